@@ -7,6 +7,7 @@ from .content import router as content_router
 from .history import router as history_router
 from .auth import router as auth_router
 from .articles import router as articles_router
+from .admin import router as admin_router
 from . import wechat
 from . import categories
 
@@ -20,5 +21,6 @@ api_router.include_router(auth_router)
 api_router.include_router(articles_router)
 api_router.include_router(wechat.router)
 api_router.include_router(categories.router)
+api_router.include_router(admin_router)
 
 __all__ = ["api_router"]
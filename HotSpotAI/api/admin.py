@@ -0,0 +1,64 @@
+"""
+管理员 API
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from core.auth import get_current_user
+from core.job_metrics import summarize_job_runs
+from db import get_recent_job_runs
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/metrics/jobs", summary="任务运行指标")
+async def get_job_metrics(
+    job: Optional[str] = Query(None, description="任务名称（scraper / analyzer / selector），为空时返回全部"),
+    limit: int = Query(50, ge=1, le=1000, description="每个任务统计最近的运行次数"),
+    include_runs: bool = Query(False, description="是否返回每次运行的步骤明细"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    统计最近运行的任务耗时分位数（仅管理员）
+
+    每个任务返回总耗时和处理条数的 p50/p90/p99，以及各步骤（按平台爬取、每批 LLM 调用、
+    每次写库）的耗时分位数、占总耗时的比例和合计条数/字节数/token 数/错误数。
+
+    **返回示例：**
+    ```json
+    {
+        "jobs": {
+            "scraper": {
+                "runs": 24,
+                "success_rate": 1.0,
+                "last_run": "2024-01-15 10:00:00",
+                "duration_ms": {"p50": 41230.5, "p90": 52010.0, "p99": 60400.2, "max": 61000.0},
+                "items": {"p50": 180, "p90": 220, "p99": 240, "max": 241},
+                "tokens": 0,
+                "errors": 3,
+                "spans": {
+                    "scrape:weibo": {
+                        "count": 24,
+                        "duration_ms": {"p50": 820.1, "p90": 1300.4, "p99": 2100.0, "max": 2210.3},
+                        "share": 0.021,
+                        "items": 960, "bytes": 5120000, "tokens": 0, "errors": 0
+                    }
+                }
+            }
+        },
+        "limit": 50
+    }
+    ```
+    """
+    if current_user.get('is_admin', False) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="仅管理员可以查看任务指标"
+        )
+
+    runs = await get_recent_job_runs(job=job, limit=limit)
+    response = {"jobs": summarize_job_runs(runs), "limit": limit}
+    if include_runs:
+        response["runs"] = runs
+    return response
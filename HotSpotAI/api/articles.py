@@ -2,20 +2,25 @@
 用户文章 API 路由
 提供文章的创建、查询、更新、删除等功能
 """
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from email.utils import parsedate_to_datetime
+from fastapi import APIRouter, HTTPException, Depends, Header, Response, status, Query
 from pydantic import BaseModel
 from typing import Optional
 
 from core.auth import get_current_user
 from core.articles import (
-    create_article, get_user_articles, get_article_by_share_token,
-    get_article_by_id, update_article_public_status, delete_article
+    create_article, get_user_articles, get_shared_article as get_cached_shared_article,
+    get_article_by_id, update_article_public_status, delete_article, SharedArticle
 )
+from core.topics_cache import etag_matches
 from core.llm import generate_article_for_topic
 from core.config import add_log
 
 router = APIRouter(tags=["articles"], prefix="/articles")
 
+# 分享文章的缓存策略：浏览器和 nginx 短时间缓存，过期后凭 ETag / Last-Modified 协商（未变化返回 304）
+SHARE_CACHE_CONTROL = "public, max-age=60"
+
 
 class GenerateAndSaveRequest(BaseModel):
     """生成并保存文章请求"""
@@ -160,17 +165,50 @@ async def delete_article_endpoint(
     return {"message": "文章已删除"}
 
 
+def not_modified(article: SharedArticle, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """
+    检查条件请求是否命中（If-None-Match 优先，存在时忽略 If-Modified-Since）
+
+    Args:
+        article: 分享文章
+        if_none_match: If-None-Match 请求头
+        if_modified_since: If-Modified-Since 请求头
+
+    Returns:
+        是否可返回 304
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, article.etag)
+    if if_modified_since and article.updated_at:
+        try:
+            return article.updated_at <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
 @router.get("/share/{share_token}", summary="通过分享链接访问文章")
-async def get_shared_article(share_token: str):
+async def get_shared_article(
+    share_token: str,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    if_modified_since: Optional[str] = Header(None, alias="If-Modified-Since"),
+):
     """
     通过分享 token 访问文章（无需认证）
 
-    文章必须设置为公开状态
+    文章必须设置为公开状态。返回预编码的 JSON，附带 ETag 和 Last-Modified（文章更新时间）；
+    条件请求未变化时返回 304。
     """
-    article = await get_article_by_share_token(share_token)
+    article = await get_cached_shared_article(share_token)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="文章不存在或未公开"
         )
-    return article
+
+    headers = {"ETag": article.etag, "Cache-Control": SHARE_CACHE_CONTROL}
+    if article.last_modified:
+        headers["Last-Modified"] = article.last_modified
+    if not_modified(article, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    return Response(content=article.body, media_type="application/json", headers=headers)
@@ -2,16 +2,21 @@
 用户认证 API 路由
 提供注册、登录、登出等功能
 """
-from fastapi import APIRouter, HTTPException, Depends, status
+import math
+from typing import Tuple
+
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from pydantic import BaseModel
 
 from core.auth import (
     create_access_token, decode_access_token,
-    get_password_hash, verify_password, get_current_user,
+    hash_password_async, verify_and_update_password_async, get_current_user,
     Token, UserCreate, UserLogin, UserResponse
 )
 from core.users import create_user, get_user_by_username, get_user_by_id, get_user_by_email
 from core.config import add_log
+from core.rate_limit import TokenBucketLimiter, get_auth_limiters
+from db import update_user
 
 router = APIRouter(tags=["auth"], prefix="/auth")
 
@@ -23,8 +28,34 @@ class AuthResponse(BaseModel):
     user: UserResponse
 
 
+def client_ip(request: Request) -> str:
+    """客户端 IP（经 nginx 转发时由 uvicorn 按 X-Forwarded-For 还原）"""
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_rate_limit(*checks: Tuple[TokenBucketLimiter, str]) -> None:
+    """
+    检查限流，全部通过时各消耗一个令牌
+
+    Args:
+        *checks: (限流器, 键)
+
+    Raises:
+        HTTPException: 任一限流器拒绝时抛出 429 错误
+    """
+    wait = max(limiter.retry_after(key) for limiter, key in checks)
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="请求过于频繁，请稍后再试",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+    for limiter, key in checks:
+        limiter.acquire(key)
+
+
 @router.post("/register", response_model=AuthResponse, summary="用户注册")
-async def register(user_data: UserCreate):
+async def register(user_data: UserCreate, request: Request):
     """
     用户注册
 
@@ -32,6 +63,9 @@ async def register(user_data: UserCreate):
     - **email**: 邮箱（唯一）
     - **password**: 密码（至少6字符）
     """
+    ip_limiter, _ = get_auth_limiters()
+    enforce_rate_limit((ip_limiter, client_ip(request)))
+
     # 检查用户名是否已存在
     existing = await get_user_by_username(user_data.username)
     if existing:
@@ -49,7 +83,7 @@ async def register(user_data: UserCreate):
         )
 
     # 创建用户
-    password_hash = get_password_hash(user_data.password)
+    password_hash = await hash_password_async(user_data.password)
     user_id = await create_user(user_data.username, user_data.email, password_hash)
 
     if user_id is None:
@@ -82,13 +116,17 @@ async def register(user_data: UserCreate):
 
 
 @router.post("/login", response_model=AuthResponse, summary="用户登录")
-async def login(login_data: UserLogin):
+async def login(login_data: UserLogin, request: Request):
     """
     用户登录
 
     - **username**: 用户名
     - **password**: 密码
     """
+    # 按 IP 和用户名限流：限制单个来源的请求量，也限制分散来源针对同一账户的尝试
+    ip_limiter, user_limiter = get_auth_limiters()
+    enforce_rate_limit((ip_limiter, client_ip(request)), (user_limiter, login_data.username))
+
     user = await get_user_by_username(login_data.username)
 
     if user is None:
@@ -97,12 +135,17 @@ async def login(login_data: UserLogin):
             detail="用户名或密码错误"
         )
 
-    if not verify_password(login_data.password, user["password_hash"]):
+    verified, new_hash = await verify_and_update_password_async(login_data.password, user["password_hash"])
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误"
         )
 
+    # 密码哈希成本与 BCRYPT_ROUNDS 不同（调整配置前创建），按新成本保存
+    if new_hash:
+        await update_user(user["id"], password_hash=new_hash)
+
     access_token = create_access_token(
         data={"sub": user["username"], "user_id": user["id"]}
     )
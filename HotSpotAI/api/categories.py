@@ -463,28 +463,12 @@ async def refresh_category_topics(
         )
 
     try:
-        from core.tasks import run_scraper_task
-        from threading import Thread
-        import asyncio
+        from core.scheduler import dispatch_job
 
         category_ids = data.category_ids
 
-        # 在后台线程中运行异步任务
-        def run_task():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                if category_ids and len(category_ids) > 0:
-                    # 刷新指定的分类
-                    for cat_id in category_ids:
-                        loop.run_until_complete(run_scraper_task(category_id=cat_id))
-                else:
-                    # 刷新所有分类（不包含热榜新闻）
-                    loop.run_until_complete(run_scraper_task(category_id=None))
-            finally:
-                loop.close()
-
-        Thread(target=run_task, daemon=True).start()
+        # 在后台执行（数据库连接绑定在主事件循环上，不能在新线程的事件循环中使用）
+        await dispatch_job("category_refresh", category_ids=category_ids)
 
         return {
             "message": "分类热点刷新任务已启动",
@@ -1,10 +1,10 @@
 """
 内容生成相关 API
 """
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import Dict
-from core import run_full_pipeline, generate_article_for_topic
+from core import dispatch_job, generate_article_for_topic
 
 router = APIRouter(tags=["content"])
 
@@ -16,14 +16,14 @@ class GenerateRequest(BaseModel):
 
 
 @router.post("/refresh-topics", summary="刷新热点话题")
-async def refresh_topics(background_tasks: BackgroundTasks):
+async def refresh_topics():
     """
     触发热点聚合完整流程
     依次执行：爬虫 -> AI 分析 -> 热点精选
 
-    使用后台任务执行，避免阻塞 API 响应
+    任务在后台执行，避免阻塞 API 响应；多进程部署时交给持有调度锁的进程执行
     """
-    background_tasks.add_task(run_full_pipeline)
+    await dispatch_job("full_pipeline")
     return {"success": True, "message": "正在后台执行完整流程：爬虫 → AI 分析 → 热点精选"}
 
 
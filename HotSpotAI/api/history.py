@@ -5,7 +5,7 @@ from fastapi import APIRouter, Query
 from typing import Optional
 from pydantic import BaseModel
 
-from db import get_historical_topics, get_distinct_dates, get_stats
+from db import get_historical_topics, get_distinct_dates, get_stats, search_news
 
 router = APIRouter(tags=["history"])
 
@@ -18,6 +18,15 @@ class HistoryResponse(BaseModel):
     limit: int
 
 
+class SearchResponse(BaseModel):
+    """全文检索响应模型"""
+    results: list
+    total: int
+    offset: int
+    limit: int
+    mode: str
+
+
 class StatsResponse(BaseModel):
     """统计信息响应模型"""
     total_topics: int
@@ -73,6 +82,61 @@ async def get_history(
     )
 
 
+@router.get("/history/search", response_model=SearchResponse, summary="全文检索新闻和热点")
+async def search_history(
+    q: str = Query(..., min_length=1, max_length=100, description="检索词，空格分隔多个词"),
+    scope: str = Query("all", pattern="^(all|raw|topics)$", description="检索范围 (all/raw/topics)"),
+    source: Optional[str] = Query(None, description="数据源筛选"),
+    category_id: Optional[int] = Query(None, description="分类ID筛选"),
+    start_date: Optional[str] = Query(None, description="起始日期 (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)"),
+    offset: int = Query(0, ge=0, description="偏移量（用于分页）"),
+    limit: int = Query(20, ge=1, le=100, description="每页数量")
+):
+    """
+    在原始新闻 (raw_news) 和精选热点 (hot_topics) 中全文检索
+
+    **排序规则：** bm25 相关度与 AI 评分加权，检索词不足 3 个字符时退化为 LIKE 匹配并按 AI 评分排序
+
+    **高亮：** highlighted_title 为已转义的 HTML，只包含 `<mark>` 标签，可直接渲染
+
+    **返回示例：**
+    ```json
+    {
+        "results": [
+            {
+                "type": "raw",
+                "id": 12,
+                "title": "某公司发布新一代大模型",
+                "highlighted_title": "某公司发布新一代<mark>大模型</mark>",
+                "link": "https://...",
+                "source": "微博",
+                "category_id": 1,
+                "ai_score": 8.5,
+                "ai_comment": "AI 竞赛持续升温",
+                "created_at": "2024-01-15 10:30:00",
+                "rank": -5.2
+            }
+        ],
+        "total": 1,
+        "offset": 0,
+        "limit": 20,
+        "mode": "fts"
+    }
+    ```
+    """
+    return await search_news(
+        query=q,
+        scope=scope,
+        source=source,
+        category_id=category_id,
+        start_date=start_date,
+        end_date=end_date,
+        offset=offset,
+        limit=limit
+    )
+
+
 @router.get("/history/dates", summary="获取所有可用日期")
 async def get_dates():
     """
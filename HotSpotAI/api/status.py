@@ -1,16 +1,25 @@
 """
 状态相关 API
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from fastapi.responses import StreamingResponse
 from core import runtime_state, get_app_config
 from core.auth import get_current_user, get_current_user_optional
+from core.events import Event, event_bus
+from core.log_utils import get_logs, get_logs_since, get_last_log_id
+from core.topics_cache import dumps, etag_matches, get_encoded_topics, make_etag, splice_topics
 import asyncio
 import json
 from typing import Optional
 
 router = APIRouter(tags=["status"])
 
+# SSE 心跳间隔（秒）
+SSE_HEARTBEAT_INTERVAL = 15
+
+# 公开热点接口的缓存策略：浏览器和 nginx 短时间缓存，过期后凭 ETag 协商（未变化返回 304）
+PUBLIC_CACHE_CONTROL = "public, max-age=5, stale-while-revalidate=30"
+
 
 # 敏感配置字段，仅管理员可见
 SENSITIVE_FIELDS = {
@@ -65,13 +74,20 @@ def filter_config(config: dict, is_admin: bool) -> dict:
         }
 
 
-def filter_state(state: dict, is_admin: bool) -> dict:
+def filter_state(
+    state: dict,
+    is_admin: bool,
+    include_logs: bool = True,
+    include_topics: bool = True,
+) -> dict:
     """
     过滤状态信息，普通用户不显示日志
 
     Args:
         state: 原始状态字典
         is_admin: 是否为管理员
+        include_logs: 是否包含日志（SSE 中日志单独推送，状态事件不重复携带）
+        include_topics: 是否包含热点话题（不包含时由调用方拼接预编码结果）
 
     Returns:
         过滤后的状态字典（确保可序列化为 JSON）
@@ -88,28 +104,35 @@ def filter_state(state: dict, is_admin: bool) -> dict:
 
     if is_admin:
         # 管理员看到完整状态，但需要确保可序列化
-        return {
+        filtered = {
             'isRunning': state.get('isRunning', False),
             'lastRunTime': str(state.get('lastRunTime', '')),
             'nextRunTime': str(state.get('nextRunTime', '')),
-            'hot_topics': state.get('hot_topics', []),
-            'logs': state.get('logs', []),
             'task_stages': task_stages,
             'task_stats': task_stats,
             'last_scraper_count': state.get('last_scraper_count', 0),
             'last_analyzer_count': state.get('last_analyzer_count', 0),
             'last_selector_count': state.get('last_selector_count', 0),
+            'scraper_metrics': state.get('scraper_metrics', {}),
+            'scraper_breakers': state.get('scraper_breakers', {}),
+            'retry_metrics': state.get('retry_metrics', {}),
         }
+        if include_logs:
+            # 日志缓冲区是 deque，转换为列表副本（最新的在前）
+            filtered['logs'] = get_logs()
     else:
         # 普通用户不显示日志和敏感信息
-        return {
+        filtered = {
             'isRunning': state.get('isRunning', False),
             'lastRunTime': str(state.get('lastRunTime', '')),
             'nextRunTime': str(state.get('nextRunTime', '')),
-            'hot_topics': state.get('hot_topics', []),
             'task_stages': task_stages,
         }
 
+    if include_topics:
+        filtered['hot_topics'] = state.get('hot_topics', [])
+    return filtered
+
 
 @router.get("/health", summary="健康检查")
 async def health_check():
@@ -117,12 +140,31 @@ async def health_check():
     return {"status": "ok", "service": "hotspotai-api"}
 
 
+@router.get("/topics", summary="获取热点话题")
+async def get_topics(if_none_match: Optional[str] = Header(None, alias="If-None-Match")):
+    """
+    获取当前热点话题列表（无需认证）
+
+    直接返回精选任务完成时预编码的 JSON，附带强 ETag；
+    请求头 If-None-Match 与当前 ETag 一致时返回 304。
+
+    Returns:
+        热点话题列表
+    """
+    encoded = get_encoded_topics()
+    headers = {"ETag": encoded.etag, "Cache-Control": PUBLIC_CACHE_CONTROL}
+    if etag_matches(if_none_match, encoded.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
+
+
 @router.get("/status/public", summary="获取公开状态")
-async def get_public_status():
+async def get_public_status(if_none_match: Optional[str] = Header(None, alias="If-None-Match")):
     """
     获取公开的系统状态信息（无需认证）
 
-    未登录用户可以看到热点话题列表，但不包含日志和敏感配置
+    未登录用户可以看到热点话题列表，但不包含日志和敏感配置。
+    热点话题使用预编码结果拼接，ETag 由话题 ETag 和运行状态组合而成，未变化时返回 304。
 
     Returns:
         {
@@ -131,11 +173,20 @@ async def get_public_status():
             "lastRunTime": str  # 上次运行时间
         }
     """
-    return {
+    encoded = get_encoded_topics()
+    state_body = dumps({
         "isRunning": runtime_state.get('isRunning', False),
-        "hot_topics": runtime_state.get('hot_topics', []),
         "lastRunTime": runtime_state.get('lastRunTime', '')
-    }
+    })
+    etag = make_etag(encoded.etag.encode() + state_body)
+    headers = {"ETag": etag, "Cache-Control": PUBLIC_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=splice_topics(state_body, encoded),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 @router.get("/status", summary="获取系统状态")
@@ -156,20 +207,70 @@ async def get_status(current_user: dict = Depends(get_current_user)):
 
     config = get_app_config()
     filtered_config = filter_config(config, is_admin)
-    filtered_state = filter_state(runtime_state, is_admin)
+    filtered_state = filter_state(runtime_state, is_admin, include_topics=False)
+
+    # 热点话题拼接预编码结果，不再按请求重复序列化
+    body = b"".join([
+        b'{"config":', dumps(filtered_config),
+        b',"state":', splice_topics(dumps(filtered_state), get_encoded_topics()),
+        b',"is_admin":', b"true" if is_admin else b"false",
+        b"}",
+    ])
+    return Response(content=body, media_type="application/json", headers={"Cache-Control": "private, no-cache"})
 
-    return {
-        "config": filtered_config,
-        "state": filtered_state,
-        "is_admin": is_admin
-    }
+
+def encode_event(event: Event, is_admin: bool) -> str:
+    """
+    将总线事件编码为 SSE 消息（同一事件按角色只序列化一次，结果缓存在事件上）
+
+    Args:
+        event: 总线事件
+        is_admin: 订阅者是否为管理员
+
+    Returns:
+        SSE 消息文本
+    """
+    key = is_admin if event.type == "status" else None
+    message = event.encoded.get(key)
+    if message is None:
+        if event.type == "status":
+            # 状态事件只是变化通知，内容取编码时的最新状态（话题由 topics 事件推送）
+            data = dumps(filter_state(runtime_state, is_admin, include_logs=False, include_topics=False)).decode()
+        elif event.type == "topics":
+            # 精选任务完成时已编码
+            data = event.data.text
+        else:
+            data = json.dumps(event.data)
+        message = f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+        event.encoded[key] = message
+    return message
+
+
+def encode_logs(logs: list) -> str:
+    """将补发的日志编码为 SSE 消息（不带 id，不影响客户端的续传位置）"""
+    return "".join(f"event: log\ndata: {json.dumps(log)}\n\n" for log in logs)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """解析 Last-Event-ID 请求头"""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
 
 
 @router.get("/events", summary="SSE 实时事件推送")
-async def sse_events(current_user: Optional[dict] = Depends(get_current_user_optional)):
+async def sse_events(
+    current_user: Optional[dict] = Depends(get_current_user_optional),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
     """
     Server-Sent Events 实时推送系统状态更新（可选认证）
 
+    事件由产生方发布到事件总线后推送，无变化时连接处于空闲状态，每 15 秒发送一次心跳。
+    断线重连时携带 Last-Event-ID 请求头可补发期间错过的事件。
+    客户端过慢导致日志事件被丢弃时，按日志序号从日志缓冲区补发。
+
     未认证用户只接收基本状态和热点话题更新
     认证用户根据角色接收不同的信息：
     - 管理员：完整状态 + 日志
@@ -182,72 +283,57 @@ async def sse_events(current_user: Optional[dict] = Depends(get_current_user_opt
         - topics: 热点话题更新
     """
     is_admin = current_user is not None and current_user.get('is_admin', False) == 1
+    types = {"status", "topics", "log"} if is_admin else {"status", "topics"}
+    resume_id = parse_last_event_id(last_event_id)
 
     async def event_generator():
         """生成 SSE 事件"""
-        # 记录上一次的状态，用于检测变化
-        last_state = {
-            'isRunning': runtime_state.get('isRunning', False),
-            'lastRunTime': runtime_state.get('lastRunTime', ''),
-            'nextRunTime': runtime_state.get('nextRunTime', ''),
-            'logs_count': len(runtime_state.get('logs', [])) if is_admin else 0,
-            'topics_count': len(runtime_state.get('hot_topics', [])),
-            'scraper_running': runtime_state.get('scraper_running', False),
-            'analyzer_running': runtime_state.get('analyzer_running', False),
-            'selector_running': runtime_state.get('selector_running', False),
-        }
-
-        # 首次发送过滤后的状态
-        filtered_state = filter_state(runtime_state, is_admin)
-        yield f"event: status\ndata: {json.dumps(filtered_state)}\n\n"
-
+        # 已推送的最大日志序号，用于去重和丢弃后的补发（续传时由重放的日志确定）
+        last_log_id = get_last_log_id() if resume_id is None else None
+        subscriber = event_bus.subscribe(types, last_event_id=resume_id)
         try:
+            # 新连接或无法续传时先发送完整状态
+            if resume_id is None or subscriber.lagged:
+                subscriber.lagged = False
+                snapshot = Event(event_bus.last_id, "status")
+                yield encode_event(snapshot, is_admin)
+
             while True:
-                await asyncio.sleep(1)  # 每秒检查一次状态变化
-
-                # 检测是否有新日志（仅管理员）
-                if is_admin:
-                    current_logs = runtime_state.get('logs', [])
-                    current_logs_count = len(current_logs)
-                    if current_logs_count > last_state['logs_count']:
-                        # 发送新日志
-                        new_logs = current_logs[last_state['logs_count']:]
-                        for log in new_logs:
-                            yield f"event: log\ndata: {json.dumps(log)}\n\n"
-                        last_state['logs_count'] = current_logs_count
-
-                # 检测热点话题是否更新（所有用户）
-                current_topics_count = len(runtime_state.get('hot_topics', []))
-                if current_topics_count != last_state['topics_count']:
-                    yield f"event: topics\ndata: {json.dumps(runtime_state.get('hot_topics', []))}\n\n"
-                    last_state['topics_count'] = current_topics_count
-
-                # 检测状态变化（所有用户）
-                state_changed = False
-                if (runtime_state.get('isRunning') != last_state['isRunning'] or
-                    runtime_state.get('lastRunTime') != last_state['lastRunTime'] or
-                    runtime_state.get('nextRunTime') != last_state['nextRunTime'] or
-                    runtime_state.get('scraper_running') != last_state['scraper_running'] or
-                    runtime_state.get('analyzer_running') != last_state['analyzer_running'] or
-                    runtime_state.get('selector_running') != last_state['selector_running']):
-                    state_changed = True
-                    last_state['isRunning'] = runtime_state.get('isRunning', False)
-                    last_state['lastRunTime'] = runtime_state.get('lastRunTime', '')
-                    last_state['nextRunTime'] = runtime_state.get('nextRunTime', '')
-                    last_state['scraper_running'] = runtime_state.get('scraper_running', False)
-                    last_state['analyzer_running'] = runtime_state.get('analyzer_running', False)
-                    last_state['selector_running'] = runtime_state.get('selector_running', False)
-
-                if state_changed:
-                    filtered_state = filter_state(runtime_state, is_admin)
-                    yield f"event: status\ndata: {json.dumps(filtered_state)}\n\n"
-
-                # 发送心跳，保持连接
-                yield ": heartbeat\n\n"
+                events = await subscriber.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                if not events:
+                    # 发送心跳，保持连接
+                    yield ": heartbeat\n\n"
+                    continue
+
+                chunks = []
+                if subscriber.lagged:
+                    # 客户端太慢，事件被丢弃过：发送完整状态，并从日志缓冲区补发错过的日志
+                    subscriber.lagged = False
+                    events = [e for e in events if e.type != "status"]
+                    chunks.append(encode_event(Event(events[-1].id if events else event_bus.last_id, "status"), is_admin))
+                    if is_admin and last_log_id is not None:
+                        missed = get_logs_since(last_log_id)
+                        if missed:
+                            chunks.append(encode_logs(missed))
+                            last_log_id = missed[-1]["id"]
+
+                for event in events:
+                    if event.type == "log":
+                        log_id = event.data["id"]
+                        if last_log_id is not None and log_id <= last_log_id:
+                            # 已在补发中推送过
+                            continue
+                        last_log_id = log_id
+                    chunks.append(encode_event(event, is_admin))
+
+                if chunks:
+                    yield "".join(chunks)
 
         except asyncio.CancelledError:
             # 客户端断开连接
             pass
+        finally:
+            subscriber.close()
 
     return StreamingResponse(
         event_generator(),
@@ -258,3 +344,38 @@ async def sse_events(current_user: Optional[dict] = Depends(get_current_user_opt
             "X-Accel-Buffering": "no"  # 禁用 Nginx 缓冲
         }
     )
+
+
+@router.get("/logs", summary="增量获取日志")
+async def get_logs_incremental(
+    since: int = Query(0, ge=0, description="已收到的最大日志序号，只返回更新的日志"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    获取序号大于 since 的日志（仅管理员）
+
+    日志序号单调递增，客户端保存返回的 last_id，下次请求时作为 since 传入即可增量获取。
+    since 早于缓冲区中最旧的日志时返回缓冲区中的全部日志。
+
+    Returns:
+        {
+            "logs": [...],   # 新增日志（按序号正序）
+            "last_id": int   # 当前最大日志序号
+        }
+    """
+    if current_user.get('is_admin', False) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="仅管理员可以查看日志"
+        )
+
+    last_id = get_last_log_id()
+    if since > last_id:
+        # 序号来自重启前的进程，返回全部日志
+        since = 0
+
+    logs = get_logs_since(since)
+    return {
+        "logs": logs,
+        "last_id": logs[-1]["id"] if logs else last_id
+    }
@@ -0,0 +1,5 @@
+"""
+性能基准测试
+不属于 pytest 测试集，按需手动运行，例如:
+    python -m benchmarks.bench_search --rows 1000000
+"""
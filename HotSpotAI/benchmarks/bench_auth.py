@@ -0,0 +1,95 @@
+"""
+认证请求基准测试
+对比带 token 的请求在缓存前（每次验签 + 新建数据库连接查询用户）与
+缓存后（token 缓存 + 认证用户缓存）的吞吐量
+
+用法:
+    python -m benchmarks.bench_auth --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+
+async def run_requests(client, path: str, token: str, total: int, concurrency: int) -> float:
+    """以 concurrency 个并发发送 total 个请求，返回每秒请求数"""
+    headers = {"Authorization": f"Bearer {token}"}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(total: int, concurrency: int) -> None:
+    import httpx
+    from fastapi import Depends, FastAPI, HTTPException
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    import core  # noqa: F401
+    import core.users
+    from core import auth
+    from core.db_pool import close_db
+    from db import create_user, init_db
+
+    await init_db()
+    user_id = await create_user("bench", "bench@example.com", "hash")
+    token = auth.create_access_token({"sub": "bench", "user_id": user_id})
+
+    async def uncached_user(credentials: HTTPAuthorizationCredentials = Depends(auth.security)) -> dict:
+        """缓存前的认证流程：每次验签，并新建连接查询用户"""
+        _, payload = auth.verify_token(credentials.credentials)
+        user = await core.users.get_user_by_id(payload["user_id"])
+        if user is None:
+            raise HTTPException(status_code=401)
+        return user
+
+    app = FastAPI()
+
+    @app.get("/uncached")
+    async def uncached(user: dict = Depends(uncached_user)):
+        return {"id": user["id"]}
+
+    @app.get("/cached")
+    async def cached(user: dict = Depends(auth.get_current_user)):
+        return {"id": user["id"]}
+
+    # 每个请求一条日志会主导耗时
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 预热（建立共享连接、填充缓存）
+        await run_requests(client, "/uncached", token, concurrency, concurrency)
+        await run_requests(client, "/cached", token, concurrency, concurrency)
+
+        print(f"{total} 个请求，并发 {concurrency}")
+        before = await run_requests(client, "/uncached", token, total, concurrency)
+        print(f"缓存前  {before:8.0f} req/s")
+        after = await run_requests(client, "/cached", token, total, concurrency)
+        print(f"缓存后  {after:8.0f} req/s  ({after / before:.1f}x)")
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="认证请求基准测试")
+    parser.add_argument("--requests", type=int, default=5000, help="每轮请求数")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 必须在加载配置前设置，两种流程使用同一个临时数据库
+        db_path = os.path.join(tmp, "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        os.environ["JWT_KEYFILE"] = os.path.join(tmp, "jwt_keys.json")
+        import core.users
+        core.users.DB_FILE = db_path
+        asyncio.run(main(args.requests, args.concurrency))
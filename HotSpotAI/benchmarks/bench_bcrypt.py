@@ -0,0 +1,49 @@
+"""
+bcrypt 成本校准
+在部署机器上测量各 bcrypt 成本下单次哈希的耗时，推荐不超过目标耗时的最大成本（写入 BCRYPT_ROUNDS）。
+
+单次哈希耗时决定了一个线程池线程每秒能处理的登录数：
+成本每加一耗时翻倍，登录吞吐量减半，暴力破解泄露哈希的代价也翻倍。
+
+用法:
+    python -m benchmarks.bench_bcrypt --target-ms 250
+"""
+import argparse
+import time
+
+from passlib.hash import bcrypt
+
+
+def measure(rounds: int, samples: int) -> float:
+    """测量指定成本下单次哈希的耗时（毫秒，取最小值以排除调度干扰）"""
+    hasher = bcrypt.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("benchmark-password")
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(target_ms: float, min_rounds: int, max_rounds: int, samples: int) -> None:
+    recommended = min_rounds
+    print(f"{'成本':>4}  {'单次耗时':>10}  {'单线程登录/秒':>12}")
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = measure(rounds, samples)
+        print(f"{rounds:>4}  {elapsed:>8.1f}ms  {1000 / elapsed:>12.1f}")
+        if elapsed <= target_ms:
+            recommended = rounds
+        else:
+            # 成本再加一只会更慢
+            break
+    print(f"\n目标 {target_ms:.0f}ms，推荐 BCRYPT_ROUNDS={recommended}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bcrypt 成本校准")
+    parser.add_argument("--target-ms", type=float, default=250, help="单次哈希的目标耗时（毫秒）")
+    parser.add_argument("--min-rounds", type=int, default=8, help="最小成本")
+    parser.add_argument("--max-rounds", type=int, default=14, help="最大成本")
+    parser.add_argument("--samples", type=int, default=3, help="每个成本的测量次数")
+    args = parser.parse_args()
+    main(args.target_ms, args.min_rounds, args.max_rounds, args.samples)
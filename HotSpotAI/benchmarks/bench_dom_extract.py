@@ -0,0 +1,85 @@
+"""
+DOM 提取基准测试
+在本地静态页面（file:// URL，模拟今日热榜节点表格）上对比两种提取方式的耗时：
+逐行 locator（每行 count / text_content / get_attribute 三次浏览器往返）与
+一次 page.evaluate 批量提取（PlaywrightScraper.extract_links）
+
+需要已安装 Playwright 浏览器（playwright install chromium）。
+
+用法:
+    python -m benchmarks.bench_dom_extract --rows 50 --repeat 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+import core  # noqa: F401
+from scrapers.tophub import TophubSource
+
+
+def make_tophub_page(rows: int) -> str:
+    """生成包含 rows 行榜单的今日热榜节点页面"""
+    cells = "".join(
+        f'<tr><td>{i + 1}.</td><td class="al"><a href="/l?e=item{i}" target="_blank">热榜条目{i}</a></td>'
+        f'<td>{(rows - i) * 1000} 万热度</td><td class="aq"><span class="icon-like"></span></td></tr>'
+        for i in range(rows)
+    )
+    return f'<html><body><table class="table"><tbody>{cells}</tbody></table></body></html>'
+
+
+async def extract_with_locators(page, limit: int) -> List[Tuple[str, str]]:
+    """改造前的逐行提取"""
+    items = []
+    for row in (await page.locator('table.table tbody tr').all())[:limit]:
+        link_el = row.locator('td.al a')
+        if await link_el.count() > 0:
+            title = await link_el.text_content()
+            href = await link_el.get_attribute('href')
+            if title:
+                items.append((title.strip(), href))
+    return items
+
+
+async def timed(func, repeat: int) -> Tuple[float, list]:
+    """执行 repeat 次，返回中位耗时（毫秒）和最后一次结果"""
+    samples = []
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+async def main(rows: int, repeat: int) -> None:
+    source = TophubSource()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tophub.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_tophub_page(rows))
+
+        async with source.browser_context() as context:
+            page = await context.new_page()
+            await source.goto(page, f"file://{path}")
+
+            before, old = await timed(lambda: extract_with_locators(page, rows), repeat)
+            after, new = await timed(
+                lambda: source.extract_links(page, 'table.table tbody tr', 'td.al a', limit=rows), repeat
+            )
+            assert old == new, "两种提取方式结果不一致"
+
+    print(f"{rows} 行，每种方式 {repeat} 次（中位数）")
+    print(f"逐行 locator   {before:8.1f}ms")
+    print(f"批量 evaluate  {after:8.1f}ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DOM 提取基准测试")
+    parser.add_argument("--rows", type=int, default=50, help="表格行数")
+    parser.add_argument("--repeat", type=int, default=10, help="每种方式的执行次数")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,106 @@
+"""
+执行器基准测试
+对比热搜页面解析和 bcrypt 哈希在事件循环中直接执行与交给执行器执行时，
+并发的轻量请求（模拟接口请求）所经历的事件循环延迟
+
+用法:
+    python -m benchmarks.bench_executors --rows 2000 --repeat 20 --hashes 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import core  # noqa: F401
+from core.auth import get_password_hash
+from core.executors import run_blocking, run_cpu, shutdown_executors
+from scrapers.parsers import parse_weibo_hot
+
+
+def make_weibo_page(rows: int) -> str:
+    """生成包含 rows 条热搜的微博页面"""
+    cells = "".join(
+        f'<tr><td class="td-01">{i}</td><td class="td-02"><a href="/weibo?q=%23话题{i}%23">热搜话题{i}</a>'
+        f'<span>{i * 1000}</span></td></tr>'
+        for i in range(rows)
+    )
+    return f"<html><body><table><tbody>{cells}</tbody></table></body></html>"
+
+
+async def probe(stop: asyncio.Event, samples: List[float], interval: float = 0.005) -> None:
+    """模拟轻量请求：每 interval 秒醒来一次，记录实际延迟"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def measure(work: Callable) -> Dict[str, float]:
+    """执行 work，同时统计事件循环延迟（毫秒）"""
+    samples: List[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(stop, samples))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await prober
+    samples.sort()
+    return {
+        "elapsed_s": elapsed,
+        "lag_p50_ms": statistics.median(samples),
+        "lag_p99_ms": samples[int(len(samples) * 0.99) - 1] if len(samples) > 1 else samples[0],
+        "lag_max_ms": samples[-1],
+    }
+
+
+def print_row(name: str, result: Dict[str, float]) -> None:
+    print(
+        f"{name:<24} 耗时 {result['elapsed_s']:7.2f}s  "
+        f"延迟 p50 {result['lag_p50_ms']:7.1f}ms  p99 {result['lag_p99_ms']:7.1f}ms  "
+        f"max {result['lag_max_ms']:7.1f}ms"
+    )
+
+
+async def main(rows: int, repeat: int, hashes: int) -> None:
+    html = make_weibo_page(rows)
+
+    async def parse_inline():
+        for _ in range(repeat):
+            parse_weibo_hot(html, rows)
+            await asyncio.sleep(0)
+
+    async def parse_offloaded():
+        await asyncio.gather(*(run_cpu(parse_weibo_hot, html, rows) for _ in range(repeat)))
+
+    async def hash_inline():
+        for _ in range(hashes):
+            get_password_hash("benchmark-password")
+            await asyncio.sleep(0)
+
+    async def hash_offloaded():
+        await asyncio.gather(*(run_blocking(get_password_hash, "benchmark-password") for _ in range(hashes)))
+
+    # 预热进程池（首次创建进程并导入解析模块）
+    await run_cpu(parse_weibo_hot, make_weibo_page(1), 1)
+
+    print(f"微博页面 {rows} 条 x {repeat} 次，bcrypt {hashes} 次")
+    print_row("解析（事件循环内）", await measure(parse_inline))
+    print_row("解析（进程池）", await measure(parse_offloaded))
+    print_row("bcrypt（事件循环内）", await measure(hash_inline))
+    print_row("bcrypt（线程池）", await measure(hash_offloaded))
+
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="执行器基准测试")
+    parser.add_argument("--rows", type=int, default=2000, help="每个页面的热搜条数")
+    parser.add_argument("--repeat", type=int, default=20, help="解析次数")
+    parser.add_argument("--hashes", type=int, default=8, help="bcrypt 哈希次数")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat, args.hashes))
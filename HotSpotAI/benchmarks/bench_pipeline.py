@@ -0,0 +1,384 @@
+"""
+完整流程基准测试（模拟 LLM 服务）
+启动本地 OpenAI 兼容的模拟服务（子进程，可配置首字延迟、生成速度、500/429 比例和非法 JSON 比例），
+向临时数据库写入 N 条模拟 raw_news，依次执行 爬虫 -> AI 分析 -> 热点精选（与 run_full_pipeline 相同），
+统计每个阶段的耗时、LLM 调用次数、token 数、数据库写入耗时和端到端耗时。
+
+爬虫阶段回放模拟站点响应（见 benchmarks/bench_scrapers.py），不访问网络。
+AI 分析任务每次最多处理 50 条，--drain 时重复执行直到积压处理完，用于观察积压规模对总耗时的影响。
+结果写入 JSON 文件，--compare 与之前的结果对比。
+
+用法:
+    python -m benchmarks.bench_pipeline --items 100 1000 5000
+    python -m benchmarks.bench_pipeline --items 2000 --drain --latency 0.5 --token-rate 50 --rate-limit-rate 0.1
+    python -m benchmarks.bench_pipeline --items 1000 --compare benchmarks/results/pipeline-20260101-120000.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Optional
+
+import httpx
+
+import core  # noqa: F401
+from core.config import reload_settings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_DIR, "benchmarks", "results")
+
+SOURCES = ["微博", "百度", "知乎", "抖音", "小红书", "今日头条"]
+WORDS = ["人工智能", "新能源", "芯片", "高考", "电影", "旅游", "医保", "航天", "股市", "暴雨"]
+
+# 各阶段调用的数据库写入函数（core.tasks 中的引用）
+DB_WRITES = ("save_raw_news_to_db", "update_news_analysis", "save_hot_topics")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：汉字约 1 个 token，其他字符约 4 个一个 token"""
+    cjk = sum(1 for c in text if "一" <= c <= "鿿")
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+# ==================== 模拟 LLM 服务 ====================
+
+def fake_completion(system: str, user: str, rng: random.Random, malformed: bool) -> str:
+    """按提示词类型生成与真实模型格式一致的回复"""
+    indices = [int(i) for i in re.findall(r"^(\d+)\. ", user, re.M)]
+
+    if "精选" in system:
+        match = re.search(r"精选出 (\d+) 条", system)
+        count = min(int(match.group(1)) if match else 20, len(indices))
+        content = ", ".join(str(i) for i in sorted(rng.sample(indices, count)))
+    else:
+        results = [
+            {"index": i, "score": round(rng.uniform(3, 9.5), 1), "comment": f"模拟点评{i}"}
+            for i in indices
+        ]
+        content = f"```json\n{json.dumps(results, ensure_ascii=False)}\n```"
+
+    if malformed:
+        # 截断的输出（max_tokens 用尽或模型跑题时的典型情况）
+        return "以下是分析结果：" + content[: len(content) // 2]
+    return content
+
+
+def serve(port: int, latency: float, token_rate: float, error_rate: float,
+          rate_limit_rate: float, malformed_rate: float, seed: int) -> None:
+    """模拟 LLM 服务子进程"""
+    import uvicorn
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    rng = random.Random(seed)
+    stats: Dict[str, int] = {}
+
+    def reset():
+        stats.update(requests=0, ok=0, rate_limited=0, errors=0, malformed=0,
+                     prompt_tokens=0, completion_tokens=0)
+
+    reset()
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(latency)
+
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "rate limited", "type": "rate_limit_error"}},
+                status_code=429, headers={"Retry-After": "1"},
+            )
+        if roll < rate_limit_rate + error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "internal error", "type": "server_error"}}, status_code=500)
+
+        messages = body.get("messages", [])
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        malformed = rng.random() < malformed_rate
+        content = fake_completion(system, user, rng, malformed)
+
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        if token_rate > 0:
+            # 按生成速度模拟输出耗时
+            await asyncio.sleep(completion_tokens / token_rate)
+
+        stats["ok"] += 1
+        stats["malformed"] += malformed
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        return {
+            "id": f"chatcmpl-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/reset")
+    async def post_reset():
+        reset()
+        return stats
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def llm_stats(client: httpx.AsyncClient) -> Dict[str, int]:
+    return (await client.get("/stats")).json()
+
+
+# ==================== 数据库写入计时 ====================
+
+class DBWriteTimer:
+    """包装 core.tasks 中的数据库写入函数，累计调用次数和耗时"""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+    def install(self) -> None:
+        from core import tasks
+
+        for name in DB_WRITES:
+            setattr(tasks, name, self._wrap(getattr(tasks, name)))
+
+    def _wrap(self, func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.calls += 1
+                self.seconds += time.perf_counter() - start
+
+        return wrapper
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"calls": self.calls, "seconds": self.seconds}
+
+
+# ==================== 流程 ====================
+
+def synthetic_news(count: int, seed: int) -> List[Dict]:
+    """N 条模拟新闻（标题唯一）"""
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"{rng.choice(WORDS)}{rng.choice(WORDS)}相关动态第{i}条",
+            "link": f"https://example.com/news/{i}",
+            "source": rng.choice(SOURCES),
+        }
+        for i in range(count)
+    ]
+
+
+async def run_stage(name: str, func, llm: httpx.AsyncClient, timer: DBWriteTimer) -> Dict:
+    """执行一个阶段并统计耗时、LLM 调用和数据库写入"""
+    llm_before = await llm_stats(llm)
+    db_before = timer.snapshot()
+    start = time.perf_counter()
+    result = await func()
+    seconds = time.perf_counter() - start
+    llm_after = await llm_stats(llm)
+    db_after = timer.snapshot()
+
+    stage = {
+        "seconds": round(seconds, 3),
+        "result": {k: v for k, v in (result or {}).items() if k != "message"},
+        "llm": {k: llm_after[k] - llm_before[k] for k in llm_after},
+        "db_writes": db_after["calls"] - db_before["calls"],
+        "db_write_ms": round((db_after["seconds"] - db_before["seconds"]) * 1000, 1),
+    }
+    print(f"  {name:9s} {seconds:8.2f}s  LLM {stage['llm']['requests']:4d} 次  "
+          f"数据库写入 {stage['db_writes']:5d} 次 {stage['db_write_ms']:9.1f}ms")
+    return stage
+
+
+async def run_pipeline(items: int, drain: bool, seed: int, llm: httpx.AsyncClient, timer: DBWriteTimer) -> Dict:
+    """在空数据库上写入 N 条积压并执行一次完整流程"""
+    from core import tasks
+    from core.db_pool import close_db
+    from core.llm import close_llm_client
+    from db import init_db
+    from scrapers.http_client import close_http_client
+    from utils import get_retry_metrics, reset_retry_metrics
+
+    await init_db()
+    await llm.post("/reset")
+    reset_retry_metrics()
+
+    start = time.perf_counter()
+    seed_start = time.perf_counter()
+    seeded = await tasks.save_raw_news_to_db(synthetic_news(items, seed))
+    seed_seconds = time.perf_counter() - seed_start
+    print(f"  写入积压 {seeded} 条，{seed_seconds:.2f}s")
+
+    async def analyze():
+        # AI 分析任务每次最多取 50 条；drain 时重复执行直到没有新处理的条目
+        runs, totals = 0, {"analyzed_count": 0, "failed_count": 0, "skipped_count": 0}
+        while True:
+            result = await tasks.run_analyzer_task()
+            runs += 1
+            processed = sum(result.get(k, 0) for k in totals)
+            for k in totals:
+                totals[k] += result.get(k, 0)
+            if not drain or processed == 0:
+                break
+        return {**totals, "runs": runs}
+
+    pipeline_start = time.perf_counter()
+    stages = {
+        "scraper": await run_stage("爬虫", tasks.run_scraper_task, llm, timer),
+        "analyzer": await run_stage("AI 分析", analyze, llm, timer),
+        "selector": await run_stage("热点精选", tasks.run_selector_task, llm, timer),
+    }
+    pipeline_seconds = time.perf_counter() - pipeline_start
+
+    llm_total = {k: sum(s["llm"][k] for s in stages.values()) for k in stages["analyzer"]["llm"]}
+    analyzed = stages["analyzer"]["result"].get("analyzed_count", 0)
+    report = {
+        "items": items,
+        "seed_seconds": round(seed_seconds, 3),
+        "stages": stages,
+        "pipeline_seconds": round(pipeline_seconds, 3),
+        "end_to_end_seconds": round(time.perf_counter() - start, 3),
+        "analyzed_per_second": round(analyzed / max(stages["analyzer"]["seconds"], 1e-9), 1),
+        "llm": llm_total,
+        "db_write_ms": round(sum(s["db_write_ms"] for s in stages.values()), 1),
+        "retry_metrics": get_retry_metrics(),
+    }
+
+    await close_http_client()
+    await close_llm_client()
+    await close_db()
+    return report
+
+
+async def run_all(sizes: List[int], drain: bool, seed: int, port: int, tmp: str) -> List[Dict]:
+    from benchmarks.bench_scrapers import make_synthetic_fixtures
+    from core import tasks
+    from scrapers import replay
+
+    fixtures = os.path.join(tmp, "fixtures")
+    make_synthetic_fixtures(fixtures, 50)
+    replay.configure_replay("replay", fixtures)
+
+    # 基准测试与时段无关，夜间也执行
+    tasks.is_night_hours = lambda: False
+    timer = DBWriteTimer()
+    timer.install()
+
+    reports = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as llm:
+        for items in sizes:
+            # 每个规模使用新的数据库
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, f'pipeline-{items}.db')}"
+            reload_settings()
+            print(f"\n积压 {items} 条:")
+            reports.append(await run_pipeline(items, drain, seed, llm, timer))
+    return reports
+
+
+def print_summary(reports: List[Dict], previous: Optional[Dict]) -> None:
+    before = {r["items"]: r for r in previous["runs"]} if previous else {}
+    print(f"\n{'积压':>6s} {'端到端':>9s} {'分析':>8s} {'条/s':>7s} {'LLM':>5s} {'429':>4s} {'500':>4s} "
+          f"{'非法':>4s} {'输入 token':>10s} {'输出 token':>10s} {'写库':>9s}")
+    for r in reports:
+        llm = r["llm"]
+        line = (f"{r['items']:6d} {r['end_to_end_seconds']:8.2f}s {r['stages']['analyzer']['seconds']:7.2f}s "
+                f"{r['analyzed_per_second']:7.1f} {llm['requests']:5d} {llm['rate_limited']:4d} {llm['errors']:4d} "
+                f"{llm['malformed']:4d} {llm['prompt_tokens']:10d} {llm['completion_tokens']:10d} {r['db_write_ms']:8.1f}ms")
+        old = before.get(r["items"])
+        if old:
+            change = (r["end_to_end_seconds"] - old["end_to_end_seconds"]) / max(old["end_to_end_seconds"], 1e-9)
+            line += f"  ({change:+.1%} 对比上次)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="完整流程基准测试（模拟 LLM 服务）")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000], help="积压条数（可指定多个规模）")
+    parser.add_argument("--drain", action="store_true", help="重复执行 AI 分析直到积压处理完")
+    parser.add_argument("--latency", type=float, default=0.2, help="模拟 LLM 首字延迟（秒）")
+    parser.add_argument("--token-rate", type=float, default=200, help="模拟 LLM 生成速度（token/s），0 表示不限")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的比例")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="返回非法 JSON 的比例")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--port", type=int, default=3920, help="模拟 LLM 服务端口")
+    parser.add_argument("--output", help="结果 JSON 文件，默认 benchmarks/results/pipeline-<时间>.json")
+    parser.add_argument("--compare", help="与之前的结果 JSON 对比")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.latency, args.token_rate, args.error_rate,
+              args.rate_limit_rate, args.malformed_rate, args.seed)
+        return
+
+    from benchmarks.bench_sse import wait_for_port
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_pipeline", "--serve", "--port", str(args.port),
+         "--latency", str(args.latency), "--token-rate", str(args.token_rate),
+         "--error-rate", str(args.error_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+         "--malformed-rate", str(args.malformed_rate), "--seed", str(args.seed)],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+    )
+    # LLM 请求发往模拟服务
+    os.environ["LLM_API_KEY"] = "bench"
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ["LLM_MODEL"] = "fake"
+    try:
+        wait_for_port(args.port)
+        with tempfile.TemporaryDirectory() as tmp:
+            reports = asyncio.run(run_all(args.items, args.drain, args.seed, args.port, tmp))
+    finally:
+        server.terminate()
+        server.wait()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_summary(reports, previous)
+
+    result = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("serve", "output", "compare")},
+        "runs": reports,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {output}")
+
+
+if __name__ == "__main__":
+    main()
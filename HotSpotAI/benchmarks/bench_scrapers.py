@@ -0,0 +1,326 @@
+"""
+爬虫回放基准测试
+在录制的站点响应（HAR，见 scrapers/replay.py）上离线测量：
+- 解析吞吐：各平台页面/接口响应的解析耗时、条目数和字节吞吐
+- 单平台抓取耗时：ScraperFactory.scrape 在回放模式下的耗时和条目数
+- 爬虫任务耗时：run_scraper_task 端到端（含写入临时数据库）的墙钟时间
+
+--server 时 HTTP 请求经本地替身服务器（子进程中的 uvicorn）应答，计入真实的连接和 HTTP 开销；
+否则在进程内直接由录制的响应应答。没有浏览器录制的平台回退到浏览器时会失败（计为 0 条）。
+
+用法:
+    python -m benchmarks.bench_scrapers --synthetic --items 50      # 生成模拟站点响应并回放
+    python -m benchmarks.bench_scrapers --record                    # 联网抓取一次并录制（浏览器平台需要 Playwright 浏览器）
+    python -m benchmarks.bench_scrapers --replay --server --repeat 5 --output scrapers.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+import core  # noqa: F401
+from core.config import get_config, reload_settings
+from scrapers import parsers, replay
+from scrapers.douyin import HOT_LIST_API, HOT_LIST_PARAMS, extract_word_list
+from scrapers.toutiao import HOT_BOARD_API, HOT_BOARD_PARAMS, extract_hot_board
+from scrapers.tophub import TOPHUB_NODES, node_url
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WEIBO_URL = "https://s.weibo.com/top/summary"
+BAIDU_URL = "https://top.baidu.com/board?tab=realtime"
+
+# 解析吞吐测量的条目上限（取完整页面）
+PARSE_LIMIT = 1000
+
+
+def _tophub_parser(text: str) -> int:
+    return len(parsers.parse_tophub_table(text, PARSE_LIMIT)[1])
+
+
+# (名称, URL 匹配, 解析函数 响应文本 -> 条目数)
+PARSERS: List[Tuple[str, Callable[[str], bool], Callable[[str], int]]] = [
+    ("weibo", lambda url: url.startswith(WEIBO_URL), lambda text: len(parsers.parse_weibo_hot(text, PARSE_LIMIT)[1])),
+    ("baidu", lambda url: url.startswith("https://top.baidu.com/board"), lambda text: len(parsers.parse_baidu_hot(text, PARSE_LIMIT)[1])),
+    ("tophub", lambda url: url.startswith("https://tophub.today/n/"), _tophub_parser),
+    ("douyin", lambda url: url.startswith(HOT_LIST_API), lambda text: len(extract_word_list(json.loads(text)))),
+    ("toutiao", lambda url: url.startswith(HOT_BOARD_API), lambda text: len(extract_hot_board(json.loads(text)))),
+]
+
+
+# ==================== 模拟站点响应 ====================
+
+def _add(store: replay.FixtureStore, url: str, body: str, content_type: str, params: Dict = None) -> None:
+    request = httpx.Request("GET", url, params=params)
+    response = httpx.Response(200, headers={"content-type": content_type}, text=body, request=request)
+    store.add(request, response, 0.0)
+
+
+def make_synthetic_fixtures(directory: str, items: int) -> replay.FixtureStore:
+    """
+    生成各平台热榜的模拟响应（结构与真实页面/接口一致，供没有录制时离线运行）
+
+    Args:
+        directory: 录制目录
+        items: 每个榜单的条目数
+
+    Returns:
+        写入的 HTTP 录制
+    """
+    store = replay.FixtureStore(os.path.join(directory, replay.HTTP_HAR_FILE))
+    words = [f"热点话题{i}号" for i in range(items)]
+
+    weibo_rows = "".join(
+        f'<tr><td class="td-01">{i + 1}</td><td class="td-02"><a href="/weibo?q=%23{w}%23">{w}</a>'
+        f'<span>{(items - i) * 10000}</span></td></tr>'
+        for i, w in enumerate(words)
+    )
+    _add(store, WEIBO_URL, f'<html><body><table><tbody>{weibo_rows}</tbody></table></body></html>', "text/html; charset=utf-8")
+
+    baidu_rows = "".join(
+        f'<div class="category-wrap_iQLoo"><a href="https://www.baidu.com/s?wd={w}">'
+        f'<div class="c-single-text-ellipsis">{w}</div></a></div>'
+        for w in words
+    )
+    _add(store, BAIDU_URL, f'<html><body><main>{baidu_rows}</main></body></html>', "text/html; charset=utf-8")
+
+    for platform, node_id in TOPHUB_NODES.items():
+        rows = "".join(
+            f'<tr><td>{i + 1}.</td><td class="al"><a href="/l?e={platform}{i}" target="_blank">{platform}{w}</a></td>'
+            f'<td>{(items - i) * 1000} 万热度</td></tr>'
+            for i, w in enumerate(words)
+        )
+        _add(store, node_url(node_id), f'<html><body><table class="table"><tbody>{rows}</tbody></table></body></html>', "text/html; charset=utf-8")
+
+    douyin = {"status_code": 0, "data": {"word_list": [{"word": f"抖音{w}", "hot_value": (items - i) * 1000} for i, w in enumerate(words)]}}
+    _add(store, HOT_LIST_API, json.dumps(douyin, ensure_ascii=False), "application/json", HOT_LIST_PARAMS)
+
+    toutiao = {"status": "success", "data": [{"Title": f"头条{w}", "Url": f"/trending/{i}/"} for i, w in enumerate(words)]}
+    _add(store, HOT_BOARD_API, json.dumps(toutiao, ensure_ascii=False), "application/json", HOT_BOARD_PARAMS)
+
+    store.save()
+    return store
+
+
+# ==================== 测量 ====================
+
+def bench_parsers(store: replay.FixtureStore, repeat: int) -> Dict[str, Dict]:
+    """录制响应的解析吞吐（进程内直接调用，不含进程池调度开销）"""
+    results: Dict[str, Dict] = {}
+    for entry in store.entries:
+        url = entry["request"]["url"]
+        for name, matches, parse in PARSERS:
+            if not matches(url):
+                continue
+            text = replay.entry_body(entry).decode("utf-8", "replace")
+            samples = []
+            count = 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                count = parse(text)
+                samples.append(time.perf_counter() - start)
+            median = statistics.median(samples)
+            result = results.setdefault(name, {"responses": 0, "bytes": 0, "items": 0, "ms": 0.0})
+            result["responses"] += 1
+            result["bytes"] += len(text.encode("utf-8"))
+            result["items"] += count
+            result["ms"] += median * 1000
+            break
+
+    for result in results.values():
+        seconds = max(result["ms"] / 1000, 1e-9)
+        result["ms"] = round(result["ms"], 3)
+        result["items_per_s"] = round(result["items"] / seconds)
+        result["mb_per_s"] = round(result["bytes"] / seconds / 1024 / 1024, 1)
+    return results
+
+
+def reset_scraper_state() -> None:
+    """清除跨次抓取的缓存（今日热榜缓存、熔断器、会话 Cookie），每次测量都从头抓取"""
+    from scrapers.factory import ScraperFactory
+    from scrapers.http_client import clear_session
+    from scrapers.tophub import clear_tophub_cache
+
+    clear_tophub_cache()
+    ScraperFactory.reset_breakers()
+    clear_session()
+
+
+async def bench_platforms(repeat: int) -> Dict[str, Dict]:
+    """各平台单独抓取的耗时和条目数"""
+    from scrapers.factory import ScraperFactory
+
+    results = {}
+    for platform in ScraperFactory.get_available_platforms():
+        samples = []
+        count = 0
+        for _ in range(repeat):
+            reset_scraper_state()
+            start = time.perf_counter()
+            count = len(await ScraperFactory.scrape(platform, limit=20))
+            samples.append((time.perf_counter() - start) * 1000)
+        results[platform] = {"items": count, "median_ms": round(statistics.median(samples), 1)}
+    return results
+
+
+async def bench_scraper_task(repeat: int) -> Dict:
+    """run_scraper_task 端到端墙钟时间（临时数据库）"""
+    from core import tasks
+    from db import init_db
+
+    await init_db()
+    # 基准测试与时段无关，夜间也执行
+    tasks.is_night_hours = lambda: False
+
+    samples = []
+    result = {}
+    for _ in range(repeat):
+        reset_scraper_state()
+        start = time.perf_counter()
+        result = await tasks.run_scraper_task()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs_ms": [round(s, 1) for s in samples],
+        "median_ms": round(statistics.median(samples), 1),
+        "scraped_count": result.get("scraped_count", 0),
+        "hot_ranking_count": result.get("hot_ranking_count", 0),
+        "category_count": result.get("category_count", 0),
+    }
+
+
+async def run_replay(directory: str, repeat: int, server: str) -> Dict:
+    from core.db_pool import close_db
+    from scrapers.http_client import close_http_client
+
+    replay.configure_replay("replay", directory, server)
+    await close_http_client()
+    store = replay.get_http_store()
+    if not len(store):
+        raise SystemExit(f"{directory} 中没有录制的响应，先使用 --record 或 --synthetic")
+
+    report = {
+        "mode": "server" if server else "in-process",
+        "fixtures": directory,
+        "recorded_requests": len(store),
+        "repeat": repeat,
+        "parse": bench_parsers(store, repeat),
+        "platforms": await bench_platforms(repeat),
+        "scraper_task": await bench_scraper_task(repeat),
+    }
+    await close_http_client()
+    await close_db()
+    return report
+
+
+async def run_record(directory: str) -> None:
+    from core import tasks
+    from core.db_pool import close_db
+    from db import init_db
+    from scrapers.http_client import close_http_client
+
+    replay.configure_replay("record", directory)
+    await close_http_client()
+    await init_db()
+    tasks.is_night_hours = lambda: False
+    reset_scraper_state()
+    result = await tasks.run_scraper_task()
+    await close_http_client()
+    await close_db()
+    print(f"录制完成: {result['message']}")
+    print(f"HTTP 请求 {len(replay.get_http_store())} 个 -> {os.path.join(directory, replay.HTTP_HAR_FILE)}")
+
+
+def print_report(report: Dict) -> None:
+    print(f"回放方式: {report['mode']}，录制请求 {report['recorded_requests']} 个，每项 {report['repeat']} 次")
+    print("\n解析吞吐（中位数）")
+    for name, r in report["parse"].items():
+        print(f"  {name:8s} {r['responses']:3d} 个响应 {r['bytes'] / 1024:8.1f}KB "
+              f"{r['items']:5d} 条 {r['ms']:8.2f}ms  {r['items_per_s']:>9,} 条/s  {r['mb_per_s']:6.1f}MB/s")
+    print("\n单平台抓取（中位数）")
+    for platform, r in report["platforms"].items():
+        print(f"  {platform:12s} {r['items']:3d} 条 {r['median_ms']:8.1f}ms")
+    task = report["scraper_task"]
+    print(f"\nrun_scraper_task: 中位 {task['median_ms']:.1f}ms，共 {task['scraped_count']} 条 "
+          f"(热榜 {task['hot_ranking_count']}，分类 {task['category_count']})")
+
+
+def serve(directory: str, port: int) -> None:
+    """替身服务器子进程"""
+    import uvicorn
+
+    store = replay.FixtureStore.load(os.path.join(directory, replay.HTTP_HAR_FILE))
+    uvicorn.run(replay.fixture_app(store), host="127.0.0.1", port=port, log_level="warning")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫回放基准测试")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", action="store_true", help="联网抓取一次并录制响应")
+    mode.add_argument("--replay", action="store_true", help="回放录制的响应（默认）")
+    mode.add_argument("--synthetic", action="store_true", help="生成模拟站点响应后回放（写入临时目录）")
+    parser.add_argument("--fixtures", default=None, help="录制目录，默认 SCRAPER_REPLAY_DIR")
+    parser.add_argument("--items", type=int, default=50, help="--synthetic 时每个榜单的条目数")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量次数")
+    parser.add_argument("--server", action="store_true", help="经本地替身服务器回放 HTTP 请求")
+    parser.add_argument("--port", type=int, default=3910, help="替身服务器端口")
+    parser.add_argument("--output", help="结果写入 JSON 文件")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    directory = args.fixtures or get_config("scraper_replay_dir", "./fixtures/scrapers")
+
+    if args.serve:
+        serve(directory, args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 抓取结果写入临时数据库，不影响本地数据
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        reload_settings()
+
+        if args.record:
+            asyncio.run(run_record(directory))
+            return
+
+        if args.synthetic:
+            directory = os.path.join(tmp, "fixtures")
+            make_synthetic_fixtures(directory, args.items)
+
+        server = None
+        server_url = None
+        if args.server:
+            from benchmarks.bench_sse import wait_for_port
+
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_scrapers", "--serve",
+                 "--fixtures", os.path.abspath(directory), "--port", str(args.port)],
+                cwd=PROJECT_DIR,
+                env={**os.environ, "LOG_LEVEL": "WARNING"},
+            )
+            server_url = f"http://127.0.0.1:{args.port}"
+        try:
+            if server is not None:
+                wait_for_port(args.port)
+            report = asyncio.run(run_replay(directory, args.repeat, server_url))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+全文检索基准测试
+对比 FTS5 (trigram) 检索与 LIKE 全表扫描在大数据量下的耗时
+
+用法:
+    python -m benchmarks.bench_search --rows 1000000 --repeat 5
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import List
+
+import core  # noqa: F401  先加载 core，避免 db <-> core 循环导入
+from db.search import FTS_SCHEMA, build_search_query
+
+WORDS = [
+    "人工智能", "大模型", "芯片", "半导体", "新能源", "汽车", "股市", "基金", "高考", "留学",
+    "电影", "票房", "综艺", "旅游", "机票", "酒店", "健康", "医保", "疫苗", "手机",
+    "发布会", "裁员", "跳槽", "创业", "咖啡", "奶茶", "外卖", "暴雨", "台风", "航天",
+]
+SOURCES = ["微博", "百度", "知乎", "抖音", "小红书", "今日头条"]
+# "航天" 不足 3 个字符，两列都走 LIKE，用于对照
+QUERIES = ["大模型", "人工智能", "发布会", "航天"]
+
+
+def create_fixture(path: str, rows: int) -> None:
+    """生成 raw_news / hot_topics 测试数据并建立全文索引"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    for table in ("raw_news", "hot_topics"):
+        conn.execute(f'''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                link TEXT NOT NULL,
+                source TEXT NOT NULL,
+                category_id INTEGER,
+                ai_score DECIMAL(3,2),
+                ai_comment TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    for sql in FTS_SCHEMA:
+        conn.execute(sql)
+
+    rng = random.Random(42)
+    # 随机汉字组成的填充词，让检索词只命中少量行（贴近真实语料的选择性）
+    fillers = ["".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(2)) for _ in range(5000)]
+
+    def generate(count: int):
+        for i in range(count):
+            words = rng.sample(fillers, 6)
+            if rng.random() < 0.02:
+                words.insert(rng.randint(0, 6), rng.choice(WORDS))
+            title = "".join(words) + f"第{i}期"
+            yield (
+                title,
+                f"https://example.com/{i}",
+                rng.choice(SOURCES),
+                rng.randint(1, 10),
+                round(rng.uniform(0, 10), 2),
+                "",
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00",
+            )
+
+    insert = '''
+        INSERT INTO {table} (title, link, source, category_id, ai_score, ai_comment, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    conn.executemany(insert.format(table="raw_news"), generate(rows))
+    conn.executemany(insert.format(table="hot_topics"), generate(max(rows // 100, 1)))
+    conn.commit()
+    conn.close()
+
+
+def run_query(conn: sqlite3.Connection, query: str, allow_fts: bool, repeat: int) -> List[float]:
+    """执行检索（查询 + 计数），返回每次耗时（毫秒）"""
+    sql, params, count_sql, count_params, _ = build_search_query(query, allow_fts=allow_fts)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(count_sql, count_params).fetchone()
+        conn.execute(sql, params + [20, 0]).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FTS5 vs LIKE 检索基准测试")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="raw_news 行数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询重复次数")
+    parser.add_argument("--db", default=None, help="复用已有的测试数据库文件")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench_search.db")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        create_fixture(path, args.rows)
+        print(f"生成 {args.rows} 行测试数据: {time.perf_counter() - start:.1f}s ({path})")
+
+    conn = sqlite3.connect(path)
+    print(f"{'查询':<16}{'FTS5 (ms)':>12}{'LIKE (ms)':>12}{'加速比':>10}")
+    for query in QUERIES:
+        fts = min(run_query(conn, query, True, args.repeat))
+        like = min(run_query(conn, query, False, args.repeat))
+        print(f"{query:<16}{fts:>12.1f}{like:>12.1f}{like / fts:>9.1f}x")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+SSE 负载测试
+启动只包含状态路由的服务子进程，建立大量空闲 SSE 连接，统计：
+- 空闲期间服务进程的 CPU 占用（事件驱动推送，空闲连接不应消耗 CPU）
+- 发布一条事件后推送到所有连接的耗时
+
+用法:
+    python -m benchmarks.bench_sse --clients 1000 --idle 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve(port: int) -> None:
+    """服务子进程：状态路由 + 基准测试辅助接口"""
+    import uvicorn
+    from fastapi import FastAPI
+
+    import core  # noqa: F401
+    from api import status
+    from core.topics_cache import set_hot_topics
+
+    app = FastAPI()
+    app.include_router(status.router, prefix="/api")
+
+    @app.get("/bench/cpu")
+    async def cpu():
+        return {"cpu": time.process_time()}
+
+    @app.post("/bench/publish")
+    async def publish():
+        set_hot_topics([{"title": "基准测试", "sent_at": time.time()}])
+        return {"ok": True}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+async def request(port: int, method: str, path: str) -> dict:
+    """发送一个简单的 HTTP 请求并解析 JSON 响应"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    return json.loads(raw.split(b"\r\n\r\n", 1)[1])
+
+
+class SSEClient:
+    """最小化 SSE 客户端（原始 socket，避免客户端开销影响测量）"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.received_at = None
+        self.connected = asyncio.Event()
+        self.task = None
+
+    async def run(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"GET /api/events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+        await writer.drain()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.startswith(b"event: status"):
+                    self.connected.set()
+                elif line.startswith(b"event: topics"):
+                    self.received_at = time.time()
+        finally:
+            writer.close()
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("服务启动超时")
+
+
+async def run_benchmark(port: int, clients: int, idle: float) -> None:
+    sse_clients: List[SSEClient] = []
+    start = time.perf_counter()
+    for i in range(clients):
+        client = SSEClient(port)
+        client.task = asyncio.create_task(client.run())
+        sse_clients.append(client)
+        if i % 100 == 99:
+            await asyncio.sleep(0)
+    await asyncio.wait_for(asyncio.gather(*(c.connected.wait() for c in sse_clients)), 120)
+    print(f"建立 {clients} 个 SSE 连接: {time.perf_counter() - start:.1f}s")
+
+    # 空闲期间的 CPU 占用
+    cpu_before = (await request(port, "GET", "/bench/cpu"))["cpu"]
+    await asyncio.sleep(idle)
+    cpu_after = (await request(port, "GET", "/bench/cpu"))["cpu"]
+    cpu_ms = (cpu_after - cpu_before) * 1000
+    print(f"空闲 {idle:.0f}s 服务进程 CPU: {cpu_ms:.1f} ms ({cpu_ms / idle / 10:.2f}% 单核)")
+
+    # 推送延迟
+    sent = time.time()
+    await request(port, "POST", "/bench/publish")
+    deadline = time.time() + 30
+    while time.time() < deadline and any(c.received_at is None for c in sse_clients):
+        await asyncio.sleep(0.01)
+    latencies = sorted((c.received_at - sent) * 1000 for c in sse_clients if c.received_at)
+    if latencies:
+        print(f"事件推送到 {len(latencies)}/{clients} 个连接: "
+              f"p50 {latencies[len(latencies) // 2]:.1f} ms，最大 {latencies[-1]:.1f} ms")
+
+    for c in sse_clients:
+        c.task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE 负载测试")
+    parser.add_argument("--clients", type=int, default=1000, help="SSE 连接数")
+    parser.add_argument("--idle", type=float, default=10, help="空闲观察时长（秒）")
+    parser.add_argument("--port", type=int, default=3900, help="服务端口")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_sse", "--serve", "--port", str(args.port)],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+    )
+    try:
+        wait_for_port(args.port)
+        asyncio.run(run_benchmark(args.port, args.clients, args.idle))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+启动耗时基准测试
+用 python -X importtime 统计 `import main` 的导入耗时，并检查较重的模块没有在启动时被加载
+
+用法:
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --budget-ms 800   # 超出预算时退出码为 1，可用于 CI 回归检查
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动时不应加载的模块（按需在首次使用时导入）
+LAZY_MODULES = ["openai", "playwright"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def measure_once() -> Tuple[int, Dict[str, int]]:
+    """
+    在子进程中导入 main 一次
+
+    Returns:
+        (main 的累计导入耗时 us, {顶层依赖模块: 累计耗时 us})
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+    )
+
+    # importtime 先输出子模块再输出父模块：缩进 1 为顶层导入，缩进 3 为其直接依赖
+    total = 0
+    modules = {}
+    children = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 3:
+            children[name] = cumulative
+        elif indent == 1:
+            if name == "main":
+                total, modules = cumulative, children
+            children = {}
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动导入耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    parser.add_argument("--top", type=int, default=10, help="显示耗时最多的依赖模块数量")
+    parser.add_argument("--budget-ms", type=float, default=None, help="导入耗时预算（中位数，毫秒）")
+    args = parser.parse_args()
+
+    totals: List[int] = []
+    modules: Dict[str, List[int]] = {}
+    for _ in range(args.repeat):
+        total, per_module = measure_once()
+        totals.append(total)
+        for name, cost in per_module.items():
+            modules.setdefault(name, []).append(cost)
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"import main: 中位数 {median_ms:.1f} ms，最小 {min(totals) / 1000:.1f} ms")
+    print(f"\n{'模块':<32}{'累计耗时 (ms)':>14}")
+    ranked = sorted(modules.items(), key=lambda kv: statistics.median(kv[1]), reverse=True)
+    for name, costs in ranked[:args.top]:
+        print(f"{name:<32}{statistics.median(costs) / 1000:>14.1f}")
+
+    # 检查延迟加载的模块
+    check = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print(','.join(sorted(sys.modules)))"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+    )
+    loaded = set(check.stdout.strip().split(","))
+    eager = [m for m in LAZY_MODULES if m in loaded]
+
+    failed = False
+    if eager:
+        print(f"\n启动时加载了应延迟导入的模块: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"\n导入耗时 {median_ms:.1f} ms 超出预算 {args.budget_ms:.1f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
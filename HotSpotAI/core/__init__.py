@@ -12,27 +12,6 @@ from .config import (
     LOG_LIMIT,
 )
 
-from db import (
-    init_db,
-    save_topics_to_db,
-    load_latest_topics_from_db,
-    get_topics_by_source,
-    clean_old_topics,
-    get_stats,
-)
-
-from .llm import (
-    analyze_hot_topics,
-    generate_article_for_topic,
-)
-
-from .scheduler import (
-    scheduler,
-    run_full_pipeline,
-    update_scheduler,
-    start_scheduler,
-)
-
 from .logger import (
     get_logger,
     setup_file_logging,
@@ -79,13 +58,46 @@ from .exceptions import (
     general_exception_handler,
 )
 
-# 新增：服务层
-from .services import (
-    AuthService,
-    CategoryService,
-    get_auth_service,
-    get_category_service,
-)
+# 延迟导入：数据库、LLM (openai)、调度器 (apscheduler) 和服务层较重，
+# 首次访问对应属性时才加载，缩短服务启动时间，也避免 core <-> db 循环导入
+_LAZY_IMPORTS = {
+    # Database
+    "init_db": "db",
+    "save_topics_to_db": "db",
+    "load_latest_topics_from_db": "db",
+    "get_topics_by_source": "db",
+    "clean_old_topics": "db",
+    "get_stats": "db",
+    # LLM
+    "analyze_hot_topics": "core.llm",
+    "generate_article_for_topic": "core.llm",
+    # Scheduler
+    "scheduler": "core.scheduler",
+    "run_full_pipeline": "core.scheduler",
+    "update_scheduler": "core.scheduler",
+    "start_scheduler": "core.scheduler",
+    "stop_scheduler": "core.scheduler",
+    "dispatch_job": "core.scheduler",
+    "run_manual_job": "core.scheduler",
+    # Services
+    "AuthService": "core.services",
+    "CategoryService": "core.services",
+    "get_auth_service": "core.services",
+    "get_category_service": "core.services",
+}
+
+
+def __getattr__(name):
+    """按需加载 _LAZY_IMPORTS 中的属性"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     # Config
@@ -111,6 +123,9 @@ __all__ = [
     "run_full_pipeline",
     "update_scheduler",
     "start_scheduler",
+    "stop_scheduler",
+    "dispatch_job",
+    "run_manual_job",
     # Logger
     "get_logger",
     "setup_file_logging",
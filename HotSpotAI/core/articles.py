@@ -4,11 +4,74 @@
 """
 import aiosqlite
 import secrets
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime
 from typing import Optional, Dict, List
-from core.config import add_log
+from core.config import add_log, runtime_state
+from core.topics_cache import dumps, make_etag
 
 DB_FILE = "data.db"
 
+# 分享文章缓存有效期（秒）与容量
+# 热门分享链接的读取远多于写入，命中时直接返回预编码的 JSON，不访问数据库。
+# 修改公开状态和删除文章会立即失效本进程的缓存，并更新共享的 articles_version（由状态同步传播到其他进程）；
+# TTL 只用于兜底绕过接口的修改
+SHARE_CACHE_TTL = 300
+SHARE_CACHE_SIZE = 256
+
+# 分享文章缓存（LRU 顺序）: share_token -> (过期时间戳, SharedArticle)
+_share_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+# 缓存对应的 articles_version，与共享状态不一致时整体失效
+_share_cache_version: Optional[str] = None
+
+# 缓存代数：每次失效加一，读取期间发生失效时不写入缓存（避免把已取消公开的文章重新缓存）
+_share_cache_generation = 0
+
+
+class SharedArticle:
+    """预编码的分享文章"""
+
+    __slots__ = ("article_id", "body", "etag", "last_modified", "updated_at")
+
+    def __init__(self, article: Dict):
+        self.article_id = article["id"]
+        self.updated_at = _parse_timestamp(article.pop("updated_at", None))
+        self.body = dumps(article)
+        self.etag = make_etag(self.body)
+        # Last-Modified 请求头（HTTP 日期格式）
+        self.last_modified = format_datetime(self.updated_at, usegmt=True) if self.updated_at else None
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """解析 SQLite CURRENT_TIMESTAMP（UTC，精确到秒）"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def invalidate_share_cache(article_id: Optional[int] = None) -> None:
+    """
+    使分享文章缓存失效（修改公开状态或删除文章后调用，同时通知其他进程）
+
+    Args:
+        article_id: 文章 ID，为 None 时清空全部缓存
+    """
+    global _share_cache_generation
+    _share_cache_generation += 1
+    if article_id is None:
+        _share_cache.clear()
+    else:
+        for token in [t for t, (_, a) in _share_cache.items() if a.article_id == article_id]:
+            del _share_cache[token]
+    runtime_state["articles_version"] = uuid.uuid4().hex
+
 
 async def create_article(
     user_id: int,
@@ -108,7 +171,7 @@ async def get_article_by_share_token(share_token: str) -> Optional[Dict]:
         async with aiosqlite.connect(DB_FILE) as db:
             db.row_factory = aiosqlite.Row
             async with db.execute('''
-                SELECT id, topic_title, topic_link, topic_source, title, content, platform, created_at
+                SELECT id, topic_title, topic_link, topic_source, title, content, platform, created_at, updated_at
                 FROM user_articles
                 WHERE share_token = ? AND is_public = 1
             ''', (share_token,)) as cursor:
@@ -121,6 +184,44 @@ async def get_article_by_share_token(share_token: str) -> Optional[Dict]:
         return None
 
 
+async def get_shared_article(share_token: str) -> Optional[SharedArticle]:
+    """
+    获取预编码的分享文章（带进程内 TTL + LRU 缓存）
+
+    Args:
+        share_token: 分享 token
+
+    Returns:
+        SharedArticle，不存在或非公开返回 None
+    """
+    global _share_cache_version
+    version = runtime_state.get("articles_version")
+    if version != _share_cache_version:
+        _share_cache.clear()
+        _share_cache_version = version
+
+    now = time.monotonic()
+    entry = _share_cache.get(share_token)
+    if entry is not None and entry[0] > now:
+        _share_cache.move_to_end(share_token)
+        return entry[1]
+
+    generation = _share_cache_generation
+    article = await get_article_by_share_token(share_token)
+    if article is None:
+        # 不缓存不存在的 token，避免随机 token 挤掉热门文章
+        _share_cache.pop(share_token, None)
+        return None
+
+    shared = SharedArticle(article)
+    if generation == _share_cache_generation:
+        _share_cache[share_token] = (now + SHARE_CACHE_TTL, shared)
+        _share_cache.move_to_end(share_token)
+        while len(_share_cache) > SHARE_CACHE_SIZE:
+            _share_cache.popitem(last=False)
+    return shared
+
+
 async def get_article_by_id(article_id: int, user_id: int) -> Optional[Dict]:
     """
     根据 ID 获取文章（所有者访问）
@@ -168,6 +269,7 @@ async def update_article_public_status(article_id: int, user_id: int, is_public:
                 WHERE id = ? AND user_id = ?
             ''', (1 if is_public else 0, article_id, user_id))
             await db.commit()
+            invalidate_share_cache(article_id)
             return True
     except Exception as e:
         add_log('error', f'更新文章状态失败: {e}')
@@ -192,6 +294,7 @@ async def delete_article(article_id: int, user_id: int) -> bool:
                 WHERE id = ? AND user_id = ?
             ''', (article_id, user_id))
             await db.commit()
+            invalidate_share_cache(article_id)
             return True
     except Exception as e:
         add_log('error', f'删除文章失败: {e}')
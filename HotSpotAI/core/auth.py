@@ -2,19 +2,24 @@
 JWT 认证和密码管理模块
 提供 token 生成、验证和密码哈希功能
 """
-import secrets
-from jose import jwt
+import hashlib
+import time
+from collections import OrderedDict
+from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 
+from core.config import get_settings
+from core.jwt_keys import get_key_ring
+
 
 # FastAPI security (imported here for get_current_user dependency)
 try:
     from fastapi import HTTPException, Depends, status
     from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-    from core.users import get_user_by_id
+    from db.users import get_cached_user
     FASTAPI_AVAILABLE = True
 except ImportError:
     FASTAPI_AVAILABLE = False
@@ -22,13 +27,16 @@ except ImportError:
     HTTPAuthorizationCredentials = None
 
 
-# JWT 配置
-SECRET_KEY = secrets.token_urlsafe(32)
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 天
+# JWT 配置（签名密钥见 core.jwt_keys，算法和有效期见 JWT_ALGORITHM / JWT_EXPIRE_MINUTES）
+
+# 已验证 token 缓存容量（按 token 的 SHA-256 索引，缓存到 token 过期为止）
+TOKEN_CACHE_SIZE = 4096
+
+# 已验证 token 缓存（LRU 顺序）: token 摘要 -> (过期时间戳, 密钥 ID, TokenData)
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
 
-# 密码哈希上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 密码哈希上下文: (bcrypt 成本, CryptContext)，BCRYPT_ROUNDS 变化时重新创建
+_pwd_context: Optional[Tuple[int, CryptContext]] = None
 
 
 class Token(BaseModel):
@@ -65,6 +73,29 @@ class UserResponse(BaseModel):
     created_at: str
 
 
+def get_pwd_context() -> CryptContext:
+    """
+    获取密码哈希上下文
+
+    新哈希使用 BCRYPT_ROUNDS；成本与之不同的已有哈希（调整配置前创建）被视为需要更新，
+    登录时由 verify_and_update_password 透明地重新哈希。
+
+    Returns:
+        CryptContext
+    """
+    global _pwd_context
+    rounds = get_settings().bcrypt_rounds
+    if _pwd_context is None or _pwd_context[0] != rounds:
+        _pwd_context = (rounds, CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        ))
+    return _pwd_context[1]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     验证密码
@@ -76,7 +107,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         密码是否匹配
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    验证密码，哈希成本与当前配置不同时同时生成新哈希
+
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希密码
+
+    Returns:
+        (密码是否匹配, 新哈希)，不需要更新时新哈希为 None
+    """
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -89,7 +134,51 @@ def get_password_hash(password: str) -> str:
     Returns:
         哈希后的密码
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    生成密码哈希（在线程池中执行，bcrypt 计算期间不阻塞事件循环）
+
+    Args:
+        password: 明文密码
+
+    Returns:
+        哈希后的密码
+    """
+    from core.executors import run_blocking
+    return await run_blocking(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    验证密码（在线程池中执行，bcrypt 计算期间不阻塞事件循环）
+
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希密码
+
+    Returns:
+        密码是否匹配
+    """
+    from core.executors import run_blocking
+    return await run_blocking(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    验证密码并按需生成新哈希（在线程池中执行，bcrypt 计算期间不阻塞事件循环）
+
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希密码
+
+    Returns:
+        (密码是否匹配, 新哈希)，不需要更新时新哈希为 None
+    """
+    from core.executors import run_blocking
+    return await run_blocking(verify_and_update_password, plain_password, hashed_password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -103,19 +192,52 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     Returns:
         JWT token 字符串
     """
+    settings = get_settings()
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + timedelta(minutes=settings.jwt_expire_minutes)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    key_ring = get_key_ring()
+    encoded_jwt = jwt.encode(
+        to_encode,
+        key_ring.signing_key,
+        algorithm=settings.jwt_algorithm,
+        headers={"kid": key_ring.signing_kid},
+    )
     return encoded_jwt
 
 
+def verify_token(token: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    按 header 中的 kid 选择密钥验证 JWT token（不使用缓存）
+
+    Args:
+        token: JWT token 字符串
+
+    Returns:
+        (密钥 ID, payload)
+
+    Raises:
+        JWTError: 密钥未知、签名无效或已过期
+    """
+    kid = jwt.get_unverified_header(token).get("kid")
+    key_ring = get_key_ring()
+    if kid is None:
+        kid = key_ring.signing_kid
+    secret = key_ring.get(kid)
+    if secret is None:
+        # 可能是其他进程轮换后用新密钥签发的 token
+        secret = get_key_ring(force_check=True).get(kid)
+    if secret is None:
+        raise JWTError(f"未知的密钥 ID: {kid}")
+    return kid, jwt.decode(token, secret, algorithms=[get_settings().jwt_algorithm])
+
+
 def decode_access_token(token: str) -> Optional[TokenData]:
     """
-    解码并验证 JWT token
+    解码并验证 JWT token（验证通过的 token 缓存到过期为止，重复请求不再重新验签）
 
     Args:
         token: JWT token 字符串
@@ -123,14 +245,35 @@ def decode_access_token(token: str) -> Optional[TokenData]:
     Returns:
         TokenData 对象，验证失败返回 None
     """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    entry = _token_cache.get(key)
+    if entry is not None:
+        # 签名密钥已被移除（轮换后过了保留期）的 token 不再有效
+        if entry[0] > time.time() and get_key_ring().get(entry[1]) is not None:
+            _token_cache.move_to_end(key)
+            return entry[2]
+        del _token_cache[key]
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        kid, payload = verify_token(token)
         username: str = payload.get("sub")
         user_id: int = payload.get("user_id")
-        return TokenData(username=username, user_id=user_id)
+        token_data = TokenData(username=username, user_id=user_id)
     except Exception:
         return None
 
+    expires = payload.get("exp")
+    if expires is not None:
+        _token_cache[key] = (expires, kid, token_data)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return token_data
+
+
+def clear_token_cache() -> None:
+    """清空已验证 token 缓存"""
+    _token_cache.clear()
+
 
 # FastAPI security and dependency (only if FastAPI is available)
 if FASTAPI_AVAILABLE:
@@ -161,7 +304,7 @@ if FASTAPI_AVAILABLE:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        user = await get_user_by_id(token_data.user_id)
+        user = await get_cached_user(token_data.user_id)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -200,7 +343,7 @@ if FASTAPI_AVAILABLE:
         if token_data is None or token_data.user_id is None:
             return None
 
-        user = await get_user_by_id(token_data.user_id)
+        user = await get_cached_user(token_data.user_id)
         return user
 else:
     async def get_current_user_optional():
@@ -0,0 +1,81 @@
+"""
+Playwright 浏览器环境检查
+只在运行爬虫的进程（持有调度锁的 API 进程或独立调度进程）中执行，
+浏览器缺失时以子进程异步安装，不阻塞事件循环。
+"""
+import asyncio
+import sys
+from typing import Optional
+
+from .config import add_log, get_settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 检查状态: pending / checking / ok / installing / missing / error
+_status = "pending"
+
+# 检查任务（保留引用，避免任务执行中被垃圾回收）
+_task: Optional[asyncio.Task] = None
+
+
+def get_browser_status() -> str:
+    """获取浏览器检查状态"""
+    return _status
+
+
+async def check_browser() -> str:
+    """
+    检查 Playwright 浏览器环境，缺失时自动安装
+
+    Returns:
+        检查状态 (ok / missing / error)
+    """
+    global _status
+    _status = "checking"
+    add_log('info', '正在检查 Playwright 浏览器环境...')
+    try:
+        from playwright.async_api import async_playwright
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=get_settings().playwright_headless)
+            await browser.close()
+        _status = "ok"
+        logger.info("Playwright 浏览器环境正常")
+        add_log('info', 'Playwright 浏览器环境正常')
+    except Exception as e:
+        if "Executable doesn't exist" in str(e) or "playwright install" in str(e):
+            _status = "installing"
+            logger.warning("浏览器未安装，正在后台自动安装...")
+            add_log('warning', '正在自动安装浏览器 (playwright install chromium)...')
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, "-m", "playwright", "install", "chromium"
+                )
+                if await process.wait() != 0:
+                    raise RuntimeError(f"退出码 {process.returncode}")
+                _status = "ok"
+                logger.info("浏览器安装成功")
+                add_log('success', '浏览器安装成功！')
+            except Exception as install_e:
+                _status = "missing"
+                logger.error(f"浏览器安装失败: {install_e}")
+                add_log('error', f'自动安装失败: {install_e}')
+        else:
+            _status = "error"
+            logger.warning(f"浏览器环境检查异常: {str(e)}")
+            add_log('warning', f'浏览器环境检查异常: {str(e)}')
+    return _status
+
+
+def start_browser_check() -> asyncio.Task:
+    """
+    在后台开始浏览器检查（每个进程只执行一次，获得调度锁时调用）
+
+    Returns:
+        检查任务
+    """
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(check_browser())
+    return _task
@@ -25,15 +25,41 @@ class Settings(BaseSettings):
     llm_model: str = Field(default="glm-4", description="LLM 模型名称")
     llm_timeout: int = Field(default=600, description="LLM 请求超时时间(秒)")  # 增加到10分钟
 
+    # JWT 配置
+    jwt_secret_key: str = Field(default="", description="JWT 签名密钥（为空时使用 JWT_KEYFILE 密钥文件）")
+    jwt_verify_keys: str = Field(default="", description="额外接受的 JWT 验证密钥（逗号分隔，轮换密钥期间填入旧密钥）")
+    jwt_keyfile: str = Field(default="./jwt_keys.json", description="JWT 密钥文件路径（不存在时自动生成）")
+    jwt_algorithm: str = Field(default="HS256", description="JWT 签名算法 (HS256 / HS384 / HS512)")
+    jwt_expire_minutes: int = Field(default=60 * 24 * 7, description="JWT 有效期(分钟)")
+
+    # 登录保护配置
+    bcrypt_rounds: int = Field(default=12, description="bcrypt 成本（对数轮数，用 python -m benchmarks.bench_bcrypt 校准），修改后已有密码在用户下次登录时按新成本重新哈希")
+    auth_ip_rate_per_minute: float = Field(default=20, description="登录/注册接口每个 IP 每分钟补充的请求数，0 表示不限流")
+    auth_ip_burst: int = Field(default=10, description="登录/注册接口每个 IP 允许的突发请求数")
+    auth_user_rate_per_minute: float = Field(default=5, description="登录接口每个用户名每分钟补充的尝试次数，0 表示不限流")
+    auth_user_burst: int = Field(default=5, description="登录接口每个用户名允许的突发尝试次数")
+
     # 数据库配置
     database_url: str = Field(default="sqlite:///./data.db", description="数据库连接 URL")
     db_keep_days: int = Field(default=7, description="数据库保留天数")
+    raw_news_keep_days: int = Field(default=14, description="原始新闻保留天数（需大于 AI 分析的 7 天窗口）")
+    archive_enabled: bool = Field(default=True, description="过期数据是否归档（否则直接删除）")
+    archive_dir: str = Field(default="./archive", description="归档文件目录")
+    maintenance_cron: str = Field(default="30 3 * * *", description="数据维护任务 Cron 表达式（低峰期）")
 
     # 爬虫配置
     request_timeout: int = Field(default=30, description="HTTP 请求超时时间(秒)")
     max_retries: int = Field(default=3, description="最大重试次数")
     retry_delay: int = Field(default=2, description="重试延迟(秒)")
     topic_limit: int = Field(default=10, description="每个平台抓取话题数量")
+    scraper_api_fast_path: bool = Field(default=True, description="是否优先直接请求热榜接口和聚合平台页面（失败时回退到浏览器）")
+    scraper_session_ttl: int = Field(default=1800, description="浏览器会话 Cookie 供接口直连复用的时长(秒)")
+    scraper_breaker_threshold: int = Field(default=3, description="平台连续失败（或抓取为空）多少次后熔断，0 表示不熔断")
+    scraper_breaker_cooldown: int = Field(default=300, description="平台首次熔断的冷却时间(秒)，再次熔断时翻倍")
+    scraper_breaker_max_cooldown: int = Field(default=3600, description="平台熔断冷却时间上限(秒)")
+    scraper_replay_mode: str = Field(default="off", description="爬虫流量录制/回放模式：off、record（录制真实响应）、replay（只用录制的响应，不访问网络）")
+    scraper_replay_dir: str = Field(default="./fixtures/scrapers", description="爬虫流量录制文件目录（HAR 格式）")
+    retry_budget_per_job: int = Field(default=20, description="一次任务执行内所有请求共享的重试次数上限，0 表示不重试")
 
     # 微信公众号配置
     wechat_app_id: str = Field(default="", description="微信 AppID")
@@ -53,9 +79,24 @@ class Settings(BaseSettings):
     debug: bool = Field(default=False, description="调试模式")
     log_level: str = Field(default="INFO", description="日志级别")
 
+    # 多进程部署配置
+    workers: int = Field(default=1, description="API worker 进程数（大于 1 时需使用 sqlite 状态后端）")
+    state_backend: str = Field(default="auto", description="运行时状态存储后端 (auto / sqlite / memory)，auto 在多进程部署时使用 sqlite，否则使用 memory")
+    state_sync_interval: float = Field(default=1.0, description="运行时状态同步间隔(秒)")
+    scheduler_lock_ttl: int = Field(default=30, description="调度锁租约时长(秒)，持有进程退出后由其他进程接管")
+    scheduler_mode: str = Field(default="embedded", description="调度模式 (embedded: API 进程运行定时任务 / worker: 由独立的 worker.py 进程运行)")
+
+    # 执行器配置（CPU 密集和阻塞调用移出事件循环）
+    cpu_workers: int = Field(default=2, description="解析任务进程池大小")
+    cpu_queue_size: int = Field(default=32, description="解析任务进程池排队上限，超过后提交方等待")
+    blocking_workers: int = Field(default=4, description="阻塞调用（bcrypt）线程池大小")
+    blocking_queue_size: int = Field(default=64, description="阻塞调用线程池排队上限，超过后提交方等待")
+    loop_lag_threshold_ms: int = Field(default=100, description="事件循环阻塞超过该时长(毫秒)时记录警告，0 表示不监控")
+
     # Playwright 配置
     playwright_headless: bool = Field(default=True, description="浏览器是否无头模式")
     playwright_timeout: int = Field(default=30000, description="浏览器操作超时(毫秒)")
+    playwright_block_resources: bool = Field(default=True, description="是否拦截图片、字体、媒体等页面解析不需要的资源")
 
     # CORS 配置
     cors_origins: str = Field(
@@ -79,6 +120,49 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(",")]
         return v
 
+    @field_validator("jwt_algorithm")
+    @classmethod
+    def validate_jwt_algorithm(cls, v: str) -> str:
+        """验证 JWT 算法（密钥为共享密钥，只支持 HMAC）"""
+        v = v.upper()
+        valid_algorithms = ["HS256", "HS384", "HS512"]
+        if v not in valid_algorithms:
+            raise ValueError(f"jwt_algorithm must be one of {valid_algorithms}")
+        return v
+
+    @field_validator("bcrypt_rounds")
+    @classmethod
+    def validate_bcrypt_rounds(cls, v: int) -> int:
+        """验证 bcrypt 成本（bcrypt 支持 4-31）"""
+        if not 4 <= v <= 31:
+            raise ValueError("bcrypt_rounds must be between 4 and 31")
+        return v
+
+    @field_validator("scraper_breaker_threshold", "scraper_breaker_cooldown", "scraper_breaker_max_cooldown")
+    @classmethod
+    def validate_breaker(cls, v: int) -> int:
+        """验证熔断配置"""
+        if v < 0:
+            raise ValueError("scraper breaker settings must not be negative")
+        return v
+
+    @field_validator("scraper_replay_mode")
+    @classmethod
+    def validate_replay_mode(cls, v: str) -> str:
+        """验证录制/回放模式"""
+        v = v.lower()
+        if v not in ("off", "record", "replay"):
+            raise ValueError("scraper_replay_mode must be one of: off, record, replay")
+        return v
+
+    @field_validator("retry_budget_per_job")
+    @classmethod
+    def validate_retry_budget(cls, v: int) -> int:
+        """验证重试预算"""
+        if v < 0:
+            raise ValueError("retry_budget_per_job must not be negative")
+        return v
+
     @field_validator("log_level")
     @classmethod
     def validate_log_level(cls, v: str) -> str:
@@ -13,320 +13,9 @@ DB_FILE = "data.db"
 
 
 async def init_db():
-    """初始化数据库表结构（异步）"""
-    try:
-        async with get_db() as db:
-            # 热点话题表 - 精选后的最终热点
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS hot_topics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    link TEXT NOT NULL,
-                    source TEXT NOT NULL,
-                    ai_score DECIMAL(3,2),
-                    ai_comment TEXT,
-                    category_id INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (category_id) REFERENCES categories(id)
-                )
-            ''')
-
-            # 用户表
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    is_admin INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # 用户文章表
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS user_articles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    topic_id INTEGER,
-                    topic_title TEXT NOT NULL,
-                    topic_link TEXT,
-                    topic_source TEXT,
-                    title TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    platform TEXT NOT NULL,
-                    share_token TEXT UNIQUE NOT NULL,
-                    is_public INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            ''')
-
-            # 创建索引以提升查询性能
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_created_at
-                ON hot_topics(created_at DESC)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_source
-                ON hot_topics(source)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_users_username
-                ON users(username)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_users_email
-                ON users(email)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_user_articles_user_id
-                ON user_articles(user_id)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_user_articles_share_token
-                ON user_articles(share_token)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_user_articles_created_at
-                ON user_articles(created_at DESC)
-            ''')
-
-            # 创建更新时间触发器
-            await db.execute('''
-                CREATE TRIGGER IF NOT EXISTS update_users_timestamp
-                AFTER UPDATE ON users
-                BEGIN
-                    UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-                END
-            ''')
-            await db.execute('''
-                CREATE TRIGGER IF NOT EXISTS update_user_articles_timestamp
-                AFTER UPDATE ON user_articles
-                BEGIN
-                    UPDATE user_articles SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-                END
-            ''')
-
-            # 微信公众号账号配置表
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS wechat_accounts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    app_id TEXT NOT NULL,
-                    secret TEXT NOT NULL,
-                    account_name TEXT,
-                    nickname TEXT,
-                    avatar_url TEXT,
-                    access_token TEXT,
-                    token_expires_at INTEGER,
-                    is_active INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            ''')
-
-            # 微信发布记录表
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS wechat_publish_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    article_id INTEGER NOT NULL,
-                    wechat_account_id INTEGER NOT NULL,
-                    publish_type TEXT NOT NULL,
-                    media_id TEXT,
-                    publish_status TEXT DEFAULT 'pending',
-                    publish_id TEXT,
-                    published_at TIMESTAMP,
-                    error_message TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                    FOREIGN KEY (article_id) REFERENCES user_articles(id) ON DELETE CASCADE,
-                    FOREIGN KEY (wechat_account_id) REFERENCES wechat_accounts(id) ON DELETE CASCADE
-                )
-            ''')
-
-            # 微信账号表索引
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_wechat_accounts_user_id
-                ON wechat_accounts(user_id)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_wechat_accounts_is_active
-                ON wechat_accounts(is_active)
-            ''')
-
-            # 发布记录表索引
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_wechat_publish_log_user_id
-                ON wechat_publish_log(user_id)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_wechat_publish_log_article_id
-                ON wechat_publish_log(article_id)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_wechat_publish_log_created_at
-                ON wechat_publish_log(created_at DESC)
-            ''')
-
-            # 创建微信账号表更新时间触发器
-            await db.execute('''
-                CREATE TRIGGER IF NOT EXISTS update_wechat_accounts_timestamp
-                AFTER UPDATE ON wechat_accounts
-                BEGIN
-                    UPDATE wechat_accounts SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-                END
-            ''')
-
-            # ========== 分类相关表 ==========
-
-            # 分类表
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    slug TEXT UNIQUE NOT NULL,
-                    description TEXT,
-                    icon TEXT,
-                    color TEXT,
-                    is_active INTEGER DEFAULT 1,
-                    sort_order INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # 关键词表
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS category_keywords (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category_id INTEGER NOT NULL,
-                    keyword TEXT NOT NULL,
-                    weight INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
-                )
-            ''')
-
-            # 平台分类配置表
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS category_platforms (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category_id INTEGER NOT NULL,
-                    platform TEXT NOT NULL,
-                    is_enabled INTEGER DEFAULT 1,
-                    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
-                )
-            ''')
-
-            # 分类相关索引
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_category_keywords_category_id
-                ON category_keywords(category_id)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_category_keywords_keyword
-                ON category_keywords(keyword)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_category_platforms_category_id
-                ON category_platforms(category_id)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_categories_is_active
-                ON categories(is_active)
-            ''')
-
-            # 创建分类表更新时间触发器
-            await db.execute('''
-                CREATE TRIGGER IF NOT EXISTS update_categories_timestamp
-                AFTER UPDATE ON categories
-                BEGIN
-                    UPDATE categories SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-                END
-            ''')
-
-            # ========== 原始新闻表（raw_news）用于爬虫存储 ==========
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS raw_news (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    link TEXT UNIQUE NOT NULL,
-                    source TEXT NOT NULL,
-                    category_id INTEGER,
-                    analyzed BOOLEAN DEFAULT 0,
-                    analyze_fail_count INTEGER DEFAULT 0,
-                    skip_reason TEXT,
-                    ai_score DECIMAL(3,2),
-                    ai_comment TEXT,
-                    last_analyzed_at TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (category_id) REFERENCES categories(id)
-                )
-            ''')
-
-            # raw_news 索引
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_raw_news_link ON raw_news(link)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_raw_news_source ON raw_news(source)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_raw_news_analyzed ON raw_news(analyzed)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_raw_news_created_at ON raw_news(created_at DESC)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_raw_news_ai_score ON raw_news(ai_score DESC)
-            ''')
-            await db.execute('''
-                CREATE INDEX IF NOT EXISTS idx_raw_news_category_id ON raw_news(category_id)
-            ''')
-
-            await db.commit()
-
-            # 数据库迁移：为已存在的 users 表添加 is_admin 字段
-            try:
-                await db.execute('ALTER TABLE users ADD COLUMN is_admin INTEGER DEFAULT 0')
-                await db.commit()
-                add_log('info', '数据库迁移完成：已添加 is_admin 字段')
-            except Exception as migrate_error:
-                # 字段已存在，忽略错误
-                if 'duplicate column' not in str(migrate_error).lower():
-                    pass
-
-            # 数据库迁移：为已存在的 user_articles 表添加微信相关字段
-            try:
-                await db.execute('ALTER TABLE user_articles ADD COLUMN wechat_draft_id TEXT')
-                await db.execute('ALTER TABLE user_articles ADD COLUMN wechat_publish_status TEXT DEFAULT "draft"')
-                await db.commit()
-                add_log('info', '数据库迁移完成：已添加微信相关字段')
-            except Exception as migrate_error:
-                # 字段已存在，忽略错误
-                if 'duplicate column' not in str(migrate_error).lower():
-                    pass
-
-            # 数据库迁移：为 hot_topics 表添加分类相关字段
-            try:
-                await db.execute('ALTER TABLE hot_topics ADD COLUMN category_id INTEGER')
-                await db.execute('ALTER TABLE hot_topics ADD COLUMN matched_keyword TEXT')
-                await db.execute('CREATE INDEX IF NOT EXISTS idx_hot_topics_category_id ON hot_topics(category_id)')
-                await db.commit()
-                add_log('info', '数据库迁移完成：已添加分类相关字段')
-            except Exception as migrate_error:
-                # 字段已存在，忽略错误
-                if 'duplicate column' not in str(migrate_error).lower():
-                    pass
-
-        add_log('info', '数据库初始化检查完成')
-    except Exception as e:
-        add_log('error', f'数据库初始化失败: {e}')
+    """初始化数据库表结构（异步，与 db.init_db 共用同一套版本迁移）"""
+    from db.base import init_db as _init_db
+    await _init_db()
 
 
 async def save_topics_to_db(topics: List[Dict]) -> int:
@@ -42,29 +42,7 @@ class DatabasePool:
         if self._initialized:
             return
 
-        settings = get_settings()
-        db_url = settings.database_url
-        db_path = db_url.replace("sqlite:///", "").replace("sqlite://", "")
-
-        # 确保数据库目录存在
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-
-        # 创建连接
-        self._connection = await aiosqlite.connect(db_path)
-
-        # 性能优化配置
-        # WAL 模式允许读操作与写操作并发执行
-        await self._connection.execute("PRAGMA journal_mode=WAL")
-        # NORMAL 模式在安全性和性能之间平衡
-        await self._connection.execute("PRAGMA synchronous=NORMAL")
-        # 64MB 缓存
-        await self._connection.execute("PRAGMA cache_size=-64000")
-        # 临时表存储在内存中
-        await self._connection.execute("PRAGMA temp_store=MEMORY")
-        # 禁用等待（WAL 模式下不需要）
-        await self._connection.execute("PRAGMA busy_timeout=5000")
-
-        await self._connection.commit()
+        self._connection = await connect_db()
         self._initialized = True
 
     @asynccontextmanager
@@ -130,9 +108,48 @@ class DatabasePool:
             await db.commit()
 
 
+async def connect_db() -> aiosqlite.Connection:
+    """
+    创建数据库连接并配置性能优化选项
+
+    Returns:
+        aiosqlite.Connection
+    """
+    settings = get_settings()
+    db_url = settings.database_url
+    db_path = db_url.replace("sqlite:///", "").replace("sqlite://", "")
+
+    # 确保数据库目录存在
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    # 创建连接
+    connection = await aiosqlite.connect(db_path)
+
+    # 性能优化配置
+    # 增量 VACUUM（仅对新建数据库立即生效，已有数据库由 scripts/migrate.py --vacuum 切换）
+    await connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    # WAL 模式允许读操作与写操作并发执行
+    await connection.execute("PRAGMA journal_mode=WAL")
+    # NORMAL 模式在安全性和性能之间平衡
+    await connection.execute("PRAGMA synchronous=NORMAL")
+    # 64MB 缓存
+    await connection.execute("PRAGMA cache_size=-64000")
+    # 临时表存储在内存中
+    await connection.execute("PRAGMA temp_store=MEMORY")
+    # 禁用等待（WAL 模式下不需要）
+    await connection.execute("PRAGMA busy_timeout=5000")
+
+    await connection.commit()
+    return connection
+
+
 # 全局连接池实例
 _pool: Optional[DatabasePool] = None
 
+# 运行时状态同步专用连接及其互斥锁
+_state_connection: Optional[aiosqlite.Connection] = None
+_state_lock: Optional[asyncio.Lock] = None
+
 
 async def get_db_pool() -> DatabasePool:
     """
@@ -165,9 +182,39 @@ async def get_db() -> AsyncIterator[aiosqlite.Connection]:
         yield db
 
 
+@asynccontextmanager
+async def get_state_db() -> AsyncIterator[aiosqlite.Connection]:
+    """
+    获取运行时状态同步专用的数据库连接
+
+    状态同步每个周期都会写入并提交，多进程写同一个文件时容易遇到 database is locked。
+    使用独立连接，出错回滚只影响本次同步，不会回滚其他协程在共享连接上未提交的写入；
+    互斥锁保证同一时间只有一个协程在该连接上执行事务。
+
+    Returns:
+        aiosqlite.Connection
+    """
+    global _state_connection, _state_lock
+    if _state_lock is None:
+        _state_lock = asyncio.Lock()
+
+    async with _state_lock:
+        if _state_connection is None:
+            _state_connection = await connect_db()
+        try:
+            yield _state_connection
+        except Exception:
+            await _state_connection.rollback()
+            raise
+
+
 async def close_db():
     """关闭数据库连接（应用关闭时调用）"""
-    global _pool
+    global _pool, _state_connection, _state_lock
     if _pool:
         await _pool.close()
         _pool = None
+    if _state_connection is not None:
+        await _state_connection.close()
+        _state_connection = None
+        _state_lock = None
@@ -0,0 +1,203 @@
+"""
+进程内事件总线（发布/订阅）
+为 SSE 推送提供事件源：日志、任务状态、热点话题更新由产生方主动发布，
+订阅方（每个 SSE 连接）在有事件时被唤醒，空闲连接不消耗 CPU。
+
+- 每个订阅者有独立的有界队列，慢客户端不会拖慢发布方和其他订阅者
+- 可合并的事件（status / topics）在队列中只保留最新一条
+- 不可合并的事件（log）队列满时丢弃最旧的，并标记订阅者需要重新同步
+- 最近的事件保存在历史环形缓冲区中，支持按 Last-Event-ID 断线续传
+
+此模块只依赖标准库，可在任何地方安全导入（log_utils 也会使用）。
+"""
+import asyncio
+import itertools
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+# 历史事件数量（断线续传的窗口）
+EVENT_HISTORY_SIZE = 500
+
+# 每个订阅者最多积压的事件数量
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# 可合并的事件类型：只关心最新值
+COALESCE_TYPES = {"status", "topics"}
+
+
+class Event:
+    """总线事件（id 单调递增）"""
+
+    __slots__ = ("id", "type", "data", "encoded")
+
+    def __init__(self, event_id: int, event_type: str, data: Any = None):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        # 序列化结果缓存（同一事件推送给所有订阅者时只序列化一次）
+        self.encoded: Dict[Any, str] = {}
+
+
+class Subscriber:
+    """事件订阅者（每个 SSE 连接一个）"""
+
+    def __init__(self, bus: "EventBus", types: Optional[Set[str]], queue_size: int):
+        self._bus = bus
+        self.types = types
+        self.queue_size = queue_size
+        # 待发送事件: 可合并事件以类型为键，其余以事件 id 为键，保持发布顺序
+        self._pending: "OrderedDict[Any, Event]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        # 队列溢出丢弃过事件，需要发送完整状态重新同步
+        self.lagged = False
+        self.dropped = 0
+
+    def accepts(self, event: Event) -> bool:
+        return self.types is None or event.type in self.types
+
+    def _put(self, event: Event) -> None:
+        """加入事件（只在事件循环线程中调用）"""
+        if event.type in COALESCE_TYPES:
+            # 合并：移除旧值，新值排到队尾
+            self._pending.pop(event.type, None)
+            self._pending[event.type] = event
+        else:
+            if len(self._pending) >= self.queue_size:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+                self.lagged = True
+            self._pending[event.id] = event
+        self._wakeup.set()
+
+    async def get(self, timeout: Optional[float] = None) -> List[Event]:
+        """
+        等待并取出所有待发送事件
+
+        Args:
+            timeout: 超时时间（秒），超时返回空列表（可用于发送心跳）
+
+        Returns:
+            事件列表（按发布顺序）
+        """
+        if not self._pending:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+        events = sorted(self._pending.values(), key=lambda e: e.id)
+        self._pending.clear()
+        return events
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """进程内事件总线"""
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def last_id(self) -> int:
+        """最近一条事件的 id（没有事件时为 0）"""
+        with self._lock:
+            return self._history[-1].id if self._history else 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Any = None) -> Event:
+        """
+        发布事件（线程安全，可在任意线程调用）
+
+        Args:
+            event_type: 事件类型 (log / status / topics ...)
+            data: 事件数据（需可 JSON 序列化）
+
+        Returns:
+            发布的事件
+        """
+        with self._lock:
+            event = Event(next(self._ids), event_type, data)
+            self._history.append(event)
+
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return event
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._deliver(event)
+        elif not loop.is_closed():
+            # 后台线程发布（如手动刷新分类的独立事件循环），转交给订阅者所在的事件循环
+            loop.call_soon_threadsafe(self._deliver, event)
+        return event
+
+    def _deliver(self, event: Event) -> None:
+        for subscriber in list(self._subscribers):
+            if subscriber.accepts(event):
+                subscriber._put(event)
+
+    def subscribe(
+        self,
+        types: Optional[Set[str]] = None,
+        last_event_id: Optional[int] = None,
+    ) -> Subscriber:
+        """
+        订阅事件（需在事件循环中调用）
+
+        Args:
+            types: 关心的事件类型，None 表示全部
+            last_event_id: 客户端最后收到的事件 id，用于断线续传
+
+        Returns:
+            订阅者；续传窗口不足（事件已被挤出历史）时 lagged 为 True
+        """
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(self, types, self.queue_size)
+
+        if last_event_id is not None:
+            with self._lock:
+                history = list(self._history)
+            last_id = history[-1].id if history else 0
+            if last_event_id > last_id or (history and history[0].id > last_event_id + 1):
+                # 事件已被挤出历史，或 id 来自重启前的进程
+                subscriber.lagged = True
+                last_event_id = last_id
+            for event in history:
+                if event.id > last_event_id and subscriber.accepts(event):
+                    subscriber._put(event)
+
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+
+# 全局事件总线
+event_bus = EventBus()
+
+
+def publish_status() -> Event:
+    """发布运行状态变化（状态内容在推送时按订阅者角色读取和序列化）"""
+    return event_bus.publish("status")
+
+
+def publish_topics(encoded: Any) -> Event:
+    """发布热点话题更新（数据为 topics_cache.EncodedTopics，推送时直接使用预编码结果）"""
+    return event_bus.publish("topics", encoded)
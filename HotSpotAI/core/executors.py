@@ -0,0 +1,170 @@
+"""
+执行器子系统
+CPU 密集的解析（BeautifulSoup 解析热搜页面、大段 LLM JSON 解析）交给进程池，
+阻塞的 C 扩展调用（bcrypt 哈希/校验）交给线程池，事件循环只负责 I/O。
+
+每个执行器都有有界的等待队列：正在执行和排队的任务数达到上限后，新的提交在协程中等待，
+不会无限堆积在执行器内部队列里（突发的登录或抓取不会占满内存，也便于观察积压）。
+
+进程池使用 spawn 启动（事件循环进程中有 aiosqlite 等后台线程，fork 不安全），
+提交给进程池的函数和参数必须可 pickle（模块级函数）。
+进程池不可用（如受限环境无法创建进程）时回退到线程池。
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import get_settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BoundedExecutor:
+    """
+    带有界等待队列的执行器封装
+
+    同时提交（执行中 + 排队）的任务数不超过 max_workers + queue_size。
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], max_workers: int, queue_size: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.submitted = 0
+        self.waiting = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._factory()
+        return self._executor
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        在执行器中运行函数
+
+        Args:
+            func: 要执行的函数（进程池要求可 pickle）
+            *args: 位置参数
+
+        Returns:
+            函数返回值
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers + self.queue_size)
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.submitted += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.submitted -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """执行器状态（执行中 + 排队的任务数、等待提交的协程数）"""
+        return {"max_workers": self.max_workers, "submitted": self.submitted, "waiting": self.waiting}
+
+    def shutdown(self) -> None:
+        """关闭执行器（不等待正在执行的任务）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+
+def _create_process_pool(max_workers: int) -> Executor:
+    """创建进程池，失败时回退到线程池"""
+    try:
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    except (OSError, NotImplementedError) as e:
+        logger.warning(f"进程池不可用，CPU 任务改用线程池执行: {e}")
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cpu")
+
+
+_cpu_executor: Optional[BoundedExecutor] = None
+_blocking_executor: Optional[BoundedExecutor] = None
+
+
+def get_cpu_executor() -> BoundedExecutor:
+    """获取 CPU 密集任务执行器（进程池）"""
+    global _cpu_executor
+    if _cpu_executor is None:
+        settings = get_settings()
+        workers = max(1, settings.cpu_workers)
+        _cpu_executor = BoundedExecutor(
+            "cpu", lambda: _create_process_pool(workers), workers, settings.cpu_queue_size
+        )
+    return _cpu_executor
+
+
+def get_blocking_executor() -> BoundedExecutor:
+    """获取阻塞调用执行器（线程池）"""
+    global _blocking_executor
+    if _blocking_executor is None:
+        settings = get_settings()
+        workers = max(1, settings.blocking_workers)
+        _blocking_executor = BoundedExecutor(
+            "blocking",
+            lambda: ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blocking"),
+            workers,
+            settings.blocking_queue_size,
+        )
+    return _blocking_executor
+
+
+async def run_cpu(func: Callable, *args) -> Any:
+    """
+    在进程池中运行 CPU 密集函数（函数和参数必须可 pickle）
+
+    Args:
+        func: 模块级函数
+        *args: 位置参数
+
+    Returns:
+        函数返回值
+    """
+    return await get_cpu_executor().run(func, *args)
+
+
+async def run_blocking(func: Callable, *args) -> Any:
+    """
+    在线程池中运行阻塞函数（释放 GIL 的 C 扩展调用，如 bcrypt）
+
+    Args:
+        func: 函数
+        *args: 位置参数
+
+    Returns:
+        函数返回值
+    """
+    return await get_blocking_executor().run(func, *args)
+
+
+def executor_stats() -> Dict[str, Dict[str, int]]:
+    """各执行器状态"""
+    return {
+        executor.name: executor.stats()
+        for executor in (_cpu_executor, _blocking_executor)
+        if executor is not None
+    }
+
+
+def shutdown_executors() -> None:
+    """关闭所有执行器（服务关闭时调用）"""
+    global _cpu_executor, _blocking_executor
+    for executor in (_cpu_executor, _blocking_executor):
+        if executor is not None:
+            executor.shutdown()
+    _cpu_executor = None
+    _blocking_executor = None
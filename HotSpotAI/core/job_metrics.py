@@ -0,0 +1,247 @@
+"""
+任务运行指标模块
+记录每次任务执行的各个步骤（按平台爬取、每批 LLM 调用、每次写库）的耗时、条数、字节数、token 数和错误数，
+执行结束后写入 job_runs 表，供 /api/admin/metrics/jobs 统计最近运行的分位数。
+
+用法:
+    @traced_job("scraper", items_key="scraped_count")
+    async def run_scraper_task(): ...
+
+    with job_span("scrape", platform) as s:
+        topics = await ScraperFactory.scrape(platform)
+        s.items = len(topics)
+
+不在任务内（如接口直接调用爬虫）时 job_span 只计时不记录，count_span 不做任何事。
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Iterator, List, Optional
+
+from core.config import add_log
+
+# 统计的分位数
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class Span:
+    """任务中的一个步骤"""
+    kind: str
+    name: str
+    start_ms: float = 0.0
+    duration_ms: float = 0.0
+    items: int = 0
+    bytes: int = 0
+    tokens: int = 0
+    errors: int = 0
+    error: str = ""
+
+
+@dataclass
+class JobRun:
+    """一次任务执行"""
+    job: str
+    started_at: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    started: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)
+    skipped: bool = False
+
+
+_current_run: ContextVar[Optional[JobRun]] = ContextVar("job_run", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("job_span", default=None)
+
+
+@contextmanager
+def job_span(kind: str, name: str) -> Iterator[Span]:
+    """
+    记录任务中的一个步骤（异常会计入 errors 后继续抛出）
+
+    Args:
+        kind: 步骤类型（scrape / llm / db）
+        name: 步骤名称（平台名、函数名等）
+
+    Yields:
+        Span，可在块内设置 items / bytes / tokens / errors
+    """
+    run = _current_run.get()
+    span = Span(kind, name)
+    start = time.perf_counter()
+    if run is not None:
+        span.start_ms = round((start - run.started) * 1000, 1)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.errors += 1
+        span.error = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        _current_span.reset(token)
+        span.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        if run is not None:
+            run.spans.append(span)
+
+
+def count_span(items: int = 0, bytes: int = 0, tokens: int = 0, errors: int = 0) -> None:
+    """
+    累加当前步骤的计数（供 HTTP 客户端、LLM 调用等底层代码上报字节数和 token 数）
+
+    Args:
+        items: 条数
+        bytes: 字节数
+        tokens: token 数
+        errors: 错误数
+    """
+    span = _current_span.get()
+    if span is not None:
+        span.items += items
+        span.bytes += bytes
+        span.tokens += tokens
+        span.errors += errors
+
+
+def in_job_span() -> bool:
+    """当前是否在任务步骤内"""
+    return _current_span.get() is not None
+
+
+def skip_job_run() -> None:
+    """标记当前任务为跳过（如夜间时段），不写入运行记录，避免拉低耗时分位数"""
+    run = _current_run.get()
+    if run is not None:
+        run.skipped = True
+
+
+def traced_job(job: str, items_key: str = None):
+    """
+    任务运行记录装饰器
+
+    被装饰的函数返回任务结果字典（含 success），执行结束后连同各步骤写入 job_runs 表；
+    写入失败只记录警告，不影响任务结果。
+
+    Args:
+        job: 任务名称（scraper / analyzer / selector）
+        items_key: 结果字典中表示处理条数的字段
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _current_run.get() is not None:
+                # 已在其他任务的记录中（嵌套调用），由外层统一记录
+                return await func(*args, **kwargs)
+
+            run = JobRun(job)
+            token = _current_run.set(run)
+            result = None
+            try:
+                result = await func(*args, **kwargs)
+                return result
+            finally:
+                _current_run.reset(token)
+                if not run.skipped:
+                    await _save_run(run, result or {}, items_key)
+
+        return wrapper
+    return decorator
+
+
+async def _save_run(run: JobRun, result: Dict, items_key: Optional[str]) -> None:
+    from db import save_job_run
+
+    spans = [asdict(s) for s in run.spans]
+    try:
+        await save_job_run(
+            job=run.job,
+            started_at=run.started_at,
+            duration_ms=round((time.perf_counter() - run.started) * 1000, 1),
+            success=bool(result.get("success")),
+            items=result.get(items_key, 0) if items_key else 0,
+            bytes=sum(s["bytes"] for s in spans),
+            tokens=sum(s["tokens"] for s in spans),
+            errors=sum(s["errors"] for s in spans),
+            spans=spans,
+        )
+    except Exception as e:
+        add_log('warning', f'保存任务运行记录失败 ({run.job}): {e}')
+
+
+# ==================== 统计 ====================
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    计算分位数（线性插值）
+
+    Args:
+        values: 数值列表
+        p: 分位（0-100）
+
+    Returns:
+        分位数，列表为空时返回 0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * p / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return round(ordered[low] + (ordered[high] - ordered[low]) * (pos - low), 1)
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    """分位数和最大值"""
+    stats = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+    stats["max"] = round(max(values), 1) if values else 0.0
+    return stats
+
+
+def summarize_job_runs(runs: List[Dict]) -> Dict[str, Dict]:
+    """
+    按任务汇总最近的运行记录
+
+    每个步骤（kind:name）统计耗时分位数、合计条数/字节数/token 数/错误数，
+    以及在任务总耗时中的占比，用于定位每轮任务的时间花在哪里。
+
+    Args:
+        runs: get_recent_job_runs 返回的运行记录
+
+    Returns:
+        {任务名: {runs, success_rate, duration_ms, items, tokens, errors, spans: {步骤: {...}}}}
+    """
+    by_job: Dict[str, List[Dict]] = {}
+    for run in runs:
+        by_job.setdefault(run["job"], []).append(run)
+
+    summary = {}
+    for job, job_runs in by_job.items():
+        total_ms = sum(r["duration_ms"] for r in job_runs)
+        spans: Dict[str, List[Dict]] = {}
+        for run in job_runs:
+            for span in run["spans"]:
+                spans.setdefault(f"{span['kind']}:{span['name']}", []).append(span)
+
+        summary[job] = {
+            "runs": len(job_runs),
+            "success_rate": round(sum(1 for r in job_runs if r["success"]) / len(job_runs), 3),
+            "last_run": max(r["started_at"] for r in job_runs),
+            "duration_ms": distribution([r["duration_ms"] for r in job_runs]),
+            "items": distribution([r["items"] for r in job_runs]),
+            "tokens": sum(r["tokens"] for r in job_runs),
+            "errors": sum(r["errors"] for r in job_runs),
+            "spans": {
+                key: {
+                    "count": len(items),
+                    "duration_ms": distribution([s["duration_ms"] for s in items]),
+                    "share": round(sum(s["duration_ms"] for s in items) / total_ms, 3) if total_ms else 0.0,
+                    "items": sum(s["items"] for s in items),
+                    "bytes": sum(s["bytes"] for s in items),
+                    "tokens": sum(s["tokens"] for s in items),
+                    "errors": sum(s["errors"] for s in items),
+                }
+                for key, items in sorted(spans.items())
+            },
+        }
+    return summary
@@ -0,0 +1,207 @@
+"""
+JWT 签名密钥管理
+签名密钥在进程重启后保持不变，多个 worker 使用同一组密钥，任一 worker 签发的 token 都能在其他 worker 验证。
+
+密钥来源（按优先级）:
+1. JWT_SECRET_KEY（签名密钥）+ JWT_VERIFY_KEYS（轮换期间仍接受的旧密钥，逗号分隔）
+2. 密钥文件 JWT_KEYFILE：未配置 JWT_SECRET_KEY 时使用，首次启动自动生成；
+   scripts/rotate_jwt_key.py 生成新签名密钥，旧密钥保留一个 token 有效期用于验证
+
+每个 token 的 header 中带有 kid（密钥 ID），验证时按 kid 选择密钥。
+密钥文件被轮换后，各进程在 KEY_RELOAD_INTERVAL 秒内重新加载（遇到未知 kid 时立即重新加载）。
+"""
+import hashlib
+import json
+import os
+import secrets
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import get_settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 示例配置中的占位密钥，视为未配置
+PLACEHOLDER_KEYS = {"your_secret_key_here"}
+
+# 检查密钥文件是否被轮换的最短间隔（秒）
+KEY_RELOAD_INTERVAL = 30.0
+
+
+def key_id(secret: str) -> str:
+    """
+    计算密钥 ID（密钥的 SHA-256 前 16 位，不泄露密钥本身）
+
+    Args:
+        secret: 密钥
+
+    Returns:
+        密钥 ID
+    """
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+class KeyRing:
+    """一组 JWT 密钥，第一个为签名密钥，全部可用于验证"""
+
+    def __init__(self, secrets_: List[str], source: str, mtime: Optional[float] = None):
+        if not secrets_:
+            raise ValueError("至少需要一个 JWT 密钥")
+        self.source = source
+        self.mtime = mtime
+        self.keys: Dict[str, str] = {}
+        for secret in secrets_:
+            self.keys.setdefault(key_id(secret), secret)
+        self.signing_kid = key_id(secrets_[0])
+        self.signing_key = secrets_[0]
+
+    def get(self, kid: str) -> Optional[str]:
+        """按密钥 ID 获取验证密钥"""
+        return self.keys.get(kid)
+
+
+def _new_key() -> Dict:
+    return {"key": secrets.token_urlsafe(48), "created_at": time.time()}
+
+
+def _write_keyfile(path: str, keys: List[Dict]) -> None:
+    """原子写入密钥文件（仅所有者可读写）"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"keys": keys}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_keyfile(path: str) -> List[Dict]:
+    """
+    读取密钥文件，不存在时生成
+
+    多个进程同时首次启动时，只有一个进程能创建文件（O_EXCL），其他进程读取它生成的密钥。
+
+    Args:
+        path: 密钥文件路径
+
+    Returns:
+        密钥列表 [{"key", "created_at"}]，第一个为签名密钥
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"keys": [_new_key()]}, f, indent=2)
+        logger.info(f"已生成 JWT 密钥文件: {path}")
+
+    # 其他进程可能刚创建文件尚未写完，短暂重试
+    for _ in range(50):
+        with open(path) as f:
+            content = f.read()
+        if content:
+            return json.loads(content)["keys"]
+        time.sleep(0.01)
+    raise RuntimeError(f"JWT 密钥文件为空: {path}")
+
+
+def rotate_keyfile(path: str, retain_seconds: float) -> Tuple[str, int]:
+    """
+    轮换密钥文件：生成新的签名密钥，旧密钥保留 retain_seconds 秒用于验证
+
+    Args:
+        path: 密钥文件路径
+        retain_seconds: 旧密钥保留时长（应不小于 token 有效期）
+
+    Returns:
+        (新密钥 ID, 保留的旧密钥数)
+    """
+    keys = read_keyfile(path)
+    now = time.time()
+    # 旧密钥的 created_at 是它成为签名密钥的时间，它签发的最后一个 token 在下一个密钥生成时签发，
+    # 因此按后继密钥的生成时间判断是否仍可能有未过期的 token
+    retained = []
+    retired_at = now
+    for key in keys:
+        if now - retired_at < retain_seconds:
+            retained.append(key)
+        retired_at = key["created_at"]
+
+    new = _new_key()
+    _write_keyfile(path, [new] + retained)
+    return key_id(new["key"]), len(retained)
+
+
+def _parse_keys(value: str) -> List[str]:
+    return [key.strip() for key in value.split(",") if key.strip()]
+
+
+def load_key_ring() -> KeyRing:
+    """
+    按配置加载密钥
+
+    Returns:
+        KeyRing
+    """
+    settings = get_settings()
+    secret = settings.jwt_secret_key.strip()
+    if secret in PLACEHOLDER_KEYS:
+        logger.warning("JWT_SECRET_KEY 仍为示例值，已忽略，改用密钥文件")
+        secret = ""
+
+    if secret:
+        return KeyRing([secret] + _parse_keys(settings.jwt_verify_keys), source="env")
+
+    path = settings.jwt_keyfile
+    keys = read_keyfile(path)
+    return KeyRing(
+        [key["key"] for key in keys] + _parse_keys(settings.jwt_verify_keys),
+        source=path,
+        mtime=os.stat(path).st_mtime,
+    )
+
+
+_key_ring: Optional[KeyRing] = None
+_last_checked = 0.0
+
+
+def get_key_ring(force_check: bool = False) -> KeyRing:
+    """
+    获取当前密钥（密钥文件被轮换后自动重新加载）
+
+    Args:
+        force_check: 是否跳过检查间隔立即检查密钥文件（遇到未知 kid 时使用）
+
+    Returns:
+        KeyRing
+    """
+    global _key_ring, _last_checked
+    if _key_ring is None:
+        _key_ring = load_key_ring()
+        _last_checked = time.monotonic()
+        return _key_ring
+
+    if _key_ring.mtime is None:
+        return _key_ring
+
+    now = time.monotonic()
+    if not force_check and now - _last_checked < KEY_RELOAD_INTERVAL:
+        return _key_ring
+    _last_checked = now
+
+    try:
+        mtime = os.stat(_key_ring.source).st_mtime
+        if mtime != _key_ring.mtime:
+            _key_ring = load_key_ring()
+            logger.info(f"JWT 密钥已重新加载，当前签名密钥 {_key_ring.signing_kid}")
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"重新加载 JWT 密钥失败，继续使用当前密钥: {e}")
+    return _key_ring
+
+
+def reset_key_ring() -> None:
+    """丢弃已加载的密钥（配置变化后或测试中使用）"""
+    global _key_ring
+    _key_ring = None
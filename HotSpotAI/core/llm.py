@@ -2,11 +2,12 @@
 LLM 引擎模块
 处理与 GLM-4 等 AI 模型的交互
 """
+import asyncio
 import json
 import re
-from typing import List, Dict
-from openai import AsyncOpenAI
+from typing import Any, List, Dict, Optional
 from core.config import add_log, get_config
+from core.job_metrics import count_span
 from core.prompts import (
     get_analysis_prompt,
     get_analysis_retry_prompt,
@@ -15,6 +16,93 @@ from core.prompts import (
 )
 from utils import llm_retry
 
+# LLM 返回内容超过该长度（字符）时在进程池中解析 JSON；
+# 较短的内容直接解析（进程间传输的开销大于解析本身）
+JSON_OFFLOAD_THRESHOLD = 64 * 1024
+
+_client: Any = None
+_client_key: Optional[tuple] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def extract_json_array(content: str) -> Optional[list]:
+    """
+    去除 markdown 代码块标记，解析内容中第一个 [ 到最后一个 ] 之间的 JSON 数组
+
+    Args:
+        content: LLM 返回内容
+
+    Returns:
+        解析结果，找不到数组时返回 None
+    """
+    clean_content = content.replace("```json", "").replace("```", "").strip()
+    start = clean_content.find('[')
+    end = clean_content.rfind(']')
+    if start == -1 or end == -1:
+        return None
+    return json.loads(clean_content[start:end+1])
+
+
+async def parse_json_array(content: str) -> Optional[list]:
+    """
+    解析 LLM 返回的 JSON 数组（内容较大时在进程池中执行，不阻塞事件循环）
+
+    Args:
+        content: LLM 返回内容
+
+    Returns:
+        解析结果，找不到数组时返回 None
+    """
+    if len(content) >= JSON_OFFLOAD_THRESHOLD:
+        from core.executors import run_cpu
+        return await run_cpu(extract_json_array, content)
+    return extract_json_array(content)
+
+
+def _create_client(**kwargs):
+    """
+    获取 LLM 客户端（openai 导入较慢，延迟到首次调用时加载）
+
+    相同参数的调用共用一个客户端（复用连接池），事件循环或参数变化时重建。
+    每次调用都新建且不关闭客户端会泄漏连接，由 GC 回收时可能关闭已被新连接复用的文件描述符。
+
+    Args:
+        **kwargs: AsyncOpenAI 的构造参数
+
+    Returns:
+        AsyncOpenAI
+    """
+    global _client, _client_key, _client_loop
+    from openai import AsyncOpenAI
+    # 重试由 llm_retry 统一负责（按异常分类、计入任务重试预算），关闭客户端内置重试，避免重试次数相乘
+    kwargs.setdefault("max_retries", 0)
+    key = tuple(sorted(kwargs.items()))
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed() or _client_key != key or _client_loop is not loop:
+        # 旧客户端绑定在其他事件循环或使用旧配置，交给 GC 回收（不能跨事件循环关闭）
+        _client = AsyncOpenAI(**kwargs)
+        _client_key = key
+        _client_loop = loop
+    return _client
+
+
+def _count_usage(response) -> None:
+    """上报本次调用消耗的 token 数（计入当前任务步骤，见 core/job_metrics.py）"""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        count_span(tokens=usage.total_tokens or 0)
+
+
+async def close_llm_client():
+    """关闭共享 LLM 客户端"""
+    global _client, _client_key, _client_loop
+    if _client is not None:
+        if _client_loop is asyncio.get_running_loop():
+            await _client.close()
+        _client = None
+        _client_key = None
+        _client_loop = None
+
 
 async def analyze_hot_topics(raw_topics: List[Dict]):
     """
@@ -40,7 +128,7 @@ async def analyze_hot_topics(raw_topics: List[Dict]):
     add_log('info', f'API 地址: {get_config("llmBaseUrl")}')
     add_log('info', f'超时设置: {get_config("llmTimeout")} 秒')
 
-    client = AsyncOpenAI(
+    client = _create_client(
         api_key=api_key,
         base_url=get_config("llmBaseUrl"),
         timeout=get_config("llmTimeout", 600)
@@ -49,23 +137,27 @@ async def analyze_hot_topics(raw_topics: List[Dict]):
 
     # 内部请求函数
     @llm_retry
+    async def call_llm(sys_prompt, temp):
+        add_log('info', f'开始调用 LLM API (temperature={temp})...')
+        resp = await client.chat.completions.create(
+            model=model_name,
+            messages=[
+                {"role": "system", "content": sys_prompt},
+                {"role": "user", "content": f"以下是原始标题列表：\n{prompt_text}"}
+            ],
+            temperature=temp,
+            max_tokens=40960
+        )
+        add_log('info', f'LLM 响应成功，开始解析结果...')
+        choice = resp.choices[0]
+        content = choice.message.content
+        add_log('info', f'LLM 返回内容长度: {len(content) if content else 0} 字符')
+        return content if content else ""
+
     async def request_llm(sys_prompt, temp):
+        # 异常在 call_llm 的重试结束后才到达这里
         try:
-            add_log('info', f'开始调用 LLM API (temperature={temp})...')
-            resp = await client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {"role": "system", "content": sys_prompt},
-                    {"role": "user", "content": f"以下是原始标题列表：\n{prompt_text}"}
-                ],
-                temperature=temp,
-                max_tokens=40960
-            )
-            add_log('info', f'LLM 响应成功，开始解析结果...')
-            choice = resp.choices[0]
-            content = choice.message.content
-            add_log('info', f'LLM 返回内容长度: {len(content) if content else 0} 字符')
-            return content if content else ""
+            return await call_llm(sys_prompt, temp)
         except Exception as e:
             add_log('error', f'LLM 请求发生异常: {type(e).__name__}: {e}')
             return ""
@@ -81,14 +173,10 @@ async def analyze_hot_topics(raw_topics: List[Dict]):
         content = await request_llm(get_analysis_retry_prompt(), 0.5)
 
     # 3. 解析与重组
-    clean_content = content.replace("```json", "").replace("```", "").strip()
     analysis_list = []
 
     try:
-        start = clean_content.find('[')
-        end = clean_content.rfind(']')
-        if start != -1 and end != -1:
-            analysis_list = json.loads(clean_content[start:end+1])
+        analysis_list = await parse_json_array(content) or []
     except Exception as e:
         add_log('error', f'JSON 解析失败: {e}')
         return raw_topics
@@ -161,7 +249,7 @@ async def generate_article_for_topic(topic: Dict, platform: str):
 
     try:
         add_log('info', f'初始化 LLM 客户端 (超时: {get_config("llmTimeout", 600)}秒)...')
-        client = AsyncOpenAI(
+        client = _create_client(
             api_key=api_key,
             base_url=get_config("llmBaseUrl"),
             timeout=get_config("llmTimeout", 600)
@@ -183,16 +271,20 @@ async def generate_article_for_topic(topic: Dict, platform: str):
             "然后基于搜索到的事实，严格按照 System Prompt 中的平台风格要求进行创作。"
         )
 
+        @llm_retry
+        async def request_llm():
+            return await client.chat.completions.create(
+                model=get_config("llmModel", "glm-4"),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                tools=tools_config
+            )
+
         add_log('info', '调用 LLM API 进行文案生成 (联网搜索已启用)...')
-        response = await client.chat.completions.create(
-            model=get_config("llmModel", "glm-4"),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature,
-            tools=tools_config
-        )
+        response = await request_llm()
 
         content = response.choices[0].message.content
         add_log('info', f'文案生成完成，内容长度: {len(content) if content else 0} 字符')
@@ -257,7 +349,7 @@ async def analyze_news_batch(news_list: List[Dict]) -> List[Dict]:
 
         add_log('info', f'正在批量分析 {len(news_list)} 条新闻...')
 
-        client = AsyncOpenAI(
+        client = _create_client(
             api_key=api_key,
             base_url=get_config("llmBaseUrl"),
             timeout=get_config("llmTimeout", 300)
@@ -274,18 +366,15 @@ async def analyze_news_batch(news_list: List[Dict]) -> List[Dict]:
                 temperature=0.3,
                 max_tokens=8192
             )
+            _count_usage(response)
             return response.choices[0].message.content
 
         content = await request_llm()
 
         # 解析结果
-        clean_content = content.replace("```json", "").replace("```", "").strip()
         try:
-            start = clean_content.find('[')
-            end = clean_content.rfind(']')
-            if start != -1 and end != -1:
-                analysis_list = json.loads(clean_content[start:end+1])
-
+            analysis_list = await parse_json_array(content)
+            if analysis_list is not None:
                 # 构建结果映射
                 score_map = {}
                 for item in analysis_list:
@@ -398,22 +487,27 @@ async def select_hot_topics(news_list: List[Dict], count: int = 20) -> List[Dict
 
         add_log('info', f'正在使用 AI 从 {len(candidates)} 条候选中精选 {count} 条...')
 
-        client = AsyncOpenAI(
+        client = _create_client(
             api_key=api_key,
             base_url=get_config("llmBaseUrl"),
             timeout=get_config("llmTimeout", 300)
         )
 
-        response = await client.chat.completions.create(
-            model=get_config("llmModel", "glm-4"),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt_text}
-            ],
-            temperature=0.5,
-            max_tokens=2048
-        )
+        @llm_retry
+        async def request_llm():
+            response = await client.chat.completions.create(
+                model=get_config("llmModel", "glm-4"),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt_text}
+                ],
+                temperature=0.5,
+                max_tokens=2048
+            )
+            _count_usage(response)
+            return response
 
+        response = await request_llm()
         content = response.choices[0].message.content.strip()
 
         # 解析索引
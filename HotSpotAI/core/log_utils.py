@@ -4,17 +4,28 @@
 
 此模块不依赖 config 或 logger，可在任何地方安全导入使用
 """
+import itertools
 import threading
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, Deque, List, Dict, Optional
+
+from .events import event_bus
 
 # 日志缓冲区限制
 LOG_LIMIT = 100
 
-# 线程安全的日志缓冲区
-_log_buffer: List[Dict] = []
+# 线程安全的日志环形缓冲区（最新的在左端，超出限制时自动丢弃最旧的）
+_log_buffer: Deque[Dict] = deque(maxlen=LOG_LIMIT)
 _log_lock = threading.Lock()
 
+# 日志序号（单调递增，清空缓冲区也不重置，可作为增量获取的游标）
+_log_seq = itertools.count(1)
+
+# 日志转发目标（多进程部署时由 core.state 设置：日志先写入共享存储，
+# 再按存储分配的全局序号通过 ingest_logs 写回缓冲区，各进程序号一致）
+_log_sink: Optional[Callable[[Dict], None]] = None
+
 # 日志级别到标准 logging 的映射
 LEVEL_MAP = {
     'info': 'INFO',
@@ -38,21 +49,68 @@ def add_log_to_buffer(level: str, message: str) -> Dict:
         创建的日志条目字典
     """
     timestamp = datetime.now().strftime("%H:%M:%S")
-    log_entry = {
-        "id": int(datetime.now().timestamp() * 1000),
-        "time": timestamp,
-        "level": level,
-        "message": message
-    }
+
+    sink = _log_sink
+    if sink is not None:
+        log_entry = {"id": None, "time": timestamp, "level": level, "message": message}
+        sink(log_entry)
+        return log_entry
 
     with _log_lock:
-        _log_buffer.insert(0, log_entry)
-        if len(_log_buffer) > LOG_LIMIT:
-            _log_buffer.pop()
+        log_entry = {
+            "id": next(_log_seq),
+            "time": timestamp,
+            "level": level,
+            "message": message
+        }
+        _log_buffer.appendleft(log_entry)
+
+    # 推送给 SSE 订阅者
+    event_bus.publish("log", log_entry)
 
     return log_entry
 
 
+def set_log_sink(sink: Optional[Callable[[Dict], None]]) -> None:
+    """
+    设置日志转发目标
+
+    设置后 add_log_to_buffer 不再直接写入缓冲区，而是交给 sink（需线程安全）；
+    传入 None 恢复直接写入。
+
+    Args:
+        sink: 接收日志条目的回调
+    """
+    global _log_sink
+    _log_sink = sink
+
+
+def ingest_logs(entries: List[Dict]) -> int:
+    """
+    写入已分配序号的日志（来自共享存储），并推送给 SSE 订阅者
+
+    序号不大于缓冲区中最新日志的条目会被忽略。
+
+    Args:
+        entries: 日志列表（按序号正序）
+
+    Returns:
+        写入的条数
+    """
+    added = []
+    with _log_lock:
+        last_id = _log_buffer[0]["id"] if _log_buffer else 0
+        for entry in entries:
+            if entry["id"] > last_id:
+                _log_buffer.appendleft(entry)
+                last_id = entry["id"]
+                added.append(entry)
+
+    for entry in added:
+        event_bus.publish("log", entry)
+    return len(added)
+
+
 def get_logs() -> List[Dict]:
     """
     获取所有日志（线程安全，返回副本）
@@ -61,14 +119,44 @@ def get_logs() -> List[Dict]:
         日志列表的副本（按插入顺序倒序）
     """
     with _log_lock:
-        return _log_buffer.copy()
+        return list(_log_buffer)
+
+
+def get_logs_since(after_id: int) -> List[Dict]:
+    """
+    获取序号大于 after_id 的日志（线程安全）
+
+    缓冲区按序号倒序排列，只遍历新增的 k 条，复杂度 O(k)。
+    after_id 早于缓冲区中最旧的日志时，返回缓冲区中的全部日志。
+
+    Args:
+        after_id: 客户端已收到的最大日志序号（0 表示全部）
+
+    Returns:
+        新增的日志列表（按序号正序）
+    """
+    with _log_lock:
+        logs = list(itertools.takewhile(lambda log: log["id"] > after_id, _log_buffer))
+    logs.reverse()
+    return logs
+
+
+def get_last_log_id() -> int:
+    """
+    获取最新一条日志的序号
+
+    Returns:
+        日志序号（缓冲区为空时为 0）
+    """
+    with _log_lock:
+        return _log_buffer[0]["id"] if _log_buffer else 0
 
 
-def get_log_buffer() -> List[Dict]:
+def get_log_buffer() -> Deque[Dict]:
     """
     获取日志缓冲区引用
 
-    注意：直接返回缓冲区引用，不适用于跨线程场景
+    注意：直接返回缓冲区引用（deque），不适用于跨线程场景，读取请使用 get_logs()
     主要用于 config.runtime_state 的初始化
 
     Returns:
@@ -120,10 +208,10 @@ def get_recent_logs(count: int = 10) -> List[Dict]:
         最近的日志列表
     """
     with _log_lock:
-        return _log_buffer[:count].copy()
+        return list(itertools.islice(_log_buffer, count))
 
 
 # 用于 runtime_state 的初始化
 # 在 config.py 中这样使用：
 # runtime_state["logs"] = get_log_buffer()
-# 这样 runtime_state 和 _log_buffer 指向同一个列表对象
+# 这样 runtime_state 和 _log_buffer 指向同一个 deque 对象
@@ -0,0 +1,110 @@
+"""
+事件循环延迟监控
+周期性地短暂休眠，实际唤醒时间比预期晚的部分即为事件循环被阻塞的时长。
+超过阈值时记录警告（同步的 CPU 计算或阻塞调用会让所有并发请求一起等待）。
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+from .config import get_settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 0.1
+
+# 两次警告之间的最短间隔（秒），避免持续阻塞时刷屏
+WARN_INTERVAL = 10.0
+
+
+class LoopLagMonitor:
+    """事件循环延迟监控"""
+
+    def __init__(self, threshold_ms: float, interval: float = SAMPLE_INTERVAL):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.blocked_count = 0
+        self._last_warning = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """开始监控"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止监控"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        """
+        记录一次采样
+
+        Args:
+            lag: 唤醒延迟（秒）
+        """
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.threshold:
+            return
+
+        self.blocked_count += 1
+        now = time.monotonic()
+        if now - self._last_warning >= WARN_INTERVAL:
+            self._last_warning = now
+            logger.warning(
+                f"事件循环被阻塞 {lag * 1000:.0f}ms（阈值 {self.threshold * 1000:.0f}ms，"
+                f"累计 {self.blocked_count} 次）"
+            )
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.perf_counter() - start - self.interval))
+
+    def stats(self) -> Dict[str, float]:
+        """监控统计（毫秒）"""
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "blocked_count": self.blocked_count,
+        }
+
+
+loop_monitor: Optional[LoopLagMonitor] = None
+
+
+def start_loop_monitor() -> Optional[LoopLagMonitor]:
+    """
+    按配置开始监控当前事件循环（LOOP_LAG_THRESHOLD_MS 为 0 时不监控）
+
+    Returns:
+        监控实例
+    """
+    global loop_monitor
+    threshold = get_settings().loop_lag_threshold_ms
+    if threshold <= 0:
+        return None
+    if loop_monitor is None:
+        loop_monitor = LoopLagMonitor(threshold)
+        loop_monitor.start()
+    return loop_monitor
+
+
+async def stop_loop_monitor() -> None:
+    """停止监控"""
+    global loop_monitor
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+        loop_monitor = None
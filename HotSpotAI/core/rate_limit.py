@@ -0,0 +1,101 @@
+"""
+令牌桶限流
+每个键（客户端 IP、用户名）一个令牌桶，按固定速率补充令牌，桶容量即允许的突发请求数。
+用于登录、注册等需要 bcrypt 计算的接口，突发的撞库请求不会占满 CPU。
+
+限流状态保存在进程内存中，多 worker 部署时每个 worker 独立计数（实际上限为 worker 数倍）。
+"""
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from .config import get_settings
+
+# 每个限流器最多跟踪的键数，超出后淘汰最久未访问的键
+MAX_KEYS = 10000
+
+
+class TokenBucketLimiter:
+    """令牌桶限流器"""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_keys: int = MAX_KEYS):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        # 键 -> (剩余令牌数, 上次更新时间)，LRU 顺序
+        self._buckets: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """速率或容量为 0 时不限流"""
+        return self.rate > 0 and self.burst > 0
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        entry = self._buckets.get(key)
+        if entry is None:
+            return float(self.burst)
+        tokens, updated = entry
+        return min(float(self.burst), tokens + (now - updated) * self.rate)
+
+    def retry_after(self, key: Hashable) -> float:
+        """
+        查询键当前需要等待的时间（不消耗令牌）
+
+        Args:
+            key: 限流键
+
+        Returns:
+            需要等待的秒数，0 表示允许请求
+        """
+        if not self.enabled:
+            return 0.0
+        tokens = self._tokens(key, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def acquire(self, key: Hashable) -> float:
+        """
+        尝试消耗一个令牌
+
+        Args:
+            key: 限流键
+
+        Returns:
+            0 表示允许请求；否则为需要等待的秒数（不消耗令牌）
+        """
+        if not self.enabled:
+            return 0.0
+
+        now = time.monotonic()
+        tokens = self._tokens(key, now)
+        if tokens < 1:
+            return (1 - tokens) / self.rate
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+    def reset(self) -> None:
+        """清空所有令牌桶"""
+        self._buckets.clear()
+
+
+_auth_limiters: Optional[Tuple[TokenBucketLimiter, TokenBucketLimiter]] = None
+
+
+def get_auth_limiters() -> Tuple[TokenBucketLimiter, TokenBucketLimiter]:
+    """
+    获取登录/注册接口的限流器
+
+    Returns:
+        (按客户端 IP 限流, 按用户名限流)
+    """
+    global _auth_limiters
+    if _auth_limiters is None:
+        settings = get_settings()
+        _auth_limiters = (
+            TokenBucketLimiter(settings.auth_ip_rate_per_minute, settings.auth_ip_burst),
+            TokenBucketLimiter(settings.auth_user_rate_per_minute, settings.auth_user_burst),
+        )
+    return _auth_limiters
@@ -1,18 +1,27 @@
 """
 定时任务调度模块
-使用 APScheduler 管理三个独立的定时任务：
+使用 APScheduler 管理四个独立的定时任务：
 1. 爬虫任务 - 每小时执行（0-6点跳过）
 2. AI 分析任务 - 每2小时执行
 3. 热点精选任务 - 每小时执行
+4. 数据维护任务 - 每天低峰期执行
 """
 import asyncio
 import traceback
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from core.config import add_log, runtime_state, get_config
-from core.tasks import run_scraper_task, run_analyzer_task, run_selector_task, get_tasks_stats
+from core.events import publish_status
+from core.tasks import (
+    run_scraper_task,
+    run_analyzer_task,
+    run_selector_task,
+    run_maintenance_task,
+    get_tasks_stats,
+)
 
 scheduler = AsyncIOScheduler()
 
@@ -24,6 +33,7 @@ async def run_scraper_job():
         return
 
     runtime_state["scraper_running"] = True
+    publish_status()
     runtime_state["lastRunTime"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     add_log('info', '>>> 开始爬虫任务')
 
@@ -41,6 +51,7 @@ async def run_scraper_job():
         traceback.print_exc()
     finally:
         runtime_state["scraper_running"] = False
+        publish_status()
         add_log('info', '<<< 爬虫任务结束')
 
 
@@ -51,6 +62,7 @@ async def run_analyzer_job():
         return
 
     runtime_state["analyzer_running"] = True
+    publish_status()
     add_log('info', '>>> 开始 AI 分析任务')
 
     try:
@@ -67,6 +79,7 @@ async def run_analyzer_job():
         traceback.print_exc()
     finally:
         runtime_state["analyzer_running"] = False
+        publish_status()
         add_log('info', '<<< AI 分析任务结束')
 
 
@@ -77,6 +90,7 @@ async def run_selector_job():
         return
 
     runtime_state["selector_running"] = True
+    publish_status()
     add_log('info', '>>> 开始热点精选任务')
 
     try:
@@ -91,9 +105,36 @@ async def run_selector_job():
         traceback.print_exc()
     finally:
         runtime_state["selector_running"] = False
+        publish_status()
         add_log('info', '<<< 热点精选任务结束')
 
 
+async def run_maintenance_job():
+    """数据维护定时任务 - 每天低峰期执行"""
+    if runtime_state.get("maintenance_running", False):
+        add_log('warning', '数据维护任务运行中，跳过')
+        return
+
+    runtime_state["maintenance_running"] = True
+    publish_status()
+    add_log('info', '>>> 开始数据维护任务')
+
+    try:
+        result = await run_maintenance_task()
+        runtime_state['last_maintenance'] = {
+            'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'archived': result.get('archived', {}),
+            'freed_pages': result.get('freed_pages', 0),
+        }
+    except Exception as e:
+        add_log('error', f"数据维护任务异常: {str(e)}")
+        traceback.print_exc()
+    finally:
+        runtime_state["maintenance_running"] = False
+        publish_status()
+        add_log('info', '<<< 数据维护任务结束')
+
+
 async def run_full_pipeline():
     """
     手动触发完整流程（用于立即刷新）
@@ -104,6 +145,7 @@ async def run_full_pipeline():
         return
 
     runtime_state["isRunning"] = True
+    publish_status()
     runtime_state["lastRunTime"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     add_log('info', '>>> 开始手动完整流程')
 
@@ -138,6 +180,77 @@ async def run_full_pipeline():
             job = jobs[0]
             if job.next_run_time:
                 runtime_state["nextRunTime"] = job.next_run_time.strftime("%Y-%m-%d %H:%M:%S")
+        publish_status()
+
+
+async def run_category_refresh(category_ids: Optional[List[int]] = None):
+    """
+    手动刷新分类热点
+
+    Args:
+        category_ids: 要刷新的分类 ID 列表，为空时刷新所有启用的分类（不包含热榜新闻）
+    """
+    if category_ids:
+        for category_id in category_ids:
+            await run_scraper_task(category_id=category_id)
+    else:
+        await run_scraper_task(category_id=None)
+
+
+# 可由接口手动触发的任务
+MANUAL_JOBS = {
+    "full_pipeline": run_full_pipeline,
+    "category_refresh": run_category_refresh,
+}
+
+# 本进程内执行的手动任务（保留引用，避免任务被回收）
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def run_manual_job(job: str, params: Dict[str, Any]):
+    """
+    执行手动任务请求（由持有调度锁的进程调用）
+
+    Args:
+        job: 任务名称（MANUAL_JOBS 中的键）
+        params: 任务参数
+    """
+    func = MANUAL_JOBS.get(job)
+    if func is None:
+        raise ValueError(f"未知的任务: {job}")
+    await func(**params)
+
+
+async def dispatch_job(job: str, **params) -> str:
+    """
+    触发手动任务
+
+    运行时状态在进程间共享时，任务提交到数据库队列，由持有调度锁的进程
+    （API worker 或独立的 worker.py）执行；否则直接在本进程后台执行。
+
+    Args:
+        job: 任务名称（MANUAL_JOBS 中的键）
+        **params: 任务参数
+
+    Returns:
+        queued（已提交到队列）/ started（已在本进程启动）
+    """
+    from core import state
+
+    if job not in MANUAL_JOBS:
+        raise ValueError(f"未知的任务: {job}")
+
+    sync = state.state_sync
+    if sync is not None and sync.backend.shared:
+        # 先推送本地状态（如刚修改分类后的 category_version），执行进程领取任务前已能看到
+        await sync.sync_once()
+        await sync.backend.enqueue_job(job, params)
+        return "queued"
+
+    task = asyncio.create_task(run_manual_job(job, params))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return "started"
 
 
 def update_scheduler():
@@ -181,6 +294,15 @@ def update_scheduler():
         )
         add_log('info', "热点精选任务: 每小时执行 (6-23点)")
 
+        # 任务4: 数据维护任务 - 每天低峰期执行
+        maintenance_cron = get_config("maintenanceCron", "30 3 * * *")
+        scheduler.add_job(
+            run_maintenance_job,
+            CronTrigger.from_crontab(maintenance_cron),
+            id="maintenance_task"
+        )
+        add_log('info', f"数据维护任务: {maintenance_cron}")
+
         # 更新下次运行时间
         jobs = scheduler.get_jobs()
         if jobs:
@@ -190,13 +312,24 @@ def update_scheduler():
                     next_times.append(job.next_run_time.strftime("%H:%M"))
             if next_times:
                 runtime_state["nextRunTime"] = f"今天 {', '.join(next_times)}"
+                publish_status()
 
     except Exception as e:
         add_log('error', f"定时任务配置错误: {e}")
 
 
 def start_scheduler():
-    """启动调度器"""
+    """启动调度器（多进程部署时只在持有调度锁的进程中调用）"""
+    if scheduler.running:
+        return
     scheduler.start()
     update_scheduler()
     add_log('info', '调度器已启动')
+
+
+def stop_scheduler():
+    """停止调度器（失去调度锁时调用，重新获得锁后可再次 start_scheduler）"""
+    if not scheduler.running:
+        return
+    scheduler.shutdown(wait=False)
+    add_log('warning', '调度器已停止')
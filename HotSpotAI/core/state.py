@@ -0,0 +1,576 @@
+"""
+运行时状态后端与多进程同步
+runtime_state 仍是每个进程内的读缓存（接口同步读取，无额外开销），
+共享部分（热点话题、任务状态、前端日志）通过状态后端在进程间同步：
+
+- memory: 只保存在进程内存中（单进程部署，与之前的行为一致，日志和状态变化立即推送）
+- sqlite: 保存在数据库中，每个进程周期性地推送本地变化、拉取其他进程的变化，
+  日志写入数据库后按数据库分配的全局序号写回各进程的日志缓冲区，
+  SSE 断线重连、/logs?since= 落到任意 worker 都使用同一套序号
+
+调度器只在持有调度锁（租约）的进程中运行，持有进程退出后其他进程在租约到期后接管，
+因此可以使用 uvicorn --workers N 提升接口吞吐。SCHEDULER_MODE=worker 时接口进程不参与选举，
+定时任务和手动触发的任务都由独立的 worker.py 进程执行，爬虫和 LLM 调用不占用接口的事件循环。
+
+默认的 auto 在多进程部署（WORKERS > 1 或 SCHEDULER_MODE=worker）时使用 sqlite，否则使用 memory，
+单进程部署不为同步付出延迟和每秒的数据库查询。
+
+自定义后端：继承 StateBackend，调用 register_state_backend 注册后在 STATE_BACKEND 中指定名称。
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, Type
+
+from .config import add_log, get_settings, runtime_state
+from .events import publish_status
+from .log_utils import LOG_LIMIT, clear_logs, get_logs, ingest_logs, set_log_sink
+from .logger import get_logger
+from .topics_cache import dumps, get_encoded_topics, set_hot_topics
+
+logger = get_logger(__name__)
+
+# 在进程间共享的运行时状态键
+SHARED_STATE_KEYS = (
+    "isRunning",
+    "lastRunTime",
+    "nextRunTime",
+    "scraper_running",
+    "analyzer_running",
+    "selector_running",
+    "maintenance_running",
+    "last_scraper_count",
+    "last_hot_ranking_count",
+    "last_category_count",
+    "last_analyzer_count",
+    "last_selector_count",
+    "last_maintenance",
+    "task_stats",
+    "hot_topics",
+    # 分类写操作后更新，持有调度锁的进程据此刷新分类图缓存
+    "category_version",
+    # 修改用户信息后更新，各进程据此清空认证用户缓存
+    "users_version",
+    # 修改文章公开状态或删除文章后更新，各进程据此清空分享文章缓存
+    "articles_version",
+    # 各平台最近一次浏览器抓取的流量统计
+    "scraper_metrics",
+    # 各平台熔断器状态
+    "scraper_breakers",
+    # 各重试策略的调用、重试和放弃次数
+    "retry_metrics",
+)
+
+# 只由持有调度锁的进程设置的运行标记（接管调度时清除上一个持有进程遗留的标记，
+# 包括手动完整流程的 isRunning，否则进程在流程中途退出后手动刷新会一直被跳过）
+SCHEDULER_FLAG_KEYS = (
+    "isRunning",
+    "scraper_running",
+    "analyzer_running",
+    "selector_running",
+    "maintenance_running",
+)
+
+# 调度锁名称
+SCHEDULER_LOCK = "scheduler"
+
+# 共享存储中保留的日志条数
+SHARED_LOG_KEEP = 1000
+
+# 等待写入共享存储的日志上限（存储不可用时丢弃最旧的）
+PENDING_LOG_LIMIT = 1000
+
+
+class StateBackend(ABC):
+    """运行时状态存储接口"""
+
+    # 是否在进程间共享（不共享时不需要同步）
+    shared: bool = True
+
+    @abstractmethod
+    async def save_state(self, values: Dict[str, Any]) -> None:
+        """写入状态（每个键分配新的版本号）"""
+
+    @abstractmethod
+    async def load_state_changes(self, since_version: int) -> Tuple[Dict[str, Any], int]:
+        """读取版本号大于 since_version 的状态，返回 ({键: 值}, 当前最大版本号)"""
+
+    @abstractmethod
+    async def append_logs(self, entries: List[Dict]) -> None:
+        """追加日志（按时间正序，由存储分配全局递增 id）"""
+
+    @abstractmethod
+    async def get_logs_since(self, after_id: int, limit: int) -> List[Dict]:
+        """获取 id 大于 after_id 的最新 limit 条日志（按 id 正序）"""
+
+    @abstractmethod
+    async def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        """获取或续期锁，返回是否持有"""
+
+    @abstractmethod
+    async def release_lock(self, name: str, owner: str) -> None:
+        """释放自己持有的锁"""
+
+    @abstractmethod
+    async def enqueue_job(self, job: str, params: Dict[str, Any]) -> int:
+        """提交手动任务请求，返回请求 id"""
+
+    @abstractmethod
+    async def claim_jobs(self, owner: str, ttl: float) -> List[Dict]:
+        """领取待执行或租约已过期的任务请求 [{"id", "job", "params"}]"""
+
+    @abstractmethod
+    async def renew_jobs(self, owner: str, ttl: float) -> None:
+        """续期自己正在执行的任务请求租约"""
+
+    @abstractmethod
+    async def finish_job(self, request_id: int, status: str, message: str = "") -> None:
+        """记录任务请求的执行结果 (done / failed)"""
+
+
+class MemoryStateBackend(StateBackend):
+    """进程内存后端（单进程部署，锁总是获取成功）"""
+
+    shared = False
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, int]] = {}
+        self._version = 0
+        self._logs: Deque[Dict] = deque(maxlen=SHARED_LOG_KEEP)
+        self._log_id = 0
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._jobs: List[Dict] = []
+
+    async def save_state(self, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            self._version += 1
+            self._values[key] = (value, self._version)
+
+    async def load_state_changes(self, since_version: int) -> Tuple[Dict[str, Any], int]:
+        changes = {k: v for k, (v, version) in self._values.items() if version > since_version}
+        return changes, self._version
+
+    async def append_logs(self, entries: List[Dict]) -> None:
+        for entry in entries:
+            self._log_id += 1
+            self._logs.append({**entry, "id": self._log_id})
+
+    async def get_logs_since(self, after_id: int, limit: int) -> List[Dict]:
+        return [e for e in self._logs if e["id"] > after_id][-limit:]
+
+    async def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        holder = self._locks.get(name)
+        if holder is None or holder[0] == owner or holder[1] < now:
+            self._locks[name] = (owner, now + ttl)
+            return True
+        return False
+
+    async def release_lock(self, name: str, owner: str) -> None:
+        if self._locks.get(name, (None,))[0] == owner:
+            del self._locks[name]
+
+    async def enqueue_job(self, job: str, params: Dict[str, Any]) -> int:
+        self._jobs.append({"id": len(self._jobs) + 1, "job": job, "params": params, "status": "pending"})
+        return len(self._jobs)
+
+    async def claim_jobs(self, owner: str, ttl: float) -> List[Dict]:
+        now = time.time()
+        claimed = []
+        for request in self._jobs:
+            if request["status"] == "pending" or (request["status"] == "running" and request["expires_at"] < now):
+                request.update(status="running", owner=owner, expires_at=now + ttl)
+                claimed.append({k: request[k] for k in ("id", "job", "params")})
+        return claimed
+
+    async def renew_jobs(self, owner: str, ttl: float) -> None:
+        for request in self._jobs:
+            if request["status"] == "running" and request["owner"] == owner:
+                request["expires_at"] = time.time() + ttl
+
+    async def finish_job(self, request_id: int, status: str, message: str = "") -> None:
+        self._jobs[request_id - 1].update(status=status, message=message)
+
+
+class SQLiteStateBackend(StateBackend):
+    """SQLite 后端（默认，同一数据库文件的所有进程共享）"""
+
+    async def save_state(self, values: Dict[str, Any]) -> None:
+        from db import save_state_values
+        await save_state_values(values)
+
+    async def load_state_changes(self, since_version: int) -> Tuple[Dict[str, Any], int]:
+        from db import load_state_changes
+        return await load_state_changes(since_version)
+
+    async def append_logs(self, entries: List[Dict]) -> None:
+        from db import append_runtime_logs
+        await append_runtime_logs(entries, keep=SHARED_LOG_KEEP)
+
+    async def get_logs_since(self, after_id: int, limit: int) -> List[Dict]:
+        from db import get_runtime_logs_since
+        return await get_runtime_logs_since(after_id, limit)
+
+    async def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        from db import acquire_lock
+        return await acquire_lock(name, owner, ttl)
+
+    async def release_lock(self, name: str, owner: str) -> None:
+        from db import release_lock
+        await release_lock(name, owner)
+
+    async def enqueue_job(self, job: str, params: Dict[str, Any]) -> int:
+        from db import enqueue_job_request
+        return await enqueue_job_request(job, params)
+
+    async def claim_jobs(self, owner: str, ttl: float) -> List[Dict]:
+        from db import claim_job_requests
+        return await claim_job_requests(owner, ttl)
+
+    async def renew_jobs(self, owner: str, ttl: float) -> None:
+        from db import renew_job_requests
+        await renew_job_requests(owner, ttl)
+
+    async def finish_job(self, request_id: int, status: str, message: str = "") -> None:
+        from db import finish_job_request
+        await finish_job_request(request_id, status, message)
+
+
+STATE_BACKENDS: Dict[str, Type[StateBackend]] = {
+    "memory": MemoryStateBackend,
+    "sqlite": SQLiteStateBackend,
+}
+
+
+def register_state_backend(name: str, backend_cls: Type[StateBackend]) -> None:
+    """
+    注册自定义状态后端
+
+    Args:
+        name: 后端名称（STATE_BACKEND 配置值）
+        backend_cls: StateBackend 子类
+    """
+    STATE_BACKENDS[name] = backend_cls
+
+
+def resolve_state_backend_name(name: Optional[str] = None) -> str:
+    """
+    解析状态后端名称（auto 按部署方式选择）
+
+    Args:
+        name: 后端名称，默认读取 STATE_BACKEND 配置
+
+    Returns:
+        后端名称
+    """
+    settings = get_settings()
+    name = (name or settings.state_backend).lower()
+    if name == "auto":
+        multi_process = settings.workers > 1 or settings.scheduler_mode == "worker"
+        name = "sqlite" if multi_process else "memory"
+    return name
+
+
+def create_state_backend(name: Optional[str] = None) -> StateBackend:
+    """
+    创建状态后端
+
+    Args:
+        name: 后端名称，默认读取 STATE_BACKEND 配置（auto 按部署方式选择）
+
+    Returns:
+        状态后端实例
+    """
+    name = resolve_state_backend_name(name)
+    backend_cls = STATE_BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"未知的状态后端: {name}（可选: {', '.join(STATE_BACKENDS)}）")
+    return backend_cls()
+
+
+class StateSync:
+    """
+    运行时状态同步与调度锁选举（每个进程一个）
+
+    每个同步周期：
+    1. 本进程产生的日志写入共享存储
+    2. 拉取其他进程的状态变化，更新本地 runtime_state 并推送给本进程的 SSE 订阅者
+    3. 推送本地 runtime_state 的变化（与上次同步的编码结果比较）
+    4. 拉取新日志写回本地日志缓冲区
+    5. 持有调度锁时领取并执行手动任务请求
+    每 lock_ttl / 3 秒续期或争取一次调度锁（can_lead=False 的进程不参与）。
+    """
+
+    def __init__(
+        self,
+        backend: StateBackend,
+        interval: Optional[float] = None,
+        lock_ttl: Optional[float] = None,
+        on_leader: Optional[Callable[[], None]] = None,
+        on_follower: Optional[Callable[[], None]] = None,
+        can_lead: bool = True,
+        job_runner: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+    ):
+        settings = get_settings()
+        self.backend = backend
+        self.interval = interval if interval is not None else settings.state_sync_interval
+        self.lock_ttl = lock_ttl if lock_ttl is not None else settings.scheduler_lock_ttl
+        self.on_leader = on_leader
+        self.on_follower = on_follower
+        self.can_lead = can_lead
+        self.job_runner = job_runner
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+
+        self._version = 0
+        self._log_cursor = 0
+        self._known: Dict[str, bytes] = {}
+        self._pending_logs: Deque[Dict] = deque(maxlen=PENDING_LOG_LIMIT)
+        self._lease_expires = 0.0
+        self._elected = False
+        self._task: Optional[asyncio.Task] = None
+        self._jobs: Set[asyncio.Task] = set()
+
+    @property
+    def role(self) -> str:
+        """当前进程角色: leader（运行定时任务）/ standby"""
+        return "leader" if self.is_leader else "standby"
+
+    async def start(self) -> None:
+        """开始同步（服务启动时调用）"""
+        if not self.backend.shared and not self.can_lead:
+            add_log('warning', '状态后端不在进程间共享，无法交给独立调度进程，本进程运行定时任务')
+            self.can_lead = True
+
+        if self.backend.shared:
+            # 之后的日志交给共享存储分配序号；启动阶段已写入缓冲区的日志一并写入
+            set_log_sink(self._pending_logs.append)
+            self._pending_logs.extendleft(get_logs())
+            clear_logs()
+            await self.sync_once()
+
+        if self.can_lead:
+            await self.elect()
+        else:
+            add_log('info', f'定时任务由独立调度进程运行，本进程只提供接口服务 ({self.owner})')
+
+        if self.backend.shared:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止同步并释放调度锁（服务关闭时调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # 正在执行的手动任务随进程退出中止
+        for task in list(self._jobs):
+            task.cancel()
+        if self._jobs:
+            await asyncio.gather(*self._jobs, return_exceptions=True)
+
+        try:
+            if self.backend.shared:
+                await self.sync_once()
+            if self.is_leader:
+                await self.backend.release_lock(SCHEDULER_LOCK, self.owner)
+        except Exception as e:
+            logger.warning(f"运行时状态同步关闭异常: {e}")
+        finally:
+            set_log_sink(None)
+            self.is_leader = False
+
+    async def sync_once(self) -> None:
+        """执行一次同步"""
+        await self._flush_logs()
+
+        changes, self._version = await self.backend.load_state_changes(self._version)
+        self._apply(changes)
+
+        local = self._local_changes()
+        if local:
+            await self.backend.save_state(local)
+
+        logs = await self.backend.get_logs_since(self._log_cursor, LOG_LIMIT)
+        if logs:
+            ingest_logs(logs)
+            self._log_cursor = logs[-1]["id"]
+
+    async def elect(self) -> bool:
+        """
+        续期或争取调度锁，角色变化时调用 on_leader / on_follower
+
+        Returns:
+            当前是否持有调度锁
+        """
+        try:
+            leader = await self.backend.acquire_lock(SCHEDULER_LOCK, self.owner, self.lock_ttl)
+            if leader:
+                self._lease_expires = time.time() + self.lock_ttl
+        except Exception as e:
+            # 存储暂时不可用：租约未到期前保持当前角色
+            logger.warning(f"调度锁续期失败: {e}")
+            leader = self.is_leader and time.time() < self._lease_expires
+
+        if leader and not self.is_leader:
+            self.is_leader = True
+            # 清除上一个持有进程遗留的运行标记（进程异常退出时不会复位）
+            for key in SCHEDULER_FLAG_KEYS:
+                runtime_state[key] = False
+            add_log('info', f'已获得调度锁，本进程运行定时任务 ({self.owner})')
+            if self.on_leader:
+                self.on_leader()
+        elif not leader and self.is_leader:
+            self.is_leader = False
+            add_log('warning', f'已失去调度锁，本进程停止定时任务 ({self.owner})')
+            if self.on_follower:
+                self.on_follower()
+        elif not leader and not self._elected:
+            add_log('info', f'调度锁由其他进程持有，本进程只提供接口服务 ({self.owner})')
+
+        self._elected = True
+        return self.is_leader
+
+    async def _run(self) -> None:
+        """同步循环"""
+        next_election = time.monotonic() + self.lock_ttl / 3
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync_once()
+                await self._run_jobs()
+            except Exception as e:
+                logger.warning(f"运行时状态同步失败: {e}")
+
+            if self.can_lead and time.monotonic() >= next_election:
+                await self.elect()
+                next_election = time.monotonic() + self.lock_ttl / 3
+
+    async def _run_jobs(self) -> None:
+        """续期正在执行的任务请求；持有调度锁时领取新的请求，在后台执行"""
+        if self._jobs:
+            await self.backend.renew_jobs(self.owner, self.lock_ttl)
+        if not self.is_leader or self.job_runner is None:
+            return
+        for request in await self.backend.claim_jobs(self.owner, self.lock_ttl):
+            task = asyncio.create_task(self._execute_job(request))
+            self._jobs.add(task)
+            task.add_done_callback(self._jobs.discard)
+
+    async def _execute_job(self, request: Dict) -> None:
+        """执行一个任务请求并记录结果"""
+        status, message = "done", ""
+        try:
+            await self.job_runner(request["job"], request["params"])
+        except asyncio.CancelledError:
+            status, message = "failed", "进程退出，任务中止"
+        except Exception as e:
+            status, message = "failed", str(e)
+            add_log('error', f"手动任务 {request['job']} 执行失败: {e}")
+
+        try:
+            await self.backend.finish_job(request["id"], status, message)
+        except Exception as e:
+            logger.warning(f"记录任务请求结果失败: {e}")
+
+    async def _flush_logs(self) -> None:
+        """本进程产生的日志写入共享存储（失败时放回队列，下个周期重试）"""
+        entries = []
+        while self._pending_logs:
+            entries.append(self._pending_logs.popleft())
+        if not entries:
+            return
+        try:
+            await self.backend.append_logs(entries)
+        except Exception:
+            self._pending_logs.extendleft(reversed(entries))
+            raise
+
+    def _encode(self, key: str, value: Any) -> bytes:
+        """编码状态值用于变化检测（热点话题复用预编码结果）"""
+        if key == "hot_topics" and value is runtime_state.get("hot_topics"):
+            return get_encoded_topics().body
+        return dumps(value)
+
+    def _apply(self, changes: Dict[str, Any]) -> None:
+        """应用其他进程的状态变化"""
+        status_changed = False
+        for key, value in changes.items():
+            if key not in SHARED_STATE_KEYS:
+                continue
+            encoded = dumps(value)
+            if self._known.get(key) == encoded:
+                # 本进程自己写入的值
+                continue
+            self._known[key] = encoded
+            if key == "hot_topics":
+                set_hot_topics(value)
+            else:
+                runtime_state[key] = value
+                status_changed = True
+
+        if status_changed:
+            publish_status()
+
+    def _local_changes(self) -> Dict[str, Any]:
+        """本地 runtime_state 中自上次同步以来变化的共享状态"""
+        changes = {}
+        for key in SHARED_STATE_KEYS:
+            if key not in runtime_state:
+                continue
+            value = runtime_state[key]
+            encoded = self._encode(key, value)
+            if self._known.get(key) != encoded:
+                self._known[key] = encoded
+                changes[key] = value
+        return changes
+
+
+# 当前进程的状态同步实例
+state_sync: Optional[StateSync] = None
+
+
+async def start_state_sync(
+    on_leader: Optional[Callable[[], None]] = None,
+    on_follower: Optional[Callable[[], None]] = None,
+    can_lead: bool = True,
+    job_runner: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+) -> StateSync:
+    """
+    按配置创建状态后端并开始同步
+
+    Args:
+        on_leader: 获得调度锁时的回调（启动调度器）
+        on_follower: 失去调度锁时的回调（停止调度器）
+        can_lead: 是否参与调度锁选举
+        job_runner: 执行手动任务请求的函数 (任务名, 参数)
+
+    Returns:
+        状态同步实例
+    """
+    global state_sync
+    state_sync = StateSync(
+        create_state_backend(),
+        on_leader=on_leader,
+        on_follower=on_follower,
+        can_lead=can_lead,
+        job_runner=job_runner,
+    )
+    await state_sync.start()
+    return state_sync
+
+
+async def stop_state_sync() -> None:
+    """停止状态同步并释放调度锁"""
+    global state_sync
+    if state_sync is not None:
+        await state_sync.stop()
+        state_sync = None
@@ -1,23 +1,32 @@
 """
 定时任务模块
-包含三个独立的定时任务：
+包含四个独立的定时任务：
 1. 爬虫任务 - 每小时执行（0-6点跳过）
 2. AI 分析任务 - 每2小时执行
 3. 热点精选任务 - 每小时执行
+4. 数据维护任务 - 每天低峰期执行（归档过期数据、增量 VACUUM）
 """
 import asyncio
 from datetime import datetime
+from functools import wraps
 from typing import List, Dict
-from core.config import add_log
+from core.config import add_log, get_config, get_settings, runtime_state
+from core.job_metrics import job_span, skip_job_run, traced_job
+from core.topics_cache import set_hot_topics
 from db import (
     save_raw_news_to_db,
     get_unanalyzed_news,
     update_news_analysis,
     get_top_scoring_news,
     save_hot_topics,
-    get_raw_news_stats
+    get_raw_news_stats,
+    get_category_graph,
+    archive_old_rows,
+    incremental_vacuum,
+    optimize_db,
 )
 from core.llm import analyze_news_batch, select_hot_topics
+from utils import get_retry_metrics, retry_budget
 
 
 def is_night_hours() -> bool:
@@ -44,8 +53,30 @@ def get_daytime_cron() -> str:
         return "0 */2 18-23 * *"
 
 
+def job_retry_budget(func):
+    """
+    任务重试预算装饰器
+
+    一次任务执行内所有网络请求、浏览器操作和 LLM 调用的重试共用 retry_budget_per_job 次，
+    平台或接口整体故障时不会让每个调用都重试满次数；执行结束后发布重试统计。
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with retry_budget(get_config("retry_budget_per_job", 20)) as budget:
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if budget.denied:
+                    add_log('warning', f'{func.__name__}: 重试预算已用完（{budget.used} 次），{budget.denied} 次失败未重试')
+                runtime_state["retry_metrics"] = get_retry_metrics()
+
+    return wrapper
+
+
 # ==================== 任务1: 爬虫任务 ====================
 
+@traced_job("scraper", items_key="scraped_count")
+@job_retry_budget
 async def run_scraper_task(category_id: int = None) -> Dict:
     """
     爬虫定时任务
@@ -76,11 +107,12 @@ async def run_scraper_task(category_id: int = None) -> Dict:
         if is_night_hours():
             result['message'] = '夜间时段，跳过爬虫任务'
             add_log('info', '夜间时段，跳过爬虫任务')
+            skip_job_run()
             return result
 
         add_log('info', f'开始执行爬虫任务 (分类ID: {category_id or "全部"})')
 
-        from scrapers.factory import create_scraper, ScraperFactory
+        from scrapers.factory import ScraperFactory
 
         total_scraped = 0
 
@@ -95,17 +127,17 @@ async def run_scraper_task(category_id: int = None) -> Dict:
 
             for platform in available_platforms:
                 try:
-                    platform_scraper = create_scraper(platform)
-                    if platform_scraper is None:
-                        continue
-
-                    # 直接抓取热榜（不使用关键词过滤）
+                    # 直接抓取热榜（不使用关键词过滤），熔断中的平台直接跳过
                     add_log('info', f'正在爬取 [{platform}] 热榜...')
-                    topics = await platform_scraper.scrape(limit=20)
+                    with job_span("scrape", platform) as span:
+                        topics = await ScraperFactory.scrape(platform, limit=20)
+                        span.items = len(topics)
 
                     if topics:
                         # 保存到 raw_news，category_id 为 NULL 表示热榜新闻
-                        count = await save_raw_news_to_db(topics, category_id=None)
+                        with job_span("db", "save_raw_news") as span:
+                            count = await save_raw_news_to_db(topics, category_id=None)
+                            span.items = count
                         hot_ranking_count += count
                         add_log('success', f'[{platform}] 热榜爬取 {count} 条')
 
@@ -119,14 +151,14 @@ async def run_scraper_task(category_id: int = None) -> Dict:
         # ========== 第二步：爬取分类新闻 ==========
         add_log('info', '========== 开始爬取分类新闻 ==========')
 
-        # 获取启用的分类（如果指定了分类ID则只爬取该分类）
+        # 一次读取分类图（含关键词和平台配置），如果指定了分类ID则只爬取该分类
         if category_id:
-            from core.database import get_category_by_id
-            category = await get_category_by_id(category_id)
-            categories = [category] if category else []
+            categories = [
+                c for c in await get_category_graph(include_inactive=True)
+                if c['id'] == category_id
+            ]
         else:
-            from core.database import get_categories_with_keywords
-            categories = await get_categories_with_keywords()
+            categories = await get_category_graph()
 
         category_count = 0
         for cat in categories:
@@ -134,22 +166,21 @@ async def run_scraper_task(category_id: int = None) -> Dict:
                 cat_id = cat['id']
                 cat_name = cat['name']
                 keywords = [k['keyword'] for k in cat.get('keywords', [])]
-
-                # 获取该分类配置的平台
-                from core.database import get_category_platforms
-                platforms = await get_category_platforms(cat_id)
-                enabled_platforms = [p['platform'] for p in platforms if p.get('is_enabled')]
+                enabled_platforms = [p['platform'] for p in cat.get('platforms', []) if p.get('is_enabled')]
 
                 add_log('info', f'爬取分类 [{cat_name}]，关键词: {", ".join(keywords[:3])}')
 
                 # 对每个启用的平台进行爬取
                 for platform in enabled_platforms or ['weibo', 'zhihu']:
                     try:
-                        platform_scraper = create_scraper(platform)
-                        # 使用关键词搜索
-                        topics = await platform_scraper.scrape_by_keywords(keywords, limit=20)
+                        # 使用关键词搜索，熔断中的平台直接跳过
+                        with job_span("scrape", f"{platform}:keywords") as span:
+                            topics = await ScraperFactory.scrape_by_keywords(platform, keywords, limit=20)
+                            span.items = len(topics)
                         # 保存到 raw_news
-                        count = await save_raw_news_to_db(topics, cat_id)
+                        with job_span("db", "save_raw_news") as span:
+                            count = await save_raw_news_to_db(topics, cat_id)
+                            span.items = count
                         category_count += count
                         add_log('success', f'[{platform}] 分类 [{cat_name}] 爬取 {count} 条')
                     except Exception as e:
@@ -184,6 +215,8 @@ async def run_scraper_task(category_id: int = None) -> Dict:
 
 # ==================== 任务2: AI 分析任务 ====================
 
+@traced_job("analyzer", items_key="analyzed_count")
+@job_retry_budget
 async def run_analyzer_task(batch_size: int = 20) -> Dict:
     """
     AI 分析定时任务
@@ -210,12 +243,15 @@ async def run_analyzer_task(batch_size: int = 20) -> Dict:
         if is_night_hours():
             result['message'] = '夜间时段，跳过 AI 分析任务'
             add_log('info', '夜间时段，跳过 AI 分析任务')
+            skip_job_run()
             return result
 
         add_log('info', '开始执行 AI 分析任务')
 
         # 获取未分析的新闻（最多 50 条）
-        unanalyzed = await get_unanalyzed_news(limit=50)
+        with job_span("db", "get_unanalyzed_news") as span:
+            unanalyzed = await get_unanalyzed_news(limit=50)
+            span.items = len(unanalyzed)
 
         if not unanalyzed:
             result['message'] = '没有待分析的新闻'
@@ -236,37 +272,42 @@ async def run_analyzer_task(batch_size: int = 20) -> Dict:
 
             try:
                 # 批量分析
-                analysis_results = await analyze_news_batch(batch)
+                with job_span("llm", "analyze_news_batch") as span:
+                    analysis_results = await analyze_news_batch(batch)
+                    span.items = len(batch)
+                    span.errors = sum(1 for a in analysis_results if not a.get('success'))
 
                 # 更新分析结果
-                for news_id, analysis in zip([n['id'] for n in batch], analysis_results):
-                    if analysis.get('success'):
-                        await update_news_analysis(
-                            news_id=news_id,
-                            ai_score=analysis.get('score', 0),
-                            ai_comment=analysis.get('comment', ''),
-                            analyzed=True
-                        )
-                        analyzed_count += 1
-                    else:
-                        # 分析失败，记录原因
-                        fail_reason = analysis.get('error', '分析失败')
-                        # 如果失败次数超过 4 次，标记为跳过
-                        news = next((n for n in batch if n['id'] == news_id), None)
-                        if news and news.get('analyze_fail_count', 0) >= 4:
+                with job_span("db", "update_news_analysis") as span:
+                    span.items = len(batch)
+                    for news_id, analysis in zip([n['id'] for n in batch], analysis_results):
+                        if analysis.get('success'):
                             await update_news_analysis(
                                 news_id=news_id,
-                                analyzed=False,
-                                skip_reason=f'失败次数过多: {fail_reason}'
+                                ai_score=analysis.get('score', 0),
+                                ai_comment=analysis.get('comment', ''),
+                                analyzed=True
                             )
-                            skipped_count += 1
+                            analyzed_count += 1
                         else:
-                            await update_news_analysis(
-                                news_id=news_id,
-                                analyzed=False,
-                                skip_reason=fail_reason
-                            )
-                            failed_count += 1
+                            # 分析失败，记录原因
+                            fail_reason = analysis.get('error', '分析失败')
+                            # 如果失败次数超过 4 次，标记为跳过
+                            news = next((n for n in batch if n['id'] == news_id), None)
+                            if news and news.get('analyze_fail_count', 0) >= 4:
+                                await update_news_analysis(
+                                    news_id=news_id,
+                                    analyzed=False,
+                                    skip_reason=f'失败次数过多: {fail_reason}'
+                                )
+                                skipped_count += 1
+                            else:
+                                await update_news_analysis(
+                                    news_id=news_id,
+                                    analyzed=False,
+                                    skip_reason=fail_reason
+                                )
+                                failed_count += 1
 
                 add_log('success', f'第 {i // batch_size + 1} 批分析完成')
 
@@ -297,6 +338,8 @@ async def run_analyzer_task(batch_size: int = 20) -> Dict:
 
 # ==================== 任务3: 热点精选任务 ====================
 
+@traced_job("selector", items_key="selected_count")
+@job_retry_budget
 async def run_selector_task(hours: int = 48, top_count: int = 50, final_count: int = 20) -> Dict:
     """
     热点精选定时任务
@@ -322,12 +365,15 @@ async def run_selector_task(hours: int = 48, top_count: int = 50, final_count: i
         if is_night_hours():
             result['message'] = '夜间时段，跳过热点精选任务'
             add_log('info', '夜间时段，跳过热点精选任务')
+            skip_job_run()
             return result
 
         add_log('info', f'开始执行热点精选任务（{hours}小时内选{final_count}条）')
 
         # 获取高评分新闻（按规则排序）
-        top_news = await get_top_scoring_news(hours=hours, limit=top_count, min_score=3.0)
+        with job_span("db", "get_top_scoring_news") as span:
+            top_news = await get_top_scoring_news(hours=hours, limit=top_count, min_score=3.0)
+            span.items = len(top_news)
 
         if not top_news:
             result['message'] = '没有足够的候选新闻'
@@ -337,15 +383,19 @@ async def run_selector_task(hours: int = 48, top_count: int = 50, final_count: i
         add_log('info', f'获取到 {len(top_news)} 条候选新闻')
 
         # 使用 AI 进行最终精选（考虑时效性和热度）
-        selected = await select_hot_topics(top_news, final_count)
+        with job_span("llm", "select_hot_topics") as span:
+            selected = await select_hot_topics(top_news, final_count)
+            span.items = len(top_news)
+            span.errors = 0 if selected else 1
 
         if selected:
             # 保存到 hot_topics 表
-            count = await save_hot_topics(selected)
+            with job_span("db", "save_hot_topics") as span:
+                count = await save_hot_topics(selected)
+                span.items = count
 
-            # 更新 runtime_state 中的 hot_topics
-            from core import runtime_state
-            runtime_state['hot_topics'] = selected
+            # 更新 runtime_state 中的 hot_topics（编码一次，供接口和 SSE 复用）
+            set_hot_topics(selected)
 
             result['success'] = True
             result['selected_count'] = count
@@ -368,10 +418,11 @@ async def run_selector_task(hours: int = 48, top_count: int = 50, final_count: i
                     'category_id': news.get('category_id')
                 })
 
-            count = await save_hot_topics(formatted_topics)
+            with job_span("db", "save_hot_topics") as span:
+                count = await save_hot_topics(formatted_topics)
+                span.items = count
 
-            from core import runtime_state
-            runtime_state['hot_topics'] = formatted_topics
+            set_hot_topics(formatted_topics)
 
             result['success'] = True
             result['selected_count'] = count
@@ -384,6 +435,53 @@ async def run_selector_task(hours: int = 48, top_count: int = 50, final_count: i
     return result
 
 
+# ==================== 任务4: 数据维护任务 ====================
+
+async def run_maintenance_task() -> Dict:
+    """
+    数据维护定时任务
+    - 每天低峰期执行一次
+    - 归档（或删除）过期的 raw_news / hot_topics
+    - 分步回收空闲页并更新查询统计信息
+
+    Returns:
+        任务执行结果
+    """
+    result = {
+        'success': False,
+        'archived': {},
+        'freed_pages': 0,
+        'message': ''
+    }
+
+    try:
+        settings = get_settings()
+        archive_dir = settings.archive_dir if settings.archive_enabled else None
+
+        retention = {
+            'raw_news': settings.raw_news_keep_days,
+            'hot_topics': settings.db_keep_days,
+        }
+        for table, days in retention.items():
+            result['archived'][table] = await archive_old_rows(table, days, archive_dir)
+
+        result['freed_pages'] = await incremental_vacuum()
+        await optimize_db()
+
+        result['success'] = True
+        result['message'] = (
+            f"数据维护完成：原始新闻 {result['archived']['raw_news']} 条，"
+            f"热点 {result['archived']['hot_topics']} 条，回收 {result['freed_pages']} 页"
+        )
+        add_log('success', result['message'])
+
+    except Exception as e:
+        result['message'] = f'数据维护任务失败: {e}'
+        add_log('error', result['message'])
+
+    return result
+
+
 # ==================== 统计信息 ====================
 
 async def get_tasks_stats() -> Dict:
@@ -0,0 +1,141 @@
+"""
+热点话题序列化缓存
+热点话题是访问最频繁的数据（公开状态接口、登录后的状态接口、SSE topics 事件），
+但只在每次精选任务完成时变化一次。精选完成时编码一次 JSON 并计算强 ETag，
+之后所有请求和 SSE 连接直接复用编码结果。
+
+orjson 为可选依赖，未安装时回退到标准库 json。
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .config import runtime_state
+
+
+def dumps(data: Any) -> bytes:
+    """
+    将数据编码为 UTF-8 JSON
+
+    Args:
+        data: 可 JSON 序列化的数据
+
+    Returns:
+        JSON 字节串
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """根据内容生成强 ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    检查 If-None-Match 请求头是否命中
+
+    If-None-Match 使用弱比较（RFC 9110），nginx 开启 gzip 时会把强 ETag 改为 W/ 前缀，
+    比较时忽略该前缀。
+
+    Args:
+        if_none_match: If-None-Match 请求头
+        etag: 当前 ETag
+
+    Returns:
+        是否命中（可返回 304）
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class EncodedTopics:
+    """预编码的热点话题"""
+
+    __slots__ = ("topics", "body", "etag", "text")
+
+    def __init__(self, topics: List[Dict]):
+        self.topics = topics
+        self.body = dumps(topics)
+        self.etag = make_etag(self.body)
+        # SSE 消息使用的文本形式
+        self.text = self.body.decode("utf-8")
+
+
+_lock = threading.Lock()
+_current: Optional[EncodedTopics] = None
+
+
+def get_encoded_topics() -> EncodedTopics:
+    """
+    获取当前热点话题的编码结果
+
+    runtime_state['hot_topics'] 被直接替换（未经过 set_hot_topics）时自动重新编码。
+
+    Returns:
+        预编码的热点话题
+    """
+    global _current
+    topics = runtime_state.get("hot_topics", [])
+    current = _current
+    if current is not None and current.topics is topics:
+        return current
+
+    with _lock:
+        if _current is None or _current.topics is not topics:
+            _current = EncodedTopics(topics)
+        return _current
+
+
+def set_hot_topics(topics: List[Dict]) -> EncodedTopics:
+    """
+    更新热点话题：写入 runtime_state，编码一次并推送给 SSE 订阅者
+
+    Args:
+        topics: 热点话题列表
+
+    Returns:
+        预编码的热点话题
+    """
+    from .events import publish_topics
+
+    global _current
+    encoded = EncodedTopics(topics)
+    with _lock:
+        _current = encoded
+        runtime_state["hot_topics"] = topics
+    publish_topics(encoded)
+    return encoded
+
+
+def splice_topics(encoded_object: bytes, encoded: EncodedTopics) -> bytes:
+    """
+    在已编码的 JSON 对象末尾追加 hot_topics 字段（避免重复序列化话题列表）
+
+    Args:
+        encoded_object: 不含 hot_topics 的 JSON 对象
+        encoded: 预编码的热点话题
+
+    Returns:
+        追加后的 JSON 对象
+    """
+    separator = b"" if encoded_object == b"{}" else b","
+    return encoded_object[:-1] + separator + b'"hot_topics":' + encoded.body + b"}"
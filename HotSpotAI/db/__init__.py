@@ -3,6 +3,7 @@
 提供数据库初始化、CRUD 操作和业务逻辑
 """
 from .base import init_db
+from .migrations import run_migrations
 from .topics import (
     save_topics_to_db,
     load_latest_topics_from_db,
@@ -24,6 +25,8 @@ from .categories import (
     update_category_keywords,
     update_category_platforms,
     get_category_platforms,
+    get_category_graph,
+    invalidate_category_cache,
     init_default_categories,
 )
 from .raw_news import (
@@ -33,17 +36,35 @@ from .raw_news import (
     get_top_scoring_news,
     get_raw_news_stats,
 )
+from .search import search_news
+from .retention import archive_old_rows, enable_incremental_vacuum, incremental_vacuum, optimize_db
+from .runtime_state import (
+    save_state_values,
+    load_state_changes,
+    append_runtime_logs,
+    get_runtime_logs_since,
+    acquire_lock,
+    release_lock,
+    enqueue_job_request,
+    claim_job_requests,
+    renew_job_requests,
+    finish_job_request,
+)
+from .job_runs import save_job_run, get_recent_job_runs
 from .users import (
     create_user,
     get_user_by_id,
     get_user_by_email,
     get_user_by_username,
     update_user,
+    get_cached_user,
+    invalidate_user_cache,
 )
 
 __all__ = [
     # 基础
     "init_db",
+    "run_migrations",
     # 热点话题
     "save_topics_to_db",
     "load_latest_topics_from_db",
@@ -64,6 +85,8 @@ __all__ = [
     "update_category_keywords",
     "update_category_platforms",
     "get_category_platforms",
+    "get_category_graph",
+    "invalidate_category_cache",
     "init_default_categories",
     # 原始新闻
     "save_raw_news_to_db",
@@ -71,10 +94,33 @@ __all__ = [
     "update_news_analysis",
     "get_top_scoring_news",
     "get_raw_news_stats",
+    # 全文检索
+    "search_news",
+    # 数据保留与归档
+    "archive_old_rows",
+    "incremental_vacuum",
+    "enable_incremental_vacuum",
+    "optimize_db",
+    # 运行时状态（多进程共享）
+    "save_state_values",
+    "load_state_changes",
+    "append_runtime_logs",
+    "get_runtime_logs_since",
+    "acquire_lock",
+    "release_lock",
+    "enqueue_job_request",
+    "claim_job_requests",
+    "renew_job_requests",
+    "finish_job_request",
+    # 任务运行记录
+    "save_job_run",
+    "get_recent_job_runs",
     # 用户
     "create_user",
     "get_user_by_id",
     "get_user_by_email",
     "get_user_by_username",
     "update_user",
+    "get_cached_user",
+    "invalidate_user_cache",
 ]
@@ -1,9 +1,23 @@
 """
 分类 (categories) 数据库操作模块
 """
+import copy
+import time
+import uuid
 from typing import List, Dict, Optional
 from core.db_pool import get_db
-from core.config import add_log
+from core.config import add_log, runtime_state
+
+# 分类图（分类 + 关键词 + 平台配置）缓存有效期（秒）
+# 分类写操作会立即失效本进程的缓存，并更新共享的 category_version（由状态同步传播到其他进程）；
+# TTL 只用于兜底绕过接口的修改（如直接改数据库）
+CATEGORY_CACHE_TTL = 300
+
+# 分类图缓存: (过期时间戳, category_version, 分类列表)
+_category_graph_cache: Optional[tuple] = None
+
+# 缓存代数：每次失效加一，读取期间发生失效时不写入缓存（避免把旧数据重新缓存一个 TTL）
+_category_graph_generation = 0
 
 
 # 预定义分类数据
@@ -91,6 +105,112 @@ DEFAULT_CATEGORIES = [
 ]
 
 
+def invalidate_category_cache() -> None:
+    """使分类图缓存失效（任何分类写操作后调用，同时通知其他进程）"""
+    global _category_graph_cache, _category_graph_generation
+    _category_graph_generation += 1
+    _category_graph_cache = None
+    # 使用随机值而不是自增，多个进程同时修改时不会得到相同的版本
+    runtime_state["category_version"] = uuid.uuid4().hex
+
+
+async def _load_category_graph() -> List[Dict]:
+    """
+    从数据库读取完整分类图
+
+    每张表一次查询，在内存中按 category_id 分组，查询次数与分类数量无关。
+
+    Returns:
+        全部分类（含未激活），每个分类包含 keywords 和 platforms
+    """
+    async with get_db() as db:
+        async with db.execute('''
+            SELECT id, name, slug, description, icon, color, is_active, sort_order, created_at, updated_at
+            FROM categories
+            ORDER BY sort_order ASC, id ASC
+        ''') as cursor:
+            rows = await cursor.fetchall()
+
+        async with db.execute('''
+            SELECT category_id, keyword, weight
+            FROM category_keywords
+            ORDER BY category_id, weight DESC, id ASC
+        ''') as cursor:
+            keyword_rows = await cursor.fetchall()
+
+        async with db.execute('''
+            SELECT category_id, platform, is_enabled
+            FROM category_platforms
+            ORDER BY category_id, id ASC
+        ''') as cursor:
+            platform_rows = await cursor.fetchall()
+
+    categories = []
+    by_id = {}
+    for r in rows:
+        category = {
+            "id": r['id'],
+            "name": r['name'],
+            "slug": r['slug'],
+            "description": r['description'],
+            "icon": r['icon'],
+            "color": r['color'],
+            "is_active": bool(r['is_active']),
+            "sort_order": r['sort_order'],
+            "created_at": r['created_at'],
+            "updated_at": r['updated_at'],
+            "keywords": [],
+            "platforms": []
+        }
+        categories.append(category)
+        by_id[r['id']] = category
+
+    for kr in keyword_rows:
+        if kr['category_id'] in by_id:
+            by_id[kr['category_id']]["keywords"].append({
+                "keyword": kr['keyword'],
+                "weight": kr['weight']
+            })
+
+    for pr in platform_rows:
+        if pr['category_id'] in by_id:
+            by_id[pr['category_id']]["platforms"].append({
+                "platform": pr['platform'],
+                "is_enabled": bool(pr['is_enabled'])
+            })
+
+    return categories
+
+
+async def get_category_graph(include_inactive: bool = False) -> List[Dict]:
+    """
+    获取分类图（分类 + 关键词 + 平台配置，带进程内缓存）
+
+    Args:
+        include_inactive: 是否包含未激活的分类
+
+    Returns:
+        分类列表（副本，调用方可以随意修改）
+    """
+    global _category_graph_cache
+    try:
+        cache = _category_graph_cache
+        now = time.monotonic()
+        version = runtime_state.get("category_version")
+        if cache is None or cache[0] <= now or cache[1] != version:
+            generation = _category_graph_generation
+            categories = await _load_category_graph()
+            if generation == _category_graph_generation:
+                _category_graph_cache = (now + CATEGORY_CACHE_TTL, version, categories)
+        else:
+            categories = cache[2]
+    except Exception as e:
+        add_log('error', f'获取分类图失败: {e}')
+        return []
+
+    return copy.deepcopy([c for c in categories if include_inactive or c["is_active"]])
+
+
 async def get_categories(include_inactive: bool = False) -> List[Dict]:
     """
     获取所有分类
@@ -144,66 +264,10 @@ async def get_category_by_id(category_id: int) -> Optional[Dict]:
     Returns:
         分类详情，包含关键词列表和平台配置
     """
-    try:
-        async with get_db() as db:
-            # 获取分类基本信息
-            async with db.execute('''
-                SELECT id, name, slug, description, icon, color, is_active, sort_order, created_at, updated_at
-                FROM categories
-                WHERE id = ?
-            ''', (category_id,)) as cursor:
-                row = await cursor.fetchone()
-
-            if not row:
-                return None
-
-            category = {
-                "id": row['id'],
-                "name": row['name'],
-                "slug": row['slug'],
-                "description": row['description'],
-                "icon": row['icon'],
-                "color": row['color'],
-                "is_active": bool(row['is_active']),
-                "sort_order": row['sort_order'],
-                "created_at": row['created_at'],
-                "updated_at": row['updated_at'],
-                "keywords": [],
-                "platforms": []
-            }
-
-            # 获取关键词
-            async with db.execute('''
-                SELECT keyword, weight
-                FROM category_keywords
-                WHERE category_id = ?
-                ORDER BY weight DESC, id ASC
-            ''', (category_id,)) as cursor:
-                keyword_rows = await cursor.fetchall()
-                for kr in keyword_rows:
-                    category["keywords"].append({
-                        "keyword": kr['keyword'],
-                        "weight": kr['weight']
-                    })
-
-            # 获取平台配置
-            async with db.execute('''
-                SELECT platform, is_enabled
-                FROM category_platforms
-                WHERE category_id = ?
-            ''', (category_id,)) as cursor:
-                platform_rows = await cursor.fetchall()
-                for pr in platform_rows:
-                    category["platforms"].append({
-                        "platform": pr['platform'],
-                        "is_enabled": bool(pr['is_enabled'])
-                    })
-
+    for category in await get_category_graph(include_inactive=True):
+        if category["id"] == category_id:
             return category
-
-    except Exception as e:
-        add_log('error', f'获取分类详情失败: {e}')
-        return None
+    return None
 
 
 async def get_categories_with_keywords() -> List[Dict]:
@@ -213,41 +277,15 @@ async def get_categories_with_keywords() -> List[Dict]:
     Returns:
         分类列表，每个分类包含关键词
     """
-    categories = []
-    try:
-        async with get_db() as db:
-            async with db.execute('''
-                SELECT id, name, slug, is_active
-                FROM categories
-                WHERE is_active = 1
-                ORDER BY sort_order ASC, id ASC
-            ''') as cursor:
-                rows = await cursor.fetchall()
-
-            for r in rows:
-                category = {
-                    "id": r['id'],
-                    "name": r['name'],
-                    "slug": r['slug'],
-                    "keywords": []
-                }
-
-                # 获取关键词
-                async with db.execute('''
-                    SELECT keyword
-                    FROM category_keywords
-                    WHERE category_id = ?
-                    ORDER BY weight DESC, id ASC
-                ''', (r['id'],)) as keyword_cursor:
-                    keyword_rows = await keyword_cursor.fetchall()
-                    category["keywords"] = [kr['keyword'] for kr in keyword_rows]
-
-                categories.append(category)
-
-    except Exception as e:
-        add_log('error', f'获取分类和关键词失败: {e}')
-
-    return categories
+    return [
+        {
+            "id": c["id"],
+            "name": c["name"],
+            "slug": c["slug"],
+            "keywords": [k["keyword"] for k in c["keywords"]]
+        }
+        for c in await get_category_graph()
+    ]
 
 
 async def create_category(data: Dict) -> int:
@@ -298,6 +336,7 @@ async def create_category(data: Dict) -> int:
                     ''', (category_id, platform, 1))
 
             await db.commit()
+            invalidate_category_cache()
             add_log('success', f'创建分类成功: {data.get("name")}')
             return category_id
 
@@ -337,6 +376,7 @@ async def update_category(category_id: int, data: Dict) -> bool:
                 ''', update_values)
 
             await db.commit()
+            invalidate_category_cache()
             add_log('success', f'更新分类成功: {category_id}')
             return True
 
@@ -367,6 +407,7 @@ async def delete_category(category_id: int) -> bool:
             await db.execute('DELETE FROM categories WHERE id = ?', (category_id,))
 
             await db.commit()
+            invalidate_category_cache()
             add_log('success', f'删除分类成功: {category_id}')
             return True
 
@@ -399,6 +440,7 @@ async def update_category_keywords(category_id: int, keywords: List[str]) -> boo
                 ''', (category_id, keyword, 1))
 
             await db.commit()
+            invalidate_category_cache()
             add_log('success', f'更新分类关键词成功: {category_id}')
             return True
 
@@ -431,6 +473,7 @@ async def update_category_platforms(category_id: int, platforms: List[str]) -> b
                 ''', (category_id, platform, 1))
 
             await db.commit()
+            invalidate_category_cache()
             return True
 
     except Exception as e:
@@ -448,20 +491,8 @@ async def get_category_platforms(category_id: int) -> List[Dict]:
     Returns:
         平台列表
     """
-    platforms = []
-    try:
-        async with get_db() as db:
-            async with db.execute('''
-                SELECT platform, is_enabled FROM category_platforms
-                WHERE category_id = ?
-            ''', (category_id,)) as cursor:
-                rows = await cursor.fetchall()
-                platforms = [dict(r) for r in rows]
-
-    except Exception as e:
-        add_log('error', f'获取分类平台失败: {e}')
-
-    return platforms
+    category = await get_category_by_id(category_id)
+    return category["platforms"] if category else []
 
 
 async def init_default_categories() -> int:
@@ -523,6 +554,7 @@ async def init_default_categories() -> int:
                 created_count += 1
 
             await db.commit()
+            invalidate_category_cache()
 
             if created_count > 0:
                 add_log('success', f'初始化默认分类完成，共创建 {created_count} 个分类')
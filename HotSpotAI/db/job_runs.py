@@ -0,0 +1,93 @@
+"""
+任务运行记录 (job_runs) 数据库操作模块
+保存每次爬虫 / AI 分析 / 热点精选任务的耗时和各步骤明细（见 core/job_metrics.py）。
+
+使用状态同步专用连接（get_state_db）：运行记录在任务结束时写入，
+出错回滚不会影响共享连接上其他协程未提交的写入。
+"""
+import json
+from typing import Dict, List
+
+from core.db_pool import get_state_db
+
+
+async def save_job_run(
+    job: str,
+    started_at: str,
+    duration_ms: float,
+    success: bool,
+    items: int,
+    bytes: int,
+    tokens: int,
+    errors: int,
+    spans: List[Dict],
+    keep_days: int = 30,
+) -> int:
+    """
+    保存一次任务运行记录，并清理 keep_days 天前的记录
+
+    Args:
+        job: 任务名称
+        started_at: 开始时间（YYYY-MM-DD HH:MM:SS）
+        duration_ms: 总耗时（毫秒）
+        success: 是否成功
+        items: 处理条数
+        bytes: 下载字节数合计
+        tokens: LLM token 数合计
+        errors: 错误数合计
+        spans: 各步骤明细
+        keep_days: 记录保留天数
+
+    Returns:
+        记录 id
+    """
+    async with get_state_db() as db:
+        cursor = await db.execute('''
+            INSERT INTO job_runs (job, started_at, duration_ms, success, items, bytes, tokens, errors, spans)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            job, started_at, duration_ms, int(success), items, bytes, tokens, errors,
+            json.dumps(spans, ensure_ascii=False),
+        ))
+        await db.execute(
+            "DELETE FROM job_runs WHERE started_at < datetime('now', 'localtime', ?)",
+            (f'-{keep_days} days',)
+        )
+        await db.commit()
+        return cursor.lastrowid
+
+
+async def get_recent_job_runs(job: str = None, limit: int = 50) -> List[Dict]:
+    """
+    获取最近的任务运行记录
+
+    Args:
+        job: 任务名称（为空时返回所有任务，每个任务各取最近 limit 条）
+        limit: 每个任务返回的条数
+
+    Returns:
+        运行记录列表（按 id 倒序）
+    """
+    async with get_state_db() as db:
+        if job:
+            sql = "SELECT * FROM job_runs WHERE job = ? ORDER BY id DESC LIMIT ?"
+            params = (job, limit)
+        else:
+            sql = '''
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY job ORDER BY id DESC) AS rn FROM job_runs
+                ) WHERE rn <= ? ORDER BY id DESC
+            '''
+            params = (limit,)
+        async with db.execute(sql, params) as cursor:
+            columns = [c[0] for c in cursor.description]
+            rows = await cursor.fetchall()
+
+    runs = []
+    for row in rows:
+        run = dict(zip(columns, row))
+        run.pop("rn", None)
+        run["success"] = bool(run["success"])
+        run["spans"] = json.loads(run["spans"])
+        runs.append(run)
+    return runs
@@ -0,0 +1,485 @@
+"""
+数据库版本迁移模块
+基于 PRAGMA user_version 记录当前结构版本，启动时只执行尚未应用的迁移；
+结构已是最新时不执行任何 DDL（快速路径）。
+
+新增迁移：在 MIGRATIONS 末尾追加一项，版本号递增，已发布的迁移不要修改。
+每个迁移都应可重复执行（IF NOT EXISTS / 先检查字段），中途失败后下次启动会从该版本重新执行。
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Tuple
+
+from core.config import add_log
+from .search import create_search_index
+
+
+@dataclass
+class Migration:
+    """数据库迁移"""
+    version: int
+    description: str
+    apply: Callable[..., Awaitable[None]]
+
+
+# ============ 迁移定义 ============
+
+TABLES = [
+    # 热点话题表 - 精选后的最终热点
+    '''
+        CREATE TABLE IF NOT EXISTS hot_topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            link TEXT NOT NULL,
+            source TEXT NOT NULL,
+            heat INTEGER DEFAULT 0,
+            tags TEXT,
+            comment TEXT,
+            ai_score DECIMAL(3,2),
+            ai_comment TEXT,
+            category_id INTEGER,
+            matched_keyword TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (category_id) REFERENCES categories(id)
+        )
+    ''',
+
+    # 用户表
+    '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            is_admin INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+
+    # 用户文章表
+    '''
+        CREATE TABLE IF NOT EXISTS user_articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            topic_title TEXT NOT NULL,
+            topic_link TEXT,
+            topic_source TEXT,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            share_token TEXT UNIQUE NOT NULL,
+            is_public INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''',
+
+    # 微信公众号账号配置表
+    '''
+        CREATE TABLE IF NOT EXISTS wechat_accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            app_id TEXT NOT NULL,
+            secret TEXT NOT NULL,
+            account_name TEXT,
+            nickname TEXT,
+            avatar_url TEXT,
+            access_token TEXT,
+            token_expires_at INTEGER,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''',
+
+    # 微信发布记录表
+    '''
+        CREATE TABLE IF NOT EXISTS wechat_publish_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            article_id INTEGER NOT NULL,
+            wechat_account_id INTEGER NOT NULL,
+            publish_type TEXT NOT NULL,
+            media_id TEXT,
+            publish_status TEXT DEFAULT 'pending',
+            publish_id TEXT,
+            published_at TIMESTAMP,
+            error_message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (article_id) REFERENCES user_articles(id) ON DELETE CASCADE,
+            FOREIGN KEY (wechat_account_id) REFERENCES wechat_accounts(id) ON DELETE CASCADE
+        )
+    ''',
+
+    # 分类表
+    '''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            slug TEXT UNIQUE NOT NULL,
+            description TEXT,
+            icon TEXT,
+            color TEXT,
+            is_active INTEGER DEFAULT 1,
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+
+    # 关键词表
+    '''
+        CREATE TABLE IF NOT EXISTS category_keywords (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category_id INTEGER NOT NULL,
+            keyword TEXT NOT NULL,
+            weight INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+        )
+    ''',
+
+    # 平台分类配置表
+    '''
+        CREATE TABLE IF NOT EXISTS category_platforms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category_id INTEGER NOT NULL,
+            platform TEXT NOT NULL,
+            is_enabled INTEGER DEFAULT 1,
+            FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+        )
+    ''',
+
+    # 原始新闻表（raw_news）用于爬虫存储
+    '''
+        CREATE TABLE IF NOT EXISTS raw_news (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            link TEXT UNIQUE NOT NULL,
+            source TEXT NOT NULL,
+            category_id INTEGER,
+            analyzed BOOLEAN DEFAULT 0,
+            analyze_fail_count INTEGER DEFAULT 0,
+            skip_reason TEXT,
+            ai_score DECIMAL(3,2),
+            ai_comment TEXT,
+            last_analyzed_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (category_id) REFERENCES categories(id)
+        )
+    ''',
+]
+
+
+# 运行时状态表（见 db/runtime_state.py）
+RUNTIME_TABLES = [
+    # 运行时状态键值（version 全局递增，各进程按 version 增量同步）
+    '''
+        CREATE TABLE IF NOT EXISTS runtime_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_runtime_state_version ON runtime_state(version)',
+
+    # 前端日志（id 即全局日志序号）
+    '''
+        CREATE TABLE IF NOT EXISTS runtime_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            time TEXT NOT NULL,
+            level TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+
+    # 进程间互斥锁（租约到期前由持有者续期）
+    '''
+        CREATE TABLE IF NOT EXISTS runtime_locks (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''',
+]
+
+
+# 手动任务请求队列（接口进程提交，持有调度锁的进程执行）
+JOB_TABLES = [
+    '''
+        CREATE TABLE IF NOT EXISTS job_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job TEXT NOT NULL,
+            params TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL DEFAULT 'pending',
+            owner TEXT,
+            expires_at REAL,
+            message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_job_requests_status ON job_requests(status, id)',
+]
+
+
+# 任务运行记录（各步骤明细以 JSON 保存在 spans 字段，见 core/job_metrics.py）
+JOB_RUN_TABLES = [
+    '''
+        CREATE TABLE IF NOT EXISTS job_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job TEXT NOT NULL,
+            started_at TIMESTAMP NOT NULL,
+            duration_ms REAL NOT NULL,
+            success INTEGER NOT NULL DEFAULT 0,
+            items INTEGER NOT NULL DEFAULT 0,
+            bytes INTEGER NOT NULL DEFAULT 0,
+            tokens INTEGER NOT NULL DEFAULT 0,
+            errors INTEGER NOT NULL DEFAULT 0,
+            spans TEXT NOT NULL DEFAULT '[]'
+        )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs(job, id)',
+    'CREATE INDEX IF NOT EXISTS idx_job_runs_started_at ON job_runs(started_at)',
+]
+
+
+# 旧版本数据库缺失的字段: (表, 字段, 类型)
+COLUMNS = [
+    ('users', 'is_admin', 'INTEGER DEFAULT 0'),
+    ('user_articles', 'wechat_draft_id', 'TEXT'),
+    ('user_articles', 'wechat_publish_status', 'TEXT DEFAULT "draft"'),
+    ('hot_topics', 'category_id', 'INTEGER'),
+    ('hot_topics', 'matched_keyword', 'TEXT'),
+    # 精选任务和全文检索排序使用
+    ('hot_topics', 'ai_score', 'DECIMAL(3,2)'),
+    ('hot_topics', 'ai_comment', 'TEXT'),
+]
+
+# 更新时间触发器: (触发器名, 表)
+TIMESTAMP_TRIGGERS = [
+    ('update_users_timestamp', 'users'),
+    ('update_user_articles_timestamp', 'user_articles'),
+    ('update_wechat_accounts_timestamp', 'wechat_accounts'),
+    ('update_categories_timestamp', 'categories'),
+]
+
+# 索引: (索引名, 表, 字段)
+INDEXES = [
+    # hot_topics 索引
+    ('idx_created_at', 'hot_topics', 'created_at DESC'),
+    ('idx_source', 'hot_topics', 'source'),
+    ('idx_hot_topics_category_id', 'hot_topics', 'category_id'),
+    # users 索引
+    ('idx_users_username', 'users', 'username'),
+    ('idx_users_email', 'users', 'email'),
+    # user_articles 索引
+    ('idx_user_articles_user_id', 'user_articles', 'user_id'),
+    ('idx_user_articles_share_token', 'user_articles', 'share_token'),
+    ('idx_user_articles_created_at', 'user_articles', 'created_at DESC'),
+    # wechat_accounts 索引
+    ('idx_wechat_accounts_user_id', 'wechat_accounts', 'user_id'),
+    ('idx_wechat_accounts_is_active', 'wechat_accounts', 'is_active'),
+    # wechat_publish_log 索引
+    ('idx_wechat_publish_log_user_id', 'wechat_publish_log', 'user_id'),
+    ('idx_wechat_publish_log_article_id', 'wechat_publish_log', 'article_id'),
+    ('idx_wechat_publish_log_created_at', 'wechat_publish_log', 'created_at DESC'),
+    # categories 索引
+    ('idx_category_keywords_category_id', 'category_keywords', 'category_id'),
+    ('idx_category_keywords_keyword', 'category_keywords', 'keyword'),
+    ('idx_category_platforms_category_id', 'category_platforms', 'category_id'),
+    ('idx_categories_is_active', 'categories', 'is_active'),
+    # raw_news 索引
+    ('idx_raw_news_link', 'raw_news', 'link'),
+    ('idx_raw_news_source', 'raw_news', 'source'),
+    ('idx_raw_news_analyzed', 'raw_news', 'analyzed'),
+    ('idx_raw_news_created_at', 'raw_news', 'created_at DESC'),
+    ('idx_raw_news_ai_score', 'raw_news', 'ai_score DESC'),
+    ('idx_raw_news_category_id', 'raw_news', 'category_id'),
+]
+
+
+def _is_dry_run(db) -> bool:
+    """是否为试运行连接"""
+    return getattr(db, "dry_run", False)
+
+
+async def _create_tables(db):
+    """创建数据表"""
+    for sql in TABLES:
+        await db.execute(sql)
+
+
+async def _add_missing_columns(db):
+    """为旧版本数据库补齐字段（先检查表结构，不依赖捕获 duplicate column 异常）"""
+    for table, column, column_type in COLUMNS:
+        async with db.execute(f"PRAGMA table_info({table})") as cursor:
+            existing = {r[1] for r in await cursor.fetchall()}
+        if column not in existing:
+            await db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+            if not _is_dry_run(db):
+                add_log('info', f'已添加 {table}.{column} 字段')
+
+
+async def _create_triggers(db):
+    """创建更新时间触发器"""
+    for name, table in TIMESTAMP_TRIGGERS:
+        await db.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {name}
+            AFTER UPDATE ON {table}
+            BEGIN
+                UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        ''')
+
+
+async def _create_indexes(db):
+    """
+    创建索引（在线构建）
+
+    每个索引单独提交并让出事件循环：WAL 模式下读请求不受影响，
+    写请求只在单个索引构建期间等待，而不是整个迁移期间。
+    """
+    async with db.execute("SELECT name FROM sqlite_master WHERE type = 'index'") as cursor:
+        existing = {r[0] for r in await cursor.fetchall()}
+
+    for name, table, columns in INDEXES:
+        if name in existing:
+            continue
+        await db.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})')
+        await db.commit()
+        await asyncio.sleep(0)
+
+
+async def _create_search_index(db):
+    """创建全文索引（依赖 hot_topics.ai_score 字段）"""
+    await create_search_index(db, dry_run=_is_dry_run(db))
+
+
+async def _create_runtime_tables(db):
+    """创建运行时状态表（多进程部署时共享热点、任务状态、日志和调度锁）"""
+    for sql in RUNTIME_TABLES:
+        await db.execute(sql)
+
+
+async def _create_job_tables(db):
+    """创建手动任务请求队列表"""
+    for sql in JOB_TABLES:
+        await db.execute(sql)
+
+
+async def _create_job_run_tables(db):
+    """创建任务运行记录表"""
+    for sql in JOB_RUN_TABLES:
+        await db.execute(sql)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "创建数据表", _create_tables),
+    Migration(2, "补齐旧版本缺失的字段", _add_missing_columns),
+    Migration(3, "创建更新时间触发器", _create_triggers),
+    Migration(4, "创建索引", _create_indexes),
+    Migration(5, "创建全文索引", _create_search_index),
+    Migration(6, "创建运行时状态表", _create_runtime_tables),
+    Migration(7, "创建手动任务请求队列", _create_job_tables),
+    Migration(8, "创建任务运行记录表", _create_job_run_tables),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ============ 迁移执行 ============
+
+async def get_schema_version(db) -> int:
+    """读取当前数据库结构版本"""
+    async with db.execute("PRAGMA user_version") as cursor:
+        row = await cursor.fetchone()
+    return row[0]
+
+
+class _DryRunConnection:
+    """
+    试运行连接：读操作（SELECT / PRAGMA 查询）照常执行，写操作只记录 SQL 不执行
+    """
+
+    # 迁移函数据此跳过日志和模块状态等副作用
+    dry_run = True
+
+    READ_PREFIXES = ("SELECT", "PRAGMA TABLE_INFO", "PRAGMA USER_VERSION")
+
+    def __init__(self, db):
+        self._db = db
+        self.statements: List[str] = []
+
+    def execute(self, sql: str, parameters=()):
+        if sql.strip().upper().startswith(self.READ_PREFIXES):
+            return self._db.execute(sql, parameters)
+        self.statements.append(" ".join(sql.split()))
+        return asyncio.sleep(0)
+
+    async def commit(self):
+        pass
+
+
+async def plan_migrations(db) -> List[Tuple[Migration, List[str]]]:
+    """
+    试运行待执行的迁移，收集每个迁移将要执行的 SQL（不修改数据库）
+
+    注意：各迁移基于当前结构试运行，前序迁移的效果不会反映到后续迁移中。
+
+    Args:
+        db: 数据库连接
+
+    Returns:
+        [(迁移, SQL 列表)]
+    """
+    current = await get_schema_version(db)
+    plan = []
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        recorder = _DryRunConnection(db)
+        await migration.apply(recorder)
+        plan.append((migration, recorder.statements))
+    return plan
+
+
+async def run_migrations(db, dry_run: bool = False) -> List[Migration]:
+    """
+    执行尚未应用的迁移
+
+    Args:
+        db: 数据库连接
+        dry_run: 试运行，只记录将要执行的 SQL，不修改数据库
+
+    Returns:
+        已执行（试运行时为待执行）的迁移列表
+    """
+    if dry_run:
+        plan = await plan_migrations(db)
+        for migration, statements in plan:
+            add_log('info', f'[试运行] v{migration.version} {migration.description}: {len(statements)} 条 SQL')
+        return [migration for migration, _ in plan]
+
+    current = await get_schema_version(db)
+    pending = [m for m in MIGRATIONS if m.version > current]
+
+    # 快速路径：结构已是最新，不执行任何 DDL
+    if not pending:
+        return []
+
+    for migration in pending:
+        await migration.apply(db)
+        await db.execute(f"PRAGMA user_version = {migration.version}")
+        await db.commit()
+        add_log('info', f'数据库迁移 v{migration.version} 完成: {migration.description}')
+
+    return pending
@@ -89,15 +89,15 @@ async def get_unanalyzed_news(limit: int = 50, max_fail_count: int = 3) -> List[
     return news_list
 
 
-async def update_news_analysis(news_id: int, ai_score: float, ai_comment: str,
+async def update_news_analysis(news_id: int, ai_score: float = None, ai_comment: str = None,
                                analyzed: bool = True, skip_reason: str = None) -> bool:
     """
     更新新闻的分析结果
 
     Args:
         news_id: 新闻ID
-        ai_score: AI评分 (0-10)
-        ai_comment: AI评论
+        ai_score: AI评分 (0-10)，分析失败时不需要
+        ai_comment: AI评论，分析失败时不需要
         analyzed: 是否分析完成
         skip_reason: 跳过原因（如果分析失败）
 
@@ -0,0 +1,195 @@
+"""
+数据保留与归档模块
+热库只保留最近的数据，过期的 raw_news / hot_topics 按月归档为压缩文件后从数据库删除，
+随后分步执行增量 VACUUM 和 PRAGMA optimize，保持数据库文件小、页缓存命中率高。
+
+归档文件格式: {archive_dir}/{table}/{table}-YYYY-MM.jsonl.gz
+每行一条记录（JSON），同一月份多次归档会以新的 gzip 成员追加到同一文件，
+可直接用 gzip.open / zcat 连续读取。
+"""
+import asyncio
+import gzip
+import json
+import os
+from typing import Dict, List
+
+from core.db_pool import get_db
+from core.config import add_log
+
+# 允许归档的表
+ARCHIVE_TABLES = ("raw_news", "hot_topics")
+
+# 每批归档/删除的行数（控制单个写事务的时长，避免长时间阻塞读写）
+ARCHIVE_BATCH_SIZE = 500
+
+# 增量 VACUUM 每步释放的页数，以及两步之间让出事件循环的间隔（秒）
+VACUUM_STEP_PAGES = 1000
+VACUUM_STEP_INTERVAL = 0.05
+
+
+def _append_archive(archive_dir: str, table: str, rows: List[Dict]) -> Dict[str, int]:
+    """
+    将记录按月份追加写入压缩归档文件（同步，在线程中执行）
+
+    Returns:
+        {文件路径: 写入条数}
+    """
+    by_month: Dict[str, List[Dict]] = {}
+    for row in rows:
+        month = str(row.get("created_at") or "unknown")[:7]
+        by_month.setdefault(month, []).append(row)
+
+    table_dir = os.path.join(archive_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    written = {}
+    for month, items in by_month.items():
+        path = os.path.join(table_dir, f"{table}-{month}.jsonl.gz")
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+        written[path] = len(items)
+    return written
+
+
+async def archive_old_rows(
+    table: str,
+    days: int,
+    archive_dir: str = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    归档并删除过期数据
+
+    先写归档文件再删除数据库记录：中途失败最多导致归档中出现重复行，不会丢数据。
+
+    Args:
+        table: 表名（raw_news 或 hot_topics）
+        days: 保留最近几天的数据
+        archive_dir: 归档目录，为空时只删除不归档
+        batch_size: 每批处理行数
+
+    Returns:
+        归档（删除）的记录数
+    """
+    if table not in ARCHIVE_TABLES:
+        raise ValueError(f"不支持归档的表: {table}")
+
+    total = 0
+    try:
+        while True:
+            async with get_db() as db:
+                async with db.execute(f'''
+                    SELECT * FROM {table}
+                    WHERE created_at < datetime('now', '-' || ? || ' days')
+                    ORDER BY id
+                    LIMIT ?
+                ''', (days, batch_size)) as cursor:
+                    rows = [dict(r) for r in await cursor.fetchall()]
+
+                if not rows:
+                    break
+
+                if archive_dir:
+                    await asyncio.to_thread(_append_archive, archive_dir, table, rows)
+
+                ids = [r["id"] for r in rows]
+                placeholders = ",".join("?" * len(ids))
+                await db.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", ids)
+                await db.commit()
+
+            total += len(rows)
+            # 批次之间让出事件循环，避免阻塞 API 请求
+            await asyncio.sleep(0)
+
+            if len(rows) < batch_size:
+                break
+
+        if total > 0:
+            action = "归档" if archive_dir else "清理"
+            add_log('info', f'已{action} {table} 中 {total} 条 {days} 天前的数据')
+
+    except Exception as e:
+        add_log('error', f'归档 {table} 失败: {e}')
+
+    return total
+
+
+async def incremental_vacuum(
+    step_pages: int = VACUUM_STEP_PAGES,
+    interval: float = VACUUM_STEP_INTERVAL,
+) -> int:
+    """
+    分步回收空闲页
+
+    每次只回收 step_pages 页，两步之间让出事件循环。数据库未启用 auto_vacuum=INCREMENTAL 时跳过
+    （切换需要一次完整 VACUUM，大库会长时间占用写锁，由 scripts/migrate.py --vacuum 单独执行）。
+
+    Args:
+        step_pages: 每步回收的页数
+        interval: 每步之间的间隔（秒）
+
+    Returns:
+        回收的页数
+    """
+    freed = 0
+    try:
+        async with get_db() as db:
+            async with db.execute("PRAGMA auto_vacuum") as cursor:
+                mode = (await cursor.fetchone())[0]
+
+            if mode != 2:
+                add_log('info', '数据库未启用增量 VACUUM，跳过空间回收（可执行 python scripts/migrate.py --vacuum 切换）')
+                return 0
+
+            while True:
+                async with db.execute("PRAGMA freelist_count") as cursor:
+                    free_pages = (await cursor.fetchone())[0]
+                if free_pages <= 0:
+                    break
+
+                step = min(step_pages, free_pages)
+                await db.execute(f"PRAGMA incremental_vacuum({step})")
+                await db.commit()
+                freed += step
+                await asyncio.sleep(interval)
+
+        if freed > 0:
+            add_log('info', f'增量 VACUUM 回收 {freed} 页')
+
+    except Exception as e:
+        add_log('error', f'增量 VACUUM 失败: {e}')
+
+    return freed
+
+
+async def enable_incremental_vacuum(db) -> bool:
+    """
+    将已有数据库切换为 auto_vacuum=INCREMENTAL
+
+    切换必须通过一次完整 VACUUM 生效，会重写整个数据库文件并在期间持有写锁，
+    只应在停服维护时显式执行（scripts/migrate.py --vacuum），不在定时任务中调用。
+
+    Args:
+        db: 数据库连接
+
+    Returns:
+        是否执行了切换（已是增量模式时返回 False）
+    """
+    async with db.execute("PRAGMA auto_vacuum") as cursor:
+        if (await cursor.fetchone())[0] == 2:
+            return False
+
+    await db.commit()
+    await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    await db.execute("VACUUM")
+    return True
+
+
+async def optimize_db() -> None:
+    """执行 PRAGMA optimize，按需更新查询规划器统计信息"""
+    try:
+        async with get_db() as db:
+            await db.execute("PRAGMA optimize")
+    except Exception as e:
+        add_log('error', f'PRAGMA optimize 失败: {e}')
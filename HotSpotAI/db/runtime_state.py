@@ -0,0 +1,247 @@
+"""
+运行时状态数据库操作模块
+多进程部署（uvicorn --workers N / 独立调度 worker）时，热点话题、任务状态、前端日志、
+调度锁和手动任务请求保存在数据库中，各进程通过 core.state.StateSync 增量同步。
+
+这里的函数使用状态同步专用连接（get_state_db），出错回滚不影响其他写入；
+不捕获数据库异常，由同步任务记录后在下一个周期重试。
+"""
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from core.db_pool import get_state_db
+
+
+async def save_state_values(values: Dict[str, Any]) -> int:
+    """
+    写入运行时状态（每个键分配新的全局版本号）
+
+    版本号在写事务内分配，提交顺序与版本号顺序一致，读取方按版本号增量同步不会遗漏。
+
+    Args:
+        values: {键: 可 JSON 序列化的值}
+
+    Returns:
+        写入后的最大版本号
+    """
+    async with get_state_db() as db:
+        for key, value in values.items():
+            await db.execute('''
+                INSERT INTO runtime_state (key, value, version, updated_at)
+                VALUES (?, ?, (SELECT COALESCE(MAX(version), 0) + 1 FROM runtime_state), CURRENT_TIMESTAMP)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    version = excluded.version,
+                    updated_at = excluded.updated_at
+            ''', (key, json.dumps(value, ensure_ascii=False, default=str)))
+        async with db.execute("SELECT COALESCE(MAX(version), 0) FROM runtime_state") as cursor:
+            version = (await cursor.fetchone())[0]
+        await db.commit()
+    return version
+
+
+async def load_state_changes(since_version: int = 0) -> Tuple[Dict[str, Any], int]:
+    """
+    读取版本号大于 since_version 的运行时状态
+
+    Args:
+        since_version: 已同步的版本号（0 表示全部）
+
+    Returns:
+        ({键: 值}, 当前最大版本号)
+    """
+    async with get_state_db() as db:
+        async with db.execute(
+            "SELECT key, value, version FROM runtime_state WHERE version > ? ORDER BY version",
+            (since_version,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+    changes = {row[0]: json.loads(row[1]) for row in rows}
+    version = rows[-1][2] if rows else since_version
+    return changes, version
+
+
+async def append_runtime_logs(entries: List[Dict], keep: int = 1000) -> None:
+    """
+    追加前端日志（id 由数据库分配，作为全局日志序号），并只保留最近 keep 条
+
+    Args:
+        entries: 日志列表（按时间正序），包含 time, level, message
+        keep: 保留的日志条数
+    """
+    if not entries:
+        return
+
+    async with get_state_db() as db:
+        await db.executemany(
+            "INSERT INTO runtime_logs (time, level, message) VALUES (?, ?, ?)",
+            [(e["time"], e["level"], e["message"]) for e in entries]
+        )
+        await db.execute(
+            "DELETE FROM runtime_logs WHERE id <= (SELECT MAX(id) FROM runtime_logs) - ?",
+            (keep,)
+        )
+        await db.commit()
+
+
+async def get_runtime_logs_since(after_id: int = 0, limit: int = 100) -> List[Dict]:
+    """
+    获取 id 大于 after_id 的日志（超过 limit 条时只返回最新的 limit 条）
+
+    Args:
+        after_id: 已同步的最大日志 id
+        limit: 返回条数上限
+
+    Returns:
+        日志列表（按 id 正序）
+    """
+    async with get_state_db() as db:
+        async with db.execute(
+            "SELECT id, time, level, message FROM runtime_logs WHERE id > ? ORDER BY id DESC LIMIT ?",
+            (after_id, limit)
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+    return [
+        {"id": row[0], "time": row[1], "level": row[2], "message": row[3]}
+        for row in reversed(rows)
+    ]
+
+
+async def acquire_lock(name: str, owner: str, ttl: float) -> bool:
+    """
+    获取或续期进程间锁（租约）
+
+    锁空闲、已过期或已由 owner 持有时获取成功，租约延长到 ttl 秒后。
+
+    Args:
+        name: 锁名称
+        owner: 持有者标识（进程唯一）
+        ttl: 租约时长（秒）
+
+    Returns:
+        是否持有锁
+    """
+    now = time.time()
+    async with get_state_db() as db:
+        await db.execute('''
+            INSERT INTO runtime_locks (name, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                owner = excluded.owner,
+                expires_at = excluded.expires_at
+            WHERE runtime_locks.owner = excluded.owner OR runtime_locks.expires_at < ?
+        ''', (name, owner, now + ttl, now))
+        await db.commit()
+        async with db.execute("SELECT owner FROM runtime_locks WHERE name = ?", (name,)) as cursor:
+            row = await cursor.fetchone()
+    return row is not None and row[0] == owner
+
+
+async def release_lock(name: str, owner: str) -> None:
+    """
+    释放进程间锁（只释放自己持有的锁）
+
+    Args:
+        name: 锁名称
+        owner: 持有者标识
+    """
+    async with get_state_db() as db:
+        await db.execute("DELETE FROM runtime_locks WHERE name = ? AND owner = ?", (name, owner))
+        await db.commit()
+
+
+async def enqueue_job_request(job: str, params: Dict[str, Any] = None) -> int:
+    """
+    提交手动任务请求（由持有调度锁的进程执行）
+
+    Args:
+        job: 任务名称
+        params: 任务参数
+
+    Returns:
+        请求 id
+    """
+    async with get_state_db() as db:
+        cursor = await db.execute(
+            "INSERT INTO job_requests (job, params) VALUES (?, ?)",
+            (job, json.dumps(params or {}, ensure_ascii=False))
+        )
+        await db.commit()
+        return cursor.lastrowid
+
+
+async def claim_job_requests(owner: str, ttl: float, limit: int = 10) -> List[Dict]:
+    """
+    领取待执行的任务请求（标记为 running，同一请求只会被一个进程领取）
+
+    领取后持有 ttl 秒的租约，执行期间由 renew_job_requests 续期。
+    执行进程退出后租约不再续期，到期的 running 请求会被重新领取。
+
+    Args:
+        owner: 领取者标识
+        ttl: 租约时长（秒）
+        limit: 最多领取的数量
+
+    Returns:
+        任务请求列表 [{"id", "job", "params"}]，按提交顺序
+    """
+    now = time.time()
+    async with get_state_db() as db:
+        async with db.execute('''
+            SELECT id, job, params FROM job_requests
+            WHERE status = 'pending' OR (status = 'running' AND expires_at < ?)
+            ORDER BY id LIMIT ?
+        ''', (now, limit)) as cursor:
+            rows = await cursor.fetchall()
+
+        claimed = []
+        for row in rows:
+            cursor = await db.execute('''
+                UPDATE job_requests
+                SET status = 'running', owner = ?, expires_at = ?, started_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND (status = 'pending' OR (status = 'running' AND expires_at < ?))
+            ''', (owner, now + ttl, row[0], now))
+            if cursor.rowcount:
+                claimed.append({"id": row[0], "job": row[1], "params": json.loads(row[2])})
+        await db.commit()
+    return claimed
+
+
+async def renew_job_requests(owner: str, ttl: float) -> None:
+    """
+    续期 owner 正在执行的任务请求租约
+
+    Args:
+        owner: 领取者标识
+        ttl: 租约时长（秒）
+    """
+    async with get_state_db() as db:
+        await db.execute(
+            "UPDATE job_requests SET expires_at = ? WHERE owner = ? AND status = 'running'",
+            (time.time() + ttl, owner)
+        )
+        await db.commit()
+
+
+async def finish_job_request(request_id: int, status: str, message: str = "", keep_days: int = 7) -> None:
+    """
+    记录任务请求的执行结果，并清理 keep_days 天前已结束的请求
+
+    Args:
+        request_id: 请求 id
+        status: done / failed
+        message: 结果说明
+        keep_days: 已结束请求的保留天数
+    """
+    async with get_state_db() as db:
+        await db.execute('''
+            UPDATE job_requests SET status = ?, message = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (status, message, request_id))
+        await db.execute(
+            "DELETE FROM job_requests WHERE status IN ('done', 'failed') AND finished_at < datetime('now', ?)",
+            (f'-{keep_days} days',)
+        )
+        await db.commit()
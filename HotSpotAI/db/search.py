@@ -0,0 +1,364 @@
+"""
+全文检索模块
+基于 SQLite FTS5 (trigram 分词器，支持中文子串匹配) 检索 raw_news 和 hot_topics
+
+索引表使用外部内容表 (external content)，只存储倒排索引，正文仍保存在原表中，
+通过触发器与原表保持同步。
+
+highlighted_title 是可直接插入页面的 HTML：标题来自抓取内容，先做 HTML 转义再加入 <mark> 标签。
+"""
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+from core.db_pool import get_db
+from core.config import add_log
+
+# trigram 分词器要求检索词至少 3 个字符
+MIN_FTS_TERM_LENGTH = 3
+
+# 高亮标记
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# 转义前使用的内部高亮标记（控制字符，不受 HTML 转义影响），转义后替换为 HIGHLIGHT_START / END
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+# ai_score 在排序中的权重（bm25 越小越相关，ai_score 越大越优先）
+DEFAULT_SCORE_WEIGHT = 0.5
+
+# 检索范围 -> (原表, 索引表, 类型标记)
+SEARCH_TABLES = {
+    "raw": ("raw_news", "raw_news_fts", "raw"),
+    "topics": ("hot_topics", "hot_topics_fts", "topic"),
+}
+
+# FTS 索引表与同步触发器 DDL
+FTS_SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS raw_news_fts USING fts5(
+        title, content='raw_news', content_rowid='id', tokenize='trigram'
+    )
+    ''',
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS hot_topics_fts USING fts5(
+        title, content='hot_topics', content_rowid='id', tokenize='trigram'
+    )
+    ''',
+]
+
+
+def _sync_trigger_sql(base_table: str, fts_table: str) -> List[str]:
+    """生成原表 -> 索引表的同步触发器（插入/删除/更新标题）"""
+    return [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {base_table} BEGIN
+            INSERT INTO {fts_table}(rowid, title) VALUES (new.id, new.title);
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {base_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title) VALUES ('delete', old.id, old.title);
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF title ON {base_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO {fts_table}(rowid, title) VALUES (new.id, new.title);
+        END
+        ''',
+    ]
+
+
+for _base_table, _fts_table, _ in SEARCH_TABLES.values():
+    FTS_SCHEMA.extend(_sync_trigger_sql(_base_table, _fts_table))
+
+# 索引是否可用（None 表示尚未检测）
+_fts_available: Optional[bool] = None
+
+
+async def create_search_index(db, dry_run: bool = False) -> bool:
+    """
+    创建全文索引表和同步触发器，新建索引时回填已有数据
+
+    Args:
+        db: 数据库连接
+        dry_run: 试运行（只记录 SQL），不输出日志也不更新索引可用状态
+
+    Returns:
+        是否可用（SQLite 未编译 FTS5/trigram 时返回 False）
+    """
+    async with db.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'"
+    ) as cursor:
+        existing = {r[0] for r in await cursor.fetchall()}
+
+    global _fts_available
+    try:
+        for sql in FTS_SCHEMA:
+            await db.execute(sql)
+    except Exception as e:
+        if not dry_run:
+            _fts_available = False
+            add_log('warning', f'全文索引不可用，检索将退化为 LIKE 扫描: {e}')
+        return False
+
+    # 仅在索引表新建时回填，避免每次启动都重建
+    for _, fts_table, _ in SEARCH_TABLES.values():
+        if fts_table not in existing:
+            await db.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+            if not dry_run:
+                add_log('info', f'全文索引 {fts_table} 已重建')
+
+    if not dry_run:
+        _fts_available = True
+    return True
+
+
+async def check_search_index(db) -> bool:
+    """
+    检测全文索引是否已存在（不执行 DDL，用于结构已是最新时的快速启动）
+
+    Args:
+        db: 数据库连接
+
+    Returns:
+        是否可用
+    """
+    global _fts_available
+    async with db.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('raw_news_fts', 'hot_topics_fts')"
+    ) as cursor:
+        _fts_available = (await cursor.fetchone())[0] == len(SEARCH_TABLES)
+    return _fts_available
+
+
+def split_terms(query: str) -> List[str]:
+    """拆分检索词（按空白分隔，去重保序）"""
+    terms = []
+    for term in query.split():
+        if term and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def to_match_expression(terms: List[str]) -> str:
+    """
+    将检索词转换为 FTS5 MATCH 表达式
+
+    每个词作为短语（双引号包裹，内部引号转义），多个词之间为 AND 关系，
+    避免用户输入中的 FTS5 语法字符（AND/OR/*/- 等）被解释。
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def build_search_query(
+    query: str,
+    scope: str = "all",
+    source: Optional[str] = None,
+    category_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    score_weight: float = DEFAULT_SCORE_WEIGHT,
+    allow_fts: bool = True,
+) -> Tuple[str, List, str, List, bool]:
+    """
+    构建检索 SQL
+
+    所有检索词都不短于 3 个字符时走 FTS5 (bm25 排序 + highlight)，
+    否则退化为原表 LIKE 扫描（按 ai_score 排序）。
+
+    Args:
+        query: 检索词
+        scope: 检索范围 (all/raw/topics)
+        source: 数据源筛选
+        category_id: 分类筛选
+        start_date: 起始日期 (YYYY-MM-DD)
+        end_date: 结束日期 (YYYY-MM-DD)
+        score_weight: ai_score 在排序中的权重
+        allow_fts: 是否允许使用 FTS 索引
+
+    Returns:
+        (查询 SQL, 查询参数, 计数 SQL, 计数参数, 是否使用 FTS)
+    """
+    terms = split_terms(query)
+    use_fts = allow_fts and bool(terms) and all(len(t) >= MIN_FTS_TERM_LENGTH for t in terms)
+    scopes = list(SEARCH_TABLES) if scope == "all" else [scope]
+
+    selects = []
+    counts = []
+    params: List = []
+    count_params: List = []
+
+    for key in scopes:
+        base_table, fts_table, kind = SEARCH_TABLES[key]
+        conditions = []
+        filter_params: List = []
+
+        if use_fts:
+            conditions.append(f"{fts_table} MATCH ?")
+            filter_params.append(to_match_expression(terms))
+        else:
+            for term in terms:
+                conditions.append("b.title LIKE ?")
+                filter_params.append(f"%{term}%")
+
+        if source:
+            conditions.append("b.source = ?")
+            filter_params.append(source)
+        if category_id:
+            conditions.append("b.category_id = ?")
+            filter_params.append(category_id)
+        if start_date:
+            conditions.append("b.created_at >= ?")
+            filter_params.append(start_date)
+        if end_date:
+            conditions.append("b.created_at < date(?, '+1 day')")
+            filter_params.append(end_date)
+
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        if use_fts:
+            from_clause = f"FROM {fts_table} JOIN {base_table} b ON b.id = {fts_table}.rowid"
+            highlight = f"highlight({fts_table}, 0, ?, ?)"
+            rank = f"bm25({fts_table}) - COALESCE(b.ai_score, 0) * ?"
+            select_params = [MARK_START, MARK_END, score_weight]
+        else:
+            from_clause = f"FROM {base_table} b"
+            highlight = "b.title"
+            rank = "-COALESCE(b.ai_score, 0)"
+            select_params = []
+
+        selects.append(f'''
+            SELECT '{kind}' AS kind, b.id, b.title, b.link, b.source, b.category_id,
+                   b.ai_score, b.ai_comment, b.created_at,
+                   {highlight} AS highlighted, {rank} AS rank
+            {from_clause}
+            {where_clause}
+        ''')
+        params.extend(select_params + filter_params)
+
+        counts.append(f"SELECT COUNT(*) AS count {from_clause} {where_clause}")
+        count_params.extend(filter_params)
+
+    sql = " UNION ALL ".join(selects) + " ORDER BY rank ASC, created_at DESC LIMIT ? OFFSET ?"
+    count_sql = "SELECT SUM(count) AS count FROM (" + " UNION ALL ".join(counts) + ")"
+
+    return sql, params, count_sql, count_params, use_fts
+
+
+def render_highlight(marked: str) -> str:
+    """
+    将带内部高亮标记的标题转为 HTML（先转义标题，再把标记替换为 <mark> 标签）
+
+    Args:
+        marked: 使用 MARK_START / MARK_END 标记匹配片段的标题
+
+    Returns:
+        转义后的 HTML
+    """
+    return html.escape(marked).replace(MARK_START, HIGHLIGHT_START).replace(MARK_END, HIGHLIGHT_END)
+
+
+def highlight_terms(title: str, terms: List[str]) -> str:
+    """
+    LIKE 模式下的 Python 端高亮
+
+    与 SQLite LIKE 一致，只有 ASCII 字母不区分大小写；多个检索词一次匹配，长词优先，不会嵌套标记。
+
+    Args:
+        title: 原始标题
+        terms: 检索词
+
+    Returns:
+        转义后的 HTML
+    """
+    title = title.replace(MARK_START, "").replace(MARK_END, "")
+    if not terms:
+        return html.escape(title)
+
+    pattern = re.compile(
+        "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+        re.IGNORECASE | re.ASCII
+    )
+    return render_highlight(pattern.sub(lambda m: MARK_START + m.group(0) + MARK_END, title))
+
+
+async def search_news(
+    query: str,
+    scope: str = "all",
+    source: Optional[str] = None,
+    category_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 20,
+) -> Dict:
+    """
+    全文检索新闻和热点话题
+
+    Args:
+        query: 检索词（空格分隔多个词，AND 关系）
+        scope: 检索范围 (all/raw/topics)
+        source: 数据源筛选
+        category_id: 分类筛选
+        start_date: 起始日期 (YYYY-MM-DD)
+        end_date: 结束日期 (YYYY-MM-DD)
+        offset: 偏移量
+        limit: 每页数量
+
+    Returns:
+        {
+            "results": [...],
+            "total": 总数,
+            "offset": 偏移量,
+            "limit": 每页数量,
+            "mode": "fts" 或 "like"
+        }
+    """
+    results = []
+    total = 0
+    mode = "like"
+
+    terms = split_terms(query)
+    if not terms:
+        return {"results": results, "total": total, "offset": offset, "limit": limit, "mode": mode}
+
+    try:
+        sql, params, count_sql, count_params, use_fts = build_search_query(
+            query, scope, source, category_id, start_date, end_date,
+            allow_fts=_fts_available is not False
+        )
+        mode = "fts" if use_fts else "like"
+
+        async with get_db() as db:
+            async with db.execute(count_sql, count_params) as cursor:
+                row = await cursor.fetchone()
+                total = row["count"] or 0
+
+            async with db.execute(sql, params + [limit, offset]) as cursor:
+                rows = await cursor.fetchall()
+
+            for r in rows:
+                if use_fts:
+                    highlighted = render_highlight(r['highlighted'])
+                else:
+                    highlighted = highlight_terms(r['title'], terms)
+                results.append({
+                    "type": r['kind'],
+                    "id": r['id'],
+                    "title": r['title'],
+                    "highlighted_title": highlighted,
+                    "link": r['link'],
+                    "source": r['source'],
+                    "category_id": r['category_id'],
+                    "ai_score": r['ai_score'],
+                    "ai_comment": r['ai_comment'],
+                    "created_at": r['created_at'],
+                    "rank": r['rank'],
+                })
+
+    except Exception as e:
+        add_log('error', f'全文检索失败: {e}')
+
+    return {"results": results, "total": total, "offset": offset, "limit": limit, "mode": mode}
@@ -1,9 +1,31 @@
 """
 用户 (users) 数据库操作模块
 """
+import time
+import uuid
+from collections import OrderedDict
 from typing import Optional, Dict
 from core.db_pool import get_db
-from core.config import add_log
+from core.config import add_log, runtime_state
+
+# 认证用户缓存有效期（秒）与容量
+# 每个带 token 的请求（含 SSE 重连、仪表盘轮询）都要读取当前用户，缓存后命中时不访问数据库。
+# update_user 会立即失效本进程的缓存，并更新共享的 users_version（由状态同步传播到其他进程）；
+# TTL 只用于兜底绕过接口的修改（如 scripts/create_admin.py 直接改数据库）
+USER_CACHE_TTL = 60
+USER_CACHE_SIZE = 1024
+
+# 认证用户缓存（LRU 顺序）: user_id -> (过期时间戳, 用户信息)
+_user_cache: "OrderedDict[int, tuple]" = OrderedDict()
+
+# 缓存对应的 users_version，与共享状态不一致时整体失效
+_user_cache_version: Optional[str] = None
+
+# 缓存代数：每次失效加一，读取期间发生失效时不写入缓存（避免把旧数据重新缓存一个 TTL）
+_user_cache_generation = 0
+
+# 缓存的用户字段（不包含密码哈希）
+USER_PUBLIC_FIELDS = ("id", "username", "email", "is_admin", "created_at", "updated_at")
 
 
 async def create_user(username: str, email: str, password_hash: str, is_admin: bool = False) -> Optional[int]:
@@ -76,6 +98,61 @@ async def get_user_by_id(user_id: int) -> Optional[Dict]:
         return None
 
 
+def invalidate_user_cache(user_id: Optional[int] = None) -> None:
+    """
+    使认证用户缓存失效（修改用户信息后调用，同时通知其他进程）
+
+    Args:
+        user_id: 用户ID，为 None 时清空全部缓存
+    """
+    global _user_cache_generation
+    _user_cache_generation += 1
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(user_id, None)
+    # 其他进程不知道具体修改了哪个用户，收到新版本后清空整个缓存
+    runtime_state["users_version"] = uuid.uuid4().hex
+
+
+async def get_cached_user(user_id: int) -> Optional[Dict]:
+    """
+    获取认证用户（带进程内 TTL + LRU 缓存，不包含密码哈希）
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        用户信息字典（副本），不存在返回 None
+    """
+    global _user_cache_version
+    version = runtime_state.get("users_version")
+    if version != _user_cache_version:
+        _user_cache.clear()
+        _user_cache_version = version
+
+    now = time.monotonic()
+    entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        _user_cache.move_to_end(user_id)
+        return dict(entry[1])
+
+    generation = _user_cache_generation
+    user = await get_user_by_id(user_id)
+    if user is None:
+        # 不缓存不存在的用户（已删除用户的 token 每次都会查库并被拒绝）
+        _user_cache.pop(user_id, None)
+        return None
+
+    user = {field: user[field] for field in USER_PUBLIC_FIELDS}
+    if generation == _user_cache_generation:
+        _user_cache[user_id] = (now + USER_CACHE_TTL, user)
+        _user_cache.move_to_end(user_id)
+        while len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+    return dict(user)
+
+
 async def get_user_by_email(email: str) -> Optional[Dict]:
     """
     根据邮箱获取用户
@@ -181,6 +258,7 @@ async def update_user(user_id: int, **kwargs) -> bool:
                 ''', update_values)
 
                 await db.commit()
+                invalidate_user_cache(user_id)
                 add_log('success', f'更新用户成功: {user_id}')
                 return True
 
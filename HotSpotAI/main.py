@@ -1,6 +1,5 @@
 import sys
 import asyncio
-import subprocess
 
 # === Windows 异步循环修复 (必须在最前面) ===
 if sys.platform == 'win32':
@@ -9,17 +8,13 @@ if sys.platform == 'win32':
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from playwright.async_api import async_playwright
 
-# 导入核心模块
+# 导入核心模块（数据库、调度器、Playwright 等较重的模块在启动事件中按需加载）
 from core import (
     add_log,
-    runtime_state,
     get_settings,
-    start_scheduler,
-    init_db,
-    load_latest_topics_from_db,
     setup_file_logging,
     get_logger,
 )
@@ -78,58 +73,89 @@ app.add_exception_handler(RequestValidationError, http_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
 
+# === 就绪状态 ===
+# 存活 (liveness): 进程能响应请求即可；就绪 (readiness): 数据库和调度器已初始化
+readiness = {
+    "database": False,
+    "scheduler": False,
+}
+
+
+def on_scheduler_leader():
+    """获得调度锁：启动定时任务，并在本进程（运行爬虫的进程）后台检查浏览器环境"""
+    from core import start_scheduler
+    from core.browser_check import start_browser_check
+
+    start_scheduler()
+    start_browser_check()
+
+
 # === 启动事件 ===
 @app.on_event("startup")
 async def startup_event():
+    from core import init_db, load_latest_topics_from_db, run_manual_job, stop_scheduler
+    from core.loop_monitor import start_loop_monitor
+    from core.state import start_state_sync
+    from core.topics_cache import set_hot_topics
+
     logger.info("=" * 50)
     logger.info("HotSpotAI API 启动中...")
     logger.info(f"日志级别: {settings.log_level}")
     logger.info("=" * 50)
 
+    # 监控事件循环阻塞
+    start_loop_monitor()
+
     # 1. 初始化数据库 (异步)
     logger.info("正在初始化数据库...")
     await init_db()
+    readiness["database"] = True
     logger.info("数据库初始化完成")
 
     # 2. 从数据库恢复历史数据 (避免重启后页面空白)
     add_log('info', '正在尝试从数据库恢复历史热点数据...')
     saved_topics = await load_latest_topics_from_db()
     if saved_topics:
-        runtime_state["hot_topics"] = saved_topics
+        set_hot_topics(saved_topics)
         logger.info(f"从数据库恢复了 {len(saved_topics)} 条热点数据")
 
-    # 3. 启动定时任务
+    # 3. 开始同步运行时状态，持有调度锁的进程启动定时任务（多 worker 时只有一个进程运行）
+    #    SCHEDULER_MODE=worker 时由独立的 worker.py 进程持有调度锁
     logger.info("正在启动定时任务调度器...")
-    start_scheduler()
+    state_sync = await start_state_sync(
+        on_leader=on_scheduler_leader,
+        on_follower=stop_scheduler,
+        can_lead=settings.scheduler_mode != "worker",
+        job_runner=run_manual_job,
+    )
+    readiness["scheduler"] = True
+    logger.info(f"调度角色: {state_sync.role}")
 
-    # 4. 检查浏览器环境
-    logger.info("正在检查 Playwright 浏览器环境...")
-    add_log('info', '正在检查 Playwright 浏览器环境...')
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=settings.playwright_headless)
-            await browser.close()
-            logger.info("Playwright 浏览器环境正常")
-            add_log('info', 'Playwright 浏览器环境正常')
-    except Exception as e:
-        if "Executable doesn't exist" in str(e) or "playwright install" in str(e):
-            logger.warning("浏览器未安装，正在自动安装...")
-            add_log('warning', '正在自动安装浏览器 (playwright install chromium)...')
-            try:
-                subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=True)
-                logger.info("浏览器安装成功")
-                add_log('success', '浏览器安装成功！')
-            except Exception as install_e:
-                logger.error(f"浏览器安装失败: {install_e}")
-                add_log('error', f'自动安装失败: {install_e}')
-        else:
-            logger.warning(f"浏览器环境检查异常: {str(e)}")
-            add_log('warning', f'浏览器环境检查异常: {str(e)}')
+    # 4. 浏览器环境检查在获得调度锁时后台执行（只在运行爬虫的进程中，不阻塞启动）
 
     logger.info(f"API 服务启动成功！监听: {settings.host}:{settings.port}")
     add_log('info', f'API 服务启动成功！监听: {settings.host}:{settings.port}')
 
 
+# === 关闭事件 ===
+@app.on_event("shutdown")
+async def shutdown_event():
+    from core import stop_scheduler
+    from core.executors import shutdown_executors
+    from core.llm import close_llm_client
+    from core.loop_monitor import stop_loop_monitor
+    from core.state import stop_state_sync
+    from scrapers.http_client import close_http_client
+
+    # 先停止调度器再释放调度锁，其他进程可立即接管
+    stop_scheduler()
+    await stop_state_sync()
+    await stop_loop_monitor()
+    shutdown_executors()
+    await close_http_client()
+    await close_llm_client()
+
+
 # === 根路径健康检查 ===
 @app.get("/")
 async def root():
@@ -141,12 +167,69 @@ async def root():
     }
 
 
+def current_checks() -> dict:
+    """
+    就绪状态（附带当前调度角色: leader 运行定时任务 / standby 调度锁由其他进程持有）
+
+    browser: pending / checking / ok / installing / missing / error，不影响就绪；
+    不运行爬虫的进程不检查浏览器，为 skipped。
+    loop_lag / executors: 事件循环延迟和执行器积压，仅供观察
+    """
+    from core import state
+    from core import loop_monitor
+    from core.browser_check import get_browser_status
+    from core.executors import executor_stats
+
+    checks = dict(readiness)
+    checks["browser"] = get_browser_status()
+    if state.state_sync is not None:
+        checks["role"] = state.state_sync.role
+        if checks["browser"] == "pending" and not state.state_sync.is_leader:
+            checks["browser"] = "skipped"
+    if loop_monitor.loop_monitor is not None:
+        checks["loop_lag"] = loop_monitor.loop_monitor.stats()
+    checks["executors"] = executor_stats()
+    return checks
+
+
 @app.get("/health")
 async def health_check():
-    """健康检查接口"""
-    return {"status": "ok", "service": "hotspotai-api"}
+    """存活检查接口（进程能响应即返回 200，附带就绪状态供参考）"""
+    return {
+        "status": "ok",
+        "service": "hotspotai-api",
+        "ready": readiness["database"] and readiness["scheduler"],
+        "checks": current_checks(),
+    }
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """就绪检查接口（数据库可用且调度器已启动时返回 200，否则 503）"""
+    from core.db_pool import get_db
+
+    checks = current_checks()
+    if checks["database"]:
+        try:
+            async with get_db() as db:
+                await db.execute("SELECT 1")
+        except Exception:
+            checks["database"] = False
+
+    ready = checks["database"] and checks["scheduler"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host=settings.host, port=settings.port, reload=settings.debug)
+    uvicorn.run(
+        "main:app",
+        host=settings.host,
+        port=settings.port,
+        reload=settings.debug,
+        # 多个 worker 通过状态后端共享运行时状态，只有持有调度锁的 worker 运行定时任务
+        workers=1 if settings.debug else settings.workers,
+    )
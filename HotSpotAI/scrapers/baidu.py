@@ -2,9 +2,10 @@
 百度热搜爬虫模块
 使用 HTTPScraper 基类实现
 """
-from bs4 import BeautifulSoup
+from core.executors import run_cpu
 from .base import HTTPScraper
 from .factory import register_scraper
+from .parsers import parse_baidu_hot
 from utils import http_retry
 
 
@@ -30,28 +31,12 @@ class BaiduScraper(HTTPScraper):
 
         try:
             html = await self.fetch_page()
-            soup = BeautifulSoup(html, 'html.parser')
-            rows = soup.select('.c-single-text-ellipsis')
+            # 页面解析在进程池中执行，不阻塞事件循环
+            row_count, parsed = await run_cpu(parse_baidu_hot, html, limit)
 
-            self.log_warning(f"原始条目数量: {len(rows)}")
+            self.log_warning(f"原始条目数量: {row_count}")
 
-            items = []
-            for t in rows:
-                if len(items) >= limit:
-                    break
-
-                title = t.get_text().strip()
-                if not title:
-                    continue
-
-                # 简单去重
-                if any(x['title'] == title for x in items):
-                    continue
-
-                items.append(self.format_result(
-                    title,
-                    f"https://www.baidu.com/s?wd={title}"
-                ))
+            items = [self.format_result(title, link) for title, link in parsed]
 
             self.log_success(len(items))
             return items
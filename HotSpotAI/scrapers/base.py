@@ -2,9 +2,45 @@
 爬虫基类模块
 定义所有爬虫的统一接口
 """
+import asyncio
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from core.config import add_log, get_config
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Dict, FrozenSet, Optional, Set, Tuple
+from core.config import add_log, get_config, runtime_state
+from .http_client import clear_session, get_http_client, get_session_cookies, store_session
+from .replay import browser_har_path, get_replay_mode
+
+# 默认请求 User-Agent
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# 浏览器启动参数（隐藏自动化特征）
+BROWSER_ARGS = ['--disable-blink-features=AutomationControlled']
+
+# 默认允许加载的资源类型：页面文档、脚本和数据请求；
+# 图片、媒体、字体、样式表、跟踪信标等在请求发出前被拦截
+DEFAULT_ALLOWED_RESOURCE_TYPES = frozenset({"document", "script", "xhr", "fetch"})
+
+# 关闭浏览器前等待流量统计完成的最长时间（秒）
+METRICS_DRAIN_TIMEOUT = 2.0
+
+# 在页面内一次提取所有匹配元素的 (标题, 链接)，避免逐行 locator 往返
+EXTRACT_LINKS_JS = """
+([selector, linkSelector, titleSelector, limit]) => {
+    const items = [];
+    for (const element of document.querySelectorAll(selector)) {
+        const link = linkSelector ? element.querySelector(linkSelector) : element;
+        if (!link) continue;
+        const titleElement = titleSelector ? link.querySelector(titleSelector) : link;
+        const title = titleElement ? titleElement.textContent.trim() : '';
+        if (!title) continue;
+        items.push([title, link.getAttribute('href') || '']);
+        if (items.length >= limit) break;
+    }
+    return items;
+}
+"""
 
 
 class BaseScraper(ABC):
@@ -121,48 +157,346 @@ class HTTPScraper(BaseScraper):
         Returns:
             页面 HTML 内容
         """
-        import httpx
-
-        default_headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
+        default_headers = {"User-Agent": DEFAULT_USER_AGENT}
         if headers:
             default_headers.update(headers)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(url, headers=default_headers)
-            response.raise_for_status()
-            return response.text
+        response = await get_http_client().get(url, headers=default_headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+
+async def _abort_route(route) -> None:
+    await route.abort()
+
+
+class PageMetrics:
+    """一次浏览器抓取的网络与加载统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.load_time = 0.0
+        self._pending: Set[asyncio.Task] = set()
+
+    def track(self, task: asyncio.Task) -> None:
+        """登记一个尚未完成的统计任务"""
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def drain(self) -> None:
+        """等待统计任务完成（浏览器关闭后无法再查询请求大小）"""
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=METRICS_DRAIN_TIMEOUT)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "bytes": self.bytes,
+            "load_time": round(self.load_time, 3),
+        }
 
 
 class PlaywrightScraper(BaseScraper):
     """Playwright 爬虫基类 (适用于需要渲染 JS 的爬虫)"""
 
+    # 允许加载的资源类型（子类按页面需要覆盖，如服务端渲染的页面只需要 document）
+    allowed_resource_types: FrozenSet[str] = DEFAULT_ALLOWED_RESOURCE_TYPES
+
+    # 浏览器和接口直连使用的 User-Agent（两者一致，会话 Cookie 才能复用）
+    user_agent: str = DEFAULT_USER_AGENT
+
+    # 保存该域名的会话 Cookie 供接口直连使用，None 表示不保存
+    session_domain: Optional[str] = None
+
+    def __init__(self):
+        super().__init__()
+        self.metrics = PageMetrics()
+
     def get_headless(self) -> bool:
         """获取浏览器无头模式配置"""
         return get_config("playwright_headless", True)
 
-    async def fetch(self, url: str) -> str:
+    @asynccontextmanager
+    async def browser_context(self, **options) -> AsyncIterator[Any]:
         """
-        使用 Playwright 获取页面内容
+        启动浏览器并创建上下文（按 allowed_resource_types 拦截资源，统计流量和页面加载时间）
+
+        退出时关闭浏览器，并把本次统计写入 runtime_state["scraper_metrics"]。
+        录制模式下把上下文的网络流量录制为 HAR，回放模式下由 HAR 应答请求（见 scrapers/replay.py）。
 
         Args:
-            url: 请求 URL
+            **options: browser.new_context 参数（user_agent、viewport 等）
 
-        Returns:
-            页面 HTML 内容
+        Yields:
+            BrowserContext
         """
         from playwright.async_api import async_playwright
-        from core.config import get_config
 
-        headless = get_config("playwright_headless", True)
-        timeout = get_config("playwright_timeout", 30000)
+        self.metrics = PageMetrics()
+        replay_mode = get_replay_mode()
+        har_path = browser_har_path(self.__class__.__name__)
+        if replay_mode == "record":
+            os.makedirs(os.path.dirname(har_path), exist_ok=True)
+            options.setdefault("record_har_path", har_path)
+            options.setdefault("record_har_content", "embed")
 
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=headless)
-            page = await browser.new_page()
-            await page.goto(url, timeout=timeout)
-            content = await page.content()
-            await browser.close()
+            browser = await p.chromium.launch(headless=self.get_headless(), args=BROWSER_ARGS)
+            context = None
+            try:
+                context = await browser.new_context(**options)
+                if replay_mode == "replay":
+                    # 先注册 HAR 应答，资源拦截后注册、先执行，放行的请求交给 HAR
+                    await context.route_from_har(har_path, not_found="abort")
+                if get_config("playwright_block_resources", True):
+                    await context.route("**/*", self._route_request)
+                context.on("requestfinished", self._on_request_finished)
+                yield context
+            finally:
+                await self.metrics.drain()
+                if context is not None and replay_mode == "record":
+                    # HAR 在上下文关闭时写入
+                    await context.close()
+                await browser.close()
+                self._record_metrics()
+
+    async def _route_request(self, route) -> None:
+        """请求拦截：白名单以外的资源类型直接中止"""
+        if route.request.resource_type in self.allowed_resource_types:
+            # 交给其他路由（回放模式下的 HAR 应答），没有时正常发出请求
+            await route.fallback()
+        else:
+            self.metrics.blocked += 1
+            await route.abort()
+
+    def _on_request_finished(self, request) -> None:
+        self.metrics.requests += 1
+        self.metrics.track(asyncio.create_task(self._add_request_size(request)))
+
+    async def _add_request_size(self, request) -> None:
+        try:
+            sizes = await request.sizes()
+            self.metrics.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            # 浏览器已关闭或请求已被回收
+            pass
+
+    async def goto(self, page, url: str, **kwargs):
+        """
+        打开页面并统计加载时间
 
-        return content
+        Args:
+            page: Page
+            url: 页面 URL
+            **kwargs: page.goto 参数（默认超时为 playwright_timeout）
+
+        Returns:
+            主文档响应
+        """
+        kwargs.setdefault("timeout", get_config("playwright_timeout", 30000))
+        start = time.perf_counter()
+        try:
+            return await page.goto(url, **kwargs)
+        finally:
+            self.metrics.load_time += time.perf_counter() - start
+
+    async def capture_response(
+        self,
+        page,
+        url: str,
+        match: Callable[[Any], bool],
+        parse: Callable[[Any], Awaitable[Any]],
+        timeout: Optional[float] = None,
+        grace: float = 0.0,
+        **kwargs,
+    ) -> Any:
+        """
+        打开页面并等待匹配的 API 响应
+
+        响应解析成功后立即返回，并中止页面剩余的加载；页面加载完成后最多再等待 grace 秒。
+
+        Args:
+            page: Page
+            url: 页面 URL
+            match: 响应过滤条件 response -> bool
+            parse: 异步解析函数 response -> 数据，返回空值或抛出异常时继续等待后续响应
+            timeout: 总等待时间（秒），默认 playwright_timeout
+            grace: 页面加载完成后继续等待 API 响应的时间（秒）
+            **kwargs: page.goto 参数
+
+        Returns:
+            解析结果，未捕获到时返回 None
+
+        Raises:
+            页面加载失败且未捕获到数据时抛出加载异常
+        """
+        loop = asyncio.get_running_loop()
+        captured = loop.create_future()
+
+        async def on_response(response):
+            if captured.done() or not match(response):
+                return
+            try:
+                data = await parse(response)
+            except Exception as e:
+                self.log_warning(f'API 响应解析失败: {e}')
+                return
+            if data and not captured.done():
+                captured.set_result(data)
+
+        if timeout is None:
+            timeout = get_config("playwright_timeout", 30000) / 1000
+        deadline = loop.time() + timeout
+        kwargs.setdefault("timeout", timeout * 1000)
+
+        page.on("response", on_response)
+        navigation = asyncio.ensure_future(self.goto(page, url, **kwargs))
+        try:
+            await asyncio.wait({captured, navigation}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not captured.done() and navigation.done():
+                error = navigation.exception()
+                if error is not None:
+                    raise error
+                remaining = min(grace, deadline - loop.time())
+                if remaining > 0:
+                    await asyncio.wait({captured}, timeout=remaining)
+            return captured.result() if captured.done() else None
+        finally:
+            page.remove_listener("response", on_response)
+            if not captured.done():
+                captured.cancel()
+            if navigation.done():
+                if not navigation.cancelled():
+                    navigation.exception()
+            else:
+                # 数据已到手（或已超时），中止页面剩余的请求，不再等待加载完成
+                with suppress(Exception):
+                    await page.route("**/*", _abort_route)
+                navigation.cancel()
+                with suppress(asyncio.CancelledError, Exception):
+                    await navigation
+
+    async def extract_links(
+        self,
+        page,
+        selector: str,
+        link_selector: Optional[str] = None,
+        title_selector: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Tuple[str, str]]:
+        """
+        一次 page.evaluate 提取列表中的标题和链接
+
+        Args:
+            page: Page
+            selector: 列表项选择器
+            link_selector: 列表项内的链接选择器，None 表示列表项本身是链接
+            title_selector: 链接内的标题选择器，None 表示取链接文本
+            limit: 最大条目数
+
+        Returns:
+            [(标题, href)]，跳过没有链接或标题为空的列表项；href 为页面上的原始值
+        """
+        rows = await page.evaluate(EXTRACT_LINKS_JS, [selector, link_selector, title_selector, limit])
+        return [(title, href) for title, href in rows]
+
+    async def save_session(self, context) -> None:
+        """保存浏览器会话的 Cookie，之后的接口直连请求携带"""
+        if not self.session_domain:
+            return
+        try:
+            store_session(self.get_platform_name(), await context.cookies(), self.session_domain)
+        except Exception as e:
+            self.log_warning(f'保存会话 Cookie 失败: {e}')
+
+    async def fetch_api(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Any:
+        """
+        直接请求 JSON 接口（共享连接池，携带最近一次浏览器会话的 Cookie）
+
+        Args:
+            url: 接口 URL
+            params: 查询参数
+            headers: 额外请求头
+
+        Returns:
+            解析后的 JSON
+        """
+        request_headers = {"User-Agent": self.user_agent, "Accept": "application/json, text/plain, */*"}
+        cookies = get_session_cookies(self.get_platform_name())
+        if cookies:
+            request_headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+        if headers:
+            request_headers.update(headers)
+
+        response = await get_http_client().get(url, params=params, headers=request_headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def scrape_api(
+        self,
+        url: str,
+        parse: Callable[[Any], list],
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Optional[list]:
+        """
+        接口直连快速路径：不启动浏览器，直接请求热榜 JSON 接口
+
+        Args:
+            url: 接口 URL
+            parse: 从 JSON 中提取数据列表
+            params: 查询参数
+            headers: 额外请求头
+
+        Returns:
+            数据列表；未启用、请求失败或没有数据时返回 None，由调用方回退到浏览器
+        """
+        if not get_config("scraper_api_fast_path", True):
+            return None
+
+        start = time.perf_counter()
+        try:
+            data = parse(await self.fetch_api(url, params, headers))
+            error = None if data else "无数据"
+        except Exception as e:
+            data, error = None, e
+
+        if error is None:
+            add_log('info', f'[{self.get_platform_name()}] 接口直连成功，耗时 {time.perf_counter() - start:.2f}s')
+            return data
+
+        # 会话 Cookie 可能已失效，由接下来的浏览器抓取重新获取
+        clear_session(self.get_platform_name())
+        self.log_warning(f'接口直连失败，改用浏览器: {error}')
+        return None
+
+    def _record_metrics(self) -> None:
+        """记录本次抓取的流量统计（管理员状态中展示）"""
+        metrics = self.metrics.to_dict()
+        runtime_state["scraper_metrics"] = {
+            **runtime_state.get("scraper_metrics", {}),
+            self.get_platform_name(): metrics,
+        }
+        add_log(
+            'info',
+            f'[{self.get_platform_name()}] 页面加载 {metrics["load_time"]:.2f}s，'
+            f'下载 {metrics["bytes"] / 1024:.1f}KB（{metrics["requests"]} 个请求，拦截 {metrics["blocked"]} 个）'
+        )
+
+    async def fetch(self, url: str) -> str:
+        """
+        使用 Playwright 获取页面内容
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            页面 HTML 内容
+        """
+        async with self.browser_context() as context:
+            page = await context.new_page()
+            await self.goto(page, url)
+            return await page.content()
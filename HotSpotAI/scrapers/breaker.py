@@ -0,0 +1,93 @@
+"""
+平台熔断器
+平台失效（改版、封禁、验证码）时，连续失败或连续抓取为空达到阈值后熔断，
+冷却期内直接跳过该平台，不再在每轮任务、每个分类上耗尽超时和重试。
+
+状态:
+- closed: 正常抓取，记录连续失败次数
+- open: 熔断，冷却期内跳过；每次重新熔断冷却时间翻倍（不超过上限）
+- half_open: 冷却结束，只放行一次探测抓取，成功则恢复，失败则重新熔断
+"""
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """单个平台的熔断器"""
+
+    def __init__(self, threshold: int, cooldown: float, max_cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = 0
+        # 连续熔断次数（决定冷却时间）
+        self.trips = 0
+        self.open_until = 0.0
+        self.last_error: Optional[str] = None
+        self._probing = False
+
+    def allow(self) -> bool:
+        """
+        是否允许本次抓取（冷却结束时转为半开并放行一次探测）
+
+        Returns:
+            False 表示跳过该平台
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() < self.open_until:
+                return False
+            self.state = HALF_OPEN
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        """抓取成功：恢复正常"""
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.last_error = None
+        self._probing = False
+
+    def record_failure(self, error: str) -> None:
+        """
+        抓取失败或结果为空
+
+        Args:
+            error: 失败原因
+        """
+        self.last_error = error
+        self._probing = False
+        self.failures += 1
+        if self.threshold <= 0:
+            # 未启用熔断
+            return
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.trips += 1
+            self.state = OPEN
+            self.open_until = time.monotonic() + self.current_cooldown()
+
+    def release(self) -> None:
+        """本次抓取无法判断平台是否正常（如关键词无匹配），释放探测名额"""
+        self._probing = False
+
+    def current_cooldown(self) -> float:
+        """当前熔断的冷却时间（秒）"""
+        return min(self.cooldown * 2 ** max(self.trips - 1, 0), self.max_cooldown)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "retry_in": round(max(self.open_until - time.monotonic(), 0), 1) if self.state == OPEN else 0,
+            "last_error": self.last_error,
+        }
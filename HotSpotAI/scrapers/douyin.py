@@ -1,96 +1,107 @@
 """
 抖音热榜爬虫模块
-使用 PlaywrightScraper 基类实现，支持 API 拦截
+优先直接请求热榜接口，失败时使用 PlaywrightScraper 渲染页面并拦截接口响应
 """
-import asyncio
-from playwright.async_api import async_playwright, Page
 from .base import PlaywrightScraper
 from .factory import register_scraper
 from utils import browser_retry
 
+# 热榜接口（页面脚本请求的同一接口）
+HOT_LIST_API = "https://www.douyin.com/aweme/v1/web/hot/search/list/"
+HOT_LIST_PARAMS = {
+    "device_platform": "webapp",
+    "aid": "6383",
+    "channel": "channel_pc_web",
+    "detail_list": "1",
+}
+
+
+def extract_word_list(json_body: dict) -> list:
+    """从热榜接口响应中提取热词列表"""
+    return (json_body.get('data') or {}).get('word_list') or []
+
 
 @register_scraper("douyin")
 class DouyinScraper(PlaywrightScraper):
     """抖音热榜爬虫"""
 
+    user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    session_domain = "douyin.com"
+
     def get_platform_name(self) -> str:
         return "抖音"
 
-    @browser_retry
     async def scrape(self, limit: int = 10) -> list:
         """抓取抖音热榜"""
         self.log_start(limit)
 
-        captured_data = {'list': []}
-
-        # 监听网络响应的回调
-        async def handle_response(response):
-            """处理 API 响应"""
-            if "web/hot/search/list" in response.url and response.status == 200:
-                try:
-                    json_body = await response.json()
-                    data_list = json_body.get('data', {}).get('word_list', [])
-                    if data_list:
-                        captured_data['list'] = data_list
-                        self.log_warning(f'捕获到 {len(data_list)} 条 API 数据')
-                except Exception as e:
-                    self.log_warning(f'API 响应解析失败: {e}')
-
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=self.get_headless(),
-                    args=['--disable-blink-features=AutomationControlled']
-                )
-
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-                    viewport={'width': 1920, 'height': 1080},
-                    device_scale_factor=1,
-                    extra_http_headers={"Referer": "https://www.douyin.com/"}
-                )
-
-                # 防止 webdriver 检测
-                await context.add_init_script(
-                    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-                )
-
-                page = await context.new_page()
-                page.on("response", handle_response)
-
-                target_url = "https://www.douyin.com/hot"
-                self.log_warning(f'正在加载页面: {target_url}')
-                await page.goto(target_url, timeout=30000, wait_until="domcontentloaded")
-
-                # 等待数据（最多 15 秒）
-                self.log_warning('等待 API 数据回传...')
-                for _ in range(30):
-                    if captured_data['list']:
-                        break
-                    await asyncio.sleep(0.5)
-
-                await browser.close()
-
-                # 处理结果
-                items = []
-                if captured_data['list']:
-                    for item in captured_data['list'][:limit]:
-                        word = item.get('word', '')
-                        if word:
-                            items.append(self.format_result(
-                                word,
-                                f"https://www.douyin.com/search/{word}?type=hot"
-                            ))
-                else:
-                    self.log_warning('未拦截到 API 数据')
-
-                self.log_success(len(items))
-                return items
+            data_list = await self.scrape_api(
+                HOT_LIST_API, extract_word_list, params=HOT_LIST_PARAMS,
+                headers={"Referer": "https://www.douyin.com/hot"},
+            )
+            if data_list is None:
+                data_list = await self._scrape_browser()
+
+            # 处理结果
+            items = []
+            if data_list:
+                for item in data_list[:limit]:
+                    word = item.get('word', '')
+                    if word:
+                        items.append(self.format_result(
+                            word,
+                            f"https://www.douyin.com/search/{word}?type=hot"
+                        ))
+            else:
+                self.log_warning('未拦截到 API 数据')
+
+            self.log_success(len(items))
+            return items
 
         except Exception as e:
             self.log_error(str(e))
             return []
 
+    @browser_retry
+    async def _scrape_browser(self) -> list:
+        """渲染热榜页面并拦截热榜接口响应"""
+
+        def is_hot_list(response) -> bool:
+            return "web/hot/search/list" in response.url and response.status == 200
+
+        async def parse_hot_list(response) -> list:
+            """解析热榜 API 响应"""
+            data_list = extract_word_list(await response.json())
+            if data_list:
+                self.log_warning(f'捕获到 {len(data_list)} 条 API 数据')
+            return data_list
+
+        async with self.browser_context(
+            user_agent=self.user_agent,
+            viewport={'width': 1920, 'height': 1080},
+            device_scale_factor=1,
+            extra_http_headers={"Referer": "https://www.douyin.com/"}
+        ) as context:
+            # 防止 webdriver 检测
+            await context.add_init_script(
+                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+            )
+
+            page = await context.new_page()
+
+            target_url = "https://www.douyin.com/hot"
+            self.log_warning(f'正在加载页面: {target_url}')
+            # 热榜接口由页面脚本在文档加载后发起，文档加载完成后最多再等待 15 秒
+            data_list = await self.capture_response(
+                page, target_url, is_hot_list, parse_hot_list,
+                grace=15, wait_until="domcontentloaded",
+            )
+            if data_list:
+                # 保存本次会话的 Cookie，之后的接口直连携带
+                await self.save_session(context)
+            return data_list
+
 
 # 兼容旧代码的函数式接口
 _scraper_instance = None
@@ -1,9 +1,11 @@
 """
 爬虫工厂模块
-使用工厂模式创建爬虫实例
+使用工厂模式创建爬虫实例，通过工厂抓取时按平台熔断
 """
-from typing import Dict, Type, Optional
+from typing import Awaitable, Callable, Dict, List, Type, Optional
+from core.config import add_log, get_config, runtime_state
 from .base import BaseScraper
+from .breaker import OPEN, CircuitBreaker
 
 
 class ScraperFactory:
@@ -12,6 +14,9 @@ class ScraperFactory:
     # 注册的爬虫类型
     _scrapers: Dict[str, Type[BaseScraper]] = {}
 
+    # 各平台熔断器
+    _breakers: Dict[str, CircuitBreaker] = {}
+
     @classmethod
     def register(cls, platform: str, scraper_class: Type[BaseScraper]):
         """
@@ -62,6 +67,102 @@ class ScraperFactory:
         """检查平台是否可用"""
         return platform.lower() in cls._scrapers
 
+    @classmethod
+    def get_breaker(cls, platform: str) -> CircuitBreaker:
+        """获取平台熔断器（首次使用时按配置创建）"""
+        platform = platform.lower()
+        breaker = cls._breakers.get(platform)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                threshold=get_config("scraper_breaker_threshold", 3),
+                cooldown=get_config("scraper_breaker_cooldown", 300),
+                max_cooldown=get_config("scraper_breaker_max_cooldown", 3600),
+            )
+            cls._breakers[platform] = breaker
+        return breaker
+
+    @classmethod
+    def reset_breakers(cls):
+        """重置所有熔断器"""
+        cls._breakers.clear()
+        runtime_state["scraper_breakers"] = {}
+
+    @classmethod
+    async def scrape(cls, platform: str, limit: int = 10) -> list:
+        """
+        抓取平台热榜（带熔断，结果为空视为失败）
+
+        Args:
+            platform: 平台名称
+            limit: 最大抓取数量
+
+        Returns:
+            热点话题列表，熔断中返回空列表
+        """
+        return await cls._guarded(platform, lambda scraper: scraper.scrape(limit=limit), empty_is_failure=True)
+
+    @classmethod
+    async def scrape_by_keywords(cls, platform: str, keywords: List[str], limit: int = 10) -> list:
+        """
+        按关键词抓取平台话题（带熔断，关键词无匹配不计为失败）
+
+        Args:
+            platform: 平台名称
+            keywords: 关键词列表
+            limit: 最大抓取数量
+
+        Returns:
+            热点话题列表，熔断中返回空列表
+        """
+        return await cls._guarded(
+            platform,
+            lambda scraper: scraper.scrape_by_keywords(keywords, limit=limit),
+            empty_is_failure=False,
+        )
+
+    @classmethod
+    async def _guarded(
+        cls,
+        platform: str,
+        call: Callable[[BaseScraper], Awaitable[list]],
+        empty_is_failure: bool,
+    ) -> list:
+        scraper = cls.create(platform)
+        if scraper is None:
+            raise ValueError(f"未知平台: {platform}")
+
+        breaker = cls.get_breaker(platform)
+        if not breaker.allow():
+            add_log('info', f'[{platform}] 熔断中，跳过（{breaker.to_dict()["retry_in"]:.0f}s 后探测）')
+            return []
+
+        previous_state = breaker.state
+        try:
+            items = await call(scraper)
+        except Exception as e:
+            breaker.record_failure(str(e))
+            raise
+        else:
+            if items:
+                breaker.record_success()
+                if previous_state != breaker.state:
+                    add_log('success', f'[{platform}] 探测成功，恢复抓取')
+            elif empty_is_failure:
+                breaker.record_failure("抓取结果为空")
+            else:
+                breaker.release()
+            return items
+        finally:
+            if breaker.state == OPEN and previous_state != OPEN:
+                add_log(
+                    'warning',
+                    f'[{platform}] 连续 {breaker.failures} 次失败（{breaker.last_error}），'
+                    f'熔断 {breaker.current_cooldown():.0f}s'
+                )
+            runtime_state["scraper_breakers"] = {
+                name: b.to_dict() for name, b in cls._breakers.items()
+            }
+
 
 # 装饰器方式注册爬虫
 def register_scraper(platform: str):
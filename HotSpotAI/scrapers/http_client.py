@@ -0,0 +1,134 @@
+"""
+爬虫共享 HTTP 客户端和浏览器会话缓存
+
+所有 HTTP 抓取共用一个连接池（复用 TCP/TLS 连接），不再每次请求新建客户端。
+浏览器抓取成功后保存站点 Cookie，之后直接请求 JSON 接口时携带，过期后重新由浏览器获取。
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from core.config import get_config
+from core.job_metrics import count_span, in_job_span
+from . import replay
+
+# 连接池上限
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# 平台 -> (会话过期时间, [(name, value, Cookie 过期时间)])
+_sessions: Dict[str, Tuple[float, List[Tuple[str, str, float]]]] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    获取共享 HTTP 客户端（懒加载，绑定到当前事件循环）
+
+    Returns:
+        httpx.AsyncClient
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        # 连接池绑定创建它的事件循环，事件循环变化（如测试、脚本多次 asyncio.run）时重建
+        limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        )
+        _client = httpx.AsyncClient(
+            timeout=get_config("request_timeout", 30),
+            follow_redirects=True,
+            limits=limits,
+            # 录制/回放模式下替换为对应的 transport（见 scrapers/replay.py）
+            transport=replay.make_transport(limits),
+            event_hooks={"response": [_count_response_bytes]},
+        )
+        _client_loop = loop
+    return _client
+
+
+async def _count_response_bytes(response: httpx.Response) -> None:
+    """任务步骤内的请求上报下载字节数（见 core/job_metrics.py）"""
+    if in_job_span():
+        # 响应钩子在读取响应体之前调用，先读取才能得到字节数（爬虫请求都不是流式的）
+        await response.aread()
+        # 优先取压缩后的实际传输量；回放等内存响应没有传输过程，按响应体长度计
+        count_span(bytes=response.num_bytes_downloaded or len(response.content))
+
+
+async def close_http_client():
+    """关闭共享 HTTP 客户端（录制模式下同时保存录制的响应）"""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+    replay.save_recordings()
+
+
+def store_session(platform: str, cookies: List[Dict], domain: str) -> int:
+    """
+    保存浏览器会话的 Cookie
+
+    Args:
+        platform: 平台名称
+        cookies: BrowserContext.cookies() 返回的 Cookie 列表
+        domain: 只保存该域名（及子域名）的 Cookie
+
+    Returns:
+        保存的 Cookie 数量
+    """
+    now = time.time()
+    kept = [
+        (c["name"], c["value"], c.get("expires", -1))
+        for c in cookies
+        if c.get("domain", "").lstrip(".").endswith(domain)
+        and not (0 < c.get("expires", -1) <= now)
+    ]
+    if kept:
+        _sessions[platform] = (now + get_config("scraper_session_ttl", 1800), kept)
+    return len(kept)
+
+
+def get_session_cookies(platform: str) -> Optional[Dict[str, str]]:
+    """
+    获取平台未过期的会话 Cookie
+
+    Args:
+        platform: 平台名称
+
+    Returns:
+        {name: value}，没有可用会话时返回 None
+    """
+    entry = _sessions.get(platform)
+    if entry is None:
+        return None
+    now = time.time()
+    expires_at, cookies = entry
+    if expires_at <= now:
+        del _sessions[platform]
+        return None
+
+    return {
+        name: value
+        for name, value, cookie_expires in cookies
+        if not 0 < cookie_expires <= now
+    }
+
+
+def clear_session(platform: Optional[str] = None) -> None:
+    """
+    丢弃会话 Cookie（接口请求失败时 Cookie 可能已失效）
+
+    Args:
+        platform: 平台名称，None 表示全部
+    """
+    if platform is None:
+        _sessions.clear()
+    else:
+        _sessions.pop(platform, None)
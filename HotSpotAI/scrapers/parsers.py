@@ -0,0 +1,103 @@
+"""
+热搜页面解析函数
+纯函数（只依赖 BeautifulSoup），由爬虫通过 core.executors.run_cpu 在进程池中调用，
+解析大页面时不阻塞事件循环。返回值为 (标题, 链接) 列表，保持可 pickle。
+"""
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup
+
+
+def parse_weibo_hot(html: str, limit: int) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    解析微博热搜页面
+
+    Args:
+        html: 页面 HTML
+        limit: 最大条目数
+
+    Returns:
+        (原始条目数, [(标题, 链接)])
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = soup.select('td.td-02 a')
+
+    items = []
+    for tr in rows:
+        if len(items) >= limit:
+            break
+
+        title = tr.get_text().strip()
+        href = tr.get('href', '')
+
+        # 过滤置顶广告和无效链接
+        if "javascript" in href or not href.startswith("/"):
+            continue
+
+        items.append((title, f"https://s.weibo.com{href}"))
+
+    return len(rows), items
+
+
+def parse_baidu_hot(html: str, limit: int) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    解析百度热搜页面
+
+    Args:
+        html: 页面 HTML
+        limit: 最大条目数
+
+    Returns:
+        (原始条目数, [(标题, 链接)])
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = soup.select('.c-single-text-ellipsis')
+
+    items = []
+    seen = set()
+    for t in rows:
+        if len(items) >= limit:
+            break
+
+        title = t.get_text().strip()
+        # 简单去重
+        if not title or title in seen:
+            continue
+        seen.add(title)
+
+        items.append((title, f"https://www.baidu.com/s?wd={title}"))
+
+    return len(rows), items
+
+
+def parse_tophub_table(html: str, limit: int) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    解析今日热榜节点页面的榜单表格
+
+    Args:
+        html: 页面 HTML
+        limit: 最大条目数
+
+    Returns:
+        (原始条目数, [(标题, 链接)])
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = soup.select('table.table tbody tr')
+
+    items = []
+    for row in rows:
+        if len(items) >= limit:
+            break
+
+        link = row.select_one('td.al a')
+        if link is None:
+            continue
+
+        title = link.get_text().strip()
+        href = link.get('href', '')
+        if not title:
+            continue
+
+        items.append((title, href if href.startswith('http') else f"https://tophub.today{href}"))
+
+    return len(rows), items
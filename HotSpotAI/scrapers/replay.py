@@ -0,0 +1,387 @@
+"""
+爬虫流量录制与回放
+把真实站点的响应保存为 HAR 格式的本地文件，之后不访问网络即可重放抓取过程，
+用于基准测试（benchmarks/bench_scrapers.py）和离线回归测试。
+
+模式由 SCRAPER_REPLAY_MODE 控制（基准测试中由 configure_replay 覆盖）:
+- off: 正常抓取
+- record: 请求照常发出，HTTP 响应写入 {目录}/http.har（关闭共享 HTTP 客户端时保存）；
+  浏览器上下文使用 Playwright 的 record_har_path 录制到 {目录}/browser/{爬虫类名}.har
+- replay: HTTP 请求由录制的响应应答，未录制的请求抛出 ReplayMissError（不访问网络）；
+  浏览器上下文通过 route_from_har 应答，未录制的请求被中止。
+  设置替身服务器地址后，HTTP 请求改写到本地替身服务器（fixture_app），计入真实的连接和协议开销
+"""
+import asyncio
+import base64
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from core.config import get_config
+
+REPLAY_MODES = ("off", "record", "replay")
+
+HTTP_HAR_FILE = "http.har"
+BROWSER_HAR_DIR = "browser"
+
+# 录制时不保存的请求头（会话凭据）
+SKIPPED_REQUEST_HEADERS = frozenset({"cookie", "authorization"})
+
+# 响应体按解码后的内容保存，编码和长度相关的响应头不再适用
+SKIPPED_RESPONSE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+# 覆盖配置的模式、目录和替身服务器地址（None 表示读取配置）
+_mode: Optional[str] = None
+_directory: Optional[str] = None
+_server: Optional[str] = None
+_http_store: Optional["FixtureStore"] = None
+
+
+class ReplayMissError(httpx.TransportError):
+    """回放模式下请求没有录制的响应（不可重试）"""
+
+
+def request_key(method: str, url: str) -> str:
+    """
+    请求的匹配键（查询参数排序，忽略片段）
+
+    Args:
+        method: 请求方法
+        url: 完整 URL
+
+    Returns:
+        "GET https://host/path?a=1&b=2"
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path or '/', query, ''))}"
+
+
+class FixtureStore:
+    """HAR 格式的录制文件（同一请求录制多次时按顺序轮流应答）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: List[Dict[str, Any]] = []
+        self.dirty = False
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "FixtureStore":
+        """读取录制文件，文件不存在时返回空的录制"""
+        store = cls(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for entry in json.load(f)["log"]["entries"]:
+                    store._append(entry)
+        return store
+
+    def save(self) -> None:
+        """写入录制文件（先写临时文件再替换，中途失败不会损坏已有录制）"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        har = {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "HotSpotAI", "version": "1.0"},
+                "entries": self.entries,
+            }
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(har, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        key = request_key(entry["request"]["method"], entry["request"]["url"])
+        self._index.setdefault(key, []).append(entry)
+
+    def add(self, request: httpx.Request, response: httpx.Response, elapsed: float) -> Dict[str, Any]:
+        """
+        记录一次请求和已读取的响应
+
+        Args:
+            request: 请求
+            response: 已读取响应体的响应
+            elapsed: 请求耗时（秒）
+
+        Returns:
+            HAR entry
+        """
+        body = response.content
+        content: Dict[str, Any] = {
+            "size": len(body),
+            "mimeType": response.headers.get("content-type", ""),
+        }
+        try:
+            content["text"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            content["text"] = base64.b64encode(body).decode("ascii")
+            content["encoding"] = "base64"
+
+        entry = {
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": round(elapsed * 1000, 1),
+            "request": {
+                "method": request.method,
+                "url": str(request.url),
+                "httpVersion": "HTTP/1.1",
+                "headers": [
+                    {"name": name, "value": value}
+                    for name, value in request.headers.items()
+                    if name.lower() not in SKIPPED_REQUEST_HEADERS
+                ],
+            },
+            "response": {
+                "status": response.status_code,
+                "statusText": response.reason_phrase,
+                "httpVersion": response.http_version,
+                "headers": [
+                    {"name": name, "value": value}
+                    for name, value in response.headers.items()
+                    if name.lower() not in SKIPPED_RESPONSE_HEADERS
+                ],
+                "content": content,
+            },
+        }
+        self._append(entry)
+        self.dirty = True
+        return entry
+
+    def lookup(self, method: str, url: str) -> Optional[Dict[str, Any]]:
+        """
+        查找录制的响应
+
+        Args:
+            method: 请求方法
+            url: 完整 URL
+
+        Returns:
+            HAR entry，没有录制时返回 None
+        """
+        key = request_key(method, url)
+        candidates = self._index.get(key)
+        if not candidates:
+            return None
+        cursor = self._cursor.get(key, 0)
+        self._cursor[key] = cursor + 1
+        return candidates[cursor % len(candidates)]
+
+
+def entry_body(entry: Dict[str, Any]) -> bytes:
+    """HAR entry 的响应体"""
+    content = entry["response"]["content"]
+    text = content.get("text", "")
+    if content.get("encoding") == "base64":
+        return base64.b64decode(text)
+    return text.encode("utf-8")
+
+
+def entry_headers(entry: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """HAR entry 的响应头"""
+    return [(header["name"], header["value"]) for header in entry["response"]["headers"]]
+
+
+def entry_response(entry: Dict[str, Any], request: httpx.Request) -> httpx.Response:
+    """由 HAR entry 构造 httpx 响应"""
+    return httpx.Response(
+        entry["response"]["status"],
+        headers=entry_headers(entry),
+        content=entry_body(entry),
+        request=request,
+    )
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """转发请求并录制响应"""
+
+    def __init__(self, store: FixtureStore, transport: httpx.AsyncBaseTransport):
+        self.store = store
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        try:
+            # 读取解码后的响应体（transport 返回的响应由客户端解码，这里需要手动读取）
+            raw = httpx.Response(response.status_code, headers=response.headers, stream=response.stream, request=request)
+            await raw.aread()
+        finally:
+            await response.aclose()
+        entry = self.store.add(request, raw, time.perf_counter() - start)
+        return entry_response(entry, request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """由录制的响应应答请求，不访问网络"""
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0):
+        self.store = store
+        self.latency = latency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.store.lookup(request.method, str(request.url))
+        if entry is None:
+            raise ReplayMissError(f"没有录制的响应: {request.method} {request.url}", request=request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return entry_response(entry, request)
+
+
+class StandInTransport(httpx.AsyncBaseTransport):
+    """把请求改写到本地替身服务器：https://host/path?q -> {server}/https/host/path?q"""
+
+    def __init__(self, server: str, transport: httpx.AsyncBaseTransport):
+        self.server = httpx.URL(server)
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = request.url
+        path = f"/{url.scheme}/{url.netloc.decode('ascii')}{url.raw_path.decode('ascii')}"
+        headers = request.headers.copy()
+        headers["Host"] = self.server.netloc.decode("ascii")
+        forwarded = httpx.Request(
+            request.method,
+            self.server.copy_with(raw_path=path.encode("ascii")),
+            headers=headers,
+            stream=request.stream,
+            extensions=request.extensions,
+        )
+        response = await self.transport.handle_async_request(forwarded)
+        response.request = request
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def fixture_app(store: FixtureStore):
+    """
+    本地替身服务器（ASGI 应用，由 uvicorn 运行），按 StandInTransport 改写后的路径应答录制的响应
+
+    Args:
+        store: 录制文件
+
+    Returns:
+        ASGI 应用
+    """
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        scheme, _, rest = scope["raw_path"].decode("ascii").lstrip("/").partition("/")
+        host, _, path = rest.partition("/")
+        query = scope["query_string"].decode("ascii")
+        url = f"{scheme}://{host}/{path}" + (f"?{query}" if query else "")
+
+        entry = store.lookup(scope["method"], url)
+        if entry is None:
+            status, headers, body = 404, [], f"no recording: {url}".encode()
+        else:
+            status, headers, body = entry["response"]["status"], entry_headers(entry), entry_body(entry)
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+            + [(b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+# ==================== 模式和录制目录 ====================
+
+def configure_replay(mode: Optional[str] = None, directory: Optional[str] = None, server: Optional[str] = None) -> None:
+    """
+    覆盖录制/回放配置（基准测试使用；参数为 None 时恢复读取配置）
+
+    只影响之后创建的共享 HTTP 客户端，已创建的客户端需先 close_http_client。
+
+    Args:
+        mode: off / record / replay
+        directory: 录制目录
+        server: 回放时使用的替身服务器地址（如 http://127.0.0.1:8765）
+    """
+    global _mode, _directory, _server, _http_store
+    if mode is not None and mode not in REPLAY_MODES:
+        raise ValueError(f"未知的回放模式: {mode}")
+    _mode, _directory, _server = mode, directory, server
+    _http_store = None
+
+
+def get_replay_mode() -> str:
+    """当前的录制/回放模式"""
+    return _mode or get_config("scraper_replay_mode", "off")
+
+
+def get_replay_dir() -> str:
+    """录制文件目录"""
+    return _directory or get_config("scraper_replay_dir", "./fixtures/scrapers")
+
+
+def get_http_store() -> FixtureStore:
+    """HTTP 录制文件（懒加载）"""
+    global _http_store
+    if _http_store is None:
+        _http_store = FixtureStore.load(os.path.join(get_replay_dir(), HTTP_HAR_FILE))
+    return _http_store
+
+
+def browser_har_path(name: str) -> str:
+    """
+    浏览器录制文件路径
+
+    Args:
+        name: 爬虫类名
+
+    Returns:
+        {录制目录}/browser/{name}.har
+    """
+    return os.path.join(get_replay_dir(), BROWSER_HAR_DIR, f"{quote(name, safe='')}.har")
+
+
+def make_transport(limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    按当前模式创建共享 HTTP 客户端的 transport
+
+    Args:
+        limits: 连接池上限
+
+    Returns:
+        录制或回放 transport；正常模式返回 None（使用 httpx 默认 transport）
+    """
+    mode = get_replay_mode()
+    if mode == "record":
+        return RecordingTransport(get_http_store(), httpx.AsyncHTTPTransport(limits=limits))
+    if mode == "replay":
+        if _server:
+            return StandInTransport(_server, httpx.AsyncHTTPTransport(limits=limits))
+        return ReplayTransport(get_http_store())
+    return None
+
+
+def save_recordings() -> int:
+    """
+    保存 HTTP 录制（没有新录制时不写文件）
+
+    Returns:
+        录制文件中的请求数
+    """
+    if _http_store is None or not _http_store.dirty:
+        return 0
+    _http_store.save()
+    return len(_http_store)
@@ -0,0 +1,183 @@
+"""
+今日热榜 (tophub.today) 聚合数据源
+知乎、小红书原站反爬严格，从今日热榜的对应节点抓取。
+
+一次抓取取回所有节点：节点页面为服务端渲染，优先直接请求 HTML 并在进程池中解析；
+请求失败的节点在同一个浏览器上下文中并行打开页面，每个表格用一次 page.evaluate 提取。
+取到榜单的平台缓存 TOPHUB_CACHE_TTL 秒，同一轮任务中的各平台（及按关键词筛选的多次调用）共用一次抓取。
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.config import get_config
+from core.executors import run_cpu
+from .base import PlaywrightScraper
+from .http_client import get_http_client
+from .parsers import parse_tophub_table
+from utils import browser_retry, http_retry
+
+TOPHUB_BASE_URL = "https://tophub.today"
+
+# 平台 -> 今日热榜节点 ID
+TOPHUB_NODES = {
+    "zhihu": "mproPpoq6O",
+    "xiaohongshu": "rYqoXQ8vOa",
+}
+
+# 抓取结果缓存时间（秒）
+TOPHUB_CACHE_TTL = 120
+
+# 每个节点保留的最大条目数（节点页面通常为 50 条）
+TOPHUB_MAX_ITEMS = 50
+
+# 浏览器渲染时等待表格出现的时间（毫秒）
+TABLE_TIMEOUT = 8000
+
+# (过期时间, 平台 -> [(标题, 链接)])
+_cache: Optional[Tuple[float, Dict[str, List[Tuple[str, str]]]]] = None
+_inflight: Optional[asyncio.Task] = None
+
+
+def node_url(node_id: str) -> str:
+    return f"{TOPHUB_BASE_URL}/n/{node_id}"
+
+
+def full_link(href: str) -> str:
+    return href if href.startswith('http') else f"{TOPHUB_BASE_URL}{href}"
+
+
+class TophubSource(PlaywrightScraper):
+    """今日热榜节点抓取（不注册为平台，由知乎、小红书爬虫调用）"""
+
+    # 节点页面为服务端渲染，只需要页面文档
+    allowed_resource_types = frozenset({"document"})
+
+    def get_platform_name(self) -> str:
+        return "今日热榜"
+
+    async def scrape(self, limit: int = 10) -> list:
+        """抓取所有节点（来源为各节点对应的平台键）"""
+        nodes = await self.fetch_nodes(TOPHUB_NODES, limit)
+        return [
+            {"title": title, "link": link, "source": platform}
+            for platform, rows in nodes.items()
+            for title, link in rows
+        ]
+
+    async def fetch_nodes(self, nodes: Dict[str, str], limit: int = TOPHUB_MAX_ITEMS) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        抓取多个节点的榜单
+
+        Args:
+            nodes: 平台 -> 节点 ID
+            limit: 每个节点的最大条目数
+
+        Returns:
+            平台 -> [(标题, 链接)]，抓取失败的节点为空列表
+        """
+        results: Dict[str, List[Tuple[str, str]]] = {platform: [] for platform in nodes}
+
+        if get_config("scraper_api_fast_path", True):
+            fetched = await asyncio.gather(*(self._fetch_node(node_id, limit) for node_id in nodes.values()))
+            results.update(zip(nodes, fetched))
+
+        missing = {platform: nodes[platform] for platform, rows in results.items() if not rows}
+        if missing:
+            self.log_warning(f'浏览器渲染节点: {", ".join(missing.values())}')
+            try:
+                async with self.browser_context(
+                    user_agent=self.user_agent,
+                    viewport={'width': 1920, 'height': 1080}
+                ) as context:
+                    rendered = await asyncio.gather(
+                        *(self._render_node(context, node_id, limit) for node_id in missing.values()),
+                        return_exceptions=True,
+                    )
+            except Exception as e:
+                # 浏览器未安装、仍在后台安装或启动失败时保留直接请求取回的节点
+                self.log_warning(f'浏览器渲染不可用: {e}')
+                return results
+
+            for (platform, node_id), rows in zip(missing.items(), rendered):
+                if isinstance(rows, Exception):
+                    self.log_warning(f'节点 {node_id} 渲染失败: {rows}')
+                else:
+                    results[platform] = rows
+
+        return results
+
+    @http_retry
+    async def _request_node(self, node_id: str) -> str:
+        """请求节点页面（网络错误、限流和 5xx 时重试，比启动浏览器代价小）"""
+        response = await get_http_client().get(
+            node_url(node_id),
+            headers={"User-Agent": self.user_agent, "Referer": f"{TOPHUB_BASE_URL}/"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.text
+
+    async def _fetch_node(self, node_id: str, limit: int) -> List[Tuple[str, str]]:
+        """直接请求节点页面并在进程池中解析，失败返回空列表"""
+        try:
+            html = await self._request_node(node_id)
+            row_count, rows = await run_cpu(parse_tophub_table, html, limit)
+            if not rows:
+                self.log_warning(f'节点 {node_id} 未解析到榜单（{row_count} 行）')
+            return rows
+        except Exception as e:
+            self.log_warning(f'节点 {node_id} 直接请求失败: {e}')
+            return []
+
+    @browser_retry
+    async def _render_node(self, context, node_id: str, limit: int) -> List[Tuple[str, str]]:
+        """在浏览器中打开节点页面，一次 evaluate 提取整张表格"""
+        page = await context.new_page()
+        try:
+            await self.goto(page, node_url(node_id), wait_until="domcontentloaded")
+            await page.wait_for_selector('table.table', timeout=TABLE_TIMEOUT)
+            rows = await self.extract_links(page, 'table.table tbody tr', 'td.al a', limit=limit)
+            return [(title, full_link(href)) for title, href in rows]
+        finally:
+            await page.close()
+
+
+async def _fetch_all() -> Dict[str, List[Tuple[str, str]]]:
+    global _cache
+    nodes = await TophubSource().fetch_nodes(TOPHUB_NODES)
+    # 只缓存取到榜单的平台，抓取失败的平台下次调用时重新抓取
+    fetched = {platform: rows for platform, rows in nodes.items() if rows}
+    if fetched:
+        _cache = (time.monotonic() + TOPHUB_CACHE_TTL, fetched)
+    return nodes
+
+
+async def get_tophub_items(platform: str, limit: int) -> List[Tuple[str, str]]:
+    """
+    获取平台在今日热榜节点上的榜单
+
+    缓存有效期内直接返回（缓存中没有该平台时重新抓取）；并发调用共用同一次抓取。
+
+    Args:
+        platform: 平台键（TOPHUB_NODES 中的键）
+        limit: 最大条目数
+
+    Returns:
+        [(标题, 链接)]
+    """
+    global _inflight
+    if _cache is not None and _cache[0] > time.monotonic() and platform in _cache[1]:
+        return _cache[1][platform][:limit]
+
+    if _inflight is None or _inflight.done():
+        _inflight = asyncio.ensure_future(_fetch_all())
+    nodes = await asyncio.shield(_inflight)
+    return nodes.get(platform, [])[:limit]
+
+
+def clear_tophub_cache() -> None:
+    """丢弃缓存的抓取结果"""
+    global _cache, _inflight
+    _cache = None
+    _inflight = None
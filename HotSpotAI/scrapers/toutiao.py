@@ -1,115 +1,127 @@
 """
 今日头条热榜爬虫模块
-支持 API 拦截 (优先) + DOM 抓取 (兜底)
+支持接口直连 (优先) + API 拦截 + DOM 抓取 (兜底)
 """
-import asyncio
-from playwright.async_api import async_playwright
 from .base import PlaywrightScraper
 from .factory import register_scraper
 from utils import browser_retry
 
+# 热榜接口（页面脚本请求的同一接口）
+HOT_BOARD_API = "https://www.toutiao.com/hot-event/hot-board/"
+HOT_BOARD_PARAMS = {"origin": "toutiao_pc"}
+
+
+def extract_hot_board(json_body: dict) -> list:
+    """从热榜接口响应中提取热榜列表（兼容 data 为列表或嵌套字典）"""
+    data = json_body.get('data', [])
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get('data') or []
+    return []
+
 
 @register_scraper("toutiao")
 class ToutiaoScraper(PlaywrightScraper):
     """今日头条热榜爬虫"""
 
+    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    session_domain = "toutiao.com"
+
     def get_platform_name(self) -> str:
         return "今日头条"
 
-    @browser_retry
     async def scrape(self, limit: int = 10) -> list:
         """抓取今日头条热榜"""
         self.log_start(limit)
 
-        captured_data = {'list': []}
-
-        # API 拦截回调
-        async def handle_response(response):
-            if "hot-event/hot-board" in response.url and response.status == 200:
-                try:
-                    json_body = await response.json()
-                    data = json_body.get('data', [])
-                    if isinstance(data, list):
-                        captured_data['list'].extend(data)
-                        self.log_warning(f'拦截 API 数据: {len(data)} 条')
-                    elif isinstance(data, dict):
-                        raw_list = data.get('data', [])
-                        if raw_list:
-                            captured_data['list'].extend(raw_list)
-                            self.log_warning(f'拦截 API 数据 (嵌套): {len(raw_list)} 条')
-                except Exception:
-                    pass
-
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=self.get_headless(),
-                    args=['--disable-blink-features=AutomationControlled']
-                )
-
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                    viewport={'width': 1920, 'height': 1080}
-                )
-
-                page = await context.new_page()
-                page.on("response", handle_response)
-
-                target_url = "https://www.toutiao.com/"
-                self.log_warning(f'正在加载页面: {target_url}')
-
-                await page.goto(target_url, timeout=30000, wait_until="networkidle")
-
-                # 等待 API 响应
-                for _ in range(10):
-                    if captured_data['list']:
-                        break
-                    await asyncio.sleep(0.5)
-
-                # 处理数据
-                items = []
-                if captured_data['list']:
-                    seen = set()
-                    for item in captured_data['list']:
-                        if len(items) >= limit:
-                            break
-
-                        title = item.get('Title', '')
-                        url = item.get('Url', '')
-
-                        if title and title not in seen:
-                            full_url = url if url.startswith('http') else f"https://www.toutiao.com{url}"
-                            items.append(self.format_result(title, full_url))
-                            seen.add(title)
-                else:
-                    # DOM 兜底
-                    self.log_warning('未拦截到 API，尝试解析 DOM...')
-                    elements = await page.locator('div[class*="hot-board"] a').all()
-
-                    if not elements:
-                        elements = await page.locator('a[href*="toutiao.com/trending"]').all()
-
-                    self.log_warning(f'DOM 找到元素: {len(elements)} 个')
-
-                    for el in elements[:limit * 2]:
-                        if len(items) >= limit:
-                            break
-
-                        text = await el.text_content()
-                        href = await el.get_attribute('href')
-
-                        if text and len(text.strip()) > 4:
-                            full_link = href if href.startswith('http') else f"https://www.toutiao.com{href}"
-                            items.append(self.format_result(text.strip(), full_link))
-
-                await browser.close()
-                self.log_success(len(items))
-                return items
+            data_list = await self.scrape_api(
+                HOT_BOARD_API, extract_hot_board, params=HOT_BOARD_PARAMS,
+                headers={"Referer": "https://www.toutiao.com/"},
+            )
+            if data_list is not None:
+                items = self._format_hot_board(data_list, limit)
+            else:
+                items = await self._scrape_browser(limit)
+
+            self.log_success(len(items))
+            return items
 
         except Exception as e:
             self.log_error(str(e))
             return []
 
+    def _format_hot_board(self, data_list: list, limit: int) -> list:
+        """格式化热榜接口数据（按标题去重）"""
+        items = []
+        seen = set()
+        for item in data_list:
+            if len(items) >= limit:
+                break
+
+            title = item.get('Title', '')
+            url = item.get('Url', '')
+
+            if title and title not in seen:
+                full_url = url if url.startswith('http') else f"https://www.toutiao.com{url}"
+                items.append(self.format_result(title, full_url))
+                seen.add(title)
+        return items
+
+    @browser_retry
+    async def _scrape_browser(self, limit: int) -> list:
+        """渲染首页并拦截热榜接口响应，未拦截到时解析 DOM"""
+
+        def is_hot_board(response) -> bool:
+            return "hot-event/hot-board" in response.url and response.status == 200
+
+        async def parse_hot_board(response) -> list:
+            """解析热榜 API 响应"""
+            data_list = extract_hot_board(await response.json())
+            if data_list:
+                self.log_warning(f'拦截 API 数据: {len(data_list)} 条')
+            return data_list
+
+        async with self.browser_context(
+            user_agent=self.user_agent,
+            viewport={'width': 1920, 'height': 1080}
+        ) as context:
+            page = await context.new_page()
+
+            target_url = "https://www.toutiao.com/"
+            self.log_warning(f'正在加载页面: {target_url}')
+
+            # 捕获到热榜接口后立即返回；网络空闲仍未出现说明页面不再请求该接口，直接走 DOM 兜底
+            data_list = await self.capture_response(
+                page, target_url, is_hot_board, parse_hot_board, wait_until="networkidle",
+            )
+
+            if data_list:
+                # 保存本次会话的 Cookie，之后的接口直连携带
+                await self.save_session(context)
+                return self._format_hot_board(data_list, limit)
+
+            # DOM 兜底
+            items = []
+            self.log_warning('未拦截到 API，尝试解析 DOM...')
+            links = await self.extract_links(page, 'div[class*="hot-board"] a', limit=limit * 2)
+
+            if not links:
+                links = await self.extract_links(page, 'a[href*="toutiao.com/trending"]', limit=limit * 2)
+
+            self.log_warning(f'DOM 找到元素: {len(links)} 个')
+
+            for text, href in links:
+                if len(items) >= limit:
+                    break
+
+                if len(text) > 4:
+                    full_link = href if href.startswith('http') else f"https://www.toutiao.com{href}"
+                    items.append(self.format_result(text, full_link))
+
+            return items
+
 
 # 兼容旧代码的函数式接口
 _scraper_instance = None
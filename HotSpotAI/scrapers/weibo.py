@@ -1,9 +1,10 @@
 """
 微博热搜爬虫模块
 """
-from bs4 import BeautifulSoup
+from core.executors import run_cpu
 from .base import HTTPScraper
 from .factory import register_scraper
+from .parsers import parse_weibo_hot
 from utils import http_retry
 from typing import List
 
@@ -39,25 +40,12 @@ class WeiboScraper(HTTPScraper):
 
         try:
             html = await self.fetch_page()
-            soup = BeautifulSoup(html, 'html.parser')
-            rows = soup.select('td.td-02 a')
+            # 页面解析在进程池中执行，不阻塞事件循环
+            row_count, parsed = await run_cpu(parse_weibo_hot, html, limit)
 
-            self.log_warning(f"原始条目数量: {len(rows)}")
+            self.log_warning(f"原始条目数量: {row_count}")
 
-            items = []
-            for tr in rows:
-                if len(items) >= limit:
-                    break
-
-                title = tr.get_text().strip()
-                href = tr.get('href', '')
-
-                # 过滤置顶广告和无效链接
-                if "javascript" in href or not href.startswith("/"):
-                    continue
-
-                link = f"https://s.weibo.com{href}"
-                items.append(self.format_result(title, link))
+            items = [self.format_result(title, link) for title, link in parsed]
 
             self.log_success(len(items))
             return items
@@ -2,19 +2,18 @@
 小红书热点爬虫模块
 使用聚合平台 (今日热榜) 抓取
 """
-from .base import PlaywrightScraper
+from .base import BaseScraper
 from .factory import register_scraper
-from utils import browser_retry
+from .tophub import get_tophub_items
 
 
 @register_scraper("xiaohongshu")
-class XiaohongshuScraper(PlaywrightScraper):
+class XiaohongshuScraper(BaseScraper):
     """小红书热点爬虫"""
 
     def get_platform_name(self) -> str:
         return "小红书"
 
-    @browser_retry
     async def scrape(self, limit: int = 10) -> list:
         """
         抓取小红书热点
@@ -22,60 +21,14 @@ class XiaohongshuScraper(PlaywrightScraper):
         """
         self.log_start(limit)
 
-        # 今日热榜上的小红书节点
-        target_url = "https://tophub.today/n/rYqoXQ8vOa"
-
         try:
-            from playwright.async_api import async_playwright
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=self.get_headless(),
-                    args=['--disable-blink-features=AutomationControlled']
-                )
-
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                )
-
-                page = await context.new_page()
-                self.log_warning(f'正在连接聚合平台: {target_url}')
-
-                await page.goto(target_url, timeout=30000, wait_until="domcontentloaded")
-
-                # 等待表格加载
-                try:
-                    await page.wait_for_selector('table.table', timeout=8000)
-                except:
-                    self.log_warning('聚合平台表格加载超时')
-                    await browser.close()
-                    return []
-
-                # 解析表格数据
-                rows = await page.locator('table.table tbody tr').all()
-                self.log_warning(f'获取到表格行数: {len(rows)}')
-
-                items = []
-                for row in rows:
-                    if len(items) >= limit:
-                        break
-
-                    link_el = row.locator('td.al a')
-                    if await link_el.count() > 0:
-                        title = await link_el.text_content()
-                        href = await link_el.get_attribute('href')
-
-                        if title:
-                            clean_title = title.strip()
-                            if not clean_title:
-                                continue
-
-                            full_link = href if href.startswith('http') else f"https://tophub.today{href}"
-                            items.append(self.format_result(clean_title, full_link))
+            rows = await get_tophub_items("xiaohongshu", limit)
+            if not rows:
+                self.log_warning('聚合平台未获取到数据')
 
-                await browser.close()
-                self.log_success(len(items))
-                return items
+            items = [self.format_result(title, link) for title, link in rows]
+            self.log_success(len(items))
+            return items
 
         except Exception as e:
             self.log_error(str(e))
@@ -3,9 +3,9 @@
 使用聚合平台 (今日热榜) 抓取，知乎日报作为兜底方案
 """
 from typing import List
-from playwright.async_api import async_playwright
 from .base import PlaywrightScraper
 from .factory import register_scraper
+from .tophub import get_tophub_items
 from utils import browser_retry
 from core.config import add_log
 
@@ -14,10 +14,12 @@ from core.config import add_log
 class ZhihuScraper(PlaywrightScraper):
     """知乎热榜爬虫"""
 
+    # 知乎日报为服务端渲染，只需要页面文档
+    allowed_resource_types = frozenset({"document"})
+
     def get_platform_name(self) -> str:
         return "知乎"
 
-    @browser_retry
     async def scrape(self, limit: int = 10) -> list:
         """
         抓取知乎热榜
@@ -26,83 +28,39 @@ class ZhihuScraper(PlaywrightScraper):
         self.log_start(limit)
 
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=self.get_headless(),
-                    args=['--disable-blink-features=AutomationControlled']
-                )
-
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                    viewport={'width': 1920, 'height': 1080}
-                )
-
-                page = await context.new_page()
-
-                # 方案 A: 今日热榜 (知乎热榜镜像)
-                items = await self._scrape_from_tophub(page, limit)
+            # 方案 A: 今日热榜 (知乎热榜镜像)
+            items = [
+                self.format_result(title, link)
+                for title, link in await get_tophub_items("zhihu", limit)
+            ]
 
-                # 方案 B: 知乎日报 (兜底)
-                if not items:
-                    self.log_warning('聚合方案失败，尝试知乎日报兜底...')
-                    items = await self._scrape_from_daily(page, limit)
+            # 方案 B: 知乎日报 (兜底)
+            if not items:
+                self.log_warning('聚合方案失败，尝试知乎日报兜底...')
+                items = await self._scrape_from_daily(limit)
 
-                await browser.close()
-                self.log_success(len(items))
-                return items
+            self.log_success(len(items))
+            return items
 
         except Exception as e:
             self.log_error(str(e))
             return []
 
-    async def _scrape_from_tophub(self, page, limit: int) -> list:
-        """从今日热榜抓取知乎数据"""
-        target_url = "https://tophub.today/n/mproPpoq6O"
-        self.log_warning(f'从聚合平台加载: {target_url}')
-
-        await page.goto(target_url, timeout=30000, wait_until="domcontentloaded")
-
-        try:
-            await page.wait_for_selector('table.table', timeout=5000)
-        except:
-            self.log_warning('聚合平台表格未加载')
-            return []
-
-        rows = await page.locator('table.table tbody tr').all()
-        items = []
-
-        for row in rows[:limit]:
-            link_el = row.locator('td.al a')
-            if await link_el.count() > 0:
-                title = await link_el.text_content()
-                href = await link_el.get_attribute('href')
-
-                if title:
-                    full_link = href if href.startswith('http') else f"https://tophub.today{href}"
-                    items.append(self.format_result(title.strip(), full_link))
-
-        return items
-
-    async def _scrape_from_daily(self, page, limit: int) -> list:
+    @browser_retry
+    async def _scrape_from_daily(self, limit: int) -> list:
         """从知乎日报抓取数据（兜底方案）"""
         daily_url = "https://daily.zhihu.com/"
         self.log_warning(f'加载知乎日报: {daily_url}')
 
-        await page.goto(daily_url, timeout=30000, wait_until="domcontentloaded")
-
-        cards = await page.locator('.box a.link-button').all()
-        items = []
-
-        for card in cards[:limit]:
-            title_el = card.locator('span.title')
-            if await title_el.count() > 0:
-                title = await title_el.text_content()
-                href = await card.get_attribute('href')
-
-                if title:
-                    items.append(self.format_result(title.strip(), f"https://daily.zhihu.com{href}"))
+        async with self.browser_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            viewport={'width': 1920, 'height': 1080}
+        ) as context:
+            page = await context.new_page()
+            await self.goto(page, daily_url, wait_until="domcontentloaded")
 
-        return items
+            cards = await self.extract_links(page, '.box a.link-button', title_selector='span.title', limit=limit)
+            return [self.format_result(title, f"https://daily.zhihu.com{href}") for title, href in cards]
 
     async def scrape_by_keywords(self, keywords: List[str], limit: int = 10) -> list:
         """
@@ -0,0 +1,68 @@
+"""
+数据库迁移脚本
+按 PRAGMA user_version 执行尚未应用的迁移（服务启动时也会自动执行）
+
+用法:
+    python scripts/migrate.py            # 执行迁移
+    python scripts/migrate.py --dry-run  # 只输出将要执行的 SQL
+    python scripts/migrate.py --vacuum   # 执行迁移后将已有数据库切换为增量 VACUUM（完整 VACUUM，建议停服执行）
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# 获取脚本所在目录的父目录（HotSpotAI 目录）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+# 将 PROJECT_DIR 添加到 Python 路径，以便导入 core 模块
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+import core  # noqa: F401,E402  先加载 core，避免 db <-> core 循环导入
+from core.db_pool import get_db, close_db  # noqa: E402
+from db.migrations import LATEST_VERSION, get_schema_version, plan_migrations, run_migrations  # noqa: E402
+from db.retention import enable_incremental_vacuum  # noqa: E402
+
+
+async def migrate(dry_run: bool, vacuum: bool = False):
+    """执行或试运行迁移"""
+    try:
+        async with get_db() as db:
+            current = await get_schema_version(db)
+            print(f"当前版本: v{current}，最新版本: v{LATEST_VERSION}")
+
+            if dry_run:
+                for migration, statements in await plan_migrations(db):
+                    print(f"\n-- v{migration.version} {migration.description}")
+                    for sql in statements:
+                        print(f"{sql};")
+                return
+
+            applied = await run_migrations(db)
+            if applied:
+                for migration in applied:
+                    print(f"已执行 v{migration.version} {migration.description}")
+            else:
+                print("数据库结构已是最新")
+
+            if vacuum:
+                print("正在执行完整 VACUUM 并切换为增量 VACUUM 模式...")
+                if await enable_incremental_vacuum(db):
+                    print("已切换为增量 VACUUM 模式")
+                else:
+                    print("数据库已是增量 VACUUM 模式")
+
+    except Exception as e:
+        print(f"数据库迁移失败: {e}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="数据库迁移")
+    parser.add_argument("--dry-run", action="store_true", help="只输出将要执行的 SQL，不修改数据库")
+    parser.add_argument("--vacuum", action="store_true", help="将已有数据库切换为增量 VACUUM 模式（执行一次完整 VACUUM）")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run, args.vacuum))
@@ -0,0 +1,53 @@
+"""
+JWT 密钥轮换脚本
+在密钥文件（JWT_KEYFILE）中生成新的签名密钥，旧密钥继续用于验证，直到它签发的 token 全部过期。
+运行中的各进程在 30 秒内自动加载新密钥，无需重启，已登录用户不受影响。
+
+使用 JWT_SECRET_KEY 配置密钥时不使用密钥文件，需手动轮换：
+先把旧密钥加入 JWT_VERIFY_KEYS，再把 JWT_SECRET_KEY 改为新密钥，依次重启各进程。
+
+用法:
+    python scripts/rotate_jwt_key.py                 # 轮换，旧密钥保留一个 token 有效期
+    python scripts/rotate_jwt_key.py --retain-hours 0  # 轮换并立即使所有已签发 token 失效
+"""
+import argparse
+import os
+import sys
+
+# 获取脚本所在目录的父目录（HotSpotAI 目录）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+# 将 PROJECT_DIR 添加到 Python 路径，以便导入 core 模块
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from core.config import get_settings  # noqa: E402
+from core.jwt_keys import PLACEHOLDER_KEYS, rotate_keyfile  # noqa: E402
+
+
+def rotate(retain_hours: float):
+    """轮换密钥文件中的签名密钥"""
+    settings = get_settings()
+    if settings.jwt_secret_key.strip() and settings.jwt_secret_key.strip() not in PLACEHOLDER_KEYS:
+        print("当前使用 JWT_SECRET_KEY 配置的密钥，密钥文件未被使用。")
+        print("请把旧密钥加入 JWT_VERIFY_KEYS，再修改 JWT_SECRET_KEY 并依次重启各进程。")
+        sys.exit(1)
+
+    kid, retained = rotate_keyfile(settings.jwt_keyfile, retain_hours * 3600)
+    print(f"已生成新的签名密钥 {kid}（{settings.jwt_keyfile}），保留 {retained} 个旧密钥用于验证")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JWT 密钥轮换")
+    parser.add_argument(
+        "--retain-hours",
+        type=float,
+        default=None,
+        help="旧密钥保留时长（小时），默认等于 token 有效期 JWT_EXPIRE_MINUTES",
+    )
+    args = parser.parse_args()
+    retain = args.retain_hours
+    if retain is None:
+        retain = get_settings().jwt_expire_minutes / 60
+    rotate(retain)
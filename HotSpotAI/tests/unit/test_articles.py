@@ -0,0 +1,134 @@
+"""
+分享文章缓存单元测试
+"""
+import json
+
+import aiosqlite
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import core  # noqa: F401
+from api import articles as articles_api
+from core import articles, runtime_state
+
+
+@pytest.fixture
+async def article_db(tmp_path, monkeypatch):
+    """带一篇公开文章的临时数据库，并统计按分享 token 查询的次数"""
+    path = str(tmp_path / "articles.db")
+    async with aiosqlite.connect(path) as db:
+        await db.executescript('''
+            CREATE TABLE user_articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, topic_id INTEGER,
+                topic_title TEXT NOT NULL, topic_link TEXT, topic_source TEXT, title TEXT NOT NULL,
+                content TEXT NOT NULL, platform TEXT NOT NULL, share_token TEXT UNIQUE NOT NULL,
+                is_public INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO user_articles
+                (user_id, topic_title, title, content, platform, share_token, is_public, updated_at)
+            VALUES (1, '话题', '标题', '正文', 'wechat', 'public-token', 1, '2026-01-02 03:04:05');
+        ''')
+        await db.commit()
+
+    lookups = []
+    original = articles.get_article_by_share_token
+
+    async def counting_lookup(share_token):
+        lookups.append(share_token)
+        return await original(share_token)
+
+    monkeypatch.setattr(articles, "DB_FILE", path)
+    monkeypatch.setattr(articles, "get_article_by_share_token", counting_lookup)
+    articles.invalidate_share_cache()
+
+    yield lookups
+
+    articles.invalidate_share_cache()
+
+
+class TestShareCache:
+    """测试分享文章缓存"""
+
+    async def test_cached_after_first_view(self, article_db):
+        first = await articles.get_shared_article("public-token")
+        second = await articles.get_shared_article("public-token")
+        assert first is second
+        body = json.loads(first.body)
+        assert body["content"] == "正文"
+        assert "updated_at" not in body
+        assert first.last_modified == "Fri, 02 Jan 2026 03:04:05 GMT"
+        assert article_db == ["public-token"]
+
+    async def test_unknown_token_not_cached(self, article_db):
+        assert await articles.get_shared_article("missing") is None
+        assert await articles.get_shared_article("missing") is None
+        assert len(article_db) == 2
+
+    async def test_unpublish_invalidates(self, article_db):
+        assert await articles.get_shared_article("public-token") is not None
+        assert await articles.update_article_public_status(1, 1, False)
+        assert await articles.get_shared_article("public-token") is None
+
+    async def test_delete_invalidates(self, article_db):
+        assert await articles.get_shared_article("public-token") is not None
+        assert await articles.delete_article(1, 1)
+        assert await articles.get_shared_article("public-token") is None
+
+    async def test_remote_version_clears_cache(self, article_db):
+        """其他进程修改文章后（articles_version 变化）重新读取"""
+        await articles.get_shared_article("public-token")
+        runtime_state["articles_version"] = "remote"
+        await articles.get_shared_article("public-token")
+        assert len(article_db) == 2
+
+    async def test_lru_eviction(self, article_db, monkeypatch):
+        monkeypatch.setattr(articles, "SHARE_CACHE_SIZE", 0)
+        await articles.get_shared_article("public-token")
+        await articles.get_shared_article("public-token")
+        assert len(article_db) == 2
+
+
+class TestShareEndpoint:
+    """测试分享接口的条件请求"""
+
+    @pytest.fixture
+    async def client(self, article_db):
+        app = FastAPI()
+        app.include_router(articles_api.router)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+    async def test_etag_304(self, client):
+        response = await client.get("/articles/share/public-token")
+        assert response.status_code == 200
+        assert response.json()["title"] == "标题"
+        etag = response.headers["ETag"]
+
+        response = await client.get("/articles/share/public-token", headers={"If-None-Match": f"W/{etag}"})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+        response = await client.get("/articles/share/public-token", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+    async def test_last_modified_304(self, client):
+        response = await client.get("/articles/share/public-token")
+        last_modified = response.headers["Last-Modified"]
+
+        response = await client.get("/articles/share/public-token", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+        response = await client.get(
+            "/articles/share/public-token", headers={"If-Modified-Since": "Thu, 01 Jan 2026 00:00:00 GMT"}
+        )
+        assert response.status_code == 200
+
+        response = await client.get("/articles/share/public-token", headers={"If-Modified-Since": "invalid"})
+        assert response.status_code == 200
+
+    async def test_not_found(self, client):
+        response = await client.get("/articles/share/missing")
+        assert response.status_code == 404
@@ -0,0 +1,368 @@
+"""
+认证缓存与 JWT 密钥单元测试
+"""
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import aiosqlite
+import httpx
+import pytest
+from fastapi import FastAPI
+from passlib.hash import bcrypt
+
+import core  # noqa: F401
+from api import auth as auth_api
+from core import auth, jwt_keys, rate_limit, runtime_state
+from core.config import get_settings
+from core.rate_limit import TokenBucketLimiter
+from db import users
+
+
+@pytest.fixture(autouse=True)
+def key_settings(tmp_path, monkeypatch):
+    """使用临时密钥文件，每个测试重新加载密钥"""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "jwt_secret_key", "")
+    monkeypatch.setattr(settings, "jwt_verify_keys", "")
+    monkeypatch.setattr(settings, "jwt_keyfile", str(tmp_path / "jwt_keys.json"))
+    jwt_keys.reset_key_ring()
+    auth.clear_token_cache()
+    yield settings
+    jwt_keys.reset_key_ring()
+    auth.clear_token_cache()
+
+
+@pytest.fixture
+async def user_db(tmp_path, monkeypatch):
+    """带两个用户的临时数据库，并统计查询次数"""
+    conn = await aiosqlite.connect(str(tmp_path / "users.db"))
+    conn.row_factory = aiosqlite.Row
+    await conn.executescript('''
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL, is_admin INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO users (username, email, password_hash) VALUES
+            ('alice', 'alice@example.com', 'hash'), ('bob', 'bob@example.com', 'hash');
+    ''')
+
+    queries = []
+    original_execute = conn.execute
+
+    def counting_execute(sql, *args, **kwargs):
+        queries.append(sql)
+        return original_execute(sql, *args, **kwargs)
+
+    @asynccontextmanager
+    async def fake_get_db():
+        yield conn
+
+    monkeypatch.setattr(conn, "execute", counting_execute)
+    monkeypatch.setattr(users, "get_db", fake_get_db)
+    users.invalidate_user_cache()
+
+    yield queries
+
+    users.invalidate_user_cache()
+    await conn.close()
+
+
+class TestUserCache:
+    """测试认证用户缓存"""
+
+    async def test_cached_after_first_lookup(self, user_db):
+        first = await users.get_cached_user(1)
+        second = await users.get_cached_user(1)
+        assert first == second
+        assert first["username"] == "alice"
+        assert "password_hash" not in first
+        assert len(user_db) == 1
+
+    async def test_returns_copy(self, user_db):
+        user = await users.get_cached_user(1)
+        user["username"] = "changed"
+        assert (await users.get_cached_user(1))["username"] == "alice"
+
+    async def test_missing_user_not_cached(self, user_db):
+        assert await users.get_cached_user(3) is None
+        assert await users.get_cached_user(3) is None
+        assert len(user_db) == 2
+
+    async def test_update_user_invalidates(self, user_db):
+        await users.get_cached_user(1)
+        assert await users.update_user(1, is_admin=True)
+        assert (await users.get_cached_user(1))["is_admin"] is True
+
+    async def test_remote_version_clears_cache(self, user_db):
+        """其他进程修改用户后（users_version 变化）重新读取"""
+        await users.get_cached_user(1)
+        runtime_state["users_version"] = "remote"
+        await users.get_cached_user(1)
+        assert len(user_db) == 2
+
+    async def test_lru_eviction(self, user_db, monkeypatch):
+        monkeypatch.setattr(users, "USER_CACHE_SIZE", 1)
+        await users.get_cached_user(1)
+        await users.get_cached_user(2)
+        await users.get_cached_user(1)
+        assert len(user_db) == 3
+
+    async def test_expired_entry_reloaded(self, user_db, monkeypatch):
+        monkeypatch.setattr(users, "USER_CACHE_TTL", 0)
+        await users.get_cached_user(1)
+        await users.get_cached_user(1)
+        assert len(user_db) == 2
+
+
+class TestTokenCache:
+    """测试已验证 token 缓存"""
+
+    def test_valid_token_cached(self, monkeypatch):
+        token = auth.create_access_token({"sub": "alice", "user_id": 1})
+        assert auth.decode_access_token(token).user_id == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("命中缓存时不应重新验签")
+
+        monkeypatch.setattr(auth.jwt, "decode", fail)
+        assert auth.decode_access_token(token).user_id == 1
+
+    def test_invalid_token_not_cached(self):
+        assert auth.decode_access_token("not-a-token") is None
+        assert len(auth._token_cache) == 0
+
+    def test_expired_entry_reverified(self, monkeypatch):
+        """缓存项过期后重新验签（过期 token 由 jwt.decode 拒绝）"""
+        token = auth.create_access_token({"sub": "alice", "user_id": 1}, expires_delta=timedelta(minutes=5))
+        assert auth.decode_access_token(token) is not None
+
+        key = next(iter(auth._token_cache))
+        expires, kid, token_data = auth._token_cache[key]
+        auth._token_cache[key] = (expires - 600, kid, token_data)
+        monkeypatch.setattr(auth.jwt, "decode", lambda *args, **kwargs: {})
+        assert auth.decode_access_token(token).user_id is None
+        assert key not in auth._token_cache
+
+    def test_expired_token_rejected(self):
+        token = auth.create_access_token({"sub": "alice", "user_id": 1}, expires_delta=timedelta(minutes=-1))
+        assert auth.decode_access_token(token) is None
+        assert len(auth._token_cache) == 0
+
+    def test_lru_eviction(self, monkeypatch):
+        monkeypatch.setattr(auth, "TOKEN_CACHE_SIZE", 2)
+        for user_id in range(3):
+            auth.decode_access_token(auth.create_access_token({"sub": "u", "user_id": user_id}))
+        assert len(auth._token_cache) == 2
+
+
+class TestKeyRing:
+    """测试 JWT 签名密钥"""
+
+    def test_keyfile_persists_across_restarts(self, key_settings):
+        token = auth.create_access_token({"sub": "alice", "user_id": 1})
+
+        # 模拟进程重启：丢弃已加载的密钥和缓存
+        jwt_keys.reset_key_ring()
+        auth.clear_token_cache()
+        assert auth.decode_access_token(token).user_id == 1
+
+    def test_keyfile_shared_by_processes(self, key_settings):
+        """多个进程读取同一个密钥文件，得到相同的签名密钥"""
+        first = jwt_keys.read_keyfile(key_settings.jwt_keyfile)
+        second = jwt_keys.read_keyfile(key_settings.jwt_keyfile)
+        assert first == second
+
+    def test_configured_secret(self, key_settings):
+        key_settings.jwt_secret_key = "configured-secret"
+        token = auth.create_access_token({"sub": "alice", "user_id": 1})
+        assert auth.jwt.get_unverified_header(token)["kid"] == jwt_keys.key_id("configured-secret")
+        assert auth.decode_access_token(token).user_id == 1
+
+    def test_placeholder_secret_ignored(self, key_settings):
+        key_settings.jwt_secret_key = "your_secret_key_here"
+        assert jwt_keys.get_key_ring().signing_key != "your_secret_key_here"
+
+    def test_verify_keys_accept_old_tokens(self, key_settings):
+        key_settings.jwt_secret_key = "old-secret"
+        token = auth.create_access_token({"sub": "alice", "user_id": 1})
+
+        key_settings.jwt_secret_key = "new-secret"
+        key_settings.jwt_verify_keys = "old-secret"
+        jwt_keys.reset_key_ring()
+        auth.clear_token_cache()
+        assert auth.decode_access_token(token).user_id == 1
+
+        key_settings.jwt_verify_keys = ""
+        jwt_keys.reset_key_ring()
+        auth.clear_token_cache()
+        assert auth.decode_access_token(token) is None
+
+    def test_rotation_keeps_old_key(self, key_settings):
+        old_token = auth.create_access_token({"sub": "alice", "user_id": 1})
+        kid, retained = jwt_keys.rotate_keyfile(key_settings.jwt_keyfile, retain_seconds=3600)
+        assert retained == 1
+
+        # 其他进程签发的新 token（kid 未知）触发立即重新加载
+        ring = jwt_keys.load_key_ring()
+        new_token = auth.jwt.encode(
+            {"user_id": 2, "exp": int(time.time()) + 60}, ring.signing_key, headers={"kid": kid}
+        )
+        assert auth.decode_access_token(new_token).user_id == 2
+        assert jwt_keys.get_key_ring().signing_kid == kid
+        assert auth.decode_access_token(old_token).user_id == 1
+
+    def test_rotation_drops_expired_keys(self, key_settings):
+        path = key_settings.jwt_keyfile
+        jwt_keys.read_keyfile(path)
+        jwt_keys.rotate_keyfile(path, retain_seconds=3600)
+
+        # 最初的密钥在 2 小时前被替换，它签发的 token 已全部过期；当前签名密钥保留
+        with open(path) as f:
+            keys = json.load(f)["keys"]
+        original = keys[1]["key"]
+        keys[0]["created_at"] -= 7200
+        with open(path, "w") as f:
+            json.dump({"keys": keys}, f)
+
+        _, retained = jwt_keys.rotate_keyfile(path, retain_seconds=3600)
+        assert retained == 1
+        assert original not in [key["key"] for key in jwt_keys.read_keyfile(path)]
+
+    def test_removed_key_invalidates_cached_token(self, key_settings):
+        token = auth.create_access_token({"sub": "alice", "user_id": 1})
+        assert auth.decode_access_token(token) is not None
+
+        jwt_keys.rotate_keyfile(key_settings.jwt_keyfile, retain_seconds=0)
+        jwt_keys.get_key_ring(force_check=True)
+        assert auth.decode_access_token(token) is None
+
+    def test_unknown_kid_rejected(self, key_settings):
+        token = auth.jwt.encode({"user_id": 1}, "other-secret", headers={"kid": "unknown"})
+        assert auth.decode_access_token(token) is None
+
+
+class TestTokenBucket:
+    """测试令牌桶限流"""
+
+    def test_burst_then_refill(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=2)
+
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == pytest.approx(1.0)
+        # 其他键不受影响
+        assert limiter.acquire("b") == 0
+
+        now[0] += 0.5
+        assert limiter.retry_after("a") == pytest.approx(0.5)
+        now[0] += 0.5
+        assert limiter.acquire("a") == 0
+
+    def test_rejected_request_not_counted(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=1)
+        limiter.acquire("a")
+        for _ in range(10):
+            assert limiter.acquire("a") > 0
+        now[0] += 1
+        assert limiter.acquire("a") == 0
+
+    def test_disabled(self):
+        limiter = TokenBucketLimiter(rate_per_minute=0, burst=1)
+        assert all(limiter.acquire("a") == 0 for _ in range(100))
+
+    def test_max_keys(self):
+        limiter = TokenBucketLimiter(rate_per_minute=1, burst=1, max_keys=2)
+        for key in ("a", "b", "c"):
+            limiter.acquire(key)
+        assert len(limiter._buckets) == 2
+        # 被淘汰的键重新获得满桶
+        assert limiter.acquire("a") == 0
+
+
+class TestPasswordHashing:
+    """测试 bcrypt 成本配置与登录时重新哈希"""
+
+    def test_configured_rounds(self, key_settings, monkeypatch):
+        monkeypatch.setattr(key_settings, "bcrypt_rounds", 4)
+        assert auth.get_password_hash("secret").startswith("$2b$04$")
+
+    def test_rehash_when_rounds_change(self, key_settings, monkeypatch):
+        monkeypatch.setattr(key_settings, "bcrypt_rounds", 4)
+        hashed = auth.get_password_hash("secret")
+        assert auth.verify_and_update_password("secret", hashed) == (True, None)
+
+        monkeypatch.setattr(key_settings, "bcrypt_rounds", 5)
+        verified, new_hash = auth.verify_and_update_password("secret", hashed)
+        assert verified
+        assert new_hash.startswith("$2b$05$")
+        assert auth.verify_and_update_password("wrong", hashed) == (False, None)
+
+
+class TestLoginEndpoint:
+    """测试登录接口的限流与重新哈希"""
+
+    @pytest.fixture
+    async def client(self, key_settings, monkeypatch):
+        monkeypatch.setattr(key_settings, "bcrypt_rounds", 4)
+        monkeypatch.setattr(rate_limit, "_auth_limiters", (
+            TokenBucketLimiter(rate_per_minute=1, burst=3),
+            TokenBucketLimiter(rate_per_minute=1, burst=2),
+        ))
+        stored = {
+            "id": 1, "username": "alice", "email": "alice@example.com", "is_admin": 0,
+            "created_at": "2026-01-01 00:00:00",
+            "password_hash": bcrypt.using(rounds=5).hash("secret"),
+        }
+        updates = []
+
+        async def fake_get_user_by_username(username):
+            return dict(stored) if username == "alice" else None
+
+        async def fake_update_user(user_id, **kwargs):
+            updates.append((user_id, kwargs))
+            return True
+
+        monkeypatch.setattr(auth_api, "get_user_by_username", fake_get_user_by_username)
+        monkeypatch.setattr(auth_api, "update_user", fake_update_user)
+
+        app = FastAPI()
+        app.include_router(auth_api.router)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client, updates
+
+    async def test_rehash_on_login(self, client):
+        client, updates = client
+        response = await client.post("/auth/login", json={"username": "alice", "password": "secret"})
+        assert response.status_code == 200
+        assert updates[0][0] == 1
+        assert updates[0][1]["password_hash"].startswith("$2b$04$")
+
+    async def test_username_limit(self, client):
+        client, _ = client
+        for _ in range(2):
+            response = await client.post("/auth/login", json={"username": "alice", "password": "wrong"})
+            assert response.status_code == 401
+
+        response = await client.post("/auth/login", json={"username": "alice", "password": "secret"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+
+        # 同一 IP 仍可登录其他账户
+        response = await client.post("/auth/login", json={"username": "bob", "password": "wrong"})
+        assert response.status_code == 401
+
+    async def test_ip_limit(self, client):
+        client, _ = client
+        for name in ("a", "b", "c"):
+            response = await client.post("/auth/login", json={"username": name, "password": "x"})
+            assert response.status_code == 401
+        response = await client.post("/auth/login", json={"username": "d", "password": "x"})
+        assert response.status_code == 429
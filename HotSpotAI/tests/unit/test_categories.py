@@ -0,0 +1,128 @@
+"""
+分类图读取与缓存单元测试
+"""
+from contextlib import asynccontextmanager
+
+import aiosqlite
+import pytest
+
+import core  # noqa: F401
+from core import runtime_state
+from db import categories
+
+
+@pytest.fixture
+async def category_db(tmp_path, monkeypatch):
+    """带分类数据的临时数据库，并统计查询次数"""
+    conn = await aiosqlite.connect(str(tmp_path / "categories.db"))
+    conn.row_factory = aiosqlite.Row
+    await conn.executescript('''
+        CREATE TABLE categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, slug TEXT, description TEXT,
+            icon TEXT, color TEXT, is_active INTEGER DEFAULT 1, sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP, updated_at TIMESTAMP
+        );
+        CREATE TABLE category_keywords (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, category_id INTEGER, keyword TEXT, weight INTEGER
+        );
+        CREATE TABLE category_platforms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, category_id INTEGER, platform TEXT, is_enabled INTEGER
+        );
+        INSERT INTO categories (name, slug, is_active, sort_order) VALUES
+            ('AI科技', 'ai-tech', 1, 0), ('财经投资', 'finance', 1, 1), ('已停用', 'off', 0, 2);
+        INSERT INTO category_keywords (category_id, keyword, weight) VALUES
+            (1, 'AI', 1), (1, '大模型', 2), (2, '股票', 1);
+        INSERT INTO category_platforms (category_id, platform, is_enabled) VALUES
+            (1, 'weibo', 1), (1, 'zhihu', 0), (3, 'douyin', 1);
+    ''')
+
+    queries = []
+    original_execute = conn.execute
+
+    def counting_execute(sql, *args, **kwargs):
+        queries.append(sql)
+        return original_execute(sql, *args, **kwargs)
+
+    @asynccontextmanager
+    async def fake_get_db():
+        yield conn
+
+    monkeypatch.setattr(conn, "execute", counting_execute)
+    monkeypatch.setattr(categories, "get_db", fake_get_db)
+    categories.invalidate_category_cache()
+
+    yield queries
+
+    categories.invalidate_category_cache()
+    await conn.close()
+
+
+class TestCategoryGraph:
+    """测试分类图读取"""
+
+    async def test_constant_queries(self, category_db):
+        """分类图只需每张表一次查询"""
+        graph = await categories.get_category_graph(include_inactive=True)
+
+        assert len(category_db) == 3
+        assert [c["slug"] for c in graph] == ["ai-tech", "finance", "off"]
+        assert [k["keyword"] for k in graph[0]["keywords"]] == ["大模型", "AI"]
+        assert graph[0]["platforms"] == [
+            {"platform": "weibo", "is_enabled": True},
+            {"platform": "zhihu", "is_enabled": False},
+        ]
+        assert graph[1]["platforms"] == []
+
+    async def test_derived_reads_use_cache(self, category_db):
+        """派生读取复用缓存，不再额外查询"""
+        with_keywords = await categories.get_categories_with_keywords()
+        category = await categories.get_category_by_id(3)
+        platforms = await categories.get_category_platforms(1)
+
+        assert len(category_db) == 3
+        assert [c["keywords"] for c in with_keywords] == [["大模型", "AI"], ["股票"]]
+        assert category["is_active"] is False
+        assert len(platforms) == 2
+        assert await categories.get_category_by_id(99) is None
+
+    async def test_returns_copies(self, category_db):
+        """调用方修改返回值不影响缓存"""
+        graph = await categories.get_category_graph()
+        graph[0]["keywords"].clear()
+
+        category = await categories.get_category_by_id(1)
+        assert len(category["keywords"]) == 2
+
+    async def test_invalidate(self, category_db):
+        """失效后重新读取数据库"""
+        await categories.get_category_graph()
+        categories.invalidate_category_cache()
+        await categories.get_category_graph()
+
+        assert len(category_db) == 6
+
+    async def test_invalidate_during_load(self, category_db, monkeypatch):
+        """读取期间发生失效时不缓存读到的旧数据"""
+        original_load = categories._load_category_graph
+
+        async def load_then_invalidate():
+            graph = await original_load()
+            categories.invalidate_category_cache()  # 模拟读取期间的分类写操作
+            return graph
+
+        monkeypatch.setattr(categories, "_load_category_graph", load_then_invalidate)
+        await categories.get_category_graph()
+        monkeypatch.setattr(categories, "_load_category_graph", original_load)
+
+        await categories.get_category_graph()
+        assert len(category_db) == 6
+
+    async def test_remote_category_version(self, category_db):
+        """其他进程修改分类（共享的 category_version 变化）后重新读取"""
+        await categories.get_category_graph()
+        await categories.get_category_graph()
+        assert len(category_db) == 3
+
+        runtime_state["category_version"] = "changed-by-another-worker"
+        await categories.get_category_graph()
+        assert len(category_db) == 6
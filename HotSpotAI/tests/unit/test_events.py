@@ -0,0 +1,102 @@
+"""
+事件总线单元测试
+"""
+import asyncio
+
+from core.events import EventBus
+
+
+class TestSubscriber:
+    """测试订阅者队列"""
+
+    async def test_receives_published_events(self):
+        bus = EventBus()
+        subscriber = bus.subscribe()
+        bus.publish("log", {"message": "a"})
+        bus.publish("log", {"message": "b"})
+
+        events = await subscriber.get(timeout=1)
+        assert [e.data["message"] for e in events] == ["a", "b"]
+
+    async def test_timeout_returns_empty(self):
+        subscriber = EventBus().subscribe()
+        assert await subscriber.get(timeout=0.01) == []
+
+    async def test_type_filter(self):
+        bus = EventBus()
+        subscriber = bus.subscribe(types={"status"})
+        bus.publish("log", {})
+        bus.publish("status")
+
+        events = await subscriber.get(timeout=1)
+        assert [e.type for e in events] == ["status"]
+
+    async def test_coalesce_keeps_latest(self):
+        """status / topics 只保留最新一条，且按发布顺序排列"""
+        bus = EventBus()
+        subscriber = bus.subscribe()
+        bus.publish("topics", [1])
+        bus.publish("log", {})
+        bus.publish("topics", [2])
+
+        events = await subscriber.get(timeout=1)
+        assert [e.type for e in events] == ["log", "topics"]
+        assert events[1].data == [2]
+
+    async def test_overflow_marks_lagged(self):
+        bus = EventBus(queue_size=3)
+        subscriber = bus.subscribe()
+        for i in range(5):
+            bus.publish("log", i)
+
+        events = await subscriber.get(timeout=1)
+        assert [e.data for e in events] == [2, 3, 4]
+        assert subscriber.lagged and subscriber.dropped == 2
+
+    async def test_publish_from_thread(self):
+        bus = EventBus()
+        subscriber = bus.subscribe()
+        await asyncio.get_running_loop().run_in_executor(None, bus.publish, "log", "thread")
+
+        events = await subscriber.get(timeout=1)
+        assert [e.data for e in events] == ["thread"]
+
+    async def test_close_unsubscribes(self):
+        bus = EventBus()
+        bus.subscribe().close()
+        assert bus.subscriber_count == 0
+
+
+class TestResume:
+    """测试 Last-Event-ID 断线续传"""
+
+    async def test_replays_missed_events(self):
+        bus = EventBus()
+        first = bus.publish("log", "a")
+        bus.publish("log", "b")
+        bus.publish("log", "c")
+
+        subscriber = bus.subscribe(last_event_id=first.id)
+        events = await subscriber.get(timeout=1)
+        assert [e.data for e in events] == ["b", "c"]
+        assert not subscriber.lagged
+
+    async def test_history_gap_marks_lagged(self):
+        """事件已被挤出历史时不做不完整的重放，由调用方发送完整状态"""
+        bus = EventBus(history_size=2)
+        first = bus.publish("log", "a")
+        for data in "bcd":
+            bus.publish("log", data)
+
+        subscriber = bus.subscribe(last_event_id=first.id)
+        assert subscriber.lagged
+        assert await subscriber.get(timeout=0.01) == []
+
+    async def test_id_from_previous_process(self):
+        """id 大于当前最新 id（服务已重启）时需要重新同步，且不重放旧事件"""
+        bus = EventBus()
+        bus.publish("log", "a")
+
+        subscriber = bus.subscribe(last_event_id=1000)
+        assert subscriber.lagged
+        assert await subscriber.get(timeout=0.01) == []
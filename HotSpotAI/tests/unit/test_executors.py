@@ -0,0 +1,164 @@
+"""
+执行器子系统与事件循环延迟监控单元测试
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import core  # noqa: F401
+from core import executors
+from core.executors import BoundedExecutor, run_cpu
+from core.llm import _create_client, close_llm_client, extract_json_array, parse_json_array
+from core.loop_monitor import LoopLagMonitor
+from scrapers.parsers import parse_baidu_hot, parse_tophub_table, parse_weibo_hot
+
+WEIBO_HTML = '''
+<table>
+  <tr><td class="td-02"><a href="javascript:void(0)">置顶广告</a></td></tr>
+  <tr><td class="td-02"><a href="/weibo?q=%23话题一%23"> 话题一 </a></td></tr>
+  <tr><td class="td-02"><a href="/weibo?q=%23话题二%23">话题二</a></td></tr>
+</table>
+'''
+
+BAIDU_HTML = '''
+<div class="c-single-text-ellipsis">热点一</div>
+<div class="c-single-text-ellipsis">热点一</div>
+<div class="c-single-text-ellipsis"> </div>
+<div class="c-single-text-ellipsis">热点二</div>
+'''
+
+
+class TestParsers:
+    """测试热搜页面解析"""
+
+    def test_weibo(self):
+        count, items = parse_weibo_hot(WEIBO_HTML, 10)
+        assert count == 3
+        assert items == [
+            ("话题一", "https://s.weibo.com/weibo?q=%23话题一%23"),
+            ("话题二", "https://s.weibo.com/weibo?q=%23话题二%23"),
+        ]
+        assert len(parse_weibo_hot(WEIBO_HTML, 1)[1]) == 1
+
+    def test_baidu_dedup(self):
+        count, items = parse_baidu_hot(BAIDU_HTML, 10)
+        assert count == 4
+        assert [title for title, _ in items] == ["热点一", "热点二"]
+
+    async def test_runs_in_process_pool(self):
+        try:
+            assert await run_cpu(parse_weibo_hot, WEIBO_HTML, 10) == parse_weibo_hot(WEIBO_HTML, 10)
+        finally:
+            executors.shutdown_executors()
+
+
+class TestBoundedExecutor:
+    """测试有界等待队列"""
+
+    async def test_limits_submitted_tasks(self):
+        release = threading.Event()
+        executor = BoundedExecutor(
+            "test", lambda: ThreadPoolExecutor(max_workers=1), max_workers=1, queue_size=1
+        )
+        tasks = [asyncio.create_task(executor.run(release.wait)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+
+        # 执行中 1 + 排队 1，其余在协程中等待
+        assert executor.stats()["submitted"] == 2
+        assert executor.stats()["waiting"] == 2
+
+        release.set()
+        assert await asyncio.gather(*tasks) == [True] * 4
+        assert executor.stats()["submitted"] == 0
+        executor.shutdown()
+
+    async def test_propagates_exceptions(self):
+        executor = BoundedExecutor("test", lambda: ThreadPoolExecutor(max_workers=1), 1, 0)
+
+        def fail():
+            raise ValueError("失败")
+
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        assert executor.stats()["submitted"] == 0
+        executor.shutdown()
+
+
+class TestLoopLagMonitor:
+    """测试事件循环延迟监控"""
+
+    def test_record(self):
+        monitor = LoopLagMonitor(threshold_ms=100)
+        monitor.record(0.01)
+        monitor.record(0.25)
+        assert monitor.blocked_count == 1
+        assert monitor.stats()["max_lag_ms"] == 250.0
+
+    async def test_detects_blocking_call(self):
+        monitor = LoopLagMonitor(threshold_ms=50, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.2)  # 阻塞事件循环
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        assert monitor.blocked_count >= 1
+        assert monitor.max_lag >= 0.1
+
+
+class TestLLMJson:
+    """测试 LLM JSON 解析"""
+
+    def test_extract_json_array(self):
+        assert extract_json_array('```json\n[{"id": 0}]\n```') == [{"id": 0}]
+        assert extract_json_array("没有数组") is None
+
+    async def test_large_content_offloaded(self, monkeypatch):
+        calls = []
+
+        async def fake_run_cpu(func, *args):
+            calls.append(func)
+            return func(*args)
+
+        monkeypatch.setattr(executors, "run_cpu", fake_run_cpu)
+        large = "[" + ",".join(['{"id": 1}'] * 10000) + "]"
+        assert len(await parse_json_array(large)) == 10000
+        assert await parse_json_array('[{"id": 2}]') == [{"id": 2}]
+        assert calls == [extract_json_array]
+
+    async def test_client_shared(self):
+        client = _create_client(api_key="k", base_url="http://127.0.0.1:1/v1", timeout=5)
+        assert _create_client(api_key="k", base_url="http://127.0.0.1:1/v1", timeout=5) is client
+        assert client.max_retries == 0
+        other = _create_client(api_key="k", base_url="http://127.0.0.1:1/v1", timeout=10)
+        assert other is not client
+
+        await close_llm_client()
+        assert other.is_closed()
+        assert _create_client(api_key="k", base_url="http://127.0.0.1:1/v1", timeout=10) is not other
+        await close_llm_client()
+
+
+TOPHUB_HTML = '''
+<table class="table"><tbody>
+  <tr><td>1.</td><td class="al"><a href="/l?e=abc"> 榜单一 </a></td></tr>
+  <tr><td>2.</td><td class="al"><a href="https://www.zhihu.com/question/2">榜单二</a></td></tr>
+  <tr><td>3.</td><td class="al"><a href="/l?e=empty"> </a></td></tr>
+  <tr><td>4.</td><td>无链接</td></tr>
+</tbody></table>
+'''
+
+
+class TestTophubParser:
+    """测试今日热榜表格解析"""
+
+    def test_parse(self):
+        count, items = parse_tophub_table(TOPHUB_HTML, 10)
+        assert count == 4
+        assert items == [
+            ("榜单一", "https://tophub.today/l?e=abc"),
+            ("榜单二", "https://www.zhihu.com/question/2"),
+        ]
+        assert len(parse_tophub_table(TOPHUB_HTML, 1)[1]) == 1
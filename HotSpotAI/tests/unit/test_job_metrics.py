@@ -0,0 +1,233 @@
+"""
+任务运行指标单元测试
+"""
+from contextlib import asynccontextmanager
+
+import aiosqlite
+import httpx
+import pytest
+
+import core  # noqa: F401
+import db
+from core.job_metrics import (
+    count_span,
+    job_span,
+    percentile,
+    skip_job_run,
+    summarize_job_runs,
+    traced_job,
+)
+from db import job_runs as job_runs_db
+from db.migrations import _create_job_run_tables
+from scrapers import replay
+from scrapers.http_client import close_http_client, get_http_client
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    """记录写入的运行记录（不写数据库）"""
+    runs = []
+
+    async def fake_save(**kwargs):
+        runs.append(kwargs)
+        return len(runs)
+
+    monkeypatch.setattr(db, "save_job_run", fake_save)
+    return runs
+
+
+@pytest.fixture
+async def runs_conn(tmp_path, monkeypatch):
+    """带 job_runs 表的临时数据库"""
+    conn = await aiosqlite.connect(str(tmp_path / "runs.db"))
+    await _create_job_run_tables(conn)
+    await conn.commit()
+
+    @asynccontextmanager
+    async def fake_get_db():
+        yield conn
+
+    monkeypatch.setattr(job_runs_db, "get_state_db", fake_get_db)
+    yield conn
+    await conn.close()
+
+
+class TestTracedJob:
+    """测试任务运行记录"""
+
+    async def test_spans_recorded(self, saved):
+        @traced_job("scraper", items_key="scraped_count")
+        async def job():
+            with job_span("scrape", "weibo") as span:
+                count_span(bytes=100)
+                count_span(bytes=50)
+                span.items = 20
+            with job_span("llm", "analyze_news_batch") as span:
+                count_span(tokens=300)
+                span.errors = 2
+            return {"success": True, "scraped_count": 20}
+
+        assert await job() == {"success": True, "scraped_count": 20}
+
+        run = saved[0]
+        assert run["job"] == "scraper"
+        assert run["success"] is True
+        assert (run["items"], run["bytes"], run["tokens"], run["errors"]) == (20, 150, 300, 2)
+        assert [(s["kind"], s["name"]) for s in run["spans"]] == [("scrape", "weibo"), ("llm", "analyze_news_batch")]
+        assert run["spans"][0]["start_ms"] <= run["spans"][1]["start_ms"]
+
+    async def test_span_error_reraised(self, saved):
+        @traced_job("scraper")
+        async def job():
+            try:
+                with job_span("scrape", "douyin"):
+                    raise ValueError("页面结构变化")
+            except ValueError:
+                pass
+            return {"success": True}
+
+        await job()
+        span = saved[0]["spans"][0]
+        assert span["errors"] == 1
+        assert span["error"] == "ValueError: 页面结构变化"
+
+    async def test_skipped_run_not_saved(self, saved):
+        @traced_job("selector")
+        async def job():
+            skip_job_run()
+            return {"success": False}
+
+        await job()
+        assert saved == []
+
+    async def test_nested_jobs_recorded_once(self, saved):
+        @traced_job("scraper")
+        async def inner():
+            with job_span("scrape", "baidu"):
+                pass
+            return {"success": True}
+
+        @traced_job("pipeline")
+        async def outer():
+            await inner()
+            return {"success": True}
+
+        await outer()
+        assert [r["job"] for r in saved] == ["pipeline"]
+        assert saved[0]["spans"][0]["name"] == "baidu"
+
+    async def test_outside_job(self, saved):
+        with job_span("scrape", "weibo") as span:
+            count_span(bytes=10)
+        assert span.bytes == 10
+        assert span.duration_ms >= 0
+        assert saved == []
+
+    async def test_save_failure_does_not_break_job(self, monkeypatch):
+        async def broken_save(**kwargs):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(db, "save_job_run", broken_save)
+
+        @traced_job("analyzer")
+        async def job():
+            return {"success": True}
+
+        assert await job() == {"success": True}
+
+    async def test_http_bytes_counted(self, saved, monkeypatch):
+        def site(request):
+            return httpx.Response(200, content=b"x" * 1000)
+
+        await close_http_client()
+        monkeypatch.setattr(replay, "make_transport", lambda limits: httpx.MockTransport(site))
+
+        @traced_job("scraper")
+        async def job():
+            with job_span("scrape", "weibo"):
+                await get_http_client().get("https://s.weibo.com/top/summary")
+            return {"success": True}
+
+        try:
+            await job()
+        finally:
+            await close_http_client()
+        assert saved[0]["bytes"] == 1000
+
+
+class TestJobRunsDb:
+    """测试运行记录读写"""
+
+    async def test_save_and_load(self, runs_conn):
+        spans = [{"kind": "scrape", "name": "微博", "duration_ms": 12.5}]
+        for job, duration in (("scraper", 100.0), ("analyzer", 200.0), ("scraper", 300.0)):
+            await job_runs_db.save_job_run(
+                job=job, started_at="2099-01-01 10:00:00", duration_ms=duration, success=True,
+                items=1, bytes=2, tokens=3, errors=0, spans=spans,
+            )
+
+        runs = await job_runs_db.get_recent_job_runs()
+        assert [(r["job"], r["duration_ms"]) for r in runs] == [
+            ("scraper", 300.0), ("analyzer", 200.0), ("scraper", 100.0),
+        ]
+        assert runs[0]["success"] is True
+        assert runs[0]["spans"] == spans
+        assert "rn" not in runs[0]
+
+        # 每个任务各取最近 limit 条
+        runs = await job_runs_db.get_recent_job_runs(limit=1)
+        assert sorted(r["duration_ms"] for r in runs) == [200.0, 300.0]
+        runs = await job_runs_db.get_recent_job_runs(job="scraper", limit=10)
+        assert [r["duration_ms"] for r in runs] == [300.0, 100.0]
+
+    async def test_old_runs_pruned(self, runs_conn):
+        kwargs = dict(job="scraper", duration_ms=1.0, success=True, items=0, bytes=0, tokens=0, errors=0, spans=[])
+        await job_runs_db.save_job_run(started_at="2000-01-01 00:00:00", **kwargs)
+        await job_runs_db.save_job_run(started_at="2099-01-01 00:00:00", **kwargs)
+
+        runs = await job_runs_db.get_recent_job_runs()
+        assert [r["started_at"] for r in runs] == ["2099-01-01 00:00:00"]
+
+
+class TestSummary:
+    """测试分位数统计"""
+
+    def test_percentile(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.5
+        assert percentile(values, 90) == 90.1
+        assert percentile([7.0], 99) == 7.0
+        assert percentile([], 50) == 0.0
+
+    def test_summarize(self):
+        def run(job, duration, success, spans):
+            return {
+                "job": job, "started_at": f"2024-01-01 {int(duration):02d}:00:00", "duration_ms": duration,
+                "success": success, "items": 10, "bytes": 0, "tokens": 5, "errors": 0, "spans": spans,
+            }
+
+        def span(name, duration, errors=0):
+            return {"kind": "scrape", "name": name, "duration_ms": duration, "items": 5,
+                    "bytes": 100, "tokens": 0, "errors": errors}
+
+        summary = summarize_job_runs([
+            run("scraper", 10.0, True, [span("weibo", 2.0), span("douyin", 6.0, errors=1)]),
+            run("scraper", 20.0, False, [span("weibo", 4.0)]),
+            run("selector", 5.0, True, []),
+        ])
+
+        scraper = summary["scraper"]
+        assert scraper["runs"] == 2
+        assert scraper["success_rate"] == 0.5
+        assert scraper["last_run"] == "2024-01-01 20:00:00"
+        assert scraper["duration_ms"]["max"] == 20.0
+        assert scraper["tokens"] == 10
+        assert list(scraper["spans"]) == ["scrape:douyin", "scrape:weibo"]
+
+        weibo = scraper["spans"]["scrape:weibo"]
+        assert weibo["count"] == 2
+        assert weibo["duration_ms"]["p50"] == 3.0
+        assert weibo["share"] == 0.2
+        assert weibo["bytes"] == 200
+        assert scraper["spans"]["scrape:douyin"]["errors"] == 1
+        assert summary["selector"]["spans"] == {}
@@ -9,6 +9,8 @@ from core.log_utils import (
     get_log_count,
     get_logs_by_level,
     get_recent_logs,
+    get_logs_since,
+    get_last_log_id,
     LOG_LIMIT,
 )
 
@@ -83,7 +85,7 @@ class TestLogBuffer:
             add_log_to_buffer("info", f"Message {i}")
 
         recent = get_recent_logs(5)
-        assert len(recent)) == 5
+        assert len(recent) == 5
         # 应该是最新的 5 条
         assert recent[0]["message"] == "Message 19"
 
@@ -97,3 +99,44 @@ class TestLogBuffer:
 
         logs = get_logs_by_level("error")
         assert len(logs) == 1
+
+    def test_log_ids_are_monotonic(self):
+        """测试日志序号单调递增（清空后也不重置）"""
+        first = add_log_to_buffer("info", "A")
+        clear_logs()
+        second = add_log_to_buffer("info", "B")
+        assert second["id"] == first["id"] + 1
+        assert get_last_log_id() == second["id"]
+
+
+class TestLogsSince:
+    """测试按序号增量获取日志"""
+
+    def setup_method(self):
+        clear_logs()
+
+    def test_returns_newer_logs_in_order(self):
+        entries = [add_log_to_buffer("info", f"Message {i}") for i in range(5)]
+
+        logs = get_logs_since(entries[2]["id"])
+        assert [log["message"] for log in logs] == ["Message 3", "Message 4"]
+
+    def test_no_new_logs(self):
+        entry = add_log_to_buffer("info", "Test")
+        assert get_logs_since(entry["id"]) == []
+
+    def test_after_buffer_wraps(self):
+        """缓冲区写满后仍能正确返回新增日志"""
+        for i in range(LOG_LIMIT + 10):
+            entry = add_log_to_buffer("info", f"Message {i}")
+
+        logs = get_logs_since(entry["id"] - 3)
+        assert [log["message"] for log in logs] == [f"Message {LOG_LIMIT + i}" for i in range(7, 10)]
+
+    def test_stale_cursor_returns_whole_buffer(self):
+        for i in range(LOG_LIMIT + 10):
+            add_log_to_buffer("info", f"Message {i}")
+
+        logs = get_logs_since(0)
+        assert len(logs) == LOG_LIMIT
+        assert logs[-1]["message"] == f"Message {LOG_LIMIT + 9}"
@@ -0,0 +1,75 @@
+"""
+数据库版本迁移单元测试
+"""
+import aiosqlite
+import pytest
+
+import core  # noqa: F401
+from db.migrations import LATEST_VERSION, get_schema_version, run_migrations
+
+
+@pytest.fixture
+async def conn(tmp_path):
+    """临时数据库连接"""
+    db = await aiosqlite.connect(str(tmp_path / "migrations.db"))
+    db.row_factory = aiosqlite.Row
+    yield db
+    await db.close()
+
+
+async def table_columns(db, table):
+    async with db.execute(f"PRAGMA table_info({table})") as cursor:
+        return {r[1] for r in await cursor.fetchall()}
+
+
+class TestMigrations:
+    """测试迁移执行"""
+
+    async def test_fresh_database(self, conn):
+        applied = await run_migrations(conn)
+
+        assert [m.version for m in applied] == list(range(1, LATEST_VERSION + 1))
+        assert await get_schema_version(conn) == LATEST_VERSION
+        assert {"ai_score", "ai_comment", "category_id"} <= await table_columns(conn, "hot_topics")
+
+    async def test_fast_path_skips_ddl(self, conn):
+        """结构已是最新时不执行任何语句"""
+        await run_migrations(conn)
+
+        statements = []
+        await conn.set_trace_callback(statements.append)
+        applied = await run_migrations(conn)
+        await conn.set_trace_callback(None)
+
+        assert applied == []
+        assert statements == ["PRAGMA user_version"]
+
+    async def test_upgrade_legacy_database(self, conn):
+        """旧版本数据库（无 user_version）补齐字段且保留数据"""
+        await conn.executescript('''
+            CREATE TABLE hot_topics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, link TEXT NOT NULL,
+                source TEXT NOT NULL, heat INTEGER DEFAULT 0, tags TEXT, comment TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO hot_topics (title, link, source) VALUES ('旧数据', 'https://a.com', '微博');
+        ''')
+
+        await run_migrations(conn)
+
+        assert {"category_id", "matched_keyword", "ai_score"} <= await table_columns(conn, "hot_topics")
+        async with conn.execute("SELECT COUNT(*) FROM hot_topics") as cursor:
+            assert (await cursor.fetchone())[0] == 1
+
+    async def test_dry_run_does_not_modify(self, conn, monkeypatch):
+        from db import search
+
+        monkeypatch.setattr(search, "_fts_available", None)
+        pending = await run_migrations(conn, dry_run=True)
+        # 试运行不更新全文索引可用状态
+        assert search._fts_available is None
+
+        assert len(pending) == LATEST_VERSION
+        assert await get_schema_version(conn) == 0
+        async with conn.execute("SELECT COUNT(*) FROM sqlite_master") as cursor:
+            assert (await cursor.fetchone())[0] == 0
@@ -0,0 +1,140 @@
+"""
+爬虫流量录制与回放单元测试
+"""
+import gzip
+
+import httpx
+import pytest
+
+from scrapers import replay
+from scrapers.http_client import close_http_client, get_http_client
+from scrapers.replay import (
+    FixtureStore,
+    RecordingTransport,
+    ReplayMissError,
+    ReplayTransport,
+    StandInTransport,
+    fixture_app,
+    request_key,
+)
+from scrapers.weibo import WeiboScraper
+from utils import is_retryable
+
+WEIBO_PAGE = (
+    '<table><tr><td class="td-02"><a href="/weibo?q=a">话题A</a></td></tr>'
+    '<tr><td class="td-02"><a href="/weibo?q=b">话题B</a></td></tr></table>'
+)
+
+
+def site(request: httpx.Request) -> httpx.Response:
+    """模拟站点：返回 gzip 压缩的页面"""
+    body = gzip.compress(f"{request.url.path}?{request.url.query.decode()}".encode())
+    return httpx.Response(200, headers={"content-type": "text/plain", "content-encoding": "gzip"}, content=body)
+
+
+@pytest.fixture
+async def replay_dir(tmp_path):
+    """录制目录，测试结束后恢复正常模式"""
+    yield str(tmp_path)
+    await close_http_client()
+    replay.configure_replay()
+
+
+class TestFixtureStore:
+    """测试录制文件"""
+
+    def test_request_key_normalized(self):
+        assert request_key("get", "https://a.com/p?b=2&a=1#x") == request_key("GET", "https://a.com/p?a=1&b=2")
+        assert request_key("GET", "https://a.com") == "GET https://a.com/"
+
+    async def test_record_and_replay(self, tmp_path):
+        store = FixtureStore(str(tmp_path / "http.har"))
+        async with httpx.AsyncClient(transport=RecordingTransport(store, httpx.MockTransport(site))) as client:
+            response = await client.get("https://a.com/list", params={"page": "1"}, headers={"Cookie": "secret=1"})
+        assert response.text == "/list?page=1"
+        assert "content-encoding" not in response.headers
+        store.save()
+
+        loaded = FixtureStore.load(store.path)
+        assert len(loaded) == 1
+        assert all(h["name"].lower() != "cookie" for h in loaded.entries[0]["request"]["headers"])
+        async with httpx.AsyncClient(transport=ReplayTransport(loaded)) as client:
+            response = await client.get("https://a.com/list?page=1")
+            assert response.status_code == 200
+            assert response.text == "/list?page=1"
+            assert response.headers["content-type"] == "text/plain"
+
+            with pytest.raises(ReplayMissError) as exc_info:
+                await client.get("https://a.com/other")
+        assert not is_retryable(exc_info.value)
+
+    def test_binary_body(self, tmp_path):
+        store = FixtureStore(str(tmp_path / "http.har"))
+        request = httpx.Request("GET", "https://a.com/image")
+        store.add(request, httpx.Response(200, content=b"\xff\x00\xfe", request=request), 0.0)
+        store.save()
+        entry = FixtureStore.load(store.path).lookup("GET", "https://a.com/image")
+        assert replay.entry_body(entry) == b"\xff\x00\xfe"
+
+    def test_repeated_requests_cycle(self, tmp_path):
+        store = FixtureStore(str(tmp_path / "http.har"))
+        for text in ("first", "second"):
+            request = httpx.Request("GET", "https://a.com/")
+            store.add(request, httpx.Response(200, text=text, request=request), 0.0)
+        bodies = [replay.entry_body(store.lookup("GET", "https://a.com/")) for _ in range(3)]
+        assert bodies == [b"first", b"second", b"first"]
+
+
+class TestReplayMode:
+    """测试共享 HTTP 客户端的录制/回放模式"""
+
+    async def test_scraper_replays_recording(self, replay_dir):
+        store = FixtureStore(f"{replay_dir}/http.har")
+        request = httpx.Request("GET", "https://s.weibo.com/top/summary")
+        store.add(request, httpx.Response(200, text=WEIBO_PAGE, request=request), 0.0)
+        store.save()
+
+        replay.configure_replay("replay", replay_dir)
+        await close_http_client()
+        items = await WeiboScraper().scrape(limit=10)
+        assert [item["title"] for item in items] == ["话题A", "话题B"]
+
+    async def test_record_mode_saves_on_close(self, replay_dir, monkeypatch):
+        replay.configure_replay("record", replay_dir)
+        await close_http_client()
+        monkeypatch.setattr(
+            replay, "make_transport",
+            lambda limits: RecordingTransport(replay.get_http_store(), httpx.MockTransport(site)),
+        )
+        response = await get_http_client().get("https://a.com/x")
+        assert response.text == "/x?"
+        await close_http_client()
+
+        assert len(FixtureStore.load(f"{replay_dir}/http.har")) == 1
+
+    async def test_off_mode_uses_default_transport(self, replay_dir):
+        replay.configure_replay("off", replay_dir)
+        await close_http_client()
+        assert replay.make_transport(httpx.Limits()) is None
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            replay.configure_replay("live")
+
+
+class TestStandInServer:
+    """测试本地替身服务器"""
+
+    async def test_round_trip(self, tmp_path):
+        store = FixtureStore(str(tmp_path / "http.har"))
+        request = httpx.Request("GET", "https://api.example.com/hot?b=2&a=1")
+        store.add(request, httpx.Response(200, json={"ok": True}, request=request), 0.0)
+
+        transport = StandInTransport("http://stand-in", httpx.ASGITransport(app=fixture_app(store)))
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://api.example.com/hot", params={"a": "1", "b": "2"})
+            assert response.json() == {"ok": True}
+            assert response.request.url.host == "api.example.com"
+
+            response = await client.get("https://api.example.com/missing")
+            assert response.status_code == 404
@@ -0,0 +1,82 @@
+"""
+数据保留与归档模块单元测试
+"""
+import gzip
+import json
+import os
+from contextlib import asynccontextmanager
+
+import aiosqlite
+import pytest
+from db import retention
+from db.retention import _append_archive, archive_old_rows, enable_incremental_vacuum
+
+
+class TestArchiveFiles:
+    """测试归档文件写入"""
+
+    def test_rows_grouped_by_month(self, tmp_path):
+        rows = [
+            {"id": 1, "title": "一月新闻", "created_at": "2024-01-31 23:00:00"},
+            {"id": 2, "title": "二月新闻", "created_at": "2024-02-01 08:00:00"},
+            {"id": 3, "title": "二月新闻2", "created_at": "2024-02-15 08:00:00"},
+        ]
+
+        written = _append_archive(str(tmp_path), "raw_news", rows)
+
+        jan = os.path.join(str(tmp_path), "raw_news", "raw_news-2024-01.jsonl.gz")
+        feb = os.path.join(str(tmp_path), "raw_news", "raw_news-2024-02.jsonl.gz")
+        assert written == {jan: 1, feb: 2}
+
+        with gzip.open(feb, "rt", encoding="utf-8") as f:
+            assert [json.loads(line)["id"] for line in f] == [2, 3]
+
+    def test_append_to_existing_month(self, tmp_path):
+        """同一月份多次归档追加到同一文件"""
+        _append_archive(str(tmp_path), "hot_topics", [{"id": 1, "created_at": "2024-03-01"}])
+        _append_archive(str(tmp_path), "hot_topics", [{"id": 2, "created_at": "2024-03-02"}])
+
+        path = os.path.join(str(tmp_path), "hot_topics", "hot_topics-2024-03.jsonl.gz")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert [json.loads(line)["id"] for line in f] == [1, 2]
+
+
+class TestArchiveOldRows:
+    """测试归档参数校验"""
+
+    async def test_rejects_unknown_table(self):
+        with pytest.raises(ValueError):
+            await archive_old_rows("users", 7)
+
+
+class TestIncrementalVacuum:
+    """测试增量 VACUUM"""
+
+    @pytest.fixture
+    async def vacuum_db(self, tmp_path, monkeypatch):
+        """未启用增量 VACUUM 的旧数据库"""
+        conn = await aiosqlite.connect(str(tmp_path / "vacuum.db"))
+        await conn.execute("CREATE TABLE t (v TEXT)")
+        await conn.commit()
+
+        @asynccontextmanager
+        async def fake_get_db():
+            yield conn
+
+        monkeypatch.setattr(retention, "get_db", fake_get_db)
+        yield conn
+        await conn.close()
+
+    async def _mode(self, conn):
+        async with conn.execute("PRAGMA auto_vacuum") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def test_scheduled_run_skips_full_vacuum(self, vacuum_db):
+        """定时任务不在旧数据库上执行完整 VACUUM"""
+        assert await retention.incremental_vacuum() == 0
+        assert await self._mode(vacuum_db) == 0
+
+    async def test_explicit_conversion(self, vacuum_db):
+        assert await enable_incremental_vacuum(vacuum_db)
+        assert await self._mode(vacuum_db) == 2
+        assert not await enable_incremental_vacuum(vacuum_db)
@@ -0,0 +1,294 @@
+"""
+重试机制单元测试
+"""
+import httpx
+import pytest
+
+from core import runtime_state
+from core.tasks import job_retry_budget
+from utils import retry as retry_module
+from utils.retry import (
+    RetryableError,
+    get_retry_metrics,
+    is_retryable,
+    reset_retry_metrics,
+    retry_after_seconds,
+    retry_budget,
+    with_retry,
+)
+
+
+def status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.com/")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+# 与 openai 异常同名的测试类（分类按模块和类名判断，不依赖 openai 包）
+class APIConnectionError(Exception):
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    pass
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+APIConnectionError.__module__ = APITimeoutError.__module__ = BadRequestError.__module__ = "openai._exceptions"
+
+
+def fast_retry(**kwargs):
+    """不等待的重试装饰器"""
+    return with_retry(max_attempts=3, min_wait=0, max_wait=0, **kwargs)
+
+
+class TestClassification:
+    """测试异常分类"""
+
+    def test_httpx_transport_errors(self):
+        request = httpx.Request("GET", "https://example.com/")
+        assert is_retryable(httpx.ConnectError("refused", request=request))
+        assert is_retryable(httpx.ReadTimeout("timeout", request=request))
+        assert not is_retryable(httpx.InvalidURL("bad url"))
+
+    def test_httpx_status(self):
+        assert is_retryable(status_error(503))
+        assert is_retryable(status_error(429))
+        assert not is_retryable(status_error(404))
+        assert not is_retryable(status_error(401))
+
+    def test_openai_errors(self):
+        assert is_retryable(APIConnectionError())
+        assert is_retryable(APITimeoutError())
+        assert not is_retryable(BadRequestError())
+
+    def test_builtin_errors(self):
+        assert not is_retryable(ValueError("bad"))
+        assert not is_retryable(KeyError("missing"))
+        assert is_retryable(ConnectionResetError())
+        assert is_retryable(RetryableError("empty"))
+
+
+class TestRetryAfter:
+    """测试 Retry-After 解析"""
+
+    def test_seconds_and_milliseconds(self):
+        assert retry_after_seconds(status_error(429, {"Retry-After": "7"})) == 7
+        assert retry_after_seconds(status_error(429, {"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(status_error(429)) is None
+        assert retry_after_seconds(status_error(429, {"Retry-After": "soon"})) is None
+
+    def test_http_date(self):
+        hint = retry_after_seconds(status_error(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}))
+        assert hint == 0
+
+    async def test_over_cap_not_retried(self):
+        calls = []
+
+        @fast_retry(max_retry_after=10)
+        async def limited():
+            calls.append(1)
+            raise status_error(429, {"Retry-After": "120"})
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await limited()
+        assert len(calls) == 1
+
+    async def test_hint_used_as_wait(self):
+        calls = []
+
+        @fast_retry()
+        async def limited():
+            calls.append(1)
+            if len(calls) == 1:
+                raise status_error(429, {"retry-after-ms": "1"})
+            return "ok"
+
+        assert await limited() == "ok"
+        assert len(calls) == 2
+
+
+class TestWithRetry:
+    """测试重试装饰器"""
+
+    async def test_not_retryable_raises_immediately(self):
+        calls = []
+
+        @fast_retry()
+        async def broken():
+            calls.append(1)
+            raise ValueError("bug")
+
+        with pytest.raises(ValueError):
+            await broken()
+        assert len(calls) == 1
+
+    async def test_retries_until_success(self):
+        calls = []
+
+        @fast_retry()
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise RetryableError("try again")
+            return "ok"
+
+        assert await flaky() == "ok"
+        assert len(calls) == 3
+
+    async def test_timeouts_not_retried(self):
+        calls = []
+
+        @fast_retry(retry_timeouts=False)
+        async def slow():
+            calls.append(1)
+            raise APITimeoutError()
+
+        with pytest.raises(APITimeoutError):
+            await slow()
+        assert len(calls) == 1
+
+    def test_sync_function(self):
+        calls = []
+
+        @fast_retry()
+        def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise ConnectionResetError()
+            return "ok"
+
+        assert flaky() == "ok"
+        assert len(calls) == 2
+
+    def test_exception_types(self):
+        calls = []
+
+        @fast_retry(exception_types=(KeyError,))
+        def flaky():
+            calls.append(1)
+            raise KeyError("x")
+
+        with pytest.raises(KeyError):
+            flaky()
+        assert len(calls) == 3
+
+
+class TestRetryBudget:
+    """测试重试预算"""
+
+    async def test_budget_shared_across_calls(self):
+        calls = []
+
+        @fast_retry()
+        async def down():
+            calls.append(1)
+            raise RetryableError("down")
+
+        with retry_budget(3) as budget:
+            for _ in range(3):
+                with pytest.raises(RetryableError):
+                    await down()
+
+        # 第一次调用重试 2 次，第二次重试 1 次后预算用完，第三次不再重试
+        assert len(calls) == 6
+        assert budget.used == 3
+        assert budget.denied == 2
+
+    async def test_exhausted_attempts_do_not_spend(self):
+        @fast_retry()
+        async def down():
+            raise RetryableError("down")
+
+        with retry_budget(10) as budget:
+            with pytest.raises(RetryableError):
+                await down()
+        assert budget.used == 2
+        assert budget.denied == 0
+
+    async def test_no_budget_outside_context(self):
+        calls = []
+
+        @fast_retry()
+        async def down():
+            calls.append(1)
+            raise RetryableError("down")
+
+        with retry_budget(0):
+            pass
+        with pytest.raises(RetryableError):
+            await down()
+        assert len(calls) == 3
+
+
+class TestRetryMetrics:
+    """测试重试统计"""
+
+    @pytest.fixture(autouse=True)
+    def clean_stats(self, monkeypatch):
+        monkeypatch.setattr(retry_module, "_stats", {})
+
+    async def test_counts(self):
+        attempts = []
+
+        @fast_retry(name="test")
+        async def flaky(fail: bool):
+            attempts.append(1)
+            if fail:
+                raise ValueError("bug")
+            if len(attempts) == 1:
+                raise RetryableError("again")
+            return "ok"
+
+        await flaky(False)
+        with pytest.raises(ValueError):
+            await flaky(True)
+
+        metrics = get_retry_metrics()["test"]
+        assert metrics["calls"] == 2
+        assert metrics["retries"] == 1
+        assert metrics["failures"] == 1
+        assert metrics["not_retryable"] == 1
+
+    async def test_reset_keeps_decorator_stats(self):
+        @fast_retry(name="test")
+        async def ok():
+            return "ok"
+
+        await ok()
+        reset_retry_metrics()
+        assert get_retry_metrics()["test"]["calls"] == 0
+        await ok()
+        assert get_retry_metrics()["test"]["calls"] == 1
+
+
+class TestJobRetryBudget:
+    """测试任务重试预算装饰器"""
+
+    async def test_budget_per_run(self, monkeypatch):
+        monkeypatch.setattr("core.tasks.get_config", lambda key, default=None: 1)
+        calls = []
+
+        @fast_retry()
+        async def down():
+            calls.append(1)
+            raise RetryableError("down")
+
+        @job_retry_budget
+        async def job():
+            for _ in range(2):
+                try:
+                    await down()
+                except RetryableError:
+                    pass
+            return "done"
+
+        assert await job() == "done"
+        # 预算 1 次：第一次调用重试 1 次后用完，第二次调用不再重试
+        assert len(calls) == 3
+        assert await job() == "done"
+        assert len(calls) == 6
+        assert "down" in " ".join(runtime_state["retry_metrics"])
@@ -1,8 +1,21 @@
 """
 爬虫基类和工厂单元测试
 """
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
 import pytest
+from scrapers import base as scrapers_base
+from scrapers import breaker as breaker_module
+from scrapers import http_client, tophub
 from scrapers.base import BaseScraper, HTTPScraper, PlaywrightScraper
+from scrapers.breaker import CircuitBreaker
+from scrapers.douyin import DouyinScraper
+from scrapers.toutiao import ToutiaoScraper
+from scrapers.xiaohongshu import XiaohongshuScraper
+from scrapers.zhihu import ZhihuScraper
 from scrapers.factory import ScraperFactory, register_scraper
 
 
@@ -134,3 +147,630 @@ class TestScraperFactory:
 
         assert ScraperFactory.is_platform_available("available") is True
         assert ScraperFactory.is_platform_available("not_available") is False
+
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, resource_type):
+        self.request = FakeRequest(resource_type)
+        self.action = None
+
+    async def fallback(self):
+        self.action = "fallback"
+
+    async def abort(self):
+        self.action = "abort"
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+
+    async def goto(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return "response"
+
+
+class MockPlaywrightScraper(PlaywrightScraper):
+    """测试用浏览器爬虫"""
+
+    def get_platform_name(self) -> str:
+        return "测试浏览器平台"
+
+    async def scrape(self, limit: int = 10) -> list:
+        return []
+
+
+class TestPlaywrightScraper:
+    """测试浏览器爬虫的资源拦截和流量统计"""
+
+    @pytest.mark.parametrize("resource_type", ["document", "script", "xhr", "fetch"])
+    async def test_allowed_resources_continue(self, resource_type):
+        scraper = MockPlaywrightScraper()
+        route = FakeRoute(resource_type)
+        await scraper._route_request(route)
+        assert route.action == "fallback"
+        assert scraper.metrics.blocked == 0
+
+    @pytest.mark.parametrize("resource_type", ["image", "media", "font", "stylesheet", "ping"])
+    async def test_heavy_resources_blocked(self, resource_type):
+        scraper = MockPlaywrightScraper()
+        route = FakeRoute(resource_type)
+        await scraper._route_request(route)
+        assert route.action == "abort"
+        assert scraper.metrics.blocked == 1
+
+    async def test_subclass_allowlist(self):
+        """服务端渲染的页面只加载文档"""
+        scraper = MockPlaywrightScraper()
+        scraper.allowed_resource_types = frozenset({"document"})
+        route = FakeRoute("script")
+        await scraper._route_request(route)
+        assert route.action == "abort"
+
+    async def test_goto_measures_load_time(self):
+        scraper = MockPlaywrightScraper()
+        page = FakePage()
+        assert await scraper.goto(page, "https://test.com", wait_until="domcontentloaded") == "response"
+        url, kwargs = page.calls[0]
+        assert url == "https://test.com"
+        assert kwargs["timeout"] == 30000
+        assert kwargs["wait_until"] == "domcontentloaded"
+        assert scraper.metrics.load_time > 0
+
+    def test_record_metrics(self):
+        from core.config import runtime_state
+
+        scraper = MockPlaywrightScraper()
+        scraper.metrics.requests = 3
+        scraper.metrics.blocked = 7
+        scraper.metrics.bytes = 2048
+        scraper._record_metrics()
+        assert runtime_state["scraper_metrics"]["测试浏览器平台"] == {
+            "requests": 3, "blocked": 7, "bytes": 2048, "load_time": 0.0,
+        }
+
+
+class FakeResponse:
+    def __init__(self, url, status=200, body=None):
+        self.url = url
+        self.status = status
+        self.body = body
+
+    async def json(self):
+        if self.body is None:
+            raise ValueError("invalid json")
+        return self.body
+
+
+class FakeLoadingPage:
+    """按时间表发出响应的页面：navigation_time 秒后加载完成（None 表示抛出加载超时）"""
+
+    def __init__(self, responses, navigation_time=0.0):
+        self.responses = responses
+        self.navigation_time = navigation_time
+        self.listeners = []
+        self.routes = []
+        self.navigation_cancelled = False
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+    async def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+    async def _emit(self):
+        for delay, response in self.responses:
+            await asyncio.sleep(delay)
+            for handler in list(self.listeners):
+                await handler(response)
+
+    async def goto(self, url, **kwargs):
+        self.emitter = asyncio.ensure_future(self._emit())
+        try:
+            if self.navigation_time is None:
+                await asyncio.sleep(0.05)
+                raise TimeoutError("navigation timeout")
+            await asyncio.sleep(self.navigation_time)
+        except asyncio.CancelledError:
+            self.navigation_cancelled = True
+            raise
+        finally:
+            # 加载失败或被中止时不再产生响应；正常加载完成后页面脚本仍可能发出请求
+            if self.navigation_cancelled or self.navigation_time is None:
+                self.emitter.cancel()
+
+
+def is_api(response):
+    return "api/hot" in response.url and response.status == 200
+
+
+async def parse_api(response):
+    return (await response.json())["list"]
+
+
+class TestCaptureResponse:
+    """测试 API 响应捕获"""
+
+    async def test_returns_as_soon_as_captured(self):
+        """数据到达后立即返回并中止页面加载"""
+        scraper = MockPlaywrightScraper()
+        page = FakeLoadingPage([(0.01, FakeResponse("https://x.com/api/hot", body={"list": [1, 2]}))],
+                               navigation_time=10)
+        start = time.perf_counter()
+        assert await scraper.capture_response(page, "https://x.com", is_api, parse_api) == [1, 2]
+        assert time.perf_counter() - start < 1
+        assert page.navigation_cancelled
+        assert page.routes == ["**/*"]
+        assert page.listeners == []
+
+    async def test_skips_unmatched_and_unparsable(self):
+        """不匹配、解析失败、数据为空的响应不结束等待"""
+        scraper = MockPlaywrightScraper()
+        page = FakeLoadingPage([
+            (0, FakeResponse("https://x.com/other", body={"list": [0]})),
+            (0, FakeResponse("https://x.com/api/hot", status=500, body={"list": [0]})),
+            (0, FakeResponse("https://x.com/api/hot")),
+            (0, FakeResponse("https://x.com/api/hot", body={"list": []})),
+            (0.01, FakeResponse("https://x.com/api/hot", body={"list": [3]})),
+        ], navigation_time=10)
+        assert await scraper.capture_response(page, "https://x.com", is_api, parse_api) == [3]
+
+    async def test_response_after_load_within_grace(self):
+        scraper = MockPlaywrightScraper()
+        page = FakeLoadingPage([(0.05, FakeResponse("https://x.com/api/hot", body={"list": [4]}))])
+        assert await scraper.capture_response(page, "https://x.com", is_api, parse_api, grace=1) == [4]
+        assert not page.navigation_cancelled
+
+    async def test_no_grace_returns_after_load(self):
+        """页面加载完成且不设等待时间时立即返回 None"""
+        scraper = MockPlaywrightScraper()
+        page = FakeLoadingPage([(1, FakeResponse("https://x.com/api/hot", body={"list": [4]}))])
+        start = time.perf_counter()
+        assert await scraper.capture_response(page, "https://x.com", is_api, parse_api) is None
+        assert time.perf_counter() - start < 0.5
+        page.emitter.cancel()
+
+    async def test_deadline(self):
+        scraper = MockPlaywrightScraper()
+        page = FakeLoadingPage([], navigation_time=10)
+        start = time.perf_counter()
+        assert await scraper.capture_response(page, "https://x.com", is_api, parse_api, timeout=0.1) is None
+        assert time.perf_counter() - start < 0.5
+        assert page.navigation_cancelled
+
+    async def test_navigation_error_raised(self):
+        scraper = MockPlaywrightScraper()
+        page = FakeLoadingPage([], navigation_time=None)
+        with pytest.raises(TimeoutError):
+            await scraper.capture_response(page, "https://x.com", is_api, parse_api, grace=5)
+
+
+class TestSessionCache:
+    """测试浏览器会话 Cookie 缓存"""
+
+    def setup_method(self):
+        http_client.clear_session()
+
+    def test_store_filters_domain_and_expired(self):
+        cookies = [
+            {"name": "ttwid", "value": "1", "domain": ".douyin.com", "expires": -1},
+            {"name": "sid", "value": "2", "domain": "www.douyin.com", "expires": time.time() + 60},
+            {"name": "old", "value": "3", "domain": ".douyin.com", "expires": time.time() - 60},
+            {"name": "other", "value": "4", "domain": ".example.com", "expires": -1},
+        ]
+        assert http_client.store_session("抖音", cookies, "douyin.com") == 2
+        assert http_client.get_session_cookies("抖音") == {"ttwid": "1", "sid": "2"}
+
+    def test_session_expiry(self, monkeypatch):
+        http_client.store_session("抖音", [{"name": "a", "value": "1", "domain": ".douyin.com"}], "douyin.com")
+        monkeypatch.setattr(http_client.time, "time", lambda: 1e12)
+        assert http_client.get_session_cookies("抖音") is None
+
+    def test_clear(self):
+        http_client.store_session("抖音", [{"name": "a", "value": "1", "domain": ".douyin.com"}], "douyin.com")
+        http_client.clear_session("抖音")
+        assert http_client.get_session_cookies("抖音") is None
+
+    async def test_client_reused(self):
+        client = http_client.get_http_client()
+        assert http_client.get_http_client() is client
+        await http_client.close_http_client()
+        assert http_client.get_http_client() is not client
+        await http_client.close_http_client()
+
+
+class TestApiFastPath:
+    """测试抖音、头条接口直连和浏览器回退"""
+
+    @pytest.fixture
+    def api(self, monkeypatch):
+        """替换共享客户端的传输层，记录请求并按 handler 返回响应"""
+        requests = []
+        state = {"handler": None}
+
+        def handle(request):
+            requests.append(request)
+            return state["handler"](request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        monkeypatch.setattr(scrapers_base, "get_http_client", lambda: client)
+        http_client.clear_session()
+        yield state, requests
+        http_client.clear_session()
+
+    @staticmethod
+    def browser_fallback(monkeypatch, scraper_cls, result):
+        calls = []
+
+        async def fake_browser(self, *args):
+            calls.append(args)
+            return result
+
+        monkeypatch.setattr(scraper_cls, "_scrape_browser", fake_browser)
+        return calls
+
+    async def test_douyin_api(self, api, monkeypatch):
+        state, requests = api
+        state["handler"] = lambda request: httpx.Response(
+            200, json={"data": {"word_list": [{"word": "热点一"}, {"word": "热点二"}]}}
+        )
+        browser_calls = self.browser_fallback(monkeypatch, DouyinScraper, [])
+        http_client.store_session("抖音", [{"name": "ttwid", "value": "abc", "domain": ".douyin.com"}], "douyin.com")
+
+        items = await DouyinScraper().scrape(limit=1)
+        assert items == [{
+            "title": "热点一", "link": "https://www.douyin.com/search/热点一?type=hot", "source": "抖音",
+        }]
+        assert browser_calls == []
+        assert requests[0].url.params["aid"] == "6383"
+        assert requests[0].headers["Cookie"] == "ttwid=abc"
+        assert requests[0].headers["User-Agent"] == DouyinScraper.user_agent
+
+    async def test_douyin_falls_back_to_browser(self, api, monkeypatch):
+        """接口失败时丢弃会话 Cookie 并回退到浏览器"""
+        state, _ = api
+        state["handler"] = lambda request: httpx.Response(403)
+        browser_calls = self.browser_fallback(monkeypatch, DouyinScraper, [{"word": "浏览器热点"}])
+        http_client.store_session("抖音", [{"name": "ttwid", "value": "abc", "domain": ".douyin.com"}], "douyin.com")
+
+        items = await DouyinScraper().scrape(limit=5)
+        assert [item["title"] for item in items] == ["浏览器热点"]
+        assert len(browser_calls) == 1
+        assert http_client.get_session_cookies("抖音") is None
+
+    async def test_empty_api_falls_back(self, api, monkeypatch):
+        state, _ = api
+        state["handler"] = lambda request: httpx.Response(200, json={"data": {"word_list": []}})
+        browser_calls = self.browser_fallback(monkeypatch, DouyinScraper, [])
+        assert await DouyinScraper().scrape(limit=5) == []
+        assert len(browser_calls) == 1
+
+    async def test_fast_path_disabled(self, api, monkeypatch):
+        state, requests = api
+        monkeypatch.setattr(scrapers_base, "get_config", lambda key, default=None: False
+                            if key == "scraper_api_fast_path" else default)
+        browser_calls = self.browser_fallback(monkeypatch, DouyinScraper, [])
+        await DouyinScraper().scrape(limit=5)
+        assert requests == []
+        assert len(browser_calls) == 1
+
+    async def test_toutiao_nested_api(self, api, monkeypatch):
+        state, _ = api
+        state["handler"] = lambda request: httpx.Response(200, json={"data": {"data": [
+            {"Title": "头条一", "Url": "/trending/1"},
+            {"Title": "头条一", "Url": "/trending/1"},
+            {"Title": "头条二", "Url": "https://www.toutiao.com/trending/2"},
+        ]}})
+        browser_calls = self.browser_fallback(monkeypatch, ToutiaoScraper, [])
+
+        items = await ToutiaoScraper().scrape(limit=5)
+        assert [item["link"] for item in items] == [
+            "https://www.toutiao.com/trending/1", "https://www.toutiao.com/trending/2",
+        ]
+        assert browser_calls == []
+
+
+TOPHUB_PAGE = '''
+<table class="table"><tbody>
+  <tr><td class="al"><a href="/l?e={node}1">{node} 第一</a></td></tr>
+  <tr><td class="al"><a href="/l?e={node}2">{node} 第二</a></td></tr>
+</tbody></table>
+'''
+
+
+class TestTophubSource:
+    """测试今日热榜聚合数据源"""
+
+    @pytest.fixture
+    def tophub_http(self, monkeypatch):
+        """按节点返回页面的 HTTP 传输层；failing 中的节点返回 403"""
+        requests = []
+        failing = set()
+
+        def handle(request):
+            node = request.url.path.rsplit("/", 1)[-1]
+            requests.append(node)
+            if node in failing:
+                return httpx.Response(403)
+            return httpx.Response(200, text=TOPHUB_PAGE.format(node=node))
+
+        async def direct_run_cpu(func, *args):
+            return func(*args)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        monkeypatch.setattr(tophub, "get_http_client", lambda: client)
+        monkeypatch.setattr(tophub, "run_cpu", direct_run_cpu)
+        tophub.clear_tophub_cache()
+        yield requests, failing
+        tophub.clear_tophub_cache()
+
+    @pytest.fixture
+    def rendered(self, monkeypatch):
+        """替换浏览器渲染，记录渲染的节点"""
+        nodes = []
+
+        @asynccontextmanager
+        async def fake_context(self, **options):
+            yield None
+
+        async def fake_render(self, context, node_id, limit):
+            nodes.append(node_id)
+            return [(f"{node_id} 渲染", f"https://tophub.today/l?e={node_id}")]
+
+        monkeypatch.setattr(tophub.TophubSource, "browser_context", fake_context)
+        monkeypatch.setattr(tophub.TophubSource, "_render_node", fake_render)
+        return nodes
+
+    async def test_one_fetch_feeds_both_platforms(self, tophub_http, rendered):
+        requests, _ = tophub_http
+        zhihu = await ZhihuScraper().scrape(limit=1)
+        xiaohongshu = await XiaohongshuScraper().scrape(limit=5)
+
+        assert zhihu == [{
+            "title": "mproPpoq6O 第一", "link": "https://tophub.today/l?e=mproPpoq6O1", "source": "知乎",
+        }]
+        assert [item["title"] for item in xiaohongshu] == ["rYqoXQ8vOa 第一", "rYqoXQ8vOa 第二"]
+        assert sorted(requests) == sorted(tophub.TOPHUB_NODES.values())
+        assert rendered == []
+
+    async def test_concurrent_calls_share_fetch(self, tophub_http, rendered):
+        requests, _ = tophub_http
+        await asyncio.gather(
+            tophub.get_tophub_items("zhihu", 10),
+            tophub.get_tophub_items("xiaohongshu", 10),
+            tophub.get_tophub_items("zhihu", 10),
+        )
+        assert len(requests) == len(tophub.TOPHUB_NODES)
+
+    async def test_failed_nodes_rendered_in_browser(self, tophub_http, rendered):
+        """直接请求失败的节点才用浏览器渲染"""
+        _, failing = tophub_http
+        failing.add(tophub.TOPHUB_NODES["xiaohongshu"])
+        assert await tophub.get_tophub_items("xiaohongshu", 10) == [
+            ("rYqoXQ8vOa 渲染", "https://tophub.today/l?e=rYqoXQ8vOa"),
+        ]
+        assert rendered == [tophub.TOPHUB_NODES["xiaohongshu"]]
+        assert len(await tophub.get_tophub_items("zhihu", 10)) == 2
+
+    async def test_empty_result_not_cached(self, tophub_http, monkeypatch):
+        requests, failing = tophub_http
+        failing.update(tophub.TOPHUB_NODES.values())
+
+        @asynccontextmanager
+        async def fake_context(self, **options):
+            yield None
+
+        async def failing_render(self, context, node_id, limit):
+            raise TimeoutError("table timeout")
+
+        monkeypatch.setattr(tophub.TophubSource, "browser_context", fake_context)
+        monkeypatch.setattr(tophub.TophubSource, "_render_node", failing_render)
+
+        assert await tophub.get_tophub_items("zhihu", 10) == []
+        failing.clear()
+        assert len(await tophub.get_tophub_items("zhihu", 10)) == 2
+        assert len(requests) == 2 * len(tophub.TOPHUB_NODES)
+
+    async def test_browser_unavailable_keeps_http_rows(self, tophub_http, monkeypatch):
+        """浏览器启动失败时保留直接请求取回的节点"""
+        _, failing = tophub_http
+        failing.add(tophub.TOPHUB_NODES["xiaohongshu"])
+
+        @asynccontextmanager
+        async def broken_context(self, **options):
+            raise RuntimeError("Executable doesn't exist")
+            yield
+
+        monkeypatch.setattr(tophub.TophubSource, "browser_context", broken_context)
+
+        assert len(await tophub.get_tophub_items("zhihu", 10)) == 2
+        assert await tophub.get_tophub_items("xiaohongshu", 10) == []
+
+    async def test_failed_platform_not_cached(self, tophub_http, monkeypatch):
+        """部分节点失败时只缓存取到榜单的平台"""
+        requests, failing = tophub_http
+        failing.add(tophub.TOPHUB_NODES["xiaohongshu"])
+
+        @asynccontextmanager
+        async def fake_context(self, **options):
+            yield None
+
+        async def failing_render(self, context, node_id, limit):
+            raise TimeoutError("table timeout")
+
+        monkeypatch.setattr(tophub.TophubSource, "browser_context", fake_context)
+        monkeypatch.setattr(tophub.TophubSource, "_render_node", failing_render)
+
+        assert await tophub.get_tophub_items("xiaohongshu", 10) == []
+        failing.clear()
+        assert len(await tophub.get_tophub_items("xiaohongshu", 10)) == 2
+        assert len(requests) == 2 * len(tophub.TOPHUB_NODES)
+
+        # 知乎在缓存中，不再请求
+        assert len(await tophub.get_tophub_items("zhihu", 10)) == 2
+        assert len(requests) == 2 * len(tophub.TOPHUB_NODES)
+
+
+class FakeEvaluatePage:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def evaluate(self, script, arg):
+        self.calls.append((script, arg))
+        return self.result
+
+
+class TestExtractLinks:
+    """测试批量 DOM 提取"""
+
+    async def test_single_evaluate(self):
+        scraper = MockPlaywrightScraper()
+        page = FakeEvaluatePage([["标题一", "/a"], ["标题二", ""]])
+        rows = await scraper.extract_links(page, "table tr", "td.al a", limit=5)
+        assert rows == [("标题一", "/a"), ("标题二", "")]
+        assert len(page.calls) == 1
+        assert page.calls[0][1] == ["table tr", "td.al a", None, 5]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """测试平台熔断"""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(breaker_module.time, "monotonic", clock)
+        return clock
+
+    def test_opens_after_threshold(self, clock):
+        breaker = CircuitBreaker(threshold=2, cooldown=10, max_cooldown=100)
+        breaker.record_failure("超时")
+        assert breaker.allow()
+        breaker.record_failure("超时")
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.to_dict()["retry_in"] == 10
+
+    def test_half_open_single_probe(self, clock):
+        breaker = CircuitBreaker(threshold=1, cooldown=10, max_cooldown=100)
+        breaker.record_failure("超时")
+        clock.now += 10
+        assert breaker.allow()
+        assert breaker.state == "half_open"
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_exponential_cooldown(self, clock):
+        breaker = CircuitBreaker(threshold=1, cooldown=10, max_cooldown=25)
+        breaker.record_failure("超时")
+        for expected in (20, 25):
+            clock.now += breaker.current_cooldown()
+            assert breaker.allow()
+            breaker.record_failure("验证码")
+            assert breaker.state == "open"
+            assert breaker.current_cooldown() == expected
+
+    def test_release_allows_next_probe(self, clock):
+        breaker = CircuitBreaker(threshold=1, cooldown=10, max_cooldown=100)
+        breaker.record_failure("超时")
+        clock.now += 10
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+
+    def test_disabled(self):
+        breaker = CircuitBreaker(threshold=0, cooldown=10, max_cooldown=100)
+        for _ in range(10):
+            breaker.record_failure("超时")
+        assert breaker.allow()
+
+
+class TestFactoryBreaker:
+    """测试通过工厂抓取时的熔断"""
+
+    def setup_method(self):
+        ScraperFactory._scrapers.clear()
+        ScraperFactory.reset_breakers()
+
+    def teardown_method(self):
+        ScraperFactory.reset_breakers()
+
+    @staticmethod
+    def register(results):
+        """注册按顺序返回 results 的爬虫（异常实例会被抛出），返回调用计数"""
+        calls = []
+
+        @register_scraper("flaky")
+        class FlakyScraper(BaseScraper):
+            def get_platform_name(self) -> str:
+                return "Flaky"
+
+            async def scrape(self, limit: int = 10) -> list:
+                calls.append(limit)
+                result = results.pop(0)
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+            async def scrape_by_keywords(self, keywords, limit: int = 10) -> list:
+                return await self.scrape(limit)
+
+        return calls
+
+    async def test_empty_results_open_breaker(self, monkeypatch):
+        from core.config import runtime_state
+
+        calls = self.register([[], [], [], [{"title": "t"}]])
+        for _ in range(3):
+            assert await ScraperFactory.scrape("flaky") == []
+        assert ScraperFactory.get_breaker("flaky").state == "open"
+        assert await ScraperFactory.scrape("flaky") == []
+        assert len(calls) == 3
+        assert runtime_state["scraper_breakers"]["flaky"]["state"] == "open"
+        assert runtime_state["scraper_breakers"]["flaky"]["last_error"] == "抓取结果为空"
+
+    async def test_exceptions_counted_and_raised(self):
+        self.register([RuntimeError("blocked")] * 3)
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await ScraperFactory.scrape("flaky")
+        assert ScraperFactory.get_breaker("flaky").state == "open"
+
+    async def test_keyword_no_match_not_failure(self):
+        self.register([[], [], [], []])
+        for _ in range(4):
+            assert await ScraperFactory.scrape_by_keywords("flaky", ["关键词"]) == []
+        assert ScraperFactory.get_breaker("flaky").state == "closed"
+
+    async def test_probe_recovers(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(breaker_module.time, "monotonic", clock)
+        calls = self.register([[], [], [], [{"title": "t"}]])
+        for _ in range(3):
+            await ScraperFactory.scrape("flaky")
+        clock.now += 300
+        assert await ScraperFactory.scrape("flaky") == [{"title": "t"}]
+        assert ScraperFactory.get_breaker("flaky").state == "closed"
+        assert len(calls) == 4
+
+    async def test_unknown_platform(self):
+        with pytest.raises(ValueError):
+            await ScraperFactory.scrape("missing")
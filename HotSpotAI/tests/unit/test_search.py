@@ -0,0 +1,133 @@
+"""
+全文检索模块单元测试
+"""
+import sqlite3
+import pytest
+from db.search import (
+    FTS_SCHEMA,
+    build_search_query,
+    highlight_terms,
+    render_highlight,
+    split_terms,
+    to_match_expression,
+)
+
+
+@pytest.fixture
+def fts_conn():
+    """带全文索引的内存数据库"""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    for table in ("raw_news", "hot_topics"):
+        conn.execute(f'''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                link TEXT NOT NULL,
+                source TEXT NOT NULL,
+                category_id INTEGER,
+                ai_score DECIMAL(3,2),
+                ai_comment TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    for sql in FTS_SCHEMA:
+        conn.execute(sql)
+    conn.executemany(
+        "INSERT INTO raw_news (title, link, source, category_id, ai_score, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            ("某公司发布新一代大模型", "https://a.com/1", "微博", 1, 6.0, "2024-01-10 08:00:00"),
+            ("大模型价格战再升级", "https://a.com/2", "知乎", 1, 9.0, "2024-01-12 08:00:00"),
+            ("春运火车票开售", "https://a.com/3", "微博", 2, 7.0, "2024-01-12 09:00:00"),
+        ]
+    )
+    conn.execute(
+        "INSERT INTO hot_topics (title, link, source, ai_score) VALUES (?, ?, ?, ?)",
+        ("大模型进入手机", "https://a.com/4", "抖音", 8.0)
+    )
+    yield conn
+    conn.close()
+
+
+def run(conn, query, **kwargs):
+    sql, params, count_sql, count_params, use_fts = build_search_query(query, **kwargs)
+    rows = conn.execute(sql, params + [20, 0]).fetchall()
+    total = conn.execute(count_sql, count_params).fetchone()["count"]
+    return rows, total, use_fts
+
+
+class TestQueryHelpers:
+    """测试检索词处理"""
+
+    def test_split_terms_dedup(self):
+        assert split_terms("  大模型  芯片 大模型 ") == ["大模型", "芯片"]
+
+    def test_match_expression_escapes_syntax(self):
+        assert to_match_expression(['a"b', "OR"]) == '"a""b" "OR"'
+
+    def test_highlight_terms(self):
+        assert highlight_terms("春运火车票", ["火车"]) == "春运<mark>火车</mark>票"
+
+    def test_highlight_escapes_title(self):
+        """抓取的标题中的 HTML 被转义，只保留 <mark> 标签"""
+        assert highlight_terms('<img src=x onerror=alert(1)>火车', ["火车"]) == (
+            "&lt;img src=x onerror=alert(1)&gt;<mark>火车</mark>"
+        )
+        assert highlight_terms("<b>", []) == "&lt;b&gt;"
+
+    def test_highlight_ascii_case_insensitive(self):
+        """与 SQLite LIKE 一致，ASCII 字母不区分大小写"""
+        assert highlight_terms("OpenAI 发布 gpt-5", ["openai", "GPT"]) == (
+            "<mark>OpenAI</mark> 发布 <mark>gpt</mark>-5"
+        )
+
+    def test_highlight_overlapping_terms(self):
+        assert highlight_terms("大模型", ["模型", "大模型"]) == "<mark>大模型</mark>"
+
+
+class TestSearchQuery:
+    """测试检索 SQL"""
+
+    def test_fts_ranks_by_relevance_and_score(self, fts_conn):
+        rows, total, use_fts = run(fts_conn, "大模型")
+        assert use_fts is True
+        assert total == 3
+        # 相关度相近时 ai_score 高的排在前面
+        assert rows[0]["title"] == "大模型价格战再升级"
+        assert "<mark>大模型</mark>" in render_highlight(rows[0]["highlighted"])
+
+    def test_fts_highlight_escapes_title(self, fts_conn):
+        fts_conn.execute(
+            "INSERT INTO raw_news (title, link, source) VALUES (?, ?, ?)",
+            ("<script>alert(1)</script>大模型", "https://a.com/5", "微博")
+        )
+        rows, _, _ = run(fts_conn, "大模型", scope="raw", source="微博")
+        highlighted = [render_highlight(r["highlighted"]) for r in rows if r["link"] == "https://a.com/5"][0]
+        assert highlighted == "&lt;script&gt;alert(1)&lt;/script&gt;<mark>大模型</mark>"
+
+    def test_short_term_falls_back_to_like(self, fts_conn):
+        rows, total, use_fts = run(fts_conn, "火车")
+        assert use_fts is False
+        assert total == 1
+        assert rows[0]["title"] == "春运火车票开售"
+
+    def test_filters(self, fts_conn):
+        rows, total, _ = run(fts_conn, "大模型", scope="raw", source="微博")
+        assert total == 1
+        assert rows[0]["link"] == "https://a.com/1"
+
+        rows, total, _ = run(fts_conn, "大模型", start_date="2024-01-11", end_date="2024-01-12")
+        assert [r["link"] for r in rows] == ["https://a.com/2"]
+
+        _, total, _ = run(fts_conn, "大模型", category_id=2)
+        assert total == 0
+
+    def test_triggers_keep_index_in_sync(self, fts_conn):
+        fts_conn.execute("UPDATE raw_news SET title = '芯片出口新规' WHERE id = 1")
+        fts_conn.execute("DELETE FROM hot_topics")
+
+        _, total, _ = run(fts_conn, "大模型")
+        assert total == 1
+
+        rows, _, _ = run(fts_conn, "芯片出口")
+        assert rows[0]["id"] == 1
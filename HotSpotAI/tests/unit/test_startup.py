@@ -0,0 +1,66 @@
+"""
+启动导入单元测试
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def loaded_modules(statement: str) -> set:
+    """在子进程中执行导入语句，返回已加载的模块"""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys; {statement}; print(','.join(sys.modules))"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "LOG_LEVEL": "WARNING"},
+    )
+    assert result.returncode == 0, result.stderr
+    return set(result.stdout.strip().splitlines()[-1].split(","))
+
+
+class TestLazyImports:
+    """测试较重的模块延迟加载"""
+
+    @pytest.mark.parametrize("module", ["openai", "playwright"])
+    def test_main_does_not_import_heavy_modules(self, module):
+        assert module not in loaded_modules("import main")
+
+    def test_core_attributes_load_on_access(self):
+        modules = loaded_modules("import core")
+        assert "core.llm" not in modules
+        assert "core.scheduler" not in modules
+
+        modules = loaded_modules("from core import generate_article_for_topic")
+        assert "core.llm" in modules
+        assert "openai" not in modules
+
+    def test_db_importable_before_core(self):
+        """延迟导入后 db 可以先于 core 导入"""
+        assert "db" in loaded_modules("import db")
+
+
+class TestBrowserCheck:
+    """测试浏览器检查只启动一次并保留任务引用"""
+
+    async def test_started_once(self, monkeypatch):
+        from core import browser_check
+
+        calls = []
+
+        async def fake_check():
+            calls.append(1)
+            return "ok"
+
+        monkeypatch.setattr(browser_check, "check_browser", fake_check)
+        monkeypatch.setattr(browser_check, "_task", None)
+
+        task = browser_check.start_browser_check()
+        assert browser_check.start_browser_check() is task
+        assert browser_check._task is task
+        assert await task == "ok"
+        assert calls == [1]
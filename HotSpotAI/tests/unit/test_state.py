@@ -0,0 +1,274 @@
+"""
+运行时状态后端与多进程同步单元测试
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import aiosqlite
+import pytest
+
+import core  # noqa: F401
+from core import runtime_state
+from core.log_utils import add_log_to_buffer, get_logs
+from core.config import get_settings
+from core.state import MemoryStateBackend, StateSync, create_state_backend, resolve_state_backend_name
+from db import runtime_state as state_db
+from db.migrations import _create_job_tables, _create_runtime_tables
+
+
+@pytest.fixture
+async def state_conn(tmp_path, monkeypatch):
+    """带运行时状态表的临时数据库"""
+    conn = await aiosqlite.connect(str(tmp_path / "state.db"))
+    await _create_runtime_tables(conn)
+    await _create_job_tables(conn)
+    await conn.commit()
+
+    @asynccontextmanager
+    async def fake_get_db():
+        yield conn
+
+    monkeypatch.setattr(state_db, "get_state_db", fake_get_db)
+    yield conn
+    await conn.close()
+
+
+@pytest.fixture
+def shared_backend():
+    """模拟跨进程共享的后端"""
+    backend = MemoryStateBackend()
+    backend.shared = True
+    return backend
+
+
+@pytest.fixture(autouse=True)
+def restore_runtime_state():
+    """测试后恢复 runtime_state"""
+    original = dict(runtime_state)
+    yield
+    runtime_state.clear()
+    runtime_state.update(original)
+
+
+class TestSQLiteStateStore:
+    """测试数据库中的运行时状态"""
+
+    async def test_versions_increase(self, state_conn):
+        await state_db.save_state_values({"isRunning": True, "hot_topics": [{"title": "热点"}]})
+        changes, version = await state_db.load_state_changes(0)
+        assert changes == {"isRunning": True, "hot_topics": [{"title": "热点"}]}
+        assert version == 2
+
+        await state_db.save_state_values({"isRunning": False})
+        changes, version = await state_db.load_state_changes(version)
+        assert changes == {"isRunning": False}
+        assert version == 3
+
+        assert await state_db.load_state_changes(version) == ({}, version)
+
+    async def test_logs_since_and_trim(self, state_conn):
+        entries = [{"time": "10:00:00", "level": "info", "message": f"日志 {i}"} for i in range(5)]
+        await state_db.append_runtime_logs(entries, keep=3)
+
+        logs = await state_db.get_runtime_logs_since(0, limit=100)
+        assert [log["message"] for log in logs] == ["日志 2", "日志 3", "日志 4"]
+        assert [log["message"] for log in await state_db.get_runtime_logs_since(logs[1]["id"])] == ["日志 4"]
+        assert len(await state_db.get_runtime_logs_since(0, limit=2)) == 2
+
+    async def test_lock_lease(self, state_conn):
+        assert await state_db.acquire_lock("scheduler", "a", ttl=30)
+        assert await state_db.acquire_lock("scheduler", "a", ttl=30)  # 续期
+        assert not await state_db.acquire_lock("scheduler", "b", ttl=30)
+
+        await state_db.release_lock("scheduler", "b")  # 不能释放他人的锁
+        assert not await state_db.acquire_lock("scheduler", "b", ttl=30)
+
+        await state_db.release_lock("scheduler", "a")
+        assert await state_db.acquire_lock("scheduler", "b", ttl=30)
+
+    async def test_expired_lock_taken_over(self, state_conn):
+        assert await state_db.acquire_lock("scheduler", "a", ttl=-1)
+        assert await state_db.acquire_lock("scheduler", "b", ttl=30)
+
+
+class TestStateSync:
+    """测试进程间状态同步"""
+
+    async def test_pushes_local_changes(self, shared_backend):
+        sync = StateSync(shared_backend, interval=60)
+        runtime_state["last_selector_count"] = 7
+        await sync.sync_once()
+
+        changes, _ = await shared_backend.load_state_changes(0)
+        assert changes["last_selector_count"] == 7
+
+        # 未变化时不重复写入
+        _, version = await shared_backend.load_state_changes(0)
+        await sync.sync_once()
+        assert (await shared_backend.load_state_changes(0))[1] == version
+
+    async def test_applies_remote_changes(self, shared_backend):
+        sync = StateSync(shared_backend, interval=60)
+        await sync.sync_once()
+
+        await shared_backend.save_state({"isRunning": True, "hot_topics": [{"title": "远端热点"}]})
+        await sync.sync_once()
+
+        assert runtime_state["isRunning"] is True
+        assert runtime_state["hot_topics"] == [{"title": "远端热点"}]
+
+    async def test_logs_use_shared_ids(self, shared_backend):
+        sync = StateSync(shared_backend, interval=60)
+        await sync.start()
+        try:
+            entry = add_log_to_buffer("info", "共享日志")
+            assert entry["id"] is None  # 序号由共享存储分配
+            await sync.sync_once()
+
+            logs = await shared_backend.get_logs_since(0, 100)
+            assert logs[-1]["message"] == "共享日志"
+            assert get_logs()[0] == logs[-1]
+        finally:
+            await sync.stop()
+
+        # 停止后恢复直接写入缓冲区
+        assert add_log_to_buffer("info", "本地日志")["id"] is not None
+
+
+class TestJobQueue:
+    """测试手动任务请求队列"""
+
+    async def test_claimed_once(self, state_conn):
+        first = await state_db.enqueue_job_request("full_pipeline")
+        second = await state_db.enqueue_job_request("category_refresh", {"category_ids": [1, 2]})
+
+        claimed = await state_db.claim_job_requests("a", ttl=30)
+        assert claimed == [
+            {"id": first, "job": "full_pipeline", "params": {}},
+            {"id": second, "job": "category_refresh", "params": {"category_ids": [1, 2]}},
+        ]
+        assert await state_db.claim_job_requests("b", ttl=30) == []
+
+        await state_db.finish_job_request(first, "done")
+        async with state_conn.execute("SELECT status FROM job_requests WHERE id = ?", (first,)) as cursor:
+            assert (await cursor.fetchone())[0] == "done"
+
+    async def test_expired_lease_reclaimed(self, state_conn):
+        """领取进程退出（租约未续期）后请求被重新领取"""
+        request_id = await state_db.enqueue_job_request("full_pipeline")
+        assert len(await state_db.claim_job_requests("a", ttl=-1)) == 1
+
+        await state_db.renew_job_requests("b", ttl=30)  # 不能续期他人的请求
+        assert [r["id"] for r in await state_db.claim_job_requests("b", ttl=30)] == [request_id]
+
+        await state_db.renew_job_requests("b", ttl=30)
+        assert await state_db.claim_job_requests("c", ttl=30) == []
+
+    async def test_leader_runs_queued_jobs(self, shared_backend):
+        executed = []
+
+        async def runner(job, params):
+            executed.append((job, params))
+            if job == "broken":
+                raise RuntimeError("失败")
+
+        api = StateSync(shared_backend, interval=60, can_lead=False, job_runner=runner)
+        worker = StateSync(shared_backend, interval=60, job_runner=runner)
+        assert await worker.elect()
+
+        await shared_backend.enqueue_job("category_refresh", {"category_ids": [3]})
+        await shared_backend.enqueue_job("broken", {})
+        await api._run_jobs()
+        assert executed == []
+
+        await worker._run_jobs()
+        await asyncio.gather(*worker._jobs)
+        assert executed == [("category_refresh", {"category_ids": [3]}), ("broken", {})]
+        assert [job["status"] for job in shared_backend._jobs] == ["done", "failed"]
+
+
+class TestLeaderElection:
+    """测试调度锁选举"""
+
+    async def test_single_leader_and_failover(self, shared_backend):
+        events = []
+        first = StateSync(shared_backend, interval=60, on_leader=lambda: events.append("first"))
+        second = StateSync(shared_backend, interval=60, on_leader=lambda: events.append("second"))
+
+        assert await first.elect()
+        assert not await second.elect()
+
+        runtime_state["scraper_running"] = True
+        runtime_state["isRunning"] = True
+        await first.backend.release_lock("scheduler", first.owner)
+        assert await second.elect()
+        assert events == ["first", "second"]
+        # 接管时清除上一个持有进程遗留的运行标记
+        assert runtime_state["scraper_running"] is False
+        assert runtime_state["isRunning"] is False
+
+    async def test_restart_clears_stale_pipeline_flag(self, shared_backend):
+        """完整流程中途退出后重启，共享存储中遗留的 isRunning 被清除"""
+        await shared_backend.save_state({"isRunning": True})
+        sync = StateSync(shared_backend, interval=60)
+        await sync.start()
+        try:
+            assert runtime_state["isRunning"] is False
+            await sync.sync_once()
+            assert (await shared_backend.load_state_changes(0))[0]["isRunning"] is False
+        finally:
+            await sync.stop()
+
+    async def test_keeps_role_while_lease_valid(self, shared_backend):
+        """存储暂时不可用时，租约未到期前保持 leader"""
+        sync = StateSync(shared_backend, interval=60, lock_ttl=30)
+        assert await sync.elect()
+
+        async def broken(*args):
+            raise RuntimeError("database is locked")
+
+        shared_backend.acquire_lock = broken
+        assert await sync.elect()
+
+        sync._lease_expires = time.time() - 1
+        assert not await sync.elect()
+
+    async def test_worker_mode_does_not_lead(self, shared_backend):
+        """SCHEDULER_MODE=worker 时 API 进程不参与选举"""
+        events = []
+        sync = StateSync(shared_backend, interval=60, can_lead=False, on_leader=lambda: events.append("api"))
+        await sync.start()
+        try:
+            assert not sync.is_leader
+            assert events == []
+        finally:
+            await sync.stop()
+
+    async def test_unshared_backend_always_leads(self):
+        sync = StateSync(MemoryStateBackend(), interval=60, can_lead=False)
+        await sync.start()
+        try:
+            assert sync.is_leader
+        finally:
+            await sync.stop()
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_state_backend("redis")
+
+
+class TestBackendSelection:
+    """测试 auto 状态后端选择"""
+
+    @pytest.mark.parametrize("workers, mode, expected", [
+        (1, "embedded", "memory"),
+        (4, "embedded", "sqlite"),
+        (1, "worker", "sqlite"),
+    ])
+    def test_auto(self, monkeypatch, workers, mode, expected):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "workers", workers)
+        monkeypatch.setattr(settings, "scheduler_mode", mode)
+        assert resolve_state_backend_name("auto") == expected
+        assert resolve_state_backend_name("sqlite") == "sqlite"
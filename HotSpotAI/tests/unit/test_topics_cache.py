@@ -0,0 +1,106 @@
+"""
+热点话题序列化缓存单元测试
+"""
+import json
+
+import pytest
+
+from core import runtime_state
+from core.events import event_bus
+from core.topics_cache import (
+    dumps,
+    etag_matches,
+    get_encoded_topics,
+    set_hot_topics,
+    splice_topics,
+)
+from api.status import get_public_status, get_topics
+
+TOPICS = [{"title": "热点一", "link": "https://a.com", "heat": 10}]
+
+
+@pytest.fixture(autouse=True)
+def restore_topics():
+    """测试后恢复 runtime_state 中的热点话题"""
+    original = runtime_state.get("hot_topics", [])
+    yield
+    runtime_state["hot_topics"] = original
+
+
+class TestEncodedTopics:
+    """测试预编码和 ETag"""
+
+    async def test_set_hot_topics_encodes_once(self):
+        subscriber = event_bus.subscribe({"topics"})
+        encoded = set_hot_topics(TOPICS)
+
+        assert runtime_state["hot_topics"] is TOPICS
+        assert json.loads(encoded.body) == TOPICS
+        assert get_encoded_topics() is encoded
+
+        events = await subscriber.get(timeout=1)
+        assert events[-1].data is encoded
+        subscriber.close()
+
+    def test_reencodes_after_direct_assignment(self):
+        first = set_hot_topics(TOPICS)
+        runtime_state["hot_topics"] = [{"title": "热点二"}]
+
+        second = get_encoded_topics()
+        assert second is not first
+        assert second.etag != first.etag
+
+    def test_etag_stable_for_same_content(self):
+        assert set_hot_topics(list(TOPICS)).etag == set_hot_topics(list(TOPICS)).etag
+
+    def test_splice_topics(self):
+        encoded = set_hot_topics(TOPICS)
+
+        assert json.loads(splice_topics(dumps({"a": 1}), encoded)) == {"a": 1, "hot_topics": TOPICS}
+        assert json.loads(splice_topics(dumps({}), encoded)) == {"hot_topics": TOPICS}
+
+
+class TestEtagMatches:
+    """测试 If-None-Match 匹配"""
+
+    @pytest.mark.parametrize("header, expected", [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", "abc"', True),
+        ('"x"', False),
+        ("*", True),
+    ])
+    def test_matches(self, header, expected):
+        assert etag_matches(header, '"abc"') is expected
+
+
+class TestConditionalEndpoints:
+    """测试公开热点接口的 304"""
+
+    async def test_topics_not_modified(self):
+        set_hot_topics(TOPICS)
+
+        response = await get_topics(if_none_match=None)
+        assert response.status_code == 200
+        assert json.loads(response.body) == TOPICS
+        assert "max-age" in response.headers["Cache-Control"]
+
+        response = await get_topics(if_none_match=response.headers["ETag"])
+        assert response.status_code == 304
+        assert response.body == b""
+
+    async def test_public_status_etag_changes_with_state(self):
+        set_hot_topics(TOPICS)
+        first = await get_public_status(if_none_match=None)
+        assert json.loads(first.body)["hot_topics"] == TOPICS
+
+        assert (await get_public_status(if_none_match=first.headers["ETag"])).status_code == 304
+
+        original = runtime_state.get("isRunning", False)
+        runtime_state["isRunning"] = not original
+        try:
+            changed = await get_public_status(if_none_match=first.headers["ETag"])
+        finally:
+            runtime_state["isRunning"] = original
+        assert changed.status_code == 200
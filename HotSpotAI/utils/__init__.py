@@ -7,6 +7,11 @@ from .retry import (
     browser_retry,
     llm_retry,
     RetryPolicy,
+    RetryableError,
+    is_retryable,
+    retry_budget,
+    get_retry_metrics,
+    reset_retry_metrics,
 )
 
 __all__ = [
@@ -15,4 +20,9 @@ __all__ = [
     "browser_retry",
     "llm_retry",
     "RetryPolicy",
+    "RetryableError",
+    "is_retryable",
+    "retry_budget",
+    "get_retry_metrics",
+    "reset_retry_metrics",
 ]
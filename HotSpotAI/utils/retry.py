@@ -1,58 +1,339 @@
 """
 重试机制工具模块
-使用 tenacity 实现指数退避重试策略
+使用 tenacity 实现带抖动的指数退避重试策略
+
+- 异常分类：按异常所属的库（httpx、openai、playwright）判断是否值得重试，
+  超时、连接错误、429 和 5xx 重试；参数错误、鉴权失败、代码错误立即抛出
+- Retry-After：服务端给出的等待时间优先于退避时间；超过上限时不再重试（等待无法在合理时间内成功）
+- 重试预算：一次任务执行内所有重试共用一个预算（retry_budget），
+  平台或接口整体故障时不会让每个调用都重试满次数
+- 统计：按策略记录调用、重试、放弃次数和重试等待时间（get_retry_metrics）
 """
 from tenacity import (
     retry,
+    retry_if_exception,
     stop_after_attempt,
     wait_exponential,
-    retry_if_exception_type,
-    before_sleep_log,
+    wait_random,
 )
 import logging
-from typing import Callable, Any, Type
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Callable, Any, Dict, Iterator, Optional, Set
 from functools import wraps
+import asyncio
+import time
 
 logger = logging.getLogger(__name__)
 
+# 值得重试的 HTTP 状态码（请求超时、限流、服务端错误）
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# 默认接受的 Retry-After 上限（秒）
+MAX_RETRY_AFTER = 60.0
+
+
+class RetryableError(Exception):
+    """调用方主动标记为可重试的错误（如接口返回空内容）"""
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# ==================== 异常分类 ====================
+
+def _class_names(exc: BaseException) -> Set[str]:
+    # 按类名判断，不需要导入 openai / playwright（导入较慢，且可能未安装）
+    return {cls.__name__ for cls in type(exc).__mro__}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _classify_httpx(exc: BaseException) -> bool:
+    names = _class_names(exc)
+    if "HTTPStatusError" in names:
+        return _status_code(exc) in RETRYABLE_STATUS
+    # TimeoutException / NetworkError / RemoteProtocolError；
+    # InvalidURL、UnsupportedProtocol、TooManyRedirects 等重试也不会成功
+    return bool(names & {"TimeoutException", "NetworkError", "RemoteProtocolError"})
+
+
+def _classify_openai(exc: BaseException) -> bool:
+    names = _class_names(exc)
+    if names & {"APIConnectionError", "RateLimitError", "InternalServerError"}:
+        # APITimeoutError 是 APIConnectionError 的子类
+        return True
+    return _status_code(exc) in RETRYABLE_STATUS
+
+
+def _classify_playwright(exc: BaseException) -> bool:
+    if "TimeoutError" in _class_names(exc):
+        return True
+    # 网络层错误（连接重置、DNS 失败等），页面脚本错误和选择器错误不重试
+    return "net::ERR_" in str(exc)
+
+
+# 异常所属的顶层模块 -> 分类函数
+EXCEPTION_CLASSIFIERS: Dict[str, Callable[[BaseException], bool]] = {
+    "httpx": _classify_httpx,
+    "httpcore": _classify_httpx,
+    "openai": _classify_openai,
+    "playwright": _classify_playwright,
+}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    判断异常是否值得重试
+
+    Args:
+        exc: 异常
+
+    Returns:
+        是否重试
+    """
+    if isinstance(exc, RetryableError):
+        return True
+    classifier = EXCEPTION_CLASSIFIERS.get(type(exc).__module__.split(".")[0])
+    if classifier is not None:
+        return classifier(exc)
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def is_timeout(exc: BaseException) -> bool:
+    """判断异常是否为超时（各库的超时异常类名均以 Timeout 开头或结尾）"""
+    if isinstance(exc, TimeoutError):
+        return True
+    return any(name.startswith("Timeout") or name.endswith("TimeoutError") for name in _class_names(exc))
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    读取服务端建议的等待时间（Retry-After / retry-after-ms 响应头）
+
+    Args:
+        exc: 异常（httpx.HTTPStatusError、openai.APIStatusError 等带 response 的异常）
+
+    Returns:
+        等待秒数，没有时返回 None
+    """
+    if isinstance(exc, RetryableError):
+        return exc.retry_after
+
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value:
+            return max(float(value) / 1000, 0.0)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+# ==================== 重试预算 ====================
+
+class RetryBudget:
+    """一次任务执行内共享的重试次数上限"""
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self.used = 0
+        self.denied = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.used >= self.max_retries
+
+    def try_spend(self) -> bool:
+        """消耗一次重试，预算已用完时返回 False"""
+        if self.exhausted:
+            self.denied += 1
+            return False
+        self.used += 1
+        return True
+
+
+_current_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+@contextmanager
+def retry_budget(max_retries: int) -> Iterator[RetryBudget]:
+    """
+    在当前上下文（及其中创建的任务）内启用重试预算
+
+    Args:
+        max_retries: 允许的重试总次数
+
+    Yields:
+        RetryBudget
+    """
+    budget = RetryBudget(max_retries)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+# ==================== 统计 ====================
+
+class RetryStats:
+    """单个重试策略的统计"""
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.not_retryable = 0
+        self.budget_exhausted = 0
+        self.retry_after = 0
+        self.wait_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "not_retryable": self.not_retryable,
+            "budget_exhausted": self.budget_exhausted,
+            "retry_after": self.retry_after,
+            "wait_seconds": round(self.wait_seconds, 1),
+        }
+
+
+_stats: Dict[str, RetryStats] = {}
+
+
+def get_retry_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    获取各重试策略的统计
+
+    Returns:
+        策略名称 -> {calls, retries, failures, not_retryable, budget_exhausted, retry_after, wait_seconds}
+    """
+    return {name: stats.to_dict() for name, stats in _stats.items()}
+
+
+def reset_retry_metrics() -> None:
+    """清空重试统计（装饰器持有统计对象的引用，只清零不删除）"""
+    for stats in _stats.values():
+        stats.__init__()
+
+
+# ==================== 装饰器 ====================
 
 def with_retry(
     max_attempts: int = 3,
     min_wait: float = 1.0,
     max_wait: float = 10.0,
-    exception_types: tuple = (Exception,),
+    exception_types: Optional[tuple] = None,
+    retry_timeouts: bool = True,
+    max_retry_after: float = MAX_RETRY_AFTER,
+    name: Optional[str] = None,
 ):
     """
     通用重试装饰器
 
     Args:
-        max_attempts: 最大重试次数
-        min_wait: 最小等待时间(秒)
+        max_attempts: 最大尝试次数
+        min_wait: 首次重试的基础等待时间(秒)，之后指数增长并加随机抖动
         max_wait: 最大等待时间(秒)
-        exception_types: 需要重试的异常类型
+        exception_types: 需要重试的异常类型，None 表示按 is_retryable 分类
+        retry_timeouts: 是否重试超时（单次超时很长的调用重试只会成倍增加耗时）
+        max_retry_after: 服务端要求的等待时间超过该值时不再重试
+        name: 统计名称，默认为函数名
 
     Returns:
         装饰器函数
     """
 
     def decorator(func: Callable) -> Callable:
-        @retry(
-            stop=stop_after_attempt(max_attempts),
-            wait=wait_exponential(multiplier=1, min=min_wait, max=max_wait),
-            retry=retry_if_exception_type(exception_types),
-            before_sleep=before_sleep_log(logger, logging.WARNING),
+        stats = _stats.setdefault(name or func.__qualname__, RetryStats())
+        # 指数退避加随机抖动，多个进程、多个调用不会在同一时刻集中重试
+        backoff = wait_exponential(multiplier=min_wait, max=max_wait) + wait_random(0, min_wait)
+
+        def should_retry(exc: BaseException) -> bool:
+            if exception_types is not None:
+                retryable = isinstance(exc, exception_types)
+            else:
+                retryable = is_retryable(exc)
+            if retryable and not retry_timeouts and is_timeout(exc):
+                retryable = False
+            hint = retry_after_seconds(exc)
+            if retryable and hint is not None and hint > max_retry_after:
+                logger.warning(f"{func.__qualname__}: 服务端要求等待 {hint:.0f}s，超过上限，不再重试")
+                retryable = False
+            if not retryable:
+                stats.not_retryable += 1
+            return retryable
+
+        def budget_stop(retry_state) -> bool:
+            budget = _current_budget.get()
+            if budget is None or budget.try_spend():
+                return False
+            stats.budget_exhausted += 1
+            logger.warning(f"{func.__qualname__}: 本次任务重试预算已用完，不再重试")
+            return True
+
+        def wait(retry_state) -> float:
+            delay = backoff(retry_state)
+            hint = retry_after_seconds(retry_state.outcome.exception())
+            return delay if hint is None else max(delay, hint)
+
+        def before_sleep(retry_state) -> None:
+            exc = retry_state.outcome.exception()
+            stats.retries += 1
+            stats.wait_seconds += retry_state.next_action.sleep
+            if retry_after_seconds(exc) is not None:
+                stats.retry_after += 1
+            logger.warning(
+                f"{func.__qualname__}: 第 {retry_state.attempt_number} 次尝试失败 "
+                f"({type(exc).__name__}: {exc})，{retry_state.next_action.sleep:.1f}s 后重试"
+            )
+
+        retrying = retry(
+            # 尝试次数用尽时不消耗预算
+            stop=stop_after_attempt(max_attempts) | budget_stop,
+            wait=wait,
+            retry=retry_if_exception(should_retry),
+            before_sleep=before_sleep,
             reraise=True,  # 重试次数用尽后重新抛出异常
-        )
+        )(func)
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs) -> Any:
-            return await func(*args, **kwargs)
+            stats.calls += 1
+            try:
+                return await retrying(*args, **kwargs)
+            except Exception:
+                stats.failures += 1
+                raise
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs) -> Any:
-            return func(*args, **kwargs)
+            stats.calls += 1
+            try:
+                return retrying(*args, **kwargs)
+            except Exception:
+                stats.failures += 1
+                raise
 
         # 根据函数类型返回对应的包装器
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
@@ -66,36 +347,28 @@ class RetryPolicy:
 
     # 网络请求重试策略
     HTTP_RETRY = {
+        "name": "http",
         "max_attempts": 3,
         "min_wait": 1.0,
         "max_wait": 5.0,
-        "exception_types": (
-            ConnectionError,
-            TimeoutError,
-            OSError,
-        ),
     }
 
     # Playwright 浏览器操作重试策略
     BROWSER_RETRY = {
+        "name": "browser",
         "max_attempts": 2,
         "min_wait": 2.0,
         "max_wait": 5.0,
-        "exception_types": (
-            TimeoutError,
-            Exception,  # Playwright 异常类型较多
-        ),
     }
 
     # LLM API 调用重试策略
+    # 单次请求超时长达数分钟，超时后重试只会成倍增加耗时；连接错误、限流和服务端错误重试
     LLM_RETRY = {
+        "name": "llm",
         "max_attempts": 3,
         "min_wait": 2.0,
-        "max_wait": 10.0,
-        "exception_types": (
-            ConnectionError,
-            TimeoutError,
-        ),
+        "max_wait": 30.0,
+        "retry_timeouts": False,
     }
 
 
@@ -112,27 +385,3 @@ def browser_retry(func: Callable) -> Callable:
 def llm_retry(func: Callable) -> Callable:
     """LLM API 调用重试装饰器"""
     return with_retry(**RetryPolicy.LLM_RETRY)(func)
-
-
-# 使用示例
-if __name__ == "__main__":
-    import httpx
-
-    @http_retry
-    async def fetch_url(url: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=5.0)
-            response.raise_for_status()
-            return response.text
-
-    # 测试
-    import asyncio
-
-    async def test():
-        try:
-            result = await fetch_url("https://httpbin.org/get")
-            print("Success:", len(result))
-        except Exception as e:
-            print("Failed after retries:", e)
-
-    # asyncio.run(test())
@@ -0,0 +1,89 @@
+"""
+独立调度进程
+与 API 进程共享数据库，通过调度锁保证只有一个进程运行定时任务，
+并执行 API 进程提交的手动任务请求（立即刷新、分类刷新）。
+
+API 进程设置 SCHEDULER_MODE=worker 后不再参与调度锁选举，
+爬虫、LLM 调用等耗时任务全部在本进程中执行。
+
+用法: python worker.py
+"""
+import sys
+import asyncio
+import signal
+
+# === Windows 异步循环修复 (必须在最前面) ===
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+from core import add_log, get_settings, setup_file_logging, get_logger
+
+settings = get_settings()
+
+# === 初始化日志系统 ===
+setup_file_logging(
+    level=settings.log_level,
+    max_bytes=10 * 1024 * 1024,  # 10MB
+    backup_count=5,
+    use_time_rotation=True  # 按天轮转
+)
+
+logger = get_logger(__name__)
+
+
+async def main():
+    from core import init_db, run_manual_job, start_scheduler, stop_scheduler
+    from core.browser_check import start_browser_check
+    from core.db_pool import close_db
+    from core.executors import shutdown_executors
+    from core.llm import close_llm_client
+    from core.loop_monitor import start_loop_monitor, stop_loop_monitor
+    from core.state import start_state_sync, stop_state_sync
+    from scrapers.http_client import close_http_client
+
+    logger.info("=" * 50)
+    logger.info("HotSpotAI 调度进程启动中...")
+    logger.info("=" * 50)
+
+    start_loop_monitor()
+    await init_db()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows 不支持 add_signal_handler，Ctrl+C 时由 asyncio.run 取消任务
+            pass
+
+    def on_leader():
+        start_scheduler()
+        start_browser_check()
+
+    state_sync = await start_state_sync(
+        on_leader=on_leader,
+        on_follower=stop_scheduler,
+        can_lead=True,
+        job_runner=run_manual_job,
+    )
+    logger.info(f"调度角色: {state_sync.role}")
+    add_log('info', f'调度进程已启动 ({state_sync.role})')
+
+    try:
+        await stop_event.wait()
+    finally:
+        # 先停止调度器再释放调度锁，其他进程可立即接管
+        logger.info("调度进程退出中...")
+        stop_scheduler()
+        await stop_state_sync()
+        await stop_loop_monitor()
+        shutdown_executors()
+        await close_http_client()
+        await close_llm_client()
+        # 关闭数据库连接（aiosqlite 的后台线程会阻止进程退出）
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -265,7 +265,7 @@ setup_environment() {
         echo ""
         echo "必需配置项："
         echo "  - LLM_API_KEY     : 智谱 AI API Key（必需）"
-        echo "  - JWT_SECRET_KEY : JWT 密钥（必需）"
+        echo "  - JWT_SECRET_KEY : JWT 密钥（可选，留空时自动生成 jwt_keys.json）"
         echo ""
 
         # 等待用户配置
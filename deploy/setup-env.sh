@@ -45,7 +45,7 @@ fi
 if [[ $INTERACTIVE == false ]]; then
     cp "$ENV_EXAMPLE" "$ENV_OUTPUT"
     log_info "配置文件已创建: $ENV_OUTPUT"
-    log_warn "请手动编辑配置文件，设置 LLM_API_KEY 和 JWT_SECRET_KEY"
+    log_warn "请手动编辑配置文件，设置 LLM_API_KEY（JWT_SECRET_KEY 留空时自动生成密钥文件）"
     exit 0
 fi
 
@@ -178,10 +178,10 @@ else
 fi
 
 # 检查 API 端点
-if curl -s http://localhost:3000/api/health > /dev/null; then
+if curl -sf http://localhost:3000/health/ready > /dev/null; then
     log_info "API 端点响应正常 ✓"
 else
-    log_warn "API 端点无响应，请检查后端日志"
+    log_warn "API 未就绪（/health/ready 非 200），请检查后端日志"
 fi
 
 # 9. 清理旧备份（保留最近 3 个）
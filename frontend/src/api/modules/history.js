@@ -21,6 +21,26 @@ export default {
     })
   },
 
+  /**
+   * 全文检索新闻和热点
+   * @param {Object} params - 查询参数
+   * @param {string} params.q - 检索词（空格分隔多个词）
+   * @param {string} params.scope - 检索范围 (all/raw/topics)
+   * @param {string} params.source - 数据源筛选
+   * @param {number} params.category_id - 分类ID筛选
+   * @param {string} params.start_date - 起始日期 (YYYY-MM-DD)
+   * @param {string} params.end_date - 结束日期 (YYYY-MM-DD)
+   * @param {number} params.offset - 偏移量
+   * @param {number} params.limit - 每页数量
+   */
+  search(params) {
+    return request({
+      url: '/history/search',
+      method: 'get',
+      params
+    })
+  },
+
   /**
    * 获取所有可用日期列表
    */
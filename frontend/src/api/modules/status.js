@@ -22,6 +22,18 @@ export function getStatus() {
   })
 }
 
+/**
+ * 增量获取日志（仅管理员）
+ * @param {number} since - 已收到的最大日志序号
+ */
+export function getLogs(since = 0) {
+  return request({
+    url: '/logs',
+    method: 'get',
+    params: { since }
+  })
+}
+
 /**
  * 健康检查（无需认证）
  */
@@ -17,13 +17,19 @@ export function useSSE() {
   let eventHandlers = {}
   let reconnectTimer = null
   let isReconnecting = false
+  // Last received event id, sent as Last-Event-ID on reconnect to resume missed events
+  let lastEventId = null
 
   /**
    * Parse SSE data from a line
    */
   function parseSSELine(line) {
-    if (line.startsWith('event:')) {
+    if (line === '') {
+      return { type: 'dispatch' }
+    } else if (line.startsWith('event:')) {
       return { type: 'event', value: line.slice(6).trim() }
+    } else if (line.startsWith('id:')) {
+      return { type: 'id', value: line.slice(3).trim() }
     } else if (line.startsWith('data:')) {
       return { type: 'data', value: line.slice(5).trim() }
     } else if (line.startsWith(':')) {
@@ -55,6 +61,10 @@ export function useSSE() {
       headers['Authorization'] = `Bearer ${token}`
     }
 
+    if (lastEventId) {
+      headers['Last-Event-ID'] = lastEventId
+    }
+
     abortController = new AbortController()
 
     try {
@@ -105,18 +115,17 @@ export function useSSE() {
 
           if (parsed.type === 'event') {
             currentEvent = parsed.value
+          } else if (parsed.type === 'id') {
+            lastEventId = parsed.value
           } else if (parsed.type === 'data') {
-            if (parsed.value === '') {
-              // Empty data line marks the end of an event
-              if (currentData.length > 0) {
-                const eventData = currentData.join('\n')
-                handleEvent(currentEvent, eventData, onMessage)
-                currentData = []
-                currentEvent = 'message'
-              }
-            } else {
-              currentData.push(parsed.value)
+            currentData.push(parsed.value)
+          } else if (parsed.type === 'dispatch') {
+            // Blank line marks the end of an event
+            if (currentData.length > 0) {
+              handleEvent(currentEvent, currentData.join('\n'), onMessage)
             }
+            currentData = []
+            currentEvent = 'message'
           }
         }
       }